@@ -0,0 +1,8 @@
+"""
+Bancs d'essai de pcUtils.
+
+Ces modules mesurent les chemins critiques de l'application sans machine
+réelle. Ils se lancent depuis la racine du dépôt, par exemple:
+
+    python -m benchmarks.ssh_bench --hosts 1,10,50
+"""
@@ -0,0 +1,581 @@
+"""
+Banc d'essai du traitement des logs par l'interface.
+
+Envoie des lignes de log JSON et de progression, à cadence fixée, depuis
+des machines simulées vers LoggerUtils.process_output_line, dans une
+application Textual sans terminal (App.run_test) qui reproduit la zone de
+logs et les conteneurs de plugins de l'écran d'exécution.
+
+Sources des lignes (--source):
+
+    synthetic  lignes produites dans le processus mesuré, au format JSONL
+               de PluginLogger (transmis tel quel par ssh_wrapper.py);
+    plugin     pour chaque machine, ssh_wrapper.py lance un plugin réel
+               (log_plugin.py) qui émet ses lignes par PluginLogger: toute
+               la chaîne plugin, wrapper, interface est mesurée.
+
+Chemins de LoggerUtils (--path):
+
+    direct     l'écran actif est l'écran d'exécution: LoggerUtils tente
+               d'afficher chaque ligne dès sa réception;
+    queued     un autre écran est actif: les lignes sont mises dans la file
+               d'attente de LoggerUtils.
+
+Comme dans l'application, les exécuteurs transmettent l'App à LoggerUtils et
+la tâche périodique de vidage de la file est lancée sur l'écran (l'écran
+d'exécution la lance sur ExecutionWidget). Avec Textual 3, app.query_one ne
+cherche que dans l'écran par défaut: sur le chemin direct, la zone de logs
+n'est pas trouvée et les lignes rejoignent elles aussi la file (500 messages
+au plus), vidée par la tâche périodique. Le banc d'essai mesure ce
+fonctionnement tel quel.
+
+Pour chaque scénario sont mesurés:
+
+    - le débit atteint (lignes/s) face au débit demandé, et la capacité du
+      traitement (lignes par seconde passée dans process_output_line);
+    - la durée de process_output_line par ligne (percentiles);
+    - le retard d'une horloge à 60 images/s sur la boucle d'événements,
+      qui retarde d'autant chaque rafraîchissement de l'interface;
+    - la mémoire du processus (RSS au début, au pic et à la fin) et la
+      taille du texte de la zone de logs;
+    - les messages perdus: lignes de log émises dont le marqueur unique
+      n'apparaît pas dans la zone de logs à la fin du scénario.
+
+Avec --duration, chaque machine émet pendant la durée donnée (essai
+d'endurance) et la croissance de la mémoire est rapportée en Mo/min.
+
+Exemples:
+
+    python -m benchmarks.log_bench --hosts 1,20 --rate 50,500 --lines 1000
+    python -m benchmarks.log_bench --source plugin --hosts 10 --rate 100 --duration 300
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+import itertools
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.stats import Reservoir, current_rss_mb, float_list, int_list, max_rss_mb
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Plugin affiché pour toutes les machines simulées
+PLUGIN_NAME = 'bench_logs'
+
+# Marqueur unique des lignes de log ([h<machine>#<n>], crochets échappés à l'affichage)
+MARKER = re.compile(r'h(\d+)#(\d+)')
+
+# Clé des durées transmises par le wrapper (REMOTE_TIMING_KEY de ssh_executor.py)
+TIMING_KEY = 'pcutils_timing'
+
+# Intervalle de l'horloge d'images (60 images/s)
+FRAME_INTERVAL = 1 / 60
+
+# Intervalle d'échantillonnage de la mémoire, en secondes
+MEMORY_INTERVAL = 1.0
+
+# Lignes envoyées entre deux ajustements de la cadence (source synthetic)
+LINES_PER_TICK = 10
+
+# Attente maximale du vidage de la file de LoggerUtils en fin de scénario
+DRAIN_TIMEOUT = 30.0
+
+def host_address(host: int) -> str:
+    """Adresse affichée pour une machine simulée (numérotées à partir de 1)."""
+    return f"10.99.{host // 250}.{host % 250 + 1}"
+
+def log_line(host: int, index: int, payload: str) -> str:
+    """
+    Ligne de log d'une machine, au format JSONL de PluginLogger.
+
+    Args:
+        host: Numéro de la machine (instance du plugin)
+        index: Numéro de la ligne
+        payload: Texte du message
+
+    Returns:
+        str: Ligne JSON
+    """
+    return json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "level": "info",
+        "plugin_name": PLUGIN_NAME,
+        "instance_id": host,
+        "message": f"[h{host}#{index}] {payload}",
+    }, ensure_ascii=False)
+
+def progress_line(host: int, step: int, total: int) -> str:
+    """
+    Ligne de progression d'une machine, au format JSONL de PluginLogger.
+
+    Args:
+        host: Numéro de la machine (instance du plugin)
+        step: Étape atteinte
+        total: Nombre total d'étapes
+
+    Returns:
+        str: Ligne JSON
+    """
+    return json.dumps({
+        "timestamp": datetime.now().isoformat(),
+        "level": "progress",
+        "plugin_name": PLUGIN_NAME,
+        "instance_id": host,
+        "message": {
+            "type": "progress",
+            "data": {
+                "id": f"pb_{PLUGIN_NAME}_{host}_main",
+                "percentage": step / total,
+                "current_step": step,
+                "total_steps": total,
+            },
+        },
+    }, ensure_ascii=False)
+
+def growth_per_minute(samples: List[Tuple[float, float]]) -> Optional[float]:
+    """
+    Pente de la mémoire échantillonnée (moindres carrés), en Mo/min.
+
+    Args:
+        samples: Échantillons (secondes écoulées, Mo)
+
+    Returns:
+        Optional[float]: Croissance, ou None avec moins de deux échantillons
+    """
+    if len(samples) < 2:
+        return None
+    mean_t = sum(t for t, _ in samples) / len(samples)
+    mean_m = sum(m for _, m in samples) / len(samples)
+    variance = sum((t - mean_t) ** 2 for t, _ in samples)
+    if not variance:
+        return None
+    slope = sum((t - mean_t) * (m - mean_m) for t, m in samples) / variance
+    return round(slope * 60, 2)
+
+def create_workspace(root: str) -> str:
+    """
+    Crée le répertoire des machines de la source plugin.
+
+    Le plugin synthétique y est copié comme exec.py du plugin bench_logs, à
+    côté d'un lien vers plugins_utils, comme sur une machine distante.
+
+    Args:
+        root: Répertoire temporaire du banc d'essai
+
+    Returns:
+        str: Répertoire des machines
+    """
+    hosts_dir = os.path.join(root, 'hosts')
+    os.makedirs(os.path.join(hosts_dir, PLUGIN_NAME))
+    os.symlink(os.path.join(REPO_DIR, 'plugins', 'plugins_utils'), os.path.join(hosts_dir, 'plugins_utils'))
+    shutil.copy(os.path.join(BENCH_DIR, 'log_plugin.py'), os.path.join(hosts_dir, PLUGIN_NAME, 'exec.py'))
+    return hosts_dir
+
+def prepare_host(hosts_dir: str, host: int, lines: int, rate: float,
+                 args: argparse.Namespace) -> List[str]:
+    """
+    Prépare le dossier d'une machine de la source plugin.
+
+    Le dossier contient ssh_wrapper.py et ses deux fichiers de configuration,
+    comme le dossier temporaire créé par SSHExecutor sur la machine.
+
+    Args:
+        hosts_dir: Répertoire des machines (create_workspace())
+        host: Numéro de la machine
+        lines: Lignes de log émises par le plugin
+        rate: Cadence d'émission, en lignes/s (0: sans limite)
+        args: Options du banc d'essai
+
+    Returns:
+        List[str]: Commande lançant le wrapper
+    """
+    host_dir = os.path.join(hosts_dir, f"h{host}")
+    os.makedirs(host_dir, exist_ok=True)
+    wrapper_path = os.path.join(host_dir, 'ssh_wrapper.py')
+    shutil.copy(os.path.join(REPO_DIR, 'ui', 'execution_screen', 'ssh_wrapper.py'), wrapper_path)
+
+    plugin_config = {
+        'plugin_name': PLUGIN_NAME,
+        'instance_id': host,
+        'ssh_mode': True,
+        'config': {
+            'bench_host': host,
+            'bench_lines': lines,
+            'bench_rate': rate,
+            'bench_line_size': args.line_size,
+            'bench_progress_every': args.progress_every,
+        },
+    }
+    with open(os.path.join(host_dir, 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump(plugin_config, f)
+
+    wrapper_config_path = os.path.join(host_dir, 'wrapper_config.json')
+    with open(wrapper_config_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'plugin_path': os.path.join(hosts_dir, PLUGIN_NAME, 'exec.py'),
+            'plugin_config': plugin_config,
+            'needs_sudo': False,
+        }, f)
+
+    return [sys.executable, wrapper_path, wrapper_config_path]
+
+def make_app_class():
+    """
+    Crée l'application Textual du banc d'essai.
+
+    Importée tardivement: l'interface n'est chargée qu'une fois l'environnement
+    du banc d'essai préparé.
+
+    Returns:
+        type: Classe de l'application
+    """
+    from textual.app import App, ComposeResult
+    from textual.containers import Horizontal, ScrollableContainer
+    from textual.screen import Screen
+    from textual.widgets import Static
+
+    from ui.execution_screen.plugin_container import PluginContainer
+
+    class BenchExecutionScreen(Screen):
+        """
+        Disposition de l'écran d'exécution: un conteneur par machine et la
+        zone de logs. Son nom contient ExecutionScreen: LoggerUtils affiche
+        les lignes dès leur réception.
+        """
+
+        def __init__(self, hosts: int):
+            super().__init__()
+            self.hosts = hosts
+
+        def compose(self) -> ComposeResult:
+            with ScrollableContainer(id="plugins-list"):
+                for host in range(1, self.hosts + 1):
+                    container = PluginContainer(f"{PLUGIN_NAME}_{host}", PLUGIN_NAME, f"Machine {host}", "📦")
+                    container.target_ip = host_address(host)
+                    yield container
+            with Horizontal(id="logs"):
+                with ScrollableContainer(id="logs-container"):
+                    yield Static("", id="logs-text")
+
+    class BenchQueuedScreen(BenchExecutionScreen):
+        """Même disposition sous un autre nom: LoggerUtils passe par sa file d'attente."""
+
+    class LogBenchApp(App):
+        """Application affichant l'un des deux écrans du banc d'essai."""
+
+        CSS_PATH = os.path.join(REPO_DIR, 'ui', 'styles', 'execution.tcss')
+
+        def __init__(self, hosts: int, path: str):
+            super().__init__()
+            self.hosts = hosts
+            self.path = path
+
+        def on_mount(self) -> None:
+            screen_class = BenchExecutionScreen if self.path == 'direct' else BenchQueuedScreen
+            self.push_screen(screen_class(self.hosts))
+
+    return LogBenchApp
+
+class LogScenario:
+    """
+    Un scénario: des machines simulées envoient leurs lignes à l'application.
+    """
+
+    def __init__(self, app_class, args: argparse.Namespace, hosts: int, rate: float, lines: int,
+                 hosts_dir: Optional[str] = None):
+        """
+        Initialise le scénario.
+
+        Args:
+            app_class: Classe de l'application (make_app_class())
+            args: Options du banc d'essai
+            hosts: Nombre de machines simulées
+            rate: Cadence de chaque machine, en lignes/s (0: sans limite)
+            lines: Lignes de log émises par chaque machine
+            hosts_dir: Répertoire des machines (source plugin)
+        """
+        from ui.execution_screen.logger_utils import LoggerUtils
+
+        self.logger_utils = LoggerUtils
+        self.app = app_class(hosts, args.path)
+        self.args = args
+        self.hosts = hosts
+        self.rate = rate
+        self.lines = lines
+        self.hosts_dir = hosts_dir
+
+        self.received = 0
+        self.busy = 0.0
+        self.call_times = Reservoir()
+        self.frame_lag = Reservoir()
+        self.memory: List[Tuple[float, float]] = []
+        self.errors: List[str] = []
+        self._stopped = asyncio.Event()
+        self._start = 0.0
+
+    async def process(self, line: str, target_ip: str) -> None:
+        """Transmet une ligne à LoggerUtils, comme les exécuteurs, et mesure sa durée."""
+        start = time.perf_counter()
+        await self.logger_utils.process_output_line(self.app, line, None, target_ip=target_ip)
+        elapsed = time.perf_counter() - start
+        self.received += 1
+        self.busy += elapsed
+        self.call_times.add(elapsed)
+
+    async def produce(self, host: int) -> None:
+        """
+        Émet les lignes d'une machine dans le processus (source synthetic).
+
+        Args:
+            host: Numéro de la machine
+        """
+        payload = 'x' * self.args.line_size
+        target_ip = host_address(host)
+        progress_every = self.args.progress_every
+        total_steps = max(1, self.lines // progress_every) if progress_every else 0
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        for index in range(self.lines):
+            await self.process(log_line(host, index, payload), target_ip)
+            if progress_every and (index + 1) % progress_every == 0:
+                await self.process(progress_line(host, (index + 1) // progress_every, total_steps), target_ip)
+            if (index + 1) % LINES_PER_TICK == 0:
+                # Sans cadence, rend tout de même la main à la boucle comme une lecture de flux
+                delay = start + (index + 1) / self.rate - loop.time() if self.rate else 0
+                await asyncio.sleep(max(0.0, delay))
+
+    async def run_plugin(self, host: int, env: Dict[str, str]) -> None:
+        """
+        Lance le wrapper et le plugin d'une machine et transmet leurs lignes (source plugin).
+
+        Args:
+            host: Numéro de la machine
+            env: Environnement des processus
+        """
+        command = prepare_host(self.hosts_dir, host, self.lines, self.rate, self.args)
+        target_ip = host_address(host)
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=env)
+
+        async def read_stream(stream) -> None:
+            while True:
+                line = await stream.readline()
+                if not line:
+                    break
+                line_text = line.decode('utf-8', errors='replace').strip()
+                # Les durées du wrapper sont enregistrées par l'exécuteur, pas affichées
+                if not line_text or TIMING_KEY in line_text:
+                    continue
+                await self.process(line_text, target_ip)
+
+        await asyncio.gather(read_stream(process.stdout), read_stream(process.stderr))
+        code = await process.wait()
+        if code:
+            self.errors.append(f"machine {host}: code de retour {code}")
+
+    async def frame_clock(self) -> None:
+        """Mesure le retard d'une horloge à 60 images/s sur la boucle d'événements."""
+        while not self._stopped.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(FRAME_INTERVAL)
+            self.frame_lag.add(max(0.0, time.perf_counter() - start - FRAME_INTERVAL))
+
+    async def sample_memory(self) -> None:
+        """Échantillonne la mémoire résidente du processus."""
+        while True:
+            rss = current_rss_mb()
+            if rss is not None:
+                self.memory.append((time.perf_counter() - self._start, rss))
+            try:
+                await asyncio.wait_for(self._stopped.wait(), MEMORY_INTERVAL)
+                return
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Exécute le scénario.
+
+        Returns:
+            Dict[str, Any]: Mesures du scénario
+        """
+        from textual.widgets import Static
+
+        async with self.app.run_test(headless=True, size=(160, 50)) as pilot:
+            await pilot.pause()
+            # L'écran tient le rôle d'ExecutionWidget: vidage de la file et zone de logs
+            screen = self.app.screen
+            await self.logger_utils.clear_logs(screen)
+            await self.logger_utils.start_logs_timer(screen)
+
+            self._start = time.perf_counter()
+            monitors = [asyncio.create_task(self.frame_clock()), asyncio.create_task(self.sample_memory())]
+
+            if self.hosts_dir:
+                env = dict(os.environ, TMPDIR=os.path.dirname(self.hosts_dir))
+                await asyncio.gather(*(self.run_plugin(host, env) for host in range(1, self.hosts + 1)))
+            else:
+                await asyncio.gather(*(self.produce(host) for host in range(1, self.hosts + 1)))
+            wall = time.perf_counter() - self._start
+
+            # Attendre que la tâche périodique ait vidé la file
+            deadline = time.perf_counter() + DRAIN_TIMEOUT
+            while self.logger_utils.get_pending_message_count() and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            drain = time.perf_counter() - self._start - wall
+            pending = self.logger_utils.get_pending_message_count()
+            await pilot.pause()
+
+            self._stopped.set()
+            await asyncio.gather(*monitors)
+            await self.logger_utils.stop_logs_timer()
+
+            text = str(screen.query_one("#logs-text", Static).renderable or "")
+
+        sent = self.hosts * self.lines
+        displayed = len(set(MARKER.findall(text)))
+        rss = [mb for _, mb in self.memory]
+        return {
+            'source': self.args.source,
+            'path': self.args.path,
+            'hosts': self.hosts,
+            'rate': self.rate,
+            'lines': self.lines,
+            'errors': self.errors,
+            'wall': round(wall, 4),
+            'drain': round(drain, 4),
+            'offered_lines_per_s': round(self.hosts * self.rate, 1) if self.rate else None,
+            'lines_per_s': round(sent / wall, 1) if wall else 0.0,
+            'capacity_lines_per_s': round(self.received / self.busy, 1) if self.busy else 0.0,
+            'received': self.received,
+            'call_ms': self.call_times.summary(scale=1000, digits=3),
+            'frame_lag_ms': self.frame_lag.summary(scale=1000, digits=2),
+            'sent': sent,
+            'displayed': displayed,
+            'dropped': sent - displayed,
+            'pending': pending,
+            'logs_chars': len(text),
+            'rss_start_mb': rss[0] if rss else None,
+            'rss_peak_mb': max(rss) if rss else None,
+            'rss_end_mb': rss[-1] if rss else None,
+            'rss_growth_mb_per_min': growth_per_minute(self.memory),
+            'max_rss_mb': max_rss_mb(),
+        }
+
+def format_result(result: Dict[str, Any]) -> str:
+    """
+    Formate les mesures d'un scénario sur quelques lignes.
+
+    Args:
+        result: Mesures (LogScenario.run())
+
+    Returns:
+        str: Texte affichable
+    """
+    status = "OK" if not result['errors'] else f"ÉCHEC ({len(result['errors'])} erreur(s))"
+    rate = f"{result['rate']:g} lignes/s" if result['rate'] else "sans limite"
+    call, lag = result['call_ms'], result['frame_lag_ms']
+    offered = f" (demandé {result['offered_lines_per_s']})" if result['offered_lines_per_s'] else ""
+    lines = [
+        f"{result['hosts']} machine(s), {result['lines']} lignes à {rate}, "
+        f"{result['source']}/{result['path']}: {status}",
+        f"  durée {result['wall']:.2f}s (+{result['drain']:.2f}s de vidage) — "
+        f"{result['lines_per_s']} lignes/s{offered}, capacité {result['capacity_lines_per_s']} lignes/s",
+        f"  par ligne: p50 {call['p50']:.3f}ms, p90 {call['p90']:.3f}ms, "
+        f"p99 {call['p99']:.3f}ms, max {call['max']:.3f}ms",
+        f"  retard d'image: p50 {lag['p50']:.2f}ms, p90 {lag['p90']:.2f}ms, "
+        f"p99 {lag['p99']:.2f}ms, max {lag['max']:.2f}ms",
+        f"  affichées {result['displayed']}/{result['sent']}, perdues {result['dropped']}, "
+        f"en attente {result['pending']}, zone de logs {result['logs_chars'] / 1e6:.1f} M caractères",
+        f"  mémoire: RSS {result['rss_start_mb']} → {result['rss_end_mb']} Mo "
+        f"(pic {result['rss_peak_mb']} Mo"
+        + (f", {result['rss_growth_mb_per_min']:+} Mo/min" if result['rss_growth_mb_per_min'] is not None else "")
+        + ")",
+    ]
+    lines.extend(f"  erreur: {error}" for error in result['errors'][:5])
+    return "\n".join(lines)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Analyse les options du banc d'essai."""
+    parser = argparse.ArgumentParser(description="Banc d'essai du traitement des logs par l'interface")
+    parser.add_argument('--hosts', type=int_list, default=[1, 10],
+                        help="Nombres de machines simulées, séparés par des virgules (défaut: 1,10)")
+    parser.add_argument('--rate', type=float_list, default=[100.0],
+                        help="Cadences de chaque machine en lignes/s, 0 pour sans limite (défaut: 100)")
+    parser.add_argument('--lines', type=int_list, default=[500],
+                        help="Lignes de log émises par machine (défaut: 500)")
+    parser.add_argument('--duration', type=float, default=0.0,
+                        help="Essai d'endurance: durée d'émission en secondes, remplace --lines")
+    parser.add_argument('--line-size', type=int, default=120,
+                        help="Taille du message de chaque ligne (défaut: 120)")
+    parser.add_argument('--progress-every', type=int, default=10,
+                        help="Une ligne de progression toutes les N lignes, 0 pour aucune (défaut: 10)")
+    parser.add_argument('--source', choices=('synthetic', 'plugin'), default='synthetic',
+                        help="Lignes produites dans le processus ou par PluginLogger et ssh_wrapper.py "
+                             "(défaut: synthetic)")
+    parser.add_argument('--path', choices=('direct', 'queued'), default='direct',
+                        help="Affichage immédiat ou par la file d'attente de LoggerUtils (défaut: direct)")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="Répétitions de chaque scénario (défaut: 1)")
+    parser.add_argument('--log-level', default='ERROR',
+                        help="Niveau des logs de l'application (défaut: ERROR, DEBUG fausse les mesures)")
+    parser.add_argument('--json', help="Fichier où écrire les mesures")
+    args = parser.parse_args(argv)
+    if args.duration and not all(args.rate):
+        parser.error("--duration nécessite une cadence (--rate) non nulle")
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée du banc d'essai.
+
+    Returns:
+        int: Code de retour (0 si tous les scénarios ont réussi)
+    """
+    args = parse_args(argv)
+    workspace = tempfile.mkdtemp(prefix='pcutils_log_bench_')
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+    results = []
+    try:
+        hosts_dir = create_workspace(workspace) if args.source == 'plugin' else None
+        app_class = make_app_class()
+        # Après l'import de l'interface, qui règle ses loggers en DEBUG
+        for name in ('pcUtils', 'logger_utils', 'asyncio'):
+            logging.getLogger(name).setLevel(args.log_level.upper())
+
+        # Essai d'endurance: le nombre de lignes découle de la durée et de la cadence
+        line_counts = [0] if args.duration else args.lines
+        for hosts, rate, lines in itertools.product(args.hosts, args.rate, line_counts):
+            if args.duration:
+                lines = math.ceil(rate * args.duration)
+            for _ in range(args.repeat):
+                scenario = LogScenario(app_class, args, hosts, rate, lines, hosts_dir)
+                result = asyncio.run(scenario.run())
+                results.append(result)
+                print(format_result(result), flush=True)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'options': {key: value for key, value in vars(args).items() if key != 'json'},
+                       'results': results}, f, indent=1)
+
+    return 0 if all(not result['errors'] for result in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Plugin synthétique du banc d'essai des logs (voir log_bench.py).
+
+Copié comme exec.py d'un plugin bench_logs et lancé par ssh_wrapper.py, il
+émet par le PluginLogger réel des lignes de log et de progression à cadence
+fixée. Chaque ligne porte un marqueur unique [h<machine>#<n>], recherché par
+le banc d'essai dans la zone de logs pour compter les messages perdus.
+"""
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugins_utils import main
+
+# Lignes émises entre deux ajustements de la cadence
+LINES_PER_TICK = 10
+
+class Plugin:
+    def run(self, config: dict, log: Any, target_ip: str) -> bool:
+        """
+        Émet bench_lines lignes à bench_rate lignes/s (0: sans limite).
+        """
+        values = config.get('config', {})
+        host = int(values.get('bench_host', 0))
+        lines = int(values.get('bench_lines', 100))
+        rate = float(values.get('bench_rate', 0))
+        payload = 'x' * int(values.get('bench_line_size', 120))
+        progress_every = int(values.get('bench_progress_every', 10))
+
+        if progress_every:
+            log.set_total_steps(max(1, lines // progress_every))
+
+        start = time.monotonic()
+        for index in range(lines):
+            log.info(f"[h{host}#{index}] {payload}")
+            if progress_every and (index + 1) % progress_every == 0:
+                log.next_step()
+            if rate and (index + 1) % LINES_PER_TICK == 0:
+                delay = start + (index + 1) / rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        return True
+
+if __name__ == "__main__":
+    plugin = Plugin()
+    m = main.Main(plugin)
+    resultat = m.start()
+    return_value = 1 - resultat
+    sys.exit(return_value)
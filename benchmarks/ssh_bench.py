@@ -0,0 +1,311 @@
+"""
+Banc d'essai de l'exécution SSH des plugins.
+
+Lance un parc de machines émulées (voir ssh_server.py) puis exécute
+SSHExecutor contre ces machines avec des plugins synthétiques, pour chaque
+combinaison de nombre de machines, de nombre de fichiers du plugin et de
+volume de sortie. Pour chaque scénario sont mesurés:
+
+    - la durée totale et le débit (machines/s, lignes/s, Mo copiés/s);
+    - les percentiles de la durée par machine, et de chaque phase mesurée
+      par TimingRecorder (connexion, copie, exécution, logs...);
+    - la mémoire du processus mesuré (pic RSS, et pic tracemalloc avec
+      --tracemalloc).
+
+Les lignes de sortie sont lues et collectées par l'exécuteur mais pas
+affichées (aucune application Textual): le traitement des logs par
+l'interface est mesuré par un banc dédié.
+
+Exemple:
+
+    python -m benchmarks.ssh_bench --hosts 1,20 --files 10,200 --lines 100,5000 \\
+        --latency-ms 20 --bandwidth-mbit 100 --batch 20 --json resultats.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+import itertools
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.ssh_server import BENCH_PASSWORD, BENCH_USER, HostFarm
+from benchmarks.stats import PERCENTILES, int_list, max_rss_mb, percentile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def create_workspace(root: str, file_counts: Sequence[int], file_size: int) -> Dict[int, str]:
+    """
+    Crée le répertoire de base des plugins synthétiques.
+
+    plugins_utils est un lien vers celui du dépôt: il est copié sur chaque
+    machine comme lors d'une exécution réelle.
+
+    Args:
+        root: Répertoire de base à remplir
+        file_counts: Nombre de fichiers de chaque plugin synthétique
+        file_size: Taille des fichiers de données, en octets
+
+    Returns:
+        Dict[int, str]: {nombre de fichiers: dossier du plugin}
+    """
+    plugins_dir = os.path.join(root, 'plugins')
+    os.makedirs(plugins_dir)
+    os.symlink(os.path.join(REPO_DIR, 'plugins', 'plugins_utils'), os.path.join(plugins_dir, 'plugins_utils'))
+
+    folders = {}
+    for count in file_counts:
+        folder = f"bench_f{count}"
+        plugin_dir = os.path.join(plugins_dir, folder)
+        os.makedirs(os.path.join(plugin_dir, 'data'))
+        with open(os.path.join(plugin_dir, 'exec.py'), 'w', encoding='utf-8') as f:
+            f.write('"""Plugin synthétique du banc d\'essai SSH (exécution émulée)."""\n')
+        for index in range(max(0, count - 1)):
+            with open(os.path.join(plugin_dir, 'data', f"file_{index}.dat"), 'wb') as f:
+                f.write(os.urandom(file_size))
+        folders[count] = folder
+    return folders
+
+def directory_size(directory: str) -> int:
+    """Taille cumulée des fichiers copiés d'un dossier (hors __pycache__ et settings.yml)."""
+    total = 0
+    for current, dirs, files in os.walk(directory, followlinks=True):
+        dirs[:] = [d for d in dirs if d != '__pycache__']
+        total += sum(os.path.getsize(os.path.join(current, name)) for name in files if name != 'settings.yml')
+    return total
+
+def make_executor_class():
+    """
+    Construit l'exécuteur SSH du banc d'essai.
+
+    Importé tardivement: XDG_CACHE_HOME doit être défini avant l'import de
+    l'interface pour isoler le cache des profils de machines.
+
+    Returns:
+        type: Sous-classe de SSHExecutor
+    """
+    from ui.execution_screen.ssh_executor import SSHExecutor
+
+    class BenchSSHExecutor(SSHExecutor):
+        """
+        SSHExecutor utilisant le répertoire des plugins synthétiques et le port du parc.
+        """
+
+        def __init__(self, base_dir: str, port: int):
+            super().__init__(None)
+            self.base_dir = base_dir
+            self.port = port
+            self.host_durations: Dict[str, float] = {}
+            self.messages: Dict[str, int] = {}
+            self.errors: List[str] = []
+
+        def _determine_base_dir(self) -> str:
+            return self.base_dir
+
+        def _get_ssh_credentials(self, ssh_config, plugin_config):
+            return BENCH_USER, BENCH_PASSWORD, self.port
+
+        def log_message(self, message: str, level: str = "info", target_ip: Optional[str] = None):
+            # Pas d'interface: compter les messages au lieu de les afficher
+            self.messages[level] = self.messages.get(level, 0) + 1
+            if level == 'error':
+                self.errors.append(message)
+
+        def _log_execution_summary(self, results, plugin_name: str, all_success: bool, unreachable=None):
+            # Résumé remplacé par celui du banc d'essai
+            pass
+
+        async def _execute_on_single_host(self, host: str, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await super()._execute_on_single_host(host, *args, **kwargs)
+            finally:
+                self.host_durations[host] = time.perf_counter() - start
+
+    return BenchSSHExecutor
+
+def run_scenario(executor_class, base_dir: str, folder: str, addresses: List[str], port: int,
+                 args: argparse.Namespace, lines: int) -> Dict[str, Any]:
+    """
+    Exécute un plugin synthétique sur des machines émulées et mesure l'exécution.
+
+    Args:
+        executor_class: Classe de l'exécuteur (make_executor_class())
+        base_dir: Répertoire de base des plugins synthétiques
+        folder: Dossier du plugin
+        addresses: Machines ciblées
+        port: Port du parc
+        args: Options du banc d'essai
+        lines: Lignes de log émises par le plugin sur chaque machine
+
+    Returns:
+        Dict[str, Any]: Mesures du scénario
+    """
+    from ui.execution_screen.timing import TimingRecorder
+
+    recorder = TimingRecorder.get_instance()
+    recorder.reset()
+    executor = executor_class(base_dir, port)
+    config = {
+        'plugin_name': folder,
+        'instance_id': 1,
+        'remote_execution': True,
+        'rollout': {'batch': args.batch or len(addresses)},
+        'config': {
+            'ssh_ips': addresses,
+            'ssh_user': BENCH_USER,
+            'ssh_passwd': BENCH_PASSWORD,
+            'bench_lines': lines,
+            'bench_line_size': args.line_size,
+            'bench_duration': args.duration,
+            'bench_progress_every': args.progress_every,
+        },
+    }
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    success, _ = asyncio.run(executor.execute_plugin(None, folder, config))
+    wall = time.perf_counter() - start
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+
+    uploaded = (directory_size(os.path.join(base_dir, 'plugins', folder))
+                + directory_size(os.path.join(base_dir, 'plugins', 'plugins_utils'))) * len(addresses)
+    host_times = list(executor.host_durations.values())
+    phases: Dict[str, List[float]] = {}
+    for span in recorder.spans():
+        phases.setdefault(span.phase, []).append(span.duration)
+
+    return {
+        'hosts': len(addresses),
+        'plugin': folder,
+        'lines': lines,
+        'success': success,
+        'errors': executor.errors,
+        'wall': round(wall, 4),
+        'hosts_per_s': round(len(addresses) / wall, 2) if wall else 0.0,
+        'lines_per_s': round(lines * len(addresses) / wall, 1) if wall else 0.0,
+        'upload_mb_per_s': round(uploaded / wall / 1e6, 2) if wall else 0.0,
+        'host_latency': {f"p{rank}": round(percentile(host_times, rank), 4) for rank in PERCENTILES}
+                        | {'max': round(max(host_times, default=0.0), 4)},
+        'phases': {phase: {f"p{rank}": round(percentile(values, rank), 4) for rank in PERCENTILES}
+                   for phase, values in phases.items()},
+        'max_rss_mb': max_rss_mb(),
+        'tracemalloc_peak_mb': round(traced_peak / 1e6, 1) if traced_peak is not None else None,
+    }
+
+def format_result(result: Dict[str, Any]) -> str:
+    """
+    Formate les mesures d'un scénario sur quelques lignes.
+
+    Args:
+        result: Mesures (run_scenario())
+
+    Returns:
+        str: Texte affichable
+    """
+    latency = result['host_latency']
+    status = "OK" if result['success'] else f"ÉCHEC ({len(result['errors'])} erreur(s))"
+    lines = [
+        f"{result['hosts']} machine(s), {result['plugin']}, {result['lines']} lignes: {status}",
+        f"  durée {result['wall']:.2f}s — {result['hosts_per_s']} machines/s, "
+        f"{result['lines_per_s']} lignes/s, {result['upload_mb_per_s']} Mo/s copiés",
+        f"  par machine: p50 {latency['p50']:.3f}s, p90 {latency['p90']:.3f}s, "
+        f"p99 {latency['p99']:.3f}s, max {latency['max']:.3f}s",
+        "  phases (p50/p90): " + ", ".join(
+            f"{phase} {values['p50']:.3f}/{values['p90']:.3f}s"
+            for phase, values in sorted(result['phases'].items(), key=lambda item: -item[1]['p50'])),
+        f"  mémoire: pic RSS {result['max_rss_mb']} Mo"
+        + (f", pic tracemalloc {result['tracemalloc_peak_mb']} Mo"
+           if result['tracemalloc_peak_mb'] is not None else ""),
+    ]
+    lines.extend(f"  erreur: {error}" for error in result['errors'][:5])
+    return "\n".join(lines)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Analyse les options du banc d'essai."""
+    parser = argparse.ArgumentParser(description="Banc d'essai de l'exécution SSH des plugins")
+    parser.add_argument('--hosts', type=int_list, default=[1, 10],
+                        help="Nombres de machines émulées, séparés par des virgules (défaut: 1,10)")
+    parser.add_argument('--files', type=int_list, default=[10],
+                        help="Nombres de fichiers des plugins synthétiques (défaut: 10)")
+    parser.add_argument('--file-size', type=int, default=4096,
+                        help="Taille des fichiers de données, en octets (défaut: 4096)")
+    parser.add_argument('--lines', type=int_list, default=[100],
+                        help="Lignes de log émises par machine (défaut: 100)")
+    parser.add_argument('--line-size', type=int, default=120,
+                        help="Taille du message de chaque ligne (défaut: 120)")
+    parser.add_argument('--progress-every', type=int, default=10,
+                        help="Une ligne de progression toutes les N lignes, 0 pour aucune (défaut: 10)")
+    parser.add_argument('--duration', type=float, default=0.0,
+                        help="Durée d'exécution simulée du plugin, en secondes (défaut: 0)")
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help="Latence du lien dans chaque sens, en millisecondes (défaut: 0)")
+    parser.add_argument('--bandwidth-mbit', type=float, default=0.0,
+                        help="Débit du lien dans chaque sens, en Mbit/s, 0 pour illimité (défaut: 0)")
+    parser.add_argument('--batch', type=int, default=0,
+                        help="Machines traitées simultanément, 0 pour toutes (défaut: 0)")
+    parser.add_argument('--port', type=int, default=2222,
+                        help="Port d'écoute des machines émulées (défaut: 2222)")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="Répétitions de chaque scénario (défaut: 1)")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Mesure le pic d'allocation Python (ralentit l'exécution)")
+    parser.add_argument('--log-level', default='WARNING',
+                        help="Niveau des logs de l'application et de paramiko (défaut: WARNING, "
+                             "DEBUG fausse les mesures)")
+    parser.add_argument('--json', help="Fichier où écrire les mesures")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée du banc d'essai.
+
+    Returns:
+        int: Code de retour (0 si tous les scénarios ont réussi)
+    """
+    args = parse_args(argv)
+    workspace = tempfile.mkdtemp(prefix='pcutils_bench_')
+    # Profils des machines émulées mis en cache à part, pas dans celui de l'utilisateur
+    os.environ['XDG_CACHE_HOME'] = os.path.join(workspace, 'cache')
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+    results = []
+    try:
+        base_dir = os.path.join(workspace, 'base')
+        folders = create_workspace(base_dir, args.files, args.file_size)
+        executor_class = make_executor_class()
+        # Après l'import de l'interface, qui règle ses loggers en DEBUG
+        for name in ('pcUtils', 'paramiko', 'asyncio'):
+            logging.getLogger(name).setLevel(args.log_level.upper())
+
+        farm = HostFarm(max(args.hosts), port=args.port, latency=args.latency_ms / 1000,
+                        bandwidth=args.bandwidth_mbit * 1e6 / 8)
+        with farm:
+            for hosts, files, lines in itertools.product(args.hosts, args.files, args.lines):
+                for _ in range(args.repeat):
+                    result = run_scenario(executor_class, base_dir, folders[files],
+                                          farm.addresses[:hosts], args.port, args, lines)
+                    results.append(result)
+                    print(format_result(result), flush=True)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'options': {key: value for key, value in vars(args).items() if key != 'json'},
+                       'results': results}, f, indent=1)
+
+    return 0 if all(result['success'] for result in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
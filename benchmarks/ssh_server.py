@@ -0,0 +1,559 @@
+"""
+Parc de machines SSH émulées pour les bancs d'essai.
+
+Chaque machine est un serveur SSH/SFTP paramiko écoutant sur sa propre
+adresse de boucle locale (127.0.0.2, 127.0.0.3...), sur un port commun:
+l'exécuteur SSH les voit comme des PC distincts. Les serveurs tournent
+dans un processus séparé pour ne pas fausser les mesures (GIL, mémoire)
+du processus mesuré.
+
+Le lien réseau de chaque connexion peut être ralenti (latence et débit
+dans chaque sens). Les commandes lancées par l'exécuteur sont émulées:
+
+    mkdir -p <dossier>                   création du dossier
+    mktemp -d <modèle>                   création d'un dossier unique
+    python3 - --ttl N                    profil de la machine (voir host_facts.py)
+    python3 <dossier>/ssh_wrapper.py ... plugin synthétique: émet les lignes
+                                         de log décrites par les clés bench_*
+                                         de sa configuration
+
+Les fichiers copiés par SFTP sont écrits dans un dossier temporaire
+propre à chaque machine.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import shlex
+import shutil
+import socket
+import tempfile
+import ipaddress
+import selectors
+import threading
+import traceback
+import multiprocessing
+from datetime import datetime
+from typing import List, Optional
+
+import paramiko
+
+# Première adresse du parc (les suivantes sont consécutives)
+FIRST_ADDRESS = '127.0.0.2'
+
+# Identifiants acceptés (tout mot de passe est accepté)
+BENCH_USER = 'bench'
+BENCH_PASSWORD = 'bench'
+
+# Clé des durées transmises par le wrapper (TIMING_KEY de ssh_wrapper.py)
+TIMING_KEY = 'pcutils_timing'
+
+# Version du format de profil (FACTS_VERSION de host_facts.py)
+FACTS_VERSION = 1
+
+# Nombre de lignes de log envoyées ensemble par le plugin synthétique
+LINES_PER_WRITE = 20
+
+# Valeurs par défaut du plugin synthétique (clés bench_* de sa configuration)
+DEFAULT_PLUGIN_VALUES = {
+    'bench_lines': 100,          # Lignes de log émises
+    'bench_line_size': 120,      # Taille du message de chaque ligne
+    'bench_duration': 0.0,       # Durée d'exécution simulée, en secondes
+    'bench_progress_every': 10,  # Une ligne de progression toutes les N lignes (0: aucune)
+}
+
+def host_addresses(count: int, first: str = FIRST_ADDRESS) -> List[str]:
+    """
+    Adresses des machines du parc.
+
+    Args:
+        count: Nombre de machines
+        first: Première adresse
+
+    Returns:
+        List[str]: Adresses consécutives à partir de first
+    """
+    start = ipaddress.IPv4Address(first)
+    return [str(start + index) for index in range(count)]
+
+class _DelayedPipe(threading.Thread):
+    """
+    Transfère les données d'une socket à une autre en émulant un lien réseau.
+
+    Chaque bloc reçu est délivré après sa durée de transmission (débit) et la
+    latence; les blocs se suivent sans attendre la latence des précédents.
+    """
+
+    def __init__(self, source: socket.socket, target: socket.socket,
+                 latency: float, bandwidth: float):
+        """
+        Initialise le transfert.
+
+        Args:
+            source: Socket lue
+            target: Socket écrite
+            latency: Latence en secondes
+            bandwidth: Débit en octets par seconde (0: illimité)
+        """
+        super().__init__(daemon=True)
+        self.source = source
+        self.target = target
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._queue: 'queue.Queue' = queue.Queue()
+
+    def run(self) -> None:
+        writer = threading.Thread(target=self._deliver, daemon=True)
+        writer.start()
+        link_free_at = 0.0
+        while True:
+            try:
+                data = self.source.recv(65536)
+            except OSError:
+                data = b''
+            now = time.monotonic()
+            if data and self.bandwidth:
+                link_free_at = max(now, link_free_at) + len(data) / self.bandwidth
+                due = link_free_at + self.latency
+            else:
+                due = max(now, link_free_at) + self.latency
+            self._queue.put((due, data))
+            if not data:
+                return
+
+    def _deliver(self) -> None:
+        while True:
+            due, data = self._queue.get()
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if not data:
+                try:
+                    self.target.shutdown(socket.SHUT_WR)
+                except OSError:
+                    pass
+                return
+            try:
+                self.target.sendall(data)
+            except OSError:
+                return
+
+def emulate_link(sock: socket.socket, latency: float, bandwidth: float) -> socket.socket:
+    """
+    Intercale un lien émulé entre une connexion et le serveur.
+
+    Args:
+        sock: Connexion acceptée
+        latency: Latence dans chaque sens, en secondes
+        bandwidth: Débit dans chaque sens, en octets par seconde (0: illimité)
+
+    Returns:
+        socket.socket: Socket à utiliser côté serveur
+    """
+    server_side, link_side = socket.socketpair()
+    _DelayedPipe(sock, link_side, latency, bandwidth).start()
+    _DelayedPipe(link_side, sock, latency, bandwidth).start()
+    return server_side
+
+class _SFTPHandle(paramiko.SFTPHandle):
+    """Fichier ouvert par le client SFTP."""
+
+    def stat(self):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def chattr(self, attr):
+        return paramiko.SFTP_OK
+
+class _SFTPServer(paramiko.SFTPServerInterface):
+    """
+    Serveur SFTP d'une machine émulée, limité à son dossier racine.
+    """
+
+    def __init__(self, server, host: 'EmulatedHost', *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.host = host
+
+    def _errno(self, error: OSError):
+        return paramiko.SFTPServer.convert_errno(error.errno)
+
+    def canonicalize(self, path):
+        return path if path.startswith('/') else f"/home/{BENCH_USER}/{path}"
+
+    def list_folder(self, path):
+        local = self.host.local_path(path)
+        try:
+            entries = []
+            for name in os.listdir(local):
+                attr = paramiko.SFTPAttributes.from_stat(os.lstat(os.path.join(local, name)))
+                attr.filename = name
+                entries.append(attr)
+            return entries
+        except OSError as e:
+            return self._errno(e)
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self.host.local_path(path)))
+        except OSError as e:
+            return self._errno(e)
+
+    def lstat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.lstat(self.host.local_path(path)))
+        except OSError as e:
+            return self._errno(e)
+
+    def open(self, path, flags, attr):
+        local = self.host.local_path(path)
+        try:
+            fd = os.open(local, flags, 0o644)
+        except OSError as e:
+            return self._errno(e)
+
+        if flags & os.O_WRONLY:
+            mode = 'ab' if flags & os.O_APPEND else 'wb'
+        elif flags & os.O_RDWR:
+            mode = 'a+b' if flags & os.O_APPEND else 'r+b'
+        else:
+            mode = 'rb'
+        f = os.fdopen(fd, mode)
+
+        handle = _SFTPHandle(flags)
+        handle.filename = local
+        handle.readfile = f
+        handle.writefile = f
+        return handle
+
+    def remove(self, path):
+        try:
+            os.remove(self.host.local_path(path))
+        except OSError as e:
+            return self._errno(e)
+        return paramiko.SFTP_OK
+
+    def rename(self, oldpath, newpath):
+        try:
+            os.rename(self.host.local_path(oldpath), self.host.local_path(newpath))
+        except OSError as e:
+            return self._errno(e)
+        return paramiko.SFTP_OK
+
+    def posix_rename(self, oldpath, newpath):
+        try:
+            os.replace(self.host.local_path(oldpath), self.host.local_path(newpath))
+        except OSError as e:
+            return self._errno(e)
+        return paramiko.SFTP_OK
+
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self.host.local_path(path))
+        except OSError as e:
+            return self._errno(e)
+        return paramiko.SFTP_OK
+
+    def rmdir(self, path):
+        try:
+            os.rmdir(self.host.local_path(path))
+        except OSError as e:
+            return self._errno(e)
+        return paramiko.SFTP_OK
+
+    def chattr(self, path, attr):
+        return paramiko.SFTP_OK
+
+class _SSHServer(paramiko.ServerInterface):
+    """
+    Authentification et canaux d'une machine émulée.
+    """
+
+    def __init__(self, host: 'EmulatedHost'):
+        self.host = host
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        command = command.decode('utf-8', errors='replace') if isinstance(command, bytes) else command
+        threading.Thread(target=self.host.run_command, args=(channel, command), daemon=True).start()
+        return True
+
+class EmulatedHost:
+    """
+    Machine émulée: dossier racine et commandes reconnues.
+    """
+
+    def __init__(self, address: str, root: str):
+        """
+        Initialise la machine.
+
+        Args:
+            address: Adresse IP de la machine
+            root: Dossier local tenant lieu de système de fichiers
+        """
+        self.address = address
+        self.root = root
+        self.home = os.path.join(root, 'home', BENCH_USER)
+        os.makedirs(self.home, exist_ok=True)
+
+    def local_path(self, path: str) -> str:
+        """
+        Convertit un chemin de la machine émulée en chemin local.
+
+        Args:
+            path: Chemin absolu, ou relatif au répertoire personnel
+
+        Returns:
+            str: Chemin dans le dossier racine de la machine
+        """
+        if path.startswith('/'):
+            local = os.path.normpath(os.path.join(self.root, path.lstrip('/')))
+        else:
+            local = os.path.normpath(os.path.join(self.home, path))
+        if local != self.root and not local.startswith(self.root + os.sep):
+            raise PermissionError(f"Chemin hors de la machine émulée: {path}")
+        return local
+
+    def run_command(self, channel: paramiko.Channel, command: str) -> None:
+        """
+        Exécute une commande émulée sur un canal.
+
+        Args:
+            channel: Canal SSH de la commande
+            command: Commande demandée par le client
+        """
+        try:
+            status = self._dispatch(channel, command)
+        except Exception as e:
+            try:
+                channel.sendall_stderr(f"Erreur de la machine émulée: {e}\n".encode('utf-8'))
+            except Exception:
+                pass
+            status = 1
+        # Fin signalée par EOF, le client ferme le canal: une fermeture côté
+        # serveur pourrait précéder la réponse à la requête exec
+        try:
+            channel.send_exit_status(status)
+            channel.shutdown_write()
+        except Exception:
+            pass
+
+    def _dispatch(self, channel: paramiko.Channel, command: str) -> int:
+        parts = shlex.split(command)
+        if not parts:
+            return 0
+
+        if parts[:2] == ['mkdir', '-p']:
+            for path in parts[2:]:
+                os.makedirs(self.local_path(path), exist_ok=True)
+            return 0
+
+        if parts[:2] == ['mktemp', '-d'] and len(parts) == 3:
+            template = parts[2]
+            stem = template.rstrip('X')
+            suffix_length = len(template) - len(stem)
+            while True:
+                path = stem + uuid.uuid4().hex[:suffix_length]
+                try:
+                    os.makedirs(self.local_path(path))
+                    break
+                except FileExistsError:
+                    continue
+            channel.sendall(f"{path}\n".encode('utf-8'))
+            return 0
+
+        if parts[:2] == ['python3', '-']:
+            return self._send_facts(channel)
+
+        if parts[0] == 'python3' and len(parts) >= 3 and parts[1].endswith('ssh_wrapper.py'):
+            return self._run_plugin(channel, parts[2])
+
+        channel.sendall_stderr(f"Commande non émulée: {command}\n".encode('utf-8'))
+        return 127
+
+    def _send_facts(self, channel: paramiko.Channel) -> int:
+        # Le script de collecte est envoyé sur l'entrée standard: le lire entièrement
+        while channel.recv(65536):
+            pass
+        facts = {'version': FACTS_VERSION, 'collected_at': time.time(), 'uname': {'node': self.address}}
+        channel.sendall(json.dumps(facts).encode('utf-8'))
+        return 0
+
+    def _run_plugin(self, channel: paramiko.Channel, wrapper_config_path: str) -> int:
+        start = time.monotonic()
+        with open(self.local_path(wrapper_config_path), 'r', encoding='utf-8') as f:
+            wrapper_config = json.load(f)
+
+        plugin_config = wrapper_config.get('plugin_config', {})
+        values = dict(DEFAULT_PLUGIN_VALUES)
+        values.update({key: value for key, value in plugin_config.get('config', {}).items()
+                       if key in DEFAULT_PLUGIN_VALUES})
+
+        lines = int(values['bench_lines'])
+        message = 'x' * int(values['bench_line_size'])
+        progress_every = int(values['bench_progress_every'])
+        writes = max(1, -(-lines // LINES_PER_WRITE))
+        pause = float(values['bench_duration']) / writes
+        entry = {
+            'plugin_name': plugin_config.get('plugin_name'),
+            'instance_id': plugin_config.get('instance_id'),
+        }
+
+        first_output = None
+        batch = []
+        for index in range(1, lines + 1):
+            timestamp = datetime.now().isoformat()
+            batch.append(json.dumps(dict(entry, timestamp=timestamp, level='info',
+                                         message=f"{index} {message}")))
+            if progress_every and index % progress_every == 0:
+                batch.append(json.dumps(dict(entry, timestamp=timestamp, level='progress', message={
+                    'type': 'progress',
+                    'data': {'id': 'main', 'percentage': index * 100 // lines,
+                             'current_step': index, 'total_steps': lines},
+                })))
+            if index % LINES_PER_WRITE == 0 or index == lines:
+                if pause:
+                    time.sleep(pause)
+                channel.sendall(('\r\n'.join(batch) + '\r\n').encode('utf-8'))
+                first_output = first_output or time.monotonic()
+                batch = []
+
+        end = time.monotonic()
+        first_output = first_output or end
+        timing = {TIMING_KEY: {'wrapper': 0.0, 'startup': round(first_output - start, 6),
+                               'plugin': round(end - first_output, 6),
+                               'sudo': bool(wrapper_config.get('needs_sudo'))}}
+        channel.sendall((json.dumps(timing) + '\r\n').encode('utf-8'))
+        return 0
+
+def _serve(addresses: List[str], port: int, latency: float, bandwidth: float,
+           ready, stop) -> None:
+    """
+    Boucle du processus serveur: accepte les connexions de toutes les machines.
+
+    Args:
+        addresses: Adresses des machines
+        port: Port d'écoute commun
+        latency: Latence du lien, en secondes
+        bandwidth: Débit du lien, en octets par seconde (0: illimité)
+        ready: Événement signalé quand les serveurs écoutent
+        stop: Événement demandant l'arrêt
+    """
+    root = tempfile.mkdtemp(prefix='pcutils_bench_hosts_')
+    selector = selectors.DefaultSelector()
+    try:
+        host_key = paramiko.RSAKey.generate(2048)
+        hosts = {}
+        for address in addresses:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((address, port))
+            listener.listen(128)
+            listener.setblocking(False)
+            hosts[address] = EmulatedHost(address, os.path.join(root, address))
+            selector.register(listener, selectors.EVENT_READ, hosts[address])
+        ready.set()
+
+        def start_transport(sock: socket.socket, host: EmulatedHost) -> None:
+            try:
+                sock.setblocking(True)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if latency or bandwidth:
+                    sock = emulate_link(sock, latency, bandwidth)
+                transport = paramiko.Transport(sock)
+                transport.add_server_key(host_key)
+                transport.set_subsystem_handler('sftp', paramiko.SFTPServer, _SFTPServer, host)
+                transport.start_server(server=_SSHServer(host))
+            except Exception:
+                traceback.print_exc()
+
+        while not stop.is_set():
+            for key, _ in selector.select(timeout=0.2):
+                try:
+                    sock, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                threading.Thread(target=start_transport, args=(sock, key.data), daemon=True).start()
+    finally:
+        selector.close()
+        shutil.rmtree(root, ignore_errors=True)
+
+class HostFarm:
+    """
+    Parc de machines émulées, servi par un processus séparé.
+    """
+
+    def __init__(self, count: int, port: int = 2222, latency: float = 0.0, bandwidth: float = 0.0):
+        """
+        Initialise le parc.
+
+        Args:
+            count: Nombre de machines
+            port: Port d'écoute commun
+            latency: Latence du lien dans chaque sens, en secondes
+            bandwidth: Débit du lien dans chaque sens, en octets par seconde (0: illimité)
+        """
+        self.addresses = host_addresses(count)
+        self.port = port
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._process: Optional[multiprocessing.Process] = None
+        self._stop = None
+
+    def start(self, timeout: float = 60.0) -> None:
+        """
+        Démarre les serveurs et attend qu'ils écoutent.
+
+        Args:
+            timeout: Délai maximal de démarrage, en secondes
+
+        Raises:
+            RuntimeError: Si les serveurs n'ont pas démarré
+        """
+        context = multiprocessing.get_context('fork' if sys.platform != 'win32' else 'spawn')
+        ready = context.Event()
+        self._stop = context.Event()
+        self._process = context.Process(
+            target=_serve,
+            args=(self.addresses, self.port, self.latency, self.bandwidth, ready, self._stop),
+            daemon=True
+        )
+        self._process.start()
+        if not ready.wait(timeout):
+            self.stop()
+            raise RuntimeError("Le parc de machines émulées n'a pas démarré")
+
+    def stop(self) -> None:
+        """Arrête les serveurs."""
+        if self._process is None:
+            return
+        self._stop.set()
+        self._process.join(5)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(5)
+        self._process = None
+
+    def __enter__(self) -> 'HostFarm':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,99 @@
+"""
+Outils de mesure communs aux bancs d'essai.
+"""
+
+import random
+import resource
+from typing import Dict, List, Optional, Sequence
+
+# Percentiles rapportés
+PERCENTILES = (50, 90, 99)
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """
+    Percentile par rang le plus proche.
+
+    Args:
+        values: Valeurs mesurées
+        rank: Rang (0-100)
+
+    Returns:
+        float: Valeur du percentile (0 si aucune valeur)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(rank / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def int_list(value: str) -> List[int]:
+    """Liste d'entiers séparés par des virgules (option de ligne de commande)."""
+    return [int(item) for item in value.split(',') if item.strip()]
+
+def float_list(value: str) -> List[float]:
+    """Liste de nombres séparés par des virgules (option de ligne de commande)."""
+    return [float(item) for item in value.split(',') if item.strip()]
+
+def max_rss_mb() -> float:
+    """Pic de mémoire résidente du processus, en Mo."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Mémoire résidente actuelle du processus, en Mo.
+
+    Returns:
+        Optional[float]: Mémoire, ou None si /proc n'est pas disponible
+    """
+    try:
+        with open('/proc/self/statm', encoding='ascii') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * resource.getpagesize() / 1e6, 1)
+
+class Reservoir:
+    """
+    Échantillon aléatoire de taille bornée d'une série de mesures.
+
+    Garde des percentiles représentatifs d'une longue série (essai
+    d'endurance) sans que la mémoire des mesures fausse celle mesurée.
+    """
+
+    def __init__(self, capacity: int = 20000):
+        """
+        Initialise l'échantillon.
+
+        Args:
+            capacity: Nombre maximal de valeurs conservées
+        """
+        self.capacity = capacity
+        self.values: List[float] = []
+        self.count = 0
+        self.maximum = 0.0
+
+    def add(self, value: float) -> None:
+        """Ajoute une mesure."""
+        self.count += 1
+        self.maximum = max(self.maximum, value)
+        if len(self.values) < self.capacity:
+            self.values.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < self.capacity:
+                self.values[index] = value
+
+    def summary(self, scale: float = 1.0, digits: int = 4) -> Dict[str, float]:
+        """
+        Percentiles et maximum de la série.
+
+        Args:
+            scale: Facteur appliqué aux valeurs (1000 pour des millisecondes)
+            digits: Nombre de décimales
+
+        Returns:
+            Dict[str, float]: {'p50': ..., 'p90': ..., 'p99': ..., 'max': ...}
+        """
+        result = {f"p{rank}": round(percentile(self.values, rank) * scale, digits) for rank in PERCENTILES}
+        result['max'] = round(self.maximum * scale, digits)
+        return result
@@ -3,11 +3,21 @@ import os
 import json
 import traceback
 from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
+
+try:
+    # Cache de lecture YAML de l'application (absent lors d'une exécution hors de pcUtils)
+    from ui.utils.yaml_cache import load_yaml
+except ImportError:
+    load_yaml = None
 
 
 def parse_model_file(file_path):
     """Parse un fichier de configuration d'imprimante au format YAML
     
+    Les fichiers sont lus en lecture seule: le cache YAML de l'application
+    est utilisé quand il est disponible.
+
     Args:
         file_path (str): Chemin vers le fichier YAML à parser
         
@@ -16,12 +26,12 @@ def parse_model_file(file_path):
             - True et le dictionnaire de configuration en cas de succès
             - False et un message d'erreur en cas d'échec
     """
-    yaml = YAML()
     try:
+        if load_yaml is not None:
+            return True, load_yaml(file_path)
         with open(file_path, 'r') as f:
-            config = yaml.load(f)
-            return True, config
-    except yaml.YAMLError as e:
+            return True, YAML(typ='safe').load(f)
+    except YAMLError as e:
         error_msg = f"Erreur lors de la lecture du fichier YAML {file_path}: {str(e)}"
         print(error_msg)
         print(traceback.format_exc())
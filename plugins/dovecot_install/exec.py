@@ -113,23 +113,25 @@ class Plugin:
         return True
 
     def _apply_acls(self, dovecot_cmd, log, archive_name, admin, modif, user):
-        for group in admin:
-            if group:
-                log.info(f"Ajout des droits admin pour {group}")
-                dovecot_cmd.add_acl_entry(archive_name, f"group={group}", "lrwtipekxas")
-                log.next_step()
-
-        for group in modif:
-            if group:
-                log.info(f"Ajout des droits modif pour {group}")
-                dovecot_cmd.add_acl_entry(archive_name, f"group={group}", "lrwtipekxs")
-                log.next_step()
-
-        for group in user:
-            if group:
-                log.info(f"Ajout des droits user pour {group}")
-                dovecot_cmd.add_acl_entry(archive_name, f"group={group}", "lrst")
-                log.next_step()
+        # Toutes les entrées sont écrites en une seule fois dans le fichier ACL
+        with dovecot_cmd.edit_acl() as acl_file:
+            for group in admin:
+                if group:
+                    log.info(f"Ajout des droits admin pour {group}")
+                    acl_file.set(archive_name, f"group={group}", "lrwtipekxas")
+                    log.next_step()
+
+            for group in modif:
+                if group:
+                    log.info(f"Ajout des droits modif pour {group}")
+                    acl_file.set(archive_name, f"group={group}", "lrwtipekxs")
+                    log.next_step()
+
+            for group in user:
+                if group:
+                    log.info(f"Ajout des droits user pour {group}")
+                    acl_file.set(archive_name, f"group={group}", "lrst")
+                    log.next_step()
 
     def _ajoute_namespace(self, dovecot_cmd, log, unit, name, location):
         log.info("Ajout du namespace public d'archivage")
@@ -9,6 +9,10 @@ les paquets et dépôts du système.
 
 # Import de la classe de base et des types
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import dpkg_status
+from plugins_utils import apt_lists
+from plugins_utils import apt_freshness
+from plugins_utils import host_facts
 import os
 import re
 import time
@@ -24,6 +28,123 @@ except ImportError:
     CONFIG_FILES_AVAILABLE = False
     class ConfigFileCommands: pass # Factice
 
+class PackagePlan:
+    """
+    Ensemble de changements de paquets appliqué en une seule transaction apt-get.
+
+    Les paquets sont déclarés au préalable (installations, versions minimales,
+    suppressions, verrous), puis AptCommands.apply_plan compare le plan à la base
+    dpkg et n'exécute que ce qui est nécessaire.
+
+    Exemple:
+        plan = apt.PackagePlan()
+        plan.install("detox").install("lara-program", min_version="2.1")
+        plan.remove("eset-agent", purge=True).hold("lara-program")
+        outcomes = apt_cmd.apply_plan(plan)
+    """
+
+    def __init__(self):
+        """Initialise un plan vide."""
+        self.installs: Dict[str, Optional[str]] = {}  # {paquet: version exacte ou None}
+        self.min_versions: Dict[str, str] = {}
+        self.removals: Dict[str, bool] = {}  # {paquet: purge}
+        self.holds: Dict[str, bool] = {}  # {paquet: True=hold, False=unhold}
+
+    def install(self, package_name: str, min_version: Optional[str] = None,
+                version: Optional[str] = None) -> 'PackagePlan':
+        """
+        Demande l'installation d'un paquet.
+
+        Args:
+            package_name: Nom du paquet.
+            min_version: Version minimale; un paquet plus ancien est mis à jour.
+            version: Version exacte à installer (prioritaire sur min_version).
+
+        Returns:
+            PackagePlan: Le plan, pour chaîner les appels.
+        """
+        self.removals.pop(package_name, None)
+        self.installs[package_name] = version
+        if min_version and not version:
+            self.min_versions[package_name] = min_version
+        else:
+            self.min_versions.pop(package_name, None)
+        return self
+
+    def remove(self, package_name: str, purge: bool = False) -> 'PackagePlan':
+        """
+        Demande la suppression d'un paquet.
+
+        Args:
+            package_name: Nom du paquet.
+            purge: Si True, supprime aussi les fichiers de configuration.
+
+        Returns:
+            PackagePlan: Le plan, pour chaîner les appels.
+        """
+        self.installs.pop(package_name, None)
+        self.min_versions.pop(package_name, None)
+        self.removals[package_name] = purge
+        return self
+
+    def hold(self, package_name: str) -> 'PackagePlan':
+        """Verrouille la version d'un paquet (apt-mark hold)."""
+        self.holds[package_name] = True
+        return self
+
+    def unhold(self, package_name: str) -> 'PackagePlan':
+        """Déverrouille la version d'un paquet (apt-mark unhold)."""
+        self.holds[package_name] = False
+        return self
+
+    def packages(self) -> List[str]:
+        """Liste les paquets concernés par le plan, dans l'ordre de déclaration."""
+        names = list(self.installs) + list(self.removals)
+        names += [name for name in self.holds if name not in self.installs and name not in self.removals]
+        return names
+
+    def __len__(self) -> int:
+        return len(self.packages())
+
+    def __repr__(self) -> str:
+        return (f"PackagePlan(installs={len(self.installs)}, removals={len(self.removals)}, "
+                f"holds={sum(self.holds.values())}, unholds={len(self.holds) - sum(self.holds.values())})")
+
+class PackageOutcome:
+    """
+    Résultat de l'application d'un plan pour un paquet.
+
+    Attributs:
+        name: Nom du paquet.
+        actions: Actions décidées ('install', 'upgrade', 'remove', 'purge',
+                 'hold', 'unhold'); vide si le paquet était déjà conforme.
+        before: Version installée avant le plan (None si absent).
+        held: True si le paquet était verrouillé (hold) avant le plan.
+        after: Version installée après le plan (None si absent).
+        success: True si l'état final est conforme au plan.
+        message: Explication en cas d'échec.
+    """
+
+    __slots__ = ('name', 'actions', 'before', 'held', 'after', 'success', 'message')
+
+    def __init__(self, name: str, before: Optional[str] = None, held: bool = False):
+        self.name = name
+        self.actions: List[str] = []
+        self.before = before
+        self.held = held
+        self.after = before
+        self.success = True
+        self.message = ""
+
+    @property
+    def changed(self) -> bool:
+        """Indique si le plan demandait un changement pour ce paquet."""
+        return bool(self.actions)
+
+    def __repr__(self) -> str:
+        state = "ok" if self.success else f"échec: {self.message}"
+        return f"PackageOutcome({self.name} {self.actions or 'inchangé'} {self.before} -> {self.after}, {state})"
+
 class AptCommands(PluginsUtilsBase):
     """
     Classe avancée pour gérer les paquets via apt/apt-get.
@@ -43,18 +164,57 @@ class AptCommands(PluginsUtilsBase):
         self._apt_env = os.environ.copy()
         self._apt_env["DEBIAN_FRONTEND"] = "noninteractive"
 
-    def update(self, allow_fail: bool = False, log_levels: Optional[Dict[str, str]] = None) -> bool:
+    def _packages_changed(self) -> None:
+        """Signale au profil de la machine que des paquets ont pu changer."""
+        host_facts.invalidate(*host_facts.PACKAGE_FACTS)
+
+    def update(self, allow_fail: bool = False, max_age: Optional[int] = None, force: bool = False,
+               log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
         Met à jour la liste des paquets disponibles via apt-get update.
         Cette méthode gère sa propre barre de progression interne via self.run.
 
+        La mise à jour est sautée si un plugin de la machine l'a faite il y a
+        moins de max_age secondes et que les sources apt n'ont pas changé
+        depuis (voir apt_freshness). Les plugins lancés en parallèle attendent
+        la mise à jour du premier.
+
         Args:
             allow_fail: Si True, renvoie True même si des erreurs non critiques surviennent.
+            max_age: Âge maximal en secondes d'une mise à jour réutilisable
+                     (None: configuration du plugin ou valeur par défaut, 0: toujours mettre à jour).
+            force: Si True, met à jour même si les listes sont récentes.
             log_levels: Dictionnaire optionnel pour spécifier les niveaux de log (compatibilité).
 
         Returns:
             bool: True si la mise à jour a réussi.
         """
+        with apt_freshness.update_lock():
+            if not force:
+                fresh, reason = apt_freshness.check(max_age)
+                if fresh:
+                    self.log_info(f"Liste des paquets à jour, apt update ignoré ({reason})", log_levels=log_levels)
+                    return True
+                self.log_debug(f"apt update nécessaire: {reason}", log_levels=log_levels)
+
+            final_success, clean = self._run_update(allow_fail, log_levels=log_levels)
+            if clean:
+                # Une mise à jour partielle (dépôt injoignable, clé manquante) n'est
+                # pas réutilisée: le plugin suivant retentera apt update
+                apt_freshness.record()
+            return final_success
+
+    def _run_update(self, allow_fail: bool, log_levels: Optional[Dict[str, str]] = None) -> Tuple[bool, bool]:
+        """
+        Lance apt-get update et interprète ses erreurs.
+
+        Args:
+            allow_fail: Si True, renvoie True même si des erreurs non critiques surviennent.
+            log_levels: Dictionnaire optionnel pour spécifier les niveaux de log (compatibilité).
+
+        Returns:
+            Tuple[bool, bool]: (succès, succès sans avertissement)
+        """
         self.log_info("Mise à jour de la liste des paquets (apt update)", log_levels=log_levels)
 
         cmd = ['apt-get', 'update']
@@ -68,7 +228,12 @@ class AptCommands(PluginsUtilsBase):
 
         warning_issued = False
         final_success = success
-        if not success and allow_fail:
+        if success and re.search(r'(NO_PUBKEY|KEYEXPIRED|Failed to fetch|Unable to fetch|Could not resolve)',
+                                 stderr or '', re.IGNORECASE):
+            # apt-get update peut réussir malgré des dépôts non mis à jour (W: ...)
+            self.log_warning("apt update terminé avec des dépôts non mis à jour.", log_levels=log_levels)
+            warning_issued = True
+        elif not success and allow_fail:
             if "NO_PUBKEY" in stderr or "KEYEXPIRED" in stderr:
                 self.log_warning("Problèmes de clés GPG détectés, mais continuer.", log_levels=log_levels)
                 warning_issued = True
@@ -90,7 +255,7 @@ class AptCommands(PluginsUtilsBase):
         else: # final_success = False
              final_message += " avec échec critique."
 
-        return final_success
+        return final_success, final_success and not warning_issued
 
     def upgrade(self,
                 dist_upgrade: bool = False,
@@ -134,22 +299,30 @@ class AptCommands(PluginsUtilsBase):
             self.log_error("Échec critique de la mise à jour des sources. Annulation.", log_levels=log_levels)
             return False
 
-        self.log_info(f"{log_prefix} - Étape 2: Exécution {cmd_verb}", log_levels=log_levels)
-        cmd = [apt_cmd, cmd_verb]
-        cmd.extend(['-o', 'Dpkg::Options::=--force-confdef', '-o', 'Dpkg::Options::=--force-confold'])
-        cmd.append('-y')
-        if simulate: cmd.append('--simulate')
-
-        upgrade_success, stdout, stderr = self.run(cmd,
-                                                   env=self._apt_env,
-                                                   check=False,
-                                                   timeout=3600,
-                                                   real_time_output=True,
-                                                   show_progress=True
-                                                   )
-        if not upgrade_success:
-            self.log_error(f"Échec de '{' '.join(cmd)}'. Stderr:\n{stderr}", log_levels=log_levels)
-            return False
+        upgradable = self.list_upgradable(log_levels=log_levels)
+        if upgradable is not None and not upgradable:
+            # Seule la commande de mise à jour est inutile: le nettoyage demandé reste fait
+            self.log_info(f"{log_prefix} - Étape 2: aucun paquet à mettre à jour", log_levels=log_levels)
+            upgrade_success = True
+        else:
+            self.log_info(f"{log_prefix} - Étape 2: Exécution {cmd_verb}", log_levels=log_levels)
+            cmd = [apt_cmd, cmd_verb]
+            cmd.extend(['-o', 'Dpkg::Options::=--force-confdef', '-o', 'Dpkg::Options::=--force-confold'])
+            cmd.append('-y')
+            if simulate: cmd.append('--simulate')
+
+            upgrade_success, stdout, stderr = self.run(cmd,
+                                                       env=self._apt_env,
+                                                       check=False,
+                                                       timeout=3600,
+                                                       real_time_output=True,
+                                                       show_progress=True
+                                                       )
+            if not simulate:
+                self._packages_changed()
+            if not upgrade_success:
+                self.log_error(f"Échec de '{' '.join(cmd)}'. Stderr:\n{stderr}", log_levels=log_levels)
+                return False
 
         autoremove_success = True
         if not simulate and autoremove:
@@ -251,6 +424,9 @@ class AptCommands(PluginsUtilsBase):
         elif not simulate and auto_fix:
              self.log_info(f"{log_prefix} - Étape 2: Réparation non nécessaire", log_levels=log_levels)
 
+        if not simulate:
+            self._packages_changed()
+
         final_message = f"{log_prefix} {'réussie' if install_success else 'échouée'}"
         if not install_success:
             self.log_error(f"Échec final de '{' '.join(cmd)}'.", log_levels=log_levels)
@@ -305,6 +481,8 @@ class AptCommands(PluginsUtilsBase):
                                                   real_time_output=True,
                                                   show_progress=True
                                                   )
+        if not simulate:
+            self._packages_changed()
 
         if not remove_success:
              self.log_error(f"Échec de '{' '.join(cmd)}'. Stderr:\n{stderr}", log_levels=log_levels)
@@ -325,6 +503,255 @@ class AptCommands(PluginsUtilsBase):
 
         return final_success
 
+    def _package_states(self, package_names: List[str]) -> Dict[str, Tuple[Optional[str], bool, bool]]:
+        """
+        Lit l'état de plusieurs paquets en une fois.
+
+        Args:
+            package_names: Noms des paquets.
+
+        Returns:
+            Dict[str, Tuple]: {paquet: (version installée ou None, verrouillé, fichiers de configuration présents)}.
+        """
+        index = dpkg_status.get_index()
+        if index.available:
+            states = {}
+            for name, status in index.statuses(package_names).items():
+                if status is None:
+                    states[name] = (None, False, False)
+                else:
+                    version = status.version if status.installed else None
+                    states[name] = (version, status.want == 'hold', status.state != 'not-installed')
+            return states
+
+        # Sans base dpkg lisible: une requête par paquet et une seule pour les verrous
+        success, stdout, _ = self.run(['apt-mark', 'showhold'], check=False, no_output=True, error_as_warning=True)
+        held = set(stdout.split()) if success else set()
+        states = {}
+        for name in package_names:
+            version = self.get_version(name)
+            states[name] = (version, name in held, version is not None)
+        return states
+
+    def resolve_plan(self, plan: PackagePlan, log_levels: Optional[Dict[str, str]] = None) -> Dict[str, PackageOutcome]:
+        """
+        Compare un plan à l'état actuel des paquets, sans rien modifier.
+
+        Args:
+            plan: Plan à résoudre.
+            log_levels: Dictionnaire optionnel pour spécifier les niveaux de log (compatibilité).
+
+        Returns:
+            Dict[str, PackageOutcome]: {paquet: résultat}, avec les actions nécessaires.
+        """
+        names = plan.packages()
+        states = self._package_states(names)
+        outcomes: Dict[str, PackageOutcome] = {}
+
+        for name in names:
+            version, held, has_files = states[name]
+            outcome = PackageOutcome(name, version, held)
+            outcomes[name] = outcome
+
+            if name in plan.installs:
+                exact = plan.installs[name]
+                min_version = plan.min_versions.get(name)
+                if version is None:
+                    outcome.actions.append('install')
+                elif exact and self._compare_versions(version, exact) != 0:
+                    outcome.actions.append('install')
+                elif min_version and not self._version_at_least(version, min_version):
+                    outcome.actions.append('upgrade')
+            elif name in plan.removals:
+                purge = plan.removals[name]
+                if version is not None or (purge and has_files):
+                    outcome.actions.append('purge' if purge else 'remove')
+
+            if name in plan.holds:
+                if plan.holds[name] and not held:
+                    outcome.actions.append('hold')
+                elif not plan.holds[name] and held:
+                    outcome.actions.append('unhold')
+
+        changed = [o.name for o in outcomes.values() if o.changed]
+        self.log_debug(f"Plan résolu: {len(changed)}/{len(outcomes)} paquet(s) à modifier"
+                       + (f" ({', '.join(changed)})" if changed else ""), log_levels=log_levels)
+        return outcomes
+
+    def apply_plan(self,
+                   plan: PackagePlan,
+                   simulate: bool = False,
+                   no_recommends: bool = False,
+                   force_conf: bool = True,
+                   auto_fix: bool = True,
+                   log_levels: Optional[Dict[str, str]] = None) -> Dict[str, PackageOutcome]:
+        """
+        Applique un plan de paquets.
+
+        Les installations et suppressions sont faites par un seul appel à
+        apt-get install (suffixes '-' et '_' pour les suppressions et purges),
+        ce qui ne prend le verrou dpkg qu'une fois et laisse apt résoudre
+        l'ensemble des dépendances d'un coup. Les déverrouillages précèdent la
+        transaction, les verrous la suivent.
+
+        Args:
+            plan: Plan à appliquer.
+            simulate: Si True, simule seulement la transaction.
+            no_recommends: Si True, n'installe pas les paquets recommandés.
+            force_conf: Si True, force les options de configuration par défaut.
+            auto_fix: Si True, tente de réparer les dépendances cassées.
+            log_levels: Dictionnaire optionnel pour spécifier les niveaux de log (compatibilité).
+
+        Returns:
+            Dict[str, PackageOutcome]: {paquet: résultat}. L'état final de chaque
+            paquet est relu dans la base dpkg (sauf en simulation).
+        """
+        action = "Simulation du plan" if simulate else "Application du plan"
+        log_prefix = f"{action} de paquets ({len(plan)} paquet(s))"
+        self.log_info(log_prefix, log_levels=log_levels)
+
+        outcomes = self.resolve_plan(plan, log_levels=log_levels)
+        targets = []
+        unholds = []
+        holds = []
+        # Paquets verrouillés que la transaction elle-même modifie
+        held_targets = []
+        for outcome in outcomes.values():
+            if outcome.held and 'unhold' not in outcome.actions and \
+               set(outcome.actions) & {'install', 'upgrade', 'remove', 'purge'}:
+                held_targets.append(outcome.name)
+            for act in outcome.actions:
+                if act == 'install':
+                    exact = plan.installs[outcome.name]
+                    targets.append(f"{outcome.name}={exact}" if exact else outcome.name)
+                elif act == 'upgrade':
+                    targets.append(outcome.name)
+                elif act == 'remove':
+                    targets.append(f"{outcome.name}-")
+                elif act == 'purge':
+                    targets.append(f"{outcome.name}_")
+                elif act == 'hold':
+                    holds.append(outcome.name)
+                elif act == 'unhold':
+                    unholds.append(outcome.name)
+
+        if not targets and not holds and not unholds:
+            self.log_success(f"{log_prefix}: aucun changement nécessaire.", log_levels=log_levels)
+            return outcomes
+
+        failures: Dict[str, str] = {}
+        self.start_task(3, description="Plan de paquets", task_id=f"apt_plan_{int(time.time())}")
+
+        # Étape 1: déverrouillages (un paquet verrouillé bloquerait la transaction)
+        if unholds and not simulate:
+            success, _, stderr = self.run(['apt-mark', 'unhold'] + unholds, check=False, needs_sudo=True, no_output=True)
+            if not success:
+                self.log_error(f"Échec de apt-mark unhold. Stderr:\n{stderr}", log_levels=log_levels)
+                failures.update({name: "échec de apt-mark unhold" for name in unholds})
+        self.update_task(description="Déverrouillages")
+
+        # Étape 2: transaction unique
+        if targets:
+            cmd = ['apt-get', 'install', '-y']
+            if force_conf: cmd.extend(['-o', 'Dpkg::Options::=--force-confdef', '-o', 'Dpkg::Options::=--force-confold'])
+            if no_recommends: cmd.append('--no-install-recommends')
+            if simulate: cmd.append('--simulate')
+            # Autoriser le changement des seuls verrous cités par le plan: sinon apt
+            # pourrait aussi modifier d'autres paquets verrouillés par dépendance
+            if held_targets:
+                self.log_info(f"Paquets verrouillés modifiés par le plan: {', '.join(held_targets)}", log_levels=log_levels)
+                cmd.append('--allow-change-held-packages')
+            cmd.extend(targets)
+
+            self.log_info(f"Transaction apt: {' '.join(targets)}", log_levels=log_levels)
+            tx_success, stdout, stderr = self.run(cmd,
+                                                  env=self._apt_env,
+                                                  check=False,
+                                                  real_time_output=True,
+                                                  show_progress=True,
+                                                  timeout=3600
+                                                  )
+            if not tx_success and not simulate and auto_fix and \
+               re.search(r'(unmet depend|broken package|held broken)', stderr, re.IGNORECASE):
+                self.log_warning("Problème dépendances, tentative réparation...", log_levels=log_levels)
+                if self.fix_broken():
+                    tx_success, stdout, stderr = self.run(cmd,
+                                                          env=self._apt_env,
+                                                          check=False,
+                                                          real_time_output=True,
+                                                          show_progress=True,
+                                                          timeout=3600
+                                                          )
+            if not simulate:
+                self._packages_changed()
+            if not tx_success:
+                self.log_error(f"Échec de '{' '.join(cmd)}'. Stderr:\n{stderr}", log_levels=log_levels)
+                if simulate:
+                    failures.update({o.name: "échec de la simulation apt-get" for o in outcomes.values()
+                                     if set(o.actions) - {'hold', 'unhold'}})
+        self.update_task(description="Transaction apt")
+
+        # Étape 3: verrous
+        if holds and not simulate:
+            success, _, stderr = self.run(['apt-mark', 'hold'] + holds, check=False, needs_sudo=True, no_output=True)
+            if not success:
+                self.log_error(f"Échec de apt-mark hold. Stderr:\n{stderr}", log_levels=log_levels)
+        self.update_task(description="Verrous")
+
+        # Vérification: état final relu paquet par paquet
+        if not simulate:
+            final_states = self._package_states(list(outcomes))
+            for outcome in outcomes.values():
+                if not outcome.changed:
+                    continue
+                version, held, has_files = final_states[outcome.name]
+                outcome.after = version
+                failures.setdefault(outcome.name, self._plan_mismatch(plan, outcome.name, version, held, has_files))
+
+        for name, message in failures.items():
+            if message:
+                outcomes[name].success = False
+                outcomes[name].message = message
+
+        failed = [o for o in outcomes.values() if not o.success]
+        changed = sum(1 for o in outcomes.values() if o.changed)
+        if failed:
+            for outcome in failed:
+                self.log_error(f"Paquet '{outcome.name}': {outcome.message}", log_levels=log_levels)
+            final_message = f"{log_prefix}: {len(failed)}/{changed} changement(s) en échec"
+        else:
+            final_message = f"{log_prefix}: {changed} paquet(s) modifié(s)"
+        self.complete_task(success=not failed, message=final_message)
+        if not failed:
+            self.log_success(final_message, log_levels=log_levels)
+        return outcomes
+
+    def _plan_mismatch(self, plan: PackagePlan, name: str, version: Optional[str],
+                       held: bool, has_files: bool) -> str:
+        """
+        Vérifie qu'un paquet est dans l'état demandé par le plan.
+
+        Returns:
+            str: Description de l'écart, chaîne vide si l'état est conforme.
+        """
+        if name in plan.installs:
+            exact = plan.installs[name]
+            min_version = plan.min_versions.get(name)
+            if version is None:
+                return "non installé après la transaction"
+            if exact and self._compare_versions(version, exact) != 0:
+                return f"version {version} installée au lieu de {exact}"
+            if min_version and not self._version_at_least(version, min_version):
+                return f"version {version} < version min ({min_version})"
+        elif name in plan.removals:
+            if version is not None:
+                return f"toujours installé ({version})"
+            if plan.removals[name] and has_files:
+                return "fichiers de configuration toujours présents"
+        if name in plan.holds and plan.holds[name] != held:
+            return "verrou non appliqué" if plan.holds[name] else "verrou non retiré"
+        return ""
+
     def autoremove(self, purge: bool = False, simulate: bool = False, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
         Supprime les paquets inutilisés.
@@ -351,6 +778,8 @@ class AptCommands(PluginsUtilsBase):
                                            real_time_output=True,
                                            show_progress=True
                                            )
+        if not simulate:
+            self._packages_changed()
 
         final_message = log_prefix
         if success:
@@ -438,6 +867,8 @@ class AptCommands(PluginsUtilsBase):
                                            real_time_output=True,
                                            show_progress=True,
                                            timeout=1800)
+        if not simulate:
+            self._packages_changed()
 
         final_message = log_prefix
         if success:
@@ -553,9 +984,14 @@ class AptCommands(PluginsUtilsBase):
             bool: True si le paquet est installé et satisfait la version minimale.
         """
         self.log_debug(f"Vérification installation paquet: {package_name}", log_levels=log_levels)
-        cmd = ['dpkg-query', '--show', package_name]
-        success, stdout, stderr = self.run(cmd, check=False, no_output=True, error_as_warning=True)
-        is_installed = success
+        index = dpkg_status.get_index()
+        if index.available:
+            # Base dpkg lue en mémoire: pas de dpkg-query
+            is_installed = index.is_installed(package_name)
+        else:
+            cmd = ['dpkg-query', '--show', package_name]
+            success, stdout, stderr = self.run(cmd, check=False, no_output=True, error_as_warning=True)
+            is_installed = success
         if not is_installed:
             self.log_debug(f"Paquet '{package_name}' non installé.", log_levels=log_levels)
             return False
@@ -566,9 +1002,7 @@ class AptCommands(PluginsUtilsBase):
                  self.log_warning(f"Paquet '{package_name}' installé mais version inconnue.", log_levels=log_levels)
                  return is_installed
             self.log_debug(f"Comparaison version: {installed_version} >= {min_version}", log_levels=log_levels)
-            cmd_compare = ['dpkg', '--compare-versions', installed_version, 'ge', min_version]
-            success_cmp, _, _ = self.run(cmd_compare, check=False, no_output=True, error_as_warning=True)
-            if not success_cmp:
+            if not self._version_at_least(installed_version, min_version):
                  self.log_warning(f"Paquet '{package_name}' ({installed_version}) < version min ({min_version}).", log_levels=log_levels)
                  return False
             self.log_info(f"Paquet '{package_name}' ({installed_version}) >= version min ({min_version}).", log_levels=log_levels)
@@ -588,6 +1022,15 @@ class AptCommands(PluginsUtilsBase):
             Optional[str]: Version installée ou None si non installé.
         """
         self.log_debug(f"Récupération version installée de: {package_name}", log_levels=log_levels)
+        index = dpkg_status.get_index()
+        if index.available:
+            version = index.version(package_name)
+            if version:
+                self.log_debug(f"Version installée de {package_name}: {version}", log_levels=log_levels)
+            else:
+                self.log_debug(f"Paquet '{package_name}' non installé.", log_levels=log_levels)
+            return version
+
         cmd = ['dpkg-query', '--show', '--showformat=${Version}', package_name]
         success, stdout, stderr = self.run(cmd, check=False, no_output=True, error_as_warning=True)
         if success and stdout.strip():
@@ -601,9 +1044,84 @@ class AptCommands(PluginsUtilsBase):
                   self.log_debug(f"Paquet '{package_name}' non trouvé par dpkg-query.", log_levels=log_levels)
              return None
 
+    def are_installed(self, package_names: List[str], min_versions: Optional[Dict[str, str]] = None,
+                      log_levels: Optional[Dict[str, str]] = None) -> Dict[str, bool]:
+        """
+        Vérifie en une fois si plusieurs paquets sont installés.
+
+        Args:
+            package_names: Noms des paquets à vérifier.
+            min_versions: Versions minimales requises, par paquet (optionnel).
+            log_levels: Dictionnaire optionnel pour spécifier les niveaux de log (compatibilité).
+
+        Returns:
+            Dict[str, bool]: {paquet: True si installé et en version suffisante}.
+        """
+        index = dpkg_status.get_index()
+        if not index.available:
+            min_versions = min_versions or {}
+            return {name: self.is_installed(name, min_versions.get(name)) for name in package_names}
+
+        result = index.are_installed(package_names, min_versions)
+        missing = [name for name, installed in result.items() if not installed]
+        self.log_debug(f"{len(result) - len(missing)}/{len(result)} paquet(s) installé(s)"
+                       + (f", absents ou trop anciens: {', '.join(missing)}" if missing else ""),
+                       log_levels=log_levels)
+        return result
+
+    def get_versions(self, package_names: List[str], log_levels: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+        """
+        Obtient en une fois la version installée de plusieurs paquets.
+
+        Args:
+            package_names: Noms des paquets.
+            log_levels: Dictionnaire optionnel pour spécifier les niveaux de log (compatibilité).
+
+        Returns:
+            Dict[str, Optional[str]]: {paquet: version installée ou None}.
+        """
+        index = dpkg_status.get_index()
+        if index.available:
+            return index.versions(package_names)
+        return {name: self.get_version(name) for name in package_names}
+
+    def _compare_versions(self, version_a: str, version_b: str) -> int:
+        """
+        Compare deux versions Debian.
+
+        Returns:
+            int: Négatif, nul ou positif selon que version_a est inférieure, égale ou supérieure.
+        """
+        try:
+            return dpkg_status.compare_versions(version_a, version_b)
+        except ValueError:
+            # Version mal formée: laisser dpkg trancher
+            for operator, result in (('eq', 0), ('lt', -1)):
+                success, _, _ = self.run(['dpkg', '--compare-versions', version_a, operator, version_b],
+                                         check=False, no_output=True, error_as_warning=True)
+                if success:
+                    return result
+            return 1
+
+    def _version_at_least(self, version: str, min_version: str) -> bool:
+        """
+        Compare deux versions Debian (version >= min_version).
+
+        Args:
+            version: Version installée.
+            min_version: Version minimale requise.
+
+        Returns:
+            bool: True si la version est suffisante.
+        """
+        return self._compare_versions(version, min_version) >= 0
+
     def get_candidate_version(self, package_name: str, log_levels: Optional[Dict[str, str]] = None) -> Optional[str]:
         """
-        Obtient la version candidate via `apt-cache policy`.
+        Obtient la version candidate (celle qu'apt installerait).
+
+        Utilise l'index des listes apt, ou `apt-cache policy` si les listes
+        ne sont pas lisibles.
 
         Args:
             package_name: Nom du paquet.
@@ -613,6 +1131,13 @@ class AptCommands(PluginsUtilsBase):
             Optional[str]: Version candidate ou None si non disponible.
         """
         self.log_debug(f"Récupération version candidate de: {package_name}", log_levels=log_levels)
+        index = apt_lists.get_index()
+        if index.available:
+            # Listes apt lues en mémoire: pas de apt-cache policy
+            candidate_version = index.candidate(package_name)
+            self.log_debug(f"Version candidate de {package_name}: {candidate_version}", log_levels=log_levels)
+            return candidate_version
+
         cmd = ['apt-cache', 'policy', package_name]
         success, stdout, stderr = self.run(cmd, check=False, no_output=True, error_as_warning=True)
         if not success:
@@ -632,6 +1157,41 @@ class AptCommands(PluginsUtilsBase):
         self.log_debug(f"Version candidate de {package_name}: {candidate_version}", log_levels=log_levels)
         return candidate_version
 
+    def get_candidate_versions(self, package_names: List[str], log_levels: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+        """
+        Obtient en une fois la version candidate de plusieurs paquets.
+
+        Args:
+            package_names: Noms des paquets.
+            log_levels: Dictionnaire optionnel pour spécifier les niveaux de log (compatibilité).
+
+        Returns:
+            Dict[str, Optional[str]]: {paquet: version candidate ou None}.
+        """
+        index = apt_lists.get_index()
+        if index.available:
+            return index.candidates(package_names)
+        return {name: self.get_candidate_version(name) for name in package_names}
+
+    def list_upgradable(self, log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Tuple[str, str]]]:
+        """
+        Liste les paquets installés pour lesquels une version plus récente est candidate.
+
+        Args:
+            log_levels: Dictionnaire optionnel pour spécifier les niveaux de log (compatibilité).
+
+        Returns:
+            Optional[Dict[str, Tuple[str, str]]]: {paquet: (version installée, version candidate)},
+            ou None si les listes apt ne sont pas lisibles.
+        """
+        index = apt_lists.get_index()
+        if not index.available:
+            self.log_debug("Listes apt illisibles, paquets à mettre à jour inconnus.", log_levels=log_levels)
+            return None
+        upgradable = index.upgradable()
+        self.log_debug(f"{len(upgradable)} paquet(s) à mettre à jour", log_levels=log_levels)
+        return upgradable
+
     def remove_line_from_sources_list(self, keyword: str, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
         Supprime les lignes contenant un mot-clé dans /etc/apt/sources.list.
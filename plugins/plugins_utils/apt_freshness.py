@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fraîcheur des listes apt, partagée entre les plugins d'une machine.
+
+Chaque plugin d'une séquence (install_update, antivirus, lara_install...)
+lançait son propre `apt-get update`. Après une mise à jour réussie,
+AptCommands.update enregistre ici un tampon: date, empreinte des sources
+apt et signature des listes téléchargées. Tant que le tampon a moins de
+max_age secondes et que ni les sources ni les listes n'ont changé, les
+plugins suivants sautent la mise à jour.
+
+La durée maximale vient, par ordre de priorité, de l'argument max_age
+d'AptCommands.update, de la clé apt_update_max_age de la configuration du
+plugin, de la variable d'environnement PCUTILS_APT_UPDATE_MAX_AGE, sinon
+DEFAULT_MAX_AGE. Une durée de 0 désactive le saut.
+
+Le tampon est stocké à côté du cache host_facts
+(~/.cache/pcUtils/apt_update.json); un verrou fcntl sérialise les mises à
+jour de plugins lancés en parallèle, le second trouvant alors le tampon
+du premier.
+"""
+
+import os
+import json
+import time
+import fcntl
+import hashlib
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+# Durée de validité par défaut d'une mise à jour, en secondes
+DEFAULT_MAX_AGE = 900
+
+# Variable d'environnement fixant la durée hors de l'application
+MAX_AGE_ENV_VAR = "PCUTILS_APT_UPDATE_MAX_AGE"
+
+_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'pcUtils'
+)
+STAMP_FILE = os.path.join(_CACHE_DIR, 'apt_update.json')
+LOCK_FILE = os.path.join(_CACHE_DIR, 'apt_update.lock')
+
+APT_LISTS = '/var/lib/apt/lists'
+APT_SOURCES = '/etc/apt/sources.list'
+
+# Fichiers qui changent l'ensemble des listes à télécharger, en plus des sources
+_EXTRA_SOURCE_FILES = ['/var/lib/dpkg/arch']
+
+# Durée définie par Main.start() (clé apt_update_max_age)
+_max_age: Optional[int] = None
+
+def set_max_age(seconds: Optional[int]) -> None:
+    """
+    Définit la durée de validité des mises à jour pour le processus.
+
+    Args:
+        seconds: Durée en secondes (None pour revenir à la valeur par défaut)
+    """
+    global _max_age
+    try:
+        _max_age = None if seconds is None else max(0, int(seconds))
+    except (TypeError, ValueError):
+        _max_age = None
+
+def get_max_age() -> int:
+    """Durée de validité effective des mises à jour, en secondes."""
+    if _max_age is not None:
+        return _max_age
+    try:
+        return max(0, int(os.environ[MAX_AGE_ENV_VAR]))
+    except (KeyError, ValueError):
+        return DEFAULT_MAX_AGE
+
+def _source_files(sources: str) -> List[str]:
+    """Fichier de sources principal, fragments .list/.sources et fichiers annexes."""
+    parts_dir = sources + '.d'
+    try:
+        parts = sorted(os.path.join(parts_dir, name) for name in os.listdir(parts_dir)
+                       if name.endswith(('.list', '.sources')))
+    except OSError:
+        parts = []
+    return [sources] + parts + _EXTRA_SOURCE_FILES
+
+def sources_hash(sources: str = APT_SOURCES) -> str:
+    """
+    Calcule l'empreinte des sources apt (noms et contenus des fichiers).
+
+    Args:
+        sources: Fichier de sources principal (le dossier .d est aussi lu)
+
+    Returns:
+        str: Empreinte SHA-256
+    """
+    digest = hashlib.sha256()
+    for path in _source_files(sources):
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            continue
+        digest.update(path.encode('utf-8') + b'\0' + content + b'\0')
+    return digest.hexdigest()
+
+def lists_signature(lists_dir: str = APT_LISTS) -> List[List]:
+    """
+    Liste (nom, mtime_ns, taille) des listes téléchargées.
+
+    Args:
+        lists_dir: Dossier des listes apt
+
+    Returns:
+        List[List]: Signature triée (vide si aucune liste)
+    """
+    entries = []
+    try:
+        with os.scandir(lists_dir) as it:
+            for entry in it:
+                if entry.name == 'lock' or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                entries.append([entry.name, stat.st_mtime_ns, stat.st_size])
+    except OSError:
+        pass
+    return sorted(entries)
+
+def check(max_age: Optional[int] = None, sources: str = APT_SOURCES,
+          lists_dir: str = APT_LISTS) -> Tuple[bool, str]:
+    """
+    Indique si une mise à jour récente rend `apt-get update` inutile.
+
+    Args:
+        max_age: Durée de validité en secondes (get_max_age() si None)
+        sources: Fichier de sources principal
+        lists_dir: Dossier des listes apt
+
+    Returns:
+        Tuple[bool, str]: (listes à jour, raison)
+    """
+    max_age = get_max_age() if max_age is None else max_age
+    if max_age <= 0:
+        return False, "saut des mises à jour désactivé"
+    try:
+        with open(STAMP_FILE, 'r', encoding='utf-8') as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return False, "aucune mise à jour enregistrée"
+
+    age = time.time() - stamp.get('time', 0)
+    if age < 0 or age > max_age:
+        return False, f"dernière mise à jour trop ancienne ({int(age)} s > {max_age} s)"
+    if stamp.get('sources') != sources_hash(sources):
+        return False, "sources apt modifiées depuis la dernière mise à jour"
+    signature = lists_signature(lists_dir)
+    if not signature or stamp.get('lists') != signature:
+        return False, "listes apt modifiées depuis la dernière mise à jour"
+    return True, f"mise à jour effectuée il y a {int(age)} s"
+
+def record(sources: str = APT_SOURCES, lists_dir: str = APT_LISTS) -> None:
+    """
+    Enregistre une mise à jour réussie.
+
+    Args:
+        sources: Fichier de sources principal
+        lists_dir: Dossier des listes apt
+    """
+    stamp = {
+        'time': time.time(),
+        'sources': sources_hash(sources),
+        'lists': lists_signature(lists_dir),
+    }
+    try:
+        os.makedirs(_CACHE_DIR, mode=0o700, exist_ok=True)
+        tmp_path = f"{STAMP_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stamp, f)
+        os.replace(tmp_path, STAMP_FILE)
+    except OSError:
+        pass
+
+def invalidate() -> None:
+    """Oublie la dernière mise à jour (la suivante sera effectuée)."""
+    try:
+        os.unlink(STAMP_FILE)
+    except OSError:
+        pass
+
+@contextmanager
+def update_lock() -> Iterator[None]:
+    """
+    Sérialise les mises à jour des plugins de la machine.
+
+    Sans dossier de cache accessible, le verrou est ignoré.
+    """
+    try:
+        os.makedirs(_CACHE_DIR, mode=0o700, exist_ok=True)
+        lock_file = open(LOCK_FILE, 'a')
+    except OSError:
+        yield
+        return
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+    finally:
+        lock_file.close()
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index des versions candidates apt, lu depuis les listes locales.
+
+AptCommands.get_candidate_version lançait `apt-cache policy` pour chaque
+paquet. Ce module lit directement les listes téléchargées par apt-get update
+(/var/lib/apt/lists/*_Packages, brutes ou compressées), les fichiers Release
+associés et les préférences apt (/etc/apt/preferences[.d]), puis choisit la
+version candidate comme apt:
+
+- priorité par défaut 500, 1 pour une archive NotAutomatic, 100 si elle est
+  aussi ButAutomaticUpgrades, 990 pour APT::Default-Release;
+- les épinglages généraux (Package: *) fixent la priorité d'une archive,
+  les épinglages d'un paquet celle de ses versions; le premier qui
+  correspond s'applique;
+- la version installée vaut au moins 100;
+- la version de plus haute priorité l'emporte, puis la plus récente; une
+  version plus ancienne que celle installée n'est retenue qu'à partir de 1000;
+  une priorité négative interdit la version.
+
+L'index est construit à la première question et reconstruit quand une liste,
+une préférence ou la configuration apt change. Les listes compressées en lz4
+nécessitent le module lz4; si une liste ne peut pas être lue, available vaut
+False et l'appelant doit revenir à apt-cache.
+
+Ce module n'importe de plugins_utils que dpkg_status.
+"""
+
+import bz2
+import fnmatch
+import glob
+import gzip
+import itertools
+import lzma
+import mmap
+import os
+import platform
+import re
+import threading
+from functools import cmp_to_key
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from plugins_utils import dpkg_status
+
+APT_LISTS = '/var/lib/apt/lists'
+APT_PREFERENCES = '/etc/apt/preferences'
+APT_CONF = '/etc/apt/apt.conf'
+
+# Priorités par défaut (apt_preferences(5))
+DEFAULT_PRIORITY = 500
+NOT_AUTOMATIC_PRIORITY = 1
+BUT_AUTOMATIC_UPGRADES_PRIORITY = 100
+TARGET_RELEASE_PRIORITY = 990
+INSTALLED_PRIORITY = 100
+DOWNGRADE_PRIORITY = 1000
+
+# Listes de paquets et leur décompression
+_PACKAGES_FILE = re.compile(r'_Packages(\.(gz|xz|bz2|lz4))?$')
+_DECOMPRESSORS = {'.gz': gzip.decompress, '.xz': lzma.decompress, '.bz2': bz2.decompress}
+try:
+    import lz4.frame
+    _DECOMPRESSORS['.lz4'] = lz4.frame.decompress
+except ImportError:
+    pass
+
+# Champs lus dans les listes (une seule passe regex sur le fichier projeté en mémoire).
+# Ancrer sur '\n' plutôt que '^' avec re.M est environ trois fois plus rapide;
+# la première ligne du fichier est lue à part.
+_PACKAGE_FIELDS = re.compile(rb'\n(Package|Version|Architecture): *([^\n]*)')
+_FIRST_FIELD = re.compile(rb'(Package|Version|Architecture): *([^\n]*)')
+_RELEASE_FIELDS = re.compile(r'^(Origin|Label|Suite|Codename|Version|NotAutomatic|ButAutomaticUpgrades): *(.*)$', re.M)
+_DEFAULT_RELEASE = re.compile(r'Default-Release\s+"([^"]*)"')
+
+# Clés des épinglages 'Pin: release' et champs Release correspondants
+_RELEASE_KEYS = {'a': 'archive', 'n': 'codename', 'v': 'version', 'o': 'origin', 'l': 'label', 'c': 'component'}
+
+# Architectures Python -> dpkg, si la base dpkg ne donne pas l'architecture native
+_MACHINE_ARCH = {'x86_64': 'amd64', 'aarch64': 'arm64', 'i686': 'i386', 'i386': 'i386',
+                 'armv7l': 'armhf', 'ppc64le': 'ppc64el', 's390x': 's390x'}
+
+class ReleaseFile:
+    """
+    Liste de paquets et métadonnées de l'archive qui la publie.
+    """
+
+    __slots__ = ('path', 'site', 'archive', 'codename', 'version', 'origin', 'label',
+                 'component', 'not_automatic', 'but_automatic_upgrades', 'priority')
+
+    def __init__(self, path: str, site: str, component: str, release: Dict[str, str]):
+        """
+        Initialise la description.
+
+        Args:
+            path: Fichier *_Packages
+            site: Hôte du dépôt ('' pour un dépôt local)
+            component: Composant ('main', 'contrib'...), '' pour un dépôt plat
+            release: Champs du fichier Release/InRelease
+        """
+        self.path = path
+        self.site = site
+        self.component = component
+        self.archive = release.get('Suite', '')
+        self.codename = release.get('Codename', '')
+        self.version = release.get('Version', '')
+        self.origin = release.get('Origin', '')
+        self.label = release.get('Label', '')
+        self.not_automatic = release.get('NotAutomatic', '').lower() == 'yes'
+        self.but_automatic_upgrades = release.get('ButAutomaticUpgrades', '').lower() == 'yes'
+        self.priority = DEFAULT_PRIORITY
+
+    def __repr__(self) -> str:
+        return f"ReleaseFile({self.origin}/{self.archive} {self.component} prio={self.priority})"
+
+class Pin:
+    """
+    Entrée d'un fichier de préférences apt.
+    """
+
+    __slots__ = ('packages', 'kind', 'value', 'priority')
+
+    def __init__(self, packages: List[str], pin: str, priority: int):
+        """
+        Initialise l'épinglage.
+
+        Args:
+            packages: Motifs du champ Package (nom, glob, /regex/ ou *)
+            pin: Champ Pin ('release a=stable', 'version 1.2*', 'origin hôte')
+            priority: Champ Pin-Priority
+        """
+        self.packages = packages
+        self.kind, _, value = pin.strip().partition(' ')
+        self.value = value.strip()
+        self.priority = priority
+
+    @property
+    def general(self) -> bool:
+        """Indique si l'épinglage vise tous les paquets (Package: *)."""
+        return self.packages == ['*']
+
+    def matches_package(self, name: str) -> bool:
+        """Indique si le paquet est visé par le champ Package."""
+        return any(_match(pattern, name) for pattern in self.packages)
+
+    def matches_file(self, release: ReleaseFile) -> bool:
+        """Indique si une archive correspond à un épinglage 'release' ou 'origin'."""
+        if self.kind == 'origin':
+            return _match(self.value.strip('"'), release.site)
+        if self.kind != 'release':
+            return False
+        if '=' not in self.value:
+            # 'Pin: release 12' désigne un numéro de version d'archive
+            return _match(self.value, release.version)
+        for condition in self.value.split(','):
+            key, _, expected = condition.strip().partition('=')
+            attribute = _RELEASE_KEYS.get(key.strip())
+            if attribute is None or not _match(expected.strip().strip('"'), getattr(release, attribute)):
+                return False
+        return True
+
+    def matches_version(self, version: str) -> bool:
+        """Indique si une version correspond à un épinglage 'version'."""
+        return self.kind == 'version' and _match(self.value, version)
+
+def _match(pattern: str, value: str) -> bool:
+    """Compare une valeur à un motif apt (texte, glob ou /regex/)."""
+    if len(pattern) > 1 and pattern.startswith('/') and pattern.endswith('/'):
+        return re.search(pattern[1:-1], value) is not None
+    if any(char in pattern for char in '*?['):
+        return fnmatch.fnmatchcase(value, pattern)
+    return pattern == value
+
+def read_preferences(paths: Iterable[str]) -> List[Pin]:
+    """
+    Lit des fichiers de préférences apt, dans l'ordre donné.
+
+    Args:
+        paths: Fichiers à lire (les fichiers absents sont ignorés)
+
+    Returns:
+        List[Pin]: Épinglages valides
+    """
+    pins: List[Pin] = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            continue
+        for block in re.split(r'\n\s*\n', content):
+            fields: Dict[str, str] = {}
+            for line in block.splitlines():
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                key, _, value = line.partition(':')
+                fields[key.strip().lower()] = value.strip()
+            try:
+                priority = int(fields.get('pin-priority', ''))
+            except ValueError:
+                continue
+            if 'package' in fields and 'pin' in fields:
+                pins.append(Pin(fields['package'].split(), fields['pin'], priority))
+    return pins
+
+def _preference_files(preferences: str) -> List[str]:
+    """Fichier de préférences principal puis fragments .d (ordre alphabétique, comme apt)."""
+    parts = sorted(path for path in glob.glob(os.path.join(preferences + '.d', '*'))
+                   if re.search(r'/[A-Za-z0-9_.-]+$', path) and
+                   (path.endswith('.pref') or '.' not in os.path.basename(path)))
+    return [preferences] + parts
+
+def _conf_files(apt_conf: str) -> List[str]:
+    """Fichier de configuration apt principal puis fragments .d."""
+    return [apt_conf] + sorted(glob.glob(os.path.join(apt_conf + '.d', '*')))
+
+def _read_default_release(paths: Iterable[str]) -> Optional[str]:
+    """Retourne APT::Default-Release s'il est défini dans la configuration apt."""
+    target = None
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for match in _DEFAULT_RELEASE.finditer(f.read()):
+                    target = match.group(1)
+        except OSError:
+            continue
+    return target
+
+def _read_release(path: str) -> Dict[str, str]:
+    """Lit les champs d'en-tête d'un fichier Release ou InRelease."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    # InRelease: ignorer la signature
+    content = content.split('-----BEGIN PGP SIGNATURE-----', 1)[0]
+    return {key: value.strip() for key, value in _RELEASE_FIELDS.findall(content)}
+
+def _read_list(path: str):
+    """
+    Ouvre une liste de paquets pour une lecture regex.
+
+    Les listes brutes sont projetées en mémoire (rien n'est copié), les
+    listes compressées décompressées en mémoire.
+
+    Returns:
+        Objet compatible buffer (mmap ou bytes)
+
+    Raises:
+        OSError: Liste illisible ou compression non prise en charge
+    """
+    extension = os.path.splitext(path)[1]
+    if extension in ('.gz', '.xz', '.bz2', '.lz4'):
+        decompress = _DECOMPRESSORS.get(extension)
+        if decompress is None:
+            raise OSError(f"Compression {extension} non prise en charge (module manquant)")
+        with open(path, 'rb') as f:
+            try:
+                return decompress(f.read())
+            except (EOFError, ValueError, lzma.LZMAError) as e:
+                raise OSError(f"Liste corrompue {path}: {e}")
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _native_architecture() -> str:
+    """Architecture dpkg native (celle du paquet dpkg installé)."""
+    status = dpkg_status.get_index().get('dpkg')
+    if status is not None and status.architecture:
+        return status.architecture
+    return _MACHINE_ARCH.get(platform.machine(), platform.machine())
+
+class AptListsIndex:
+    """
+    Index des versions disponibles dans les listes apt, reconstruit quand elles changent.
+    """
+
+    def __init__(self, lists_dir: str = APT_LISTS, preferences: str = APT_PREFERENCES,
+                 apt_conf: str = APT_CONF, status_path: str = dpkg_status.DPKG_STATUS):
+        """
+        Initialise l'index (les listes sont lues à la première question).
+
+        Args:
+            lists_dir: Dossier des listes apt
+            preferences: Fichier de préférences apt (le dossier .d est aussi lu)
+            apt_conf: Fichier de configuration apt (le dossier .d est aussi lu)
+            status_path: Base dpkg donnant les versions installées
+        """
+        self.lists_dir = lists_dir
+        self.preferences = preferences
+        self.apt_conf = apt_conf
+        self.status_path = status_path
+        self.files: List[ReleaseFile] = []
+        self.unreadable: List[str] = []
+        self._versions: Dict[str, Dict[str, List[int]]] = {}  # {paquet: {version: [n° fichier]}}
+        self._pins: List[Pin] = []
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def _current_signature(self) -> Tuple:
+        """Identité des listes, préférences et configuration apt."""
+        entries = []
+        try:
+            with os.scandir(self.lists_dir) as it:
+                for entry in it:
+                    if entry.is_file() and (_PACKAGES_FILE.search(entry.name) or 'Release' in entry.name):
+                        stat = entry.stat()
+                        entries.append((entry.name, stat.st_mtime_ns, stat.st_size, stat.st_ino))
+        except OSError:
+            pass
+        settings = []
+        for path in _preference_files(self.preferences) + _conf_files(self.apt_conf):
+            try:
+                stat = os.stat(path)
+                settings.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                continue
+        return tuple(sorted(entries)), tuple(settings)
+
+    def refresh(self) -> bool:
+        """
+        Relit les listes si elles ont changé depuis la dernière lecture.
+
+        Returns:
+            bool: True si toutes les listes ont pu être lues
+        """
+        signature = self._current_signature()
+        if signature == self._signature:
+            return not self.unreadable and bool(self.files)
+
+        with self._lock:
+            if signature != self._signature:
+                self._build(signature)
+        return not self.unreadable and bool(self.files)
+
+    def _build(self, signature: Tuple):
+        """Construit l'index (appelé sous verrou)."""
+        native = _native_architecture()
+        files: List[ReleaseFile] = []
+        unreadable: List[str] = []
+        versions: Dict[str, Dict[str, List[int]]] = {}
+
+        for name, _, _, _ in signature[0]:
+            if not _PACKAGES_FILE.search(name):
+                continue
+            stem = _PACKAGES_FILE.sub('', name)
+            arch_match = re.search(r'_binary-([^_]+)$', stem)
+            if arch_match:
+                if arch_match.group(1) not in (native, 'all'):
+                    continue
+                stem = stem[:arch_match.start()]
+            path = os.path.join(self.lists_dir, name)
+            release_file = self._release_for(stem, path)
+            try:
+                buffer = _read_list(path)
+            except OSError:
+                unreadable.append(path)
+                continue
+
+            file_id = len(files)
+            files.append(release_file)
+            try:
+                package = version = architecture = None
+                first = _FIRST_FIELD.match(buffer)
+                for match in itertools.chain([first] if first else [], _PACKAGE_FIELDS.finditer(buffer)):
+                    field = match.group(1)
+                    if field == b'Package':
+                        if package and version and architecture in (None, native, 'all'):
+                            versions.setdefault(package, {}).setdefault(version, []).append(file_id)
+                        package = match.group(2).decode('utf-8', 'replace').strip()
+                        version = architecture = None
+                    elif field == b'Version':
+                        version = match.group(2).decode('utf-8', 'replace').strip()
+                    else:
+                        architecture = match.group(2).decode('utf-8', 'replace').strip()
+                if package and version and architecture in (None, native, 'all'):
+                    versions.setdefault(package, {}).setdefault(version, []).append(file_id)
+            finally:
+                if isinstance(buffer, mmap.mmap):
+                    buffer.close()
+
+        pins = read_preferences(_preference_files(self.preferences))
+        target = _read_default_release(_conf_files(self.apt_conf))
+        for release_file in files:
+            release_file.priority = self._file_priority(release_file, pins, target)
+
+        self.files, self.unreadable = files, unreadable
+        self._versions, self._pins, self._signature = versions, pins, signature
+
+    def _release_for(self, stem: str, path: str) -> ReleaseFile:
+        """
+        Retrouve le fichier Release d'une liste.
+
+        'hôte_debian_dists_bookworm_main' est publié par
+        'hôte_debian_dists_bookworm_InRelease', composant 'main'.
+        """
+        site = stem.split('_', 1)[0]
+        parts = stem.split('_')
+        for cut in range(len(parts), 0, -1):
+            prefix = '_'.join(parts[:cut])
+            for suffix in ('_InRelease', '_Release'):
+                release_path = os.path.join(self.lists_dir, prefix + suffix)
+                try:
+                    release = _read_release(release_path)
+                except OSError:
+                    continue
+                return ReleaseFile(path, site, '/'.join(parts[cut:]), release)
+        return ReleaseFile(path, site, '', {})
+
+    @staticmethod
+    def _file_priority(release_file: ReleaseFile, pins: List[Pin], target: Optional[str]) -> int:
+        """Priorité d'une archive: épinglage général, Default-Release, NotAutomatic, sinon 500."""
+        for pin in pins:
+            if pin.general and pin.matches_file(release_file):
+                return pin.priority
+        if target and target in (release_file.archive, release_file.codename):
+            return TARGET_RELEASE_PRIORITY
+        if release_file.not_automatic:
+            return BUT_AUTOMATIC_UPGRADES_PRIORITY if release_file.but_automatic_upgrades else NOT_AUTOMATIC_PRIORITY
+        return DEFAULT_PRIORITY
+
+    @property
+    def available(self) -> bool:
+        """Indique si les listes apt sont présentes et toutes lisibles."""
+        return self.refresh()
+
+    def _priority(self, name: str, version: str, installed: Optional[str]) -> int:
+        """Priorité d'une version (sans vérifier si les listes ont changé)."""
+        file_ids = self._versions.get(name, {}).get(version, [])
+        for pin in self._pins:
+            if pin.general or not pin.matches_package(name):
+                continue
+            if pin.kind == 'version':
+                if pin.matches_version(version):
+                    return pin.priority
+            elif any(pin.matches_file(self.files[file_id]) for file_id in file_ids):
+                return pin.priority
+        priorities = [self.files[file_id].priority for file_id in file_ids]
+        if version == installed:
+            priorities.append(INSTALLED_PRIORITY)
+        return max(priorities) if priorities else 0
+
+    def _candidate(self, name: str, installed: Optional[str]) -> Optional[str]:
+        """Version candidate (sans vérifier si les listes ont changé)."""
+        available = set(self._versions.get(name, ()))
+        if installed:
+            available.add(installed)
+        best: Optional[Tuple[int, str]] = None
+        for version in available:
+            priority = self._priority(name, version, installed)
+            if priority < 0:
+                continue
+            if installed and version != installed and priority < DOWNGRADE_PRIORITY \
+               and dpkg_status.compare_versions(version, installed) < 0:
+                continue
+            if best is None or priority > best[0] or \
+               (priority == best[0] and dpkg_status.compare_versions(version, best[1]) > 0):
+                best = (priority, version)
+        return best[1] if best else None
+
+    def versions_of(self, package_name: str) -> List[str]:
+        """
+        Liste les versions proposées par les dépôts, de la plus récente à la plus ancienne.
+
+        Args:
+            package_name: Nom du paquet
+
+        Returns:
+            List[str]: Versions disponibles
+        """
+        self.refresh()
+        return sorted(self._versions.get(package_name, ()),
+                      key=cmp_to_key(dpkg_status.compare_versions), reverse=True)
+
+    def priority(self, package_name: str, version: str) -> int:
+        """
+        Retourne la priorité apt d'une version d'un paquet.
+
+        Args:
+            package_name: Nom du paquet
+            version: Version
+
+        Returns:
+            int: Priorité (0 si la version n'est pas connue)
+        """
+        self.refresh()
+        installed = dpkg_status.get_index(self.status_path).version(package_name)
+        return self._priority(package_name, version, installed)
+
+    def candidate(self, package_name: str) -> Optional[str]:
+        """
+        Retourne la version qu'apt installerait.
+
+        Args:
+            package_name: Nom du paquet
+
+        Returns:
+            Optional[str]: Version candidate ou None
+        """
+        return self.candidates([package_name])[package_name]
+
+    def candidates(self, package_names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Retourne la version candidate de chaque paquet.
+
+        Args:
+            package_names: Noms des paquets
+
+        Returns:
+            Dict[str, Optional[str]]: {paquet: version candidate ou None}
+        """
+        self.refresh()
+        names = list(package_names)
+        installed = dpkg_status.get_index(self.status_path).versions(names)
+        return {name: self._candidate(name, installed[name]) for name in names}
+
+    def upgradable(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Liste les paquets installés dont la version candidate est plus récente.
+
+        Returns:
+            Dict[str, Tuple[str, str]]: {paquet: (version installée, version candidate)}
+        """
+        self.refresh()
+        status_index = dpkg_status.get_index(self.status_path)
+        names = [name for name in status_index.installed_packages() if name in self._versions]
+        result = {}
+        for name, installed in status_index.versions(names).items():
+            candidate = self._candidate(name, installed)
+            if installed and candidate and dpkg_status.compare_versions(candidate, installed) > 0:
+                result[name] = (installed, candidate)
+        return result
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._versions)
+
+# Index partagé par les utilitaires du processus, par dossier de listes
+_indexes: Dict[str, AptListsIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_index(lists_dir: str = APT_LISTS) -> AptListsIndex:
+    """
+    Retourne l'index partagé des listes apt.
+
+    Args:
+        lists_dir: Dossier des listes apt
+
+    Returns:
+        AptListsIndex: Index (vérifier available avant usage)
+    """
+    with _indexes_lock:
+        index = _indexes.get(lists_dir)
+        if index is None:
+            index = _indexes[lists_dir] = AptListsIndex(lists_dir)
+        return index
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profilage des commandes lancées par PluginsUtilsBase.run().
+
+Quand le profilage est activé (clé profile_commands de la configuration,
+option --profile de l'application, ou variable d'environnement
+PCUTILS_PROFILE_COMMANDS=1), chaque commande produit un message de niveau
+« profile » dans le flux de logs du plugin:
+
+    {"type": "command_profile",
+     "data": {"argv": [...], "sudo": true, "duration": 1.234,
+              "exit_code": 0, "output_bytes": 5120}}
+
+Les arguments sont nettoyés avant émission (mot de passe sudo, valeurs des
+options de type mot de passe, arguments trop longs). Le contrôleur agrège
+ces messages de toutes les machines dans le rapport des commandes les plus
+lentes (ui/execution_screen/command_report.py).
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Union
+
+# Type des messages émis dans le flux de logs
+PROFILE_TYPE = "command_profile"
+
+# Variable d'environnement activant le profilage hors de l'application
+PROFILE_ENV_VAR = "PCUTILS_PROFILE_COMMANDS"
+
+MASK = "********"
+
+# Longueur maximale d'un argument conservé dans le profil
+MAX_ARG_LENGTH = 200
+
+# Noms d'options ou de variables dont la valeur est masquée
+_SENSITIVE_NAME = re.compile(r'(pass(word|wd)?|mdp|secret|token|credential|api[_-]?key)', re.IGNORECASE)
+
+# Option et valeur dans le même argument (--password=x, PASSWORD=x)
+_SENSITIVE_ASSIGNMENT = re.compile(
+    r'((?:--?)?[\w.-]*(?:pass(?:word|wd)?|mdp|secret|token|credential|api[_-]?key)[\w.-]*=)(\S+)',
+    re.IGNORECASE
+)
+
+# Commandes acceptant le mot de passe collé à l'option -p (mysql -psecret)
+_ATTACHED_PASSWORD_COMMANDS = {'mysql', 'mysqldump', 'mysqladmin', 'mariadb', 'mariadb-dump'}
+
+# Activation définie par Main.start()
+_enabled = False
+
+def enable(flag: bool = True) -> None:
+    """
+    Active ou désactive le profilage des commandes du processus.
+
+    Args:
+        flag: True pour activer
+    """
+    global _enabled
+    _enabled = bool(flag)
+
+def is_enabled() -> bool:
+    """Indique si le profilage des commandes est actif."""
+    return _enabled or os.environ.get(PROFILE_ENV_VAR, '') not in ('', '0')
+
+def _mask_text(text: str, secrets: List[str]) -> str:
+    """Masque les secrets connus et les affectations sensibles d'une chaîne."""
+    for secret in secrets:
+        if secret:
+            text = text.replace(secret, MASK)
+    text = _SENSITIVE_ASSIGNMENT.sub(lambda m: m.group(1) + MASK, text)
+    if len(text) > MAX_ARG_LENGTH:
+        text = text[:MAX_ARG_LENGTH] + "…"
+    return text
+
+def sanitize_command(cmd: Union[str, List[str]], sudo_password: Optional[str] = None) -> Union[str, List[str]]:
+    """
+    Nettoie une commande avant de l'enregistrer dans le profil.
+
+    Args:
+        cmd: Commande (liste d'arguments, ou chaîne pour shell=True)
+        sudo_password: Mot de passe sudo à masquer (optionnel)
+
+    Returns:
+        Union[str, List[str]]: Commande nettoyée, du même type
+    """
+    secrets = [sudo_password] if sudo_password else []
+
+    if isinstance(cmd, str):
+        return _mask_text(cmd, secrets)
+
+    argv = [str(arg) for arg in cmd]
+    program = os.path.basename(argv[0]) if argv else ''
+    sanitized = []
+    mask_next = False
+    for arg in argv:
+        if mask_next:
+            sanitized.append(MASK)
+            mask_next = False
+            continue
+        if arg.startswith('-') and '=' not in arg and _SENSITIVE_NAME.search(arg):
+            # Option dont la valeur est l'argument suivant (--password x)
+            sanitized.append(arg)
+            mask_next = True
+            continue
+        if program in _ATTACHED_PASSWORD_COMMANDS and arg.startswith('-p') and len(arg) > 2:
+            sanitized.append('-p' + MASK)
+            continue
+        sanitized.append(_mask_text(arg, secrets))
+    return sanitized
+
+def build_profile(cmd: Union[str, List[str]], use_sudo: bool, duration: float,
+                  exit_code: Optional[int], stdout: str, stderr: str,
+                  sudo_password: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Construit l'enregistrement de profil d'une commande.
+
+    Args:
+        cmd: Commande exécutée (sans le préfixe sudo)
+        use_sudo: Si la commande a été lancée via sudo
+        duration: Durée en secondes
+        exit_code: Code de retour (None si la commande n'a pas abouti)
+        stdout: Sortie standard collectée
+        stderr: Sortie d'erreur collectée
+        sudo_password: Mot de passe sudo à masquer (optionnel)
+
+    Returns:
+        Dict[str, Any]: Données du profil
+    """
+    sanitized = sanitize_command(cmd, sudo_password)
+    data = {
+        'argv': sanitized if isinstance(sanitized, list) else None,
+        'command': sanitized if isinstance(sanitized, str) else None,
+        'sudo': bool(use_sudo),
+        'duration': round(max(0.0, duration), 4),
+        'exit_code': exit_code,
+        'output_bytes': len((stdout or '').encode('utf-8', errors='replace'))
+                        + len((stderr or '').encode('utf-8', errors='replace')),
+    }
+    return {key: value for key, value in data.items() if value is not None or key == 'exit_code'}
+
+def format_profile(data: Dict[str, Any]) -> str:
+    """
+    Formate un profil de commande pour l'affichage en mode texte.
+
+    Args:
+        data: Données du profil
+
+    Returns:
+        str: Ligne lisible
+    """
+    command = data.get('command') or ' '.join(data.get('argv') or [])
+    exit_code = data.get('exit_code')
+    status = f"code {exit_code}" if exit_code is not None else "interrompue"
+    sudo = " (sudo)" if data.get('sudo') else ""
+    return f"{data.get('duration', 0):.3f}s {status} {data.get('output_bytes', 0)} o{sudo}: {command}"
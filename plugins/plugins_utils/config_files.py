@@ -6,6 +6,7 @@ Utilise principalement les fonctionnalités natives de Python.
 """
 
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import parse_cache
 import os
 import re
 import json
@@ -15,8 +16,455 @@ import shutil
 import io
 import stat
 import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Union, Optional, List, Dict, Any, Tuple, Generator
+from typing import Union, Optional, List, Dict, Any, Tuple, Generator, Callable
+
+# Script de remplacement atomique exécuté avec sudo par _write_atomic_privileged.
+# $1: fichier cible, $2: propriétaire (uid:gid) d'un fichier créé; contenu sur stdin.
+# Les attributs (mode, propriétaire, ACL, attributs étendus) du fichier existant
+# sont copiés sur le fichier temporaire, synchronisé puis renommé sur la cible.
+_ATOMIC_WRITE_SCRIPT = r"""
+set -e
+target=$(readlink -f -- "$1")
+dir=$(dirname -- "$target")
+tmp=$(mktemp -- "$dir/.$(basename -- "$target").XXXXXX")
+trap 'rm -f -- "$tmp"' EXIT
+if [ -e "$target" ]; then
+    cp --attributes-only --preserve=mode,ownership -- "$target" "$tmp"
+    cp --attributes-only --preserve=xattr -- "$target" "$tmp" 2>/dev/null || true
+else
+    chmod 644 -- "$tmp"
+    chown -- "$2" "$tmp"
+fi
+cat > "$tmp"
+sync -- "$tmp" 2>/dev/null || true
+mv -f -- "$tmp" "$target"
+trap - EXIT
+sync -- "$dir" 2>/dev/null || true
+"""
+
+class ConfigFileEdit:
+    """
+    Session d'édition d'un fichier, ouverte par ConfigFileCommands.edit.
+
+    Le fichier est lu une seule fois; les modifications INI, ligne et bloc
+    s'appliquent en mémoire, puis la sortie du bloc `with` écrit le fichier
+    une seule fois (une sauvegarde, une écriture). Rien n'est écrit si le
+    contenu est inchangé, si une modification a échoué, si discard() a été
+    appelé ou si une exception sort du bloc.
+
+    Exemple:
+        with cfg.edit("/etc/lightdm/lightdm.conf") as f:
+            f.set_ini_value("Seat:*", "greeter-hide-users", "true")
+            f.comment_line(r"^autologin-user=")
+            f.ensure_line_exists("allow-guest=false")
+        if not f.committed:
+            ...
+
+    Attributs:
+        path: Chemin du fichier.
+        original: Contenu lu à l'ouverture (None si illisible).
+        content: Contenu courant, modifié par les méthodes de la session.
+        exists: True si le fichier existait à l'ouverture.
+        ok: False dès qu'une modification a échoué.
+        committed: True si la session s'est terminée sans erreur (écriture
+                   effectuée ou inutile).
+    """
+
+    def __init__(self, commands: 'ConfigFileCommands', path: Path, content: Optional[str],
+                 exists: bool, log_levels: Optional[Dict[str, str]] = None):
+        self._commands = commands
+        self._log_levels = log_levels
+        self.path = path
+        self.original = content
+        self.content = content
+        self.exists = exists
+        self.ok = content is not None
+        self.discarded = False
+        self.committed = False
+
+    @property
+    def changed(self) -> bool:
+        """Indique si le contenu diffère de celui lu à l'ouverture."""
+        return self.content != self.original
+
+    def discard(self) -> None:
+        """Abandonne les modifications: rien ne sera écrit."""
+        self.discarded = True
+
+    def _fail(self, message: str, exc_info: bool = False) -> bool:
+        """Journalise une erreur et marque la session en échec."""
+        self._commands.log_error(message, exc_info=exc_info, log_levels=self._log_levels)
+        self.ok = False
+        return False
+
+    def _debug(self, message: str) -> None:
+        self._commands.log_debug(message, log_levels=self._log_levels)
+
+    def _usable(self, require_existing: bool = False) -> bool:
+        """Vérifie que le contenu est disponible avant une modification."""
+        if self.content is None:
+            return self._fail(f"Impossible de lire le fichier {self.path}")
+        if require_existing and not self.exists and not self.content:
+            self._debug(f"Fichier introuvable: {self.path}")
+            self.ok = False
+            return False
+        return True
+
+    # --- Modifications INI ---
+
+    def set_ini_value(self, section: str, key: str, value: Optional[str], create_section: bool = True) -> bool:
+        """
+        Définit ou supprime une valeur INI.
+
+        Args:
+            section: Nom de la section
+            key: Nom de la clé
+            value: Nouvelle valeur ou None pour supprimer la clé
+            create_section: Si True, crée la section si elle n'existe pas
+
+        Returns:
+            bool: True si la modification réussit (ou était déjà en place)
+        """
+        if not self._usable():
+            return False
+
+        action = "Suppression de" if value is None else "Définition de"
+        self._debug(f"{action} la clé INI '{key}' dans la section '[{section}]' du fichier: {self.path}")
+        if value is not None:
+            self._debug(f"  Nouvelle valeur: '{value}'")
+
+        # Utiliser un ConfigParser pour préserver la structure
+        config = configparser.ConfigParser(interpolation=None)
+        current_content = self.content
+
+        # Prétraitement pour ajouter [DEFAULT] si nécessaire
+        original_needs_default = False
+        processed_content = current_content
+
+        if current_content:
+            needs_default_section = True
+            has_content = False
+
+            for line in current_content.splitlines():
+                line_strip = line.strip()
+                if not line_strip or line_strip.startswith('#') or line_strip.startswith(';'):
+                    continue
+
+                has_content = True
+                if line_strip.startswith('['):
+                    needs_default_section = False
+                    break
+
+            if has_content and needs_default_section:
+                processed_content = "[DEFAULT]\n" + current_content
+                original_needs_default = True
+
+        try:
+            if processed_content:
+                config.read_string(processed_content)
+
+            # Vérifier/Créer la section
+            target_section = section if section else 'DEFAULT'
+            if not config.has_section(target_section) and target_section != 'DEFAULT':
+                if create_section:
+                    self._debug(f"Création de la section INI: [{target_section}]")
+                    config.add_section(target_section)
+                else:
+                    return self._fail(f"La section INI '[{target_section}]' n'existe pas et create_section=False.")
+
+            # Définir ou supprimer la valeur; ne pas réécrire le fichier si elle est déjà en place
+            if value is None:
+                if not config.has_option(target_section, key):
+                    self._debug(f"Clé '{key}' n'existait pas dans la section '[{target_section}]'.")
+                    return True
+                config.remove_option(target_section, key)
+                self._debug(f"Clé '{key}' supprimée de la section '[{target_section}]'.")
+            else:
+                if config.has_option(target_section, key) and config.get(target_section, key) == str(value):
+                    self._debug(f"Clé '{key}' déjà définie à '{value}' dans la section '[{target_section}]'.")
+                    return True
+                config.set(target_section, key, str(value))  # Assurer que la valeur est une chaîne
+                self._debug(f"Clé '{key}' définie à '{value}' dans la section '[{target_section}]'.")
+
+            # Écrire le contenu modifié dans une chaîne
+            string_io = io.StringIO()
+            config.write(string_io)
+            new_content = string_io.getvalue()
+
+            # Si l'original n'avait pas de section, et qu'on a écrit seulement dans [DEFAULT],
+            # on retire l'en-tête [DEFAULT] du contenu final.
+            if original_needs_default and not config.sections():
+                lines = new_content.splitlines()
+                if lines and lines[0].strip() == '[DEFAULT]':
+                    new_content = "\n".join(lines[1:])
+                    self._debug("En-tête [DEFAULT] retiré avant l'écriture car fichier original sans section.")
+
+            self.content = new_content
+            return True
+
+        except Exception as e:
+            return self._fail(f"Erreur lors de la modification de la configuration INI: {e}", exc_info=True)
+
+    # --- Modifications ligne par ligne ---
+
+    def replace_line(self, pattern: str, new_line: str, replace_all: bool = False) -> bool:
+        """
+        Remplace la première ou toutes les lignes correspondant à un motif regex.
+
+        Args:
+            pattern: Motif regex à rechercher
+            new_line: Nouvelle ligne à utiliser en remplacement
+            replace_all: Si True, remplace toutes les occurrences, sinon uniquement la première
+
+        Returns:
+            bool: True si le remplacement réussit (y compris sans ligne correspondante)
+        """
+        self._debug(f"Remplacement des lignes correspondant à '{pattern}' dans {self.path}")
+        if not self._usable(require_existing=True):
+            return False
+
+        new_lines = []
+        modified = False
+        replaced_count = 0
+
+        try:
+            regex = re.compile(pattern)
+            # S'assurer que la nouvelle ligne a une fin de ligne
+            new_line_with_eol = new_line.rstrip('\n') + '\n'
+
+            for line in self.content.splitlines(keepends=True):
+                # Utiliser search pour trouver le pattern n'importe où dans la ligne
+                if regex.search(line) and (replace_all or replaced_count == 0):
+                    new_lines.append(new_line_with_eol)
+                    modified = True
+                    replaced_count += 1
+                    self._debug(f"  Ligne remplacée: {line.strip()} -> {new_line.strip()}")
+                else:
+                    new_lines.append(line)  # Garder la ligne originale avec sa fin de ligne
+
+            if not modified:
+                self._debug("Aucune ligne correspondante trouvée pour remplacement.")
+                return True  # Pas d'erreur si rien à remplacer
+
+            self.content = "".join(new_lines)
+            return True
+
+        except re.error as e:
+            return self._fail(f"Erreur de regex dans le pattern '{pattern}': {e}")
+
+    def comment_line(self, pattern: str, comment_char: str = '#') -> bool:
+        """
+        Commente les lignes correspondant à un motif regex.
+
+        Args:
+            pattern: Motif regex à rechercher
+            comment_char: Caractère de commentaire à utiliser
+
+        Returns:
+            bool: True si le commentage réussit (y compris sans ligne à commenter)
+        """
+        self._debug(f"Commentage des lignes correspondant à '{pattern}' dans {self.path}")
+        if not self._usable(require_existing=True):
+            return False
+
+        new_lines = []
+        modified = False
+
+        try:
+            regex = re.compile(pattern)
+            for line in self.content.splitlines(keepends=True):
+                line_strip = line.strip()
+                # Ne commenter que si elle correspond ET n'est pas déjà commentée (ou vide)
+                if line_strip and not line_strip.startswith(comment_char) and regex.search(line):
+                    # Préserver l'indentation originale
+                    indent = line[:len(line) - len(line.lstrip())]
+                    new_lines.append(f"{indent}{comment_char} {line_strip}\n")
+                    modified = True
+                    self._debug(f"  Ligne commentée: {line_strip}")
+                else:
+                    new_lines.append(line)  # Garder la ligne originale
+
+            if not modified:
+                self._debug("Aucune ligne à commenter trouvée.")
+                return True
+
+            self.content = "".join(new_lines)
+            return True
+
+        except re.error as e:
+            return self._fail(f"Erreur de regex dans le pattern '{pattern}': {e}")
+
+    def uncomment_line(self, pattern: str, comment_char: str = '#') -> bool:
+        """
+        Décommente les lignes correspondant à un motif regex.
+
+        Args:
+            pattern: Motif regex à rechercher
+            comment_char: Caractère de commentaire à supprimer
+
+        Returns:
+            bool: True si le décommentage réussit (y compris sans ligne à décommenter)
+        """
+        self._debug(f"Décommentage des lignes correspondant à '{pattern}' dans {self.path}")
+        if not self._usable(require_existing=True):
+            return False
+
+        new_lines = []
+        modified = False
+
+        try:
+            regex = re.compile(pattern)
+            # Regex pour trouver le commentaire au début (avec ou sans espace après)
+            comment_regex = re.compile(r"^(\s*)" + re.escape(comment_char) + r"\s*(.*)")
+
+            for line in self.content.splitlines(keepends=True):
+                match_comment = comment_regex.match(line)
+                # Vérifier si la ligne est commentée ET si le contenu décommenté correspond au pattern
+                if match_comment:
+                    indent, uncommented_content = match_comment.groups()
+                    if regex.search(uncommented_content):  # Vérifier le pattern sur le contenu décommenté
+                        new_lines.append(f"{indent}{uncommented_content}\n")  # Restaurer indentation
+                        modified = True
+                        self._debug(f"  Ligne décommentée: {line.strip()}")
+                    else:
+                        new_lines.append(line)  # Ne correspond pas au pattern, garder commenté
+                else:
+                    new_lines.append(line)  # Pas commenté, garder tel quel
+
+            if not modified:
+                self._debug("Aucune ligne à décommenter trouvée.")
+                return True
+
+            self.content = "".join(new_lines)
+            return True
+
+        except re.error as e:
+            return self._fail(f"Erreur de regex dans le pattern '{pattern}': {e}")
+
+    def append_line(self, line_to_append: str, ensure_newline: bool = True) -> bool:
+        """
+        Ajoute une ligne à la fin du fichier.
+
+        Args:
+            line_to_append: Ligne à ajouter
+            ensure_newline: Si True, s'assure que la ligne a un saut de ligne à la fin
+
+        Returns:
+            bool: True si l'ajout réussit
+        """
+        self._debug(f"Ajout de la ligne à la fin de {self.path}: {line_to_append[:50]}...")
+        if not self._usable():
+            return False
+
+        content_to_append = line_to_append
+        if ensure_newline and not content_to_append.endswith('\n'):
+            content_to_append += '\n'
+        self.content += content_to_append
+        return True
+
+    def ensure_line_exists(self, line_to_ensure: str, pattern_to_check: Optional[str] = None) -> bool:
+        """
+        S'assure qu'une ligne spécifique existe, l'ajoute sinon.
+
+        Args:
+            line_to_ensure: La ligne exacte qui doit exister (sera ajoutée si absente)
+            pattern_to_check: Regex pour vérifier l'existence. Si None, utilise line_to_ensure littéralement
+
+        Returns:
+            bool: True si la ligne existe ou a été ajoutée
+        """
+        self._debug(f"Vérification/Ajout de la ligne dans {self.path}: {line_to_ensure[:50]}...")
+        if not self._usable():
+            return False
+
+        try:
+            check_pattern = pattern_to_check if pattern_to_check else r'^' + re.escape(line_to_ensure.strip()) + r'\s*$'
+            if re.search(check_pattern, self.content, re.MULTILINE):
+                return True
+        except re.error as e:
+            return self._fail(f"Erreur de regex dans le pattern '{pattern_to_check}': {e}")
+
+        # Ajouter la ligne avec un saut de ligne avant si nécessaire
+        new_content = self.content
+        if new_content and not new_content.endswith('\n'):
+            new_content += '\n'
+        self.content = new_content + line_to_ensure.rstrip('\n') + '\n'
+        return True
+
+    # --- Modifications des fichiers à blocs ---
+
+    def update_block_config(self, key_path: str, value: Any) -> bool:
+        """
+        Met à jour une valeur d'un fichier de configuration à blocs.
+
+        Args:
+            key_path: Chemin de la clé à mettre à jour (format 'section/sous-section/clé')
+            value: Nouvelle valeur à définir
+
+        Returns:
+            bool: True si la mise à jour réussit
+        """
+        if not self._usable(require_existing=True):
+            return False
+
+        try:
+            config = self._commands._parse_block_config(self.content, log_levels=self._log_levels)
+        except Exception as e:
+            return self._fail(f"Erreur lors du parsing du fichier de configuration {self.path}: {e}", exc_info=True)
+
+        # Naviguer jusqu'au parent de la clé à mettre à jour
+        keys = key_path.split('/')
+        current = config
+        for key in keys[:-1]:
+            if key not in current:
+                # Créer les sections manquantes
+                current[key] = {}
+            elif not isinstance(current[key], dict):
+                # Convertir une valeur simple en dictionnaire si nécessaire
+                old_value = current[key]
+                current[key] = {"_value": old_value}
+
+            current = current[key]
+
+        if current.get(keys[-1]) == value:
+            self._debug(f"Valeur '{key_path}' déjà à jour dans {self.path}.")
+            return True
+        current[keys[-1]] = value
+
+        try:
+            self.content = self._commands._format_block_config(config)
+            return True
+        except Exception as e:
+            return self._fail(f"Erreur lors de l'écriture du fichier de configuration {self.path}: {e}", exc_info=True)
+
+    # --- Validation ---
+
+    def _commit(self, backup: bool = True) -> bool:
+        """
+        Écrit le fichier si le contenu a changé.
+
+        Args:
+            backup: Si True, crée une sauvegarde du fichier original
+
+        Returns:
+            bool: True si le fichier est à jour
+        """
+        if self.discarded:
+            self._debug(f"Modifications de {self.path} abandonnées.")
+            self.committed = False
+        elif not self.ok:
+            self._commands.log_warning(f"Modifications de {self.path} non écrites suite à une erreur.",
+                                       log_levels=self._log_levels)
+            self.committed = False
+        elif not self.changed:
+            self._debug(f"Contenu de {self.path} inchangé, écriture ignorée.")
+            self.committed = True
+        else:
+            self.committed = self._commands._write_file_content(self.path, self.content, backup=backup,
+                                                                log_levels=self._log_levels)
+        return self.committed
 
 class ConfigFileCommands(PluginsUtilsBase):
     """
@@ -92,6 +540,40 @@ class ConfigFileCommands(PluginsUtilsBase):
 
         return content
 
+    def _read_parsed(self, path: Union[str, Path], kind: str, parser: Callable[[str], Any],
+                     log_levels: Optional[Dict[str, str]] = None) -> Any:
+        """
+        Lit et analyse un fichier en passant par le cache partagé (parse_cache).
+
+        L'analyse est réutilisée tant que le fichier garde la même date de
+        modification, taille et inode.
+
+        Args:
+            path: Chemin du fichier
+            kind: Format de l'analyse, qui distingue les entrées du cache ('ini', 'json'...)
+            parser: Fonction recevant le contenu et retournant la structure (None en cas d'erreur)
+
+        Returns:
+            Any: Copie de la structure analysée, ou None en cas d'erreur
+        """
+        file_path = Path(path)
+        cache = parse_cache.get_cache()
+        # Signature relevée avant la lecture: une modification pendant la lecture invalide l'entrée
+        signature = parse_cache.file_signature(file_path)
+        found, value = cache.get(file_path, kind, signature)
+        if found:
+            self.log_debug(f"Utilisation de l'analyse en cache ({kind}) pour {file_path}", log_levels=log_levels)
+            return value
+
+        content = self._read_file_content(file_path, log_levels=log_levels)
+        if content is None:
+            return None
+
+        value = parser(content)
+        if value is not None:
+            cache.put(file_path, kind, signature, value)
+        return value
+
     def _get_file_stats(self, path: Union[str, Path], log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict[str, int]]:
         """
         Obtient les statistiques d'un fichier (uid, gid, mode), avec gestion sudo si nécessaire.
@@ -192,33 +674,131 @@ class ConfigFileCommands(PluginsUtilsBase):
             path: Chemin du fichier
             stats: Dictionnaire avec uid, gid, mode
 
-        Returns:
-            bool: True si l'opération réussit, False sinon
+        Returns:
+            bool: True si l'opération réussit, False sinon
+        """
+        file_path = Path(path)
+
+        # Essayer d'abord avec les droits standards
+        try:
+            if not self._sudo_mode:
+                file_path.chmod(stats['mode'])
+                os.chown(file_path, stats['uid'], stats['gid'])
+                return True
+        except (PermissionError, OSError) as e:
+            self.log_debug(f"Application des permissions standard échouée pour {file_path}: {e}", log_levels=log_levels)
+            self._sudo_mode = True
+
+        # Si on arrive ici, il faut utiliser sudo
+        success_chmod = self.run(['chmod', f"{stats['mode']:o}", str(file_path)],
+                                needs_sudo=True, check=False, no_output=True)[0]
+        success_chown = self.run(['chown', f"{stats['uid']}:{stats['gid']}", str(file_path)],
+                                needs_sudo=True, check=False, no_output=True)[0]
+
+        return success_chmod and success_chown
+
+    def _write_atomic(self, file_path: Path, data: bytes) -> None:
+        """
+        Remplace un fichier de façon atomique sans privilèges.
+
+        Le contenu est écrit dans un fichier temporaire du même dossier,
+        synchronisé sur disque, doté du mode, du propriétaire et des attributs
+        étendus (dont les ACL POSIX) du fichier d'origine, puis renommé sur la
+        cible: un lecteur voit l'ancien ou le nouveau contenu, jamais un
+        fichier partiel.
+
+        Args:
+            file_path: Chemin du fichier (un lien symbolique est suivi)
+            data: Contenu à écrire
+
+        Raises:
+            PermissionError: Dossier non modifiable ou propriétaire impossible à conserver
+            OSError: Autre erreur d'écriture
+        """
+        target = Path(os.path.realpath(file_path))
+        try:
+            original = os.stat(target)
+        except FileNotFoundError:
+            original = None
+
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+
+            if original is None:
+                os.fchmod(fd, 0o644)
+            else:
+                os.fchmod(fd, stat.S_IMODE(original.st_mode))
+                if (original.st_uid, original.st_gid) != (os.getuid(), os.getgid()):
+                    # Lève PermissionError si le propriétaire ne peut pas être conservé
+                    os.fchown(fd, original.st_uid, original.st_gid)
+                # Attributs étendus, dont system.posix_acl_access et security.selinux
+                try:
+                    names = os.listxattr(target)
+                except OSError:
+                    names = []
+                for name in names:
+                    try:
+                        os.setxattr(fd, name, os.getxattr(target, name))
+                    except OSError as e:
+                        self.log_debug(f"Attribut {name} non conservé pour {target}: {e}")
+            os.close(fd)
+            fd = -1
+            os.replace(tmp_name, target)
+        except BaseException:
+            if fd >= 0:
+                os.close(fd)
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+        # Rendre le renommage durable
+        try:
+            dir_fd = os.open(target.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+    def _write_atomic_privileged(self, file_path: Path, content: str, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
-        file_path = Path(path)
+        Remplace un fichier de façon atomique avec sudo, en un seul appel.
 
-        # Essayer d'abord avec les droits standards
-        try:
-            if not self._sudo_mode:
-                file_path.chmod(stats['mode'])
-                os.chown(file_path, stats['uid'], stats['gid'])
-                return True
-        except (PermissionError, OSError) as e:
-            self.log_debug(f"Application des permissions standard échouée pour {file_path}: {e}", log_levels=log_levels)
-            self._sudo_mode = True
+        Même principe que _write_atomic, exécuté par _ATOMIC_WRITE_SCRIPT:
+        le contenu passe par l'entrée standard, les attributs du fichier
+        d'origine sont copiés sur le fichier temporaire avant le renommage.
 
-        # Si on arrive ici, il faut utiliser sudo
-        success_chmod = self.run(['chmod', f"{stats['mode']:o}", str(file_path)],
-                                needs_sudo=True, check=False, no_output=True)[0]
-        success_chown = self.run(['chown', f"{stats['uid']}:{stats['gid']}", str(file_path)],
-                                needs_sudo=True, check=False, no_output=True)[0]
+        Args:
+            file_path: Chemin du fichier
+            content: Contenu à écrire
 
-        return success_chmod and success_chown
+        Returns:
+            bool: True si l'écriture réussit, False sinon
+        """
+        cmd = ['sh', '-c', _ATOMIC_WRITE_SCRIPT, 'pcutils-write',
+               str(file_path), f"{os.getuid()}:{os.getgid()}"]
+        success, _, stderr = self.run(cmd, input_data=content, check=False, needs_sudo=True,
+                                      no_output=True)
+        if not success:
+            self.log_error(f"Échec de l'écriture de {file_path} avec sudo. Stderr: {stderr}", log_levels=log_levels)
+        return success
 
     def _write_file_content(self, path: Union[str, Path], content: str, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
         Écrit du contenu dans un fichier, avec sauvegarde optionnelle et gestion sudo.
 
+        L'écriture est atomique (fichier temporaire dans le même dossier puis
+        renommage) et conserve mode, propriétaire, attributs étendus et ACL.
+        Si le dossier n'est pas modifiable mais le fichier l'est, le fichier
+        est réécrit sur place.
+
         Args:
             path: Chemin du fichier
             content: Contenu à écrire
@@ -233,51 +813,30 @@ class ConfigFileCommands(PluginsUtilsBase):
         # Vérifier si sudo est nécessaire
         self._sudo_mode = self._check_sudo_required(file_path)
 
-        # Obtenir les stats originales (pour restauration après écriture)
-        original_stats = None
-        if file_path.exists():
-            original_stats = self._get_file_stats(file_path)
-
         # Créer une sauvegarde si demandé
         if backup:
-            backup_file = self._backup_file(file_path)
+            self._backup_file(file_path, log_levels=log_levels)
 
-            # Si la sauvegarde réussit et qu'on n'avait pas les stats, les prendre de la sauvegarde
-            if backup_file and not original_stats:
-                original_stats = self._get_file_stats(backup_file)
-
-        # Utiliser un fichier temporaire pour l'écriture
-        tmp_file_path = None
         try:
-            fd, tmp_file = tempfile.mkstemp(suffix=".tmp", text=True)
-            os.close(fd)  # Fermer le descripteur immédiatement
-            tmp_file_path = Path(tmp_file)
-
-            # Écrire le contenu dans le fichier temporaire
-            tmp_file_path.write_text(content, encoding='utf-8')
-            self.log_debug(f"Contenu écrit dans le fichier temporaire: {tmp_file_path}", log_levels=log_levels)
+            if not self._sudo_mode:
+                data = content.encode('utf-8')
+                try:
+                    self._write_atomic(file_path, data)
+                except PermissionError as e:
+                    if file_path.exists() and os.access(file_path, os.W_OK):
+                        # Dossier protégé ou propriétaire différent: réécriture sur place (non atomique)
+                        self.log_debug(f"Écriture atomique impossible pour {file_path} ({e}), réécriture sur place.", log_levels=log_levels)
+                        with open(file_path, 'r+b') as f:
+                            f.write(data)
+                            f.truncate()
+                            f.flush()
+                            os.fsync(f.fileno())
+                    else:
+                        self.log_debug(f"Écriture atomique impossible pour {file_path} ({e}), passage par sudo.", log_levels=log_levels)
+                        self._sudo_mode = True
 
-            # Déplacer le fichier temporaire vers la destination finale
-            if self._sudo_mode:
-                # Utiliser une commande avec sudo
-                cmd_cp = ['cp', str(tmp_file_path), str(file_path)]
-                success_cp, _, stderr_cp = self.run(cmd_cp, check=False, needs_sudo=True)
-                if not success_cp:
-                    self.log_error(f"Échec de la copie vers {file_path}. Stderr: {stderr_cp}", log_levels=log_levels)
-                    return False
-            else:
-                # Utiliser les fonctions Python standard
-                shutil.copy2(tmp_file_path, file_path)
-
-            # Restaurer les permissions et propriétaires originaux
-            if original_stats:
-                success_perm = self._apply_file_permissions(file_path, original_stats)
-                if not success_perm:
-                    self.log_warning(f"Impossible de restaurer les permissions originales pour {file_path}", log_levels=log_levels)
-            else:
-                # Appliquer des permissions par défaut si aucune info originale
-                default_stats = {'uid': os.getuid(), 'gid': os.getgid(), 'mode': 0o644}
-                self._apply_file_permissions(file_path, default_stats)
+            if self._sudo_mode and not self._write_atomic_privileged(file_path, content, log_levels=log_levels):
+                return False
 
             self.log_info(f"Fichier {file_path} écrit/mis à jour avec succès.", log_levels=log_levels)
             return True
@@ -287,12 +846,35 @@ class ConfigFileCommands(PluginsUtilsBase):
             return False
 
         finally:
-            # Nettoyer le fichier temporaire
-            if tmp_file_path and tmp_file_path.exists():
-                try:
-                    tmp_file_path.unlink()
-                except Exception as e_unlink:
-                    self.log_warning(f"Impossible de supprimer le fichier temporaire {tmp_file_path}: {e_unlink}", log_levels=log_levels)
+            # Le fichier a pu changer même en cas d'échec: oublier ses analyses
+            parse_cache.get_cache().invalidate(file_path)
+
+    @contextmanager
+    def edit(self, path: Union[str, Path], backup: bool = True,
+             log_levels: Optional[Dict[str, str]] = None) -> Generator[ConfigFileEdit, None, None]:
+        """
+        Ouvre une session d'édition transactionnelle d'un fichier.
+
+        Le fichier est lu une fois à l'ouverture; les modifications de la
+        session (set_ini_value, replace_line, comment_line, uncomment_line,
+        append_line, ensure_line_exists, update_block_config) se font en
+        mémoire. À la sortie du bloc `with`, le fichier est sauvegardé et
+        écrit une seule fois, et seulement si son contenu a changé.
+
+        Args:
+            path: Chemin du fichier (il sera créé s'il n'existe pas)
+            backup: Si True, crée une sauvegarde du fichier original avant l'écriture
+
+        Yields:
+            ConfigFileEdit: Session d'édition (voir committed après le bloc)
+        """
+        file_path = Path(path)
+        exists = file_path.exists()
+        content = self._read_file_content(file_path, log_levels=log_levels) if exists else ""
+        session = ConfigFileEdit(self, file_path, content, exists, log_levels=log_levels)
+        # Une exception dans le bloc remonte ici: rien n'est écrit
+        yield session
+        session._commit(backup=backup)
 
     # --- Méthodes INI ---
 
@@ -360,12 +942,20 @@ class ConfigFileCommands(PluginsUtilsBase):
         """
         file_path = Path(path)
         self.log_debug(f"Lecture du fichier INI: {file_path}", log_levels=log_levels)
+        return self._read_parsed(file_path, 'ini',
+                                 lambda content: self._parse_ini_content(content, log_levels=log_levels),
+                                 log_levels=log_levels)
 
-        # Lire le contenu du fichier
-        content = self._read_file_content(file_path)
-        if content is None:
-            return None
+    def _parse_ini_content(self, content: str, log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Analyse le contenu d'un fichier INI (configparser, puis parsing manuel).
 
+        Args:
+            content: Contenu du fichier INI
+
+        Returns:
+            Optional[Dict[str, Dict[str, str]]]: Structure INI parsée ou None en cas d'erreur
+        """
         # 1. Essayer avec configparser (non strict)
         config = configparser.ConfigParser(interpolation=None, strict=False)
         config_dict = None
@@ -475,89 +1065,9 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         Returns:
             bool: True si la modification réussit, False sinon
         """
-        file_path = Path(path)
-        action = "Suppression de" if value is None else "Définition de"
-        self.log_debug(f"{action} la clé INI '{key}' dans la section '[{section}]' du fichier: {file_path}", log_levels=log_levels)
-        if value is not None:
-            self.log_debug(f"  Nouvelle valeur: '{value}'", log_levels=log_levels)
-
-        # Utiliser un ConfigParser pour préserver la structure et les commentaires
-        config = configparser.ConfigParser(interpolation=None)
-
-        # Lire le contenu existant
-        current_content = ""
-        if file_path.exists():
-            content_read = self._read_file_content(file_path)
-            if content_read:
-                current_content = content_read
-
-        # Prétraitement pour ajouter [DEFAULT] si nécessaire
-        original_needs_default = False
-        processed_content = current_content
-
-        if current_content:
-            needs_default_section = True
-            has_content = False
-
-            for line in current_content.splitlines():
-                line_strip = line.strip()
-                if not line_strip or line_strip.startswith('#') or line_strip.startswith(';'):
-                    continue
-
-                has_content = True
-                if line_strip.startswith('['):
-                    needs_default_section = False
-                    break
-
-            if has_content and needs_default_section:
-                processed_content = "[DEFAULT]\n" + current_content
-                original_needs_default = True
-
-        try:
-            # Lire le contenu existant
-            if processed_content:
-                config.read_string(processed_content)
-
-            # Vérifier/Créer la section
-            target_section = section if section else 'DEFAULT'
-            if not config.has_section(target_section) and target_section != 'DEFAULT':
-                if create_section:
-                    self.log_debug(f"Création de la section INI: [{target_section}]", log_levels=log_levels)
-                    config.add_section(target_section)
-                else:
-                    self.log_error(f"La section INI '[{target_section}]' n'existe pas et create_section=False.", log_levels=log_levels)
-                    return False
-
-            # Définir ou supprimer la valeur
-            if value is None:
-                if config.has_option(target_section, key):
-                    config.remove_option(target_section, key)
-                    self.log_debug(f"Clé '{key}' supprimée de la section '[{target_section}]'.", log_levels=log_levels)
-                else:
-                    self.log_debug(f"Clé '{key}' n'existait pas dans la section '[{target_section}]'.", log_levels=log_levels)
-            else:
-                config.set(target_section, key, str(value))  # Assurer que la valeur est une chaîne
-                self.log_debug(f"Clé '{key}' définie à '{value}' dans la section '[{target_section}]'.", log_levels=log_levels)
-
-            # Écrire le contenu modifié dans une chaîne
-            string_io = io.StringIO()
-            config.write(string_io)
-            new_content = string_io.getvalue()
-
-            # Si l'original n'avait pas de section, et qu'on a écrit seulement dans [DEFAULT],
-            # on retire l'en-tête [DEFAULT] du contenu final.
-            if original_needs_default and not config.sections():
-                lines = new_content.splitlines()
-                if lines and lines[0].strip() == '[DEFAULT]':
-                    new_content = "\n".join(lines[1:])
-                    self.log_debug("En-tête [DEFAULT] retiré avant l'écriture car fichier original sans section.", log_levels=log_levels)
-
-            # Écrire le fichier final
-            return self._write_file_content(file_path, new_content, backup=backup)
-
-        except Exception as e:
-            self.log_error(f"Erreur lors de la modification de la configuration INI: {e}", exc_info=True, log_levels=log_levels)
-            return False
+        with self.edit(path, backup=backup, log_levels=log_levels) as session:
+            session.set_ini_value(section, key, value, create_section=create_section)
+        return session.committed
 
     # --- Méthodes JSON ---
 
@@ -573,12 +1083,21 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         """
         file_path = Path(path)
         self.log_debug(f"Lecture du fichier JSON: {file_path}", log_levels=log_levels)
+        return self._read_parsed(file_path, 'json',
+                                 lambda content: self._parse_json_content(file_path, content, log_levels=log_levels),
+                                 log_levels=log_levels)
 
-        # Lire le contenu du fichier
-        content = self._read_file_content(file_path)
-        if content is None:
-            return None
+    def _parse_json_content(self, file_path: Path, content: str, log_levels: Optional[Dict[str, str]] = None) -> Optional[Any]:
+        """
+        Analyse le contenu d'un fichier JSON.
+
+        Args:
+            file_path: Chemin du fichier (pour les messages)
+            content: Contenu du fichier JSON
 
+        Returns:
+            Optional[Any]: Contenu JSON parsé ou None en cas d'erreur
+        """
         try:
             data = json.loads(content)
             self.log_debug("Contenu JSON lu avec succès.", log_levels=log_levels)
@@ -629,13 +1148,9 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         file_path = Path(path)
         self.log_debug(f"Lecture des lignes du fichier: {file_path}", log_levels=log_levels)
 
-        # Lire le contenu du fichier
-        content = self._read_file_content(file_path)
-        if content is None:
-            return None
-
         # Retourner les lignes en gardant les fins de ligne originales
-        return content.splitlines(keepends=True)
+        return self._read_parsed(file_path, 'lines', lambda content: content.splitlines(keepends=True),
+                                 log_levels=log_levels)
 
     def get_line_containing(self, path: Union[str, Path], pattern: str, first_match_only: bool = True, log_levels: Optional[Dict[str, str]] = None) -> Union[Optional[str], List[str], None]:
         """
@@ -686,46 +1201,9 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         Returns:
             bool: True si le remplacement réussit, False sinon
         """
-        file_path = Path(path)
-        self.log_debug(f"Remplacement des lignes correspondant à '{pattern}' dans {file_path}", log_levels=log_levels)
-
-        # Lire le contenu du fichier
-        lines = self.read_file_lines(file_path)
-        if lines is None:
-            return False
-
-        new_lines = []
-        modified = False
-        replaced_count = 0
-
-        try:
-            regex = re.compile(pattern)
-            # S'assurer que la nouvelle ligne a une fin de ligne
-            new_line_with_eol = new_line.rstrip('\n') + '\n'
-
-            for line in lines:
-                # Utiliser search pour trouver le pattern n'importe où dans la ligne
-                if regex.search(line) and (replace_all or replaced_count == 0):
-                    new_lines.append(new_line_with_eol)
-                    modified = True
-                    replaced_count += 1
-                    self.log_debug(f"  Ligne remplacée: {line.strip()} -> {new_line.strip()}", log_levels=log_levels)
-                else:
-                    new_lines.append(line)  # Garder la ligne originale avec sa fin de ligne
-
-            if not modified:
-                self.log_debug("Aucune ligne correspondante trouvée pour remplacement.", log_levels=log_levels)
-                return True  # Pas d'erreur si rien à remplacer
-
-            # Écrire le contenu modifié
-            return self._write_file_content(file_path, "".join(new_lines), backup=backup)
-
-        except re.error as e:
-            self.log_error(f"Erreur de regex dans le pattern '{pattern}': {e}", log_levels=log_levels)
-            return False
-        except Exception as e:
-            self.log_error(f"Erreur lors du remplacement dans {file_path}: {e}", exc_info=True, log_levels=log_levels)
-            return False
+        with self.edit(path, backup=backup, log_levels=log_levels) as session:
+            session.replace_line(pattern, new_line, replace_all=replace_all)
+        return session.committed
 
     def comment_line(self, path: Union[str, Path], pattern: str, comment_char: str = '#', backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -740,44 +1218,9 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         Returns:
             bool: True si le commentage réussit, False sinon
         """
-        file_path = Path(path)
-        self.log_debug(f"Commentage des lignes correspondant à '{pattern}' dans {file_path}", log_levels=log_levels)
-
-        # Lire le contenu du fichier
-        lines = self.read_file_lines(file_path)
-        if lines is None:
-            return False
-
-        new_lines = []
-        modified = False
-
-        try:
-            regex = re.compile(pattern)
-            for line in lines:
-                line_strip = line.strip()
-                # Ne commenter que si elle correspond ET n'est pas déjà commentée (ou vide)
-                if line_strip and not line_strip.startswith(comment_char) and regex.search(line):
-                    # Préserver l'indentation originale
-                    indent = line[:len(line) - len(line.lstrip())]
-                    new_lines.append(f"{indent}{comment_char} {line_strip}\n")
-                    modified = True
-                    self.log_debug(f"  Ligne commentée: {line_strip}", log_levels=log_levels)
-                else:
-                    new_lines.append(line)  # Garder la ligne originale
-
-            if not modified:
-                self.log_debug("Aucune ligne à commenter trouvée.", log_levels=log_levels)
-                return True
-
-            # Écrire le contenu modifié
-            return self._write_file_content(file_path, "".join(new_lines), backup=backup)
-
-        except re.error as e:
-            self.log_error(f"Erreur de regex dans le pattern '{pattern}': {e}", log_levels=log_levels)
-            return False
-        except Exception as e:
-            self.log_error(f"Erreur lors du commentage dans {file_path}: {e}", exc_info=True, log_levels=log_levels)
-            return False
+        with self.edit(path, backup=backup, log_levels=log_levels) as session:
+            session.comment_line(pattern, comment_char=comment_char)
+        return session.committed
 
     def uncomment_line(self, path: Union[str, Path], pattern: str, comment_char: str = '#', backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -792,49 +1235,9 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         Returns:
             bool: True si le décommentage réussit, False sinon
         """
-        file_path = Path(path)
-        self.log_debug(f"Décommentage des lignes correspondant à '{pattern}' dans {file_path}", log_levels=log_levels)
-
-        # Lire le contenu du fichier
-        lines = self.read_file_lines(file_path)
-        if lines is None:
-            return False
-
-        new_lines = []
-        modified = False
-
-        try:
-            regex = re.compile(pattern)
-            # Regex pour trouver le commentaire au début (avec ou sans espace après)
-            comment_regex = re.compile(r"^(\s*)" + re.escape(comment_char) + r"\s*(.*)")
-
-            for line in lines:
-                match_comment = comment_regex.match(line)
-                # Vérifier si la ligne est commentée ET si le contenu décommenté correspond au pattern
-                if match_comment:
-                    indent, uncommented_content = match_comment.groups()
-                    if regex.search(uncommented_content):  # Vérifier le pattern sur le contenu décommenté
-                        new_lines.append(f"{indent}{uncommented_content}\n")  # Restaurer indentation
-                        modified = True
-                        self.log_debug(f"  Ligne décommentée: {line.strip()}", log_levels=log_levels)
-                    else:
-                        new_lines.append(line)  # Ne correspond pas au pattern, garder commenté
-                else:
-                    new_lines.append(line)  # Pas commenté, garder tel quel
-
-            if not modified:
-                self.log_debug("Aucune ligne à décommenter trouvée.", log_levels=log_levels)
-                return True
-
-            # Écrire le contenu modifié
-            return self._write_file_content(file_path, "".join(new_lines), backup=backup)
-
-        except re.error as e:
-            self.log_error(f"Erreur de regex dans le pattern '{pattern}': {e}", log_levels=log_levels)
-            return False
-        except Exception as e:
-            self.log_error(f"Erreur lors du décommentage dans {file_path}: {e}", exc_info=True, log_levels=log_levels)
-            return False
+        with self.edit(path, backup=backup, log_levels=log_levels) as session:
+            session.uncomment_line(pattern, comment_char=comment_char)
+        return session.committed
 
     def append_line(self, path: Union[str, Path], line_to_append: str, ensure_newline: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -876,6 +1279,7 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         try:
             with file_path.open('a', encoding='utf-8') as f:
                 f.write(content_to_append)
+            parse_cache.get_cache().invalidate(file_path)
             self.log_info(f"Ligne ajoutée avec succès à {file_path}.", log_levels=log_levels)
             return True
         except Exception as e:
@@ -895,37 +1299,9 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         Returns:
             bool: True si la ligne existe ou a été ajoutée avec succès
         """
-        file_path = Path(path)
-        self.log_debug(f"Vérification/Ajout de la ligne dans {file_path}: {line_to_ensure[:50]}...", log_levels=log_levels)
-
-        # Lire le contenu actuel
-        current_content = ""
-        if file_path.exists():
-            content_read = self._read_file_content(file_path)
-            if content_read is not None:
-                current_content = content_read
-
-        # Vérifier l'existence
-        line_exists = False
-        try:
-            check_pattern = pattern_to_check if pattern_to_check else r'^' + re.escape(line_to_ensure.strip()) + r'\s*$'
-            if re.search(check_pattern, current_content, re.MULTILINE):
-                line_exists = True
-        except re.error as e:
-            self.log_error(f"Erreur de regex dans le pattern '{pattern_to_check}': {e}", log_levels=log_levels)
-            return False
-
-        # Ajouter si nécessaire
-        if line_exists:
-            return True
-        else:
-            # Ajouter la ligne avec un saut de ligne avant si nécessaire
-            new_content = current_content
-            if current_content and not current_content.endswith('\n'):
-                new_content += '\n'
-            new_content += line_to_ensure.rstrip('\n') + '\n'
-
-            return self._write_file_content(file_path, new_content, backup=backup)
+        with self.edit(path, backup=backup, log_levels=log_levels) as session:
+            session.ensure_line_exists(line_to_ensure, pattern_to_check=pattern_to_check)
+        return session.committed
 
     # --- Méthodes pour les fichiers de configuration à blocs (type Dovecot) ---
     def _parse_block_config(self, content: str, log_levels: Optional[Dict[str, str]] = None) -> dict:
@@ -1196,19 +1572,14 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         file_path = Path(path)
         self.log_debug(f"Lecture du fichier de configuration à blocs: {file_path}", log_levels=log_levels)
 
-        # Lire le contenu du fichier
-        content = self._read_file_content(file_path)
-        if content is None:
-            return None
+        def parse(content: str) -> Optional[Dict]:
+            try:
+                return self._parse_block_config(content, log_levels=log_levels)
+            except Exception as e:
+                self.log_error(f"Erreur lors du parsing du fichier de configuration {file_path}: {e}", exc_info=True, log_levels=log_levels)
+                return None
 
-        try:
-            # Parser le contenu
-            config = self._parse_block_config(content)
-            print(config)
-            return config
-        except Exception as e:
-            self.log_error(f"Erreur lors du parsing du fichier de configuration {file_path}: {e}", exc_info=True, log_levels=log_levels)
-            return None
+        return self._read_parsed(file_path, 'blocks', parse, log_levels=log_levels)
 
     def write_block_config_file(self, path: Union[str, Path], config: dict, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -1248,30 +1619,7 @@ create_section: bool = True, backup: bool = True, log_levels: Optional[Dict[str,
         Returns:
             bool: True si la mise à jour réussit, False sinon
         """
-        config = self.read_block_config_file(path)
-        if config is None:
-            self.log_error(f"Impossible de lire le fichier de configuration pour mise à jour: {path}", log_levels=log_levels)
-            return False
-
-        # Parcourir le chemin pour trouver et mettre à jour la valeur
-        keys = key_path.split('/')
-        current = config
-
-        # Naviguer jusqu'au parent de la clé à mettre à jour
-        for i, key in enumerate(keys[:-1]):
-            if key not in current:
-                # Créer les sections manquantes
-                current[key] = {}
-            elif not isinstance(current[key], dict):
-                # Convertir une valeur simple en dictionnaire si nécessaire
-                old_value = current[key]
-                current[key] = {"_value": old_value}
-
-            current = current[key]
-
-        # Mettre à jour la valeur
-        last_key = keys[-1]
-        current[last_key] = value
+        with self.edit(path, backup=backup, log_levels=log_levels) as session:
+            session.update_block_config(key_path, value)
+        return session.committed
 
-        # Écrire la configuration mise à jour
-        return self.write_block_config_file(path, config, backup=backup)
\ No newline at end of file
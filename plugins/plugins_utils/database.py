@@ -6,6 +6,7 @@ Utilise les outils clients en ligne de commande (mysql, psql, mysqldump, pg_dump
 """
 
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import host_facts
 
 import os
 import shlex # Pour échapper les arguments
@@ -34,9 +35,13 @@ class DatabaseCommands(PluginsUtilsBase):
         missing = []
         self._cmd_paths = {}
         for cmd in cmds:
-            success, stdout, _ = self.run(['which', cmd], check=False, no_output=True, error_as_warning=True)
-            if success and stdout.strip():
-                 self._cmd_paths[cmd] = stdout.strip()
+            # Commande relevée dans le profil de la machine, sinon which
+            path = host_facts.command_path(cmd)
+            if path is None:
+                success, stdout, _ = self.run(['which', cmd], check=False, no_output=True, error_as_warning=True)
+                path = stdout.strip() if success else ''
+            if path:
+                 self._cmd_paths[cmd] = path
             else:
                 # Ne logguer que si l'outil correspondant est probablement utilisé
                 if cmd in ['mysql', 'mysqldump'] or cmd in ['psql', 'pg_dump', 'createdb', 'dropdb', 'createuser', 'dropuser']:
@@ -48,6 +53,11 @@ class DatabaseCommands(PluginsUtilsBase):
 
     def detect_db_type(self, log_levels: Optional[Dict[str, str]] = None) -> str:
         """Tente de détecter le type de SGBD principal installé."""
+        if host_facts.has_fact('db_type'):
+            db_type = host_facts.get_fact('db_type')
+            self.log_info(f"SGBD détecté (profil de la machine): {db_type}")
+            return db_type
+
         if self._cmd_paths.get('mysql'):
             # Vérifier si le service est actif
             try:
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index en mémoire de la base debconf (/var/cache/debconf).
+
+DpkgCommands lançait `which debconf-show`, `debconf-show`, `grep -A5`
+sur config.dat ou debconf-communicate pour chaque paquet et chaque
+question. Ce module lit une fois par processus les questions (config.dat),
+leur type (templates.dat) et, si le fichier est lisible, les mots de passe
+(passwords.dat, réservé à root), puis répond à toutes les questions et
+compare des pré-réponses souhaitées à la base sans sous-processus.
+
+L'index est reconstruit dès qu'un des fichiers change (taille, date de
+modification ou inode), par exemple après debconf-set-selections.
+
+Ce module n'importe rien de plugins_utils.
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DEBCONF_DIR = '/var/cache/debconf'
+
+# Champs de config.dat et templates.dat conservés dans l'index
+_QUESTION_FIELDS = {'Name', 'Template', 'Value', 'Owners', 'Flags'}
+_TEMPLATE_FIELDS = {'Name', 'Type', 'Default'}
+
+class Question:
+    """
+    Question de la base debconf.
+    """
+
+    __slots__ = ('name', 'template', 'value', 'stored_value', 'owners', 'flags', 'type')
+
+    def __init__(self, name: str, template: str, value: Optional[str],
+                 owners: List[str], flags: Set[str]):
+        """
+        Initialise la question.
+
+        Args:
+            name: Nom complet ('tzdata/Areas')
+            template: Nom du modèle (souvent identique au nom)
+            value: Valeur actuelle (à défaut, celle par défaut du modèle), None si aucune
+            owners: Paquets propriétaires
+            flags: Drapeaux ('seen'...)
+        """
+        self.name = name
+        self.template = template
+        self.value = value
+        # Valeur réellement enregistrée, sans repli sur la valeur par défaut
+        self.stored_value = value
+        self.owners = owners
+        self.flags = flags
+        self.type = 'string'
+
+    @property
+    def seen(self) -> bool:
+        """Indique si la question a déjà été posée (astérisque de debconf-show)."""
+        return 'seen' in self.flags
+
+    def __repr__(self) -> str:
+        return f"Question({self.name} {self.type}={self.value!r} owners={self.owners})"
+
+def _read_records(path: str, fields: Set[str]) -> Iterable[Dict[str, str]]:
+    """
+    Lit les enregistrements d'un fichier de la base debconf.
+
+    Seuls les champs demandés sont extraits; les lignes de continuation
+    (Variables, descriptions longues) sont ignorées.
+    """
+    record: Dict[str, str] = {}
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line == '\n':
+                if record:
+                    yield record
+                    record = {}
+                continue
+            if line[0] in ' \t':
+                continue
+            key, _, value = line.partition(':')
+            if key in fields:
+                record[key] = value.strip()
+    if record:
+        yield record
+
+class DebconfIndex:
+    """
+    Index des questions debconf, reconstruit quand la base change.
+    """
+
+    def __init__(self, directory: str = DEBCONF_DIR):
+        """
+        Initialise l'index (la base est lue à la première question).
+
+        Args:
+            directory: Dossier de la base debconf
+        """
+        self.config_path = os.path.join(directory, 'config.dat')
+        self.templates_path = os.path.join(directory, 'templates.dat')
+        self.passwords_path = os.path.join(directory, 'passwords.dat')
+        self._questions: Dict[str, Question] = {}
+        self._by_owner: Dict[str, List[Question]] = {}
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def _current_signature(self) -> Optional[Tuple]:
+        """Identité des fichiers de la base, None si config.dat est illisible."""
+        signature = []
+        for path in (self.config_path, self.templates_path, self.passwords_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except OSError:
+                if path == self.config_path:
+                    return None
+                signature.append(None)
+        if not os.access(self.config_path, os.R_OK):
+            return None
+        return tuple(signature)
+
+    def refresh(self) -> bool:
+        """
+        Relit la base si elle a changé depuis la dernière lecture.
+
+        Returns:
+            bool: True si la base est disponible
+        """
+        signature = self._current_signature()
+        if signature is None:
+            with self._lock:
+                self._questions, self._by_owner, self._signature = {}, {}, None
+            return False
+        if signature == self._signature:
+            return True
+
+        with self._lock:
+            if signature == self._signature:
+                return True
+            try:
+                questions = self._load()
+            except OSError:
+                self._questions, self._by_owner, self._signature = {}, {}, None
+                return False
+            by_owner: Dict[str, List[Question]] = {}
+            for question in questions.values():
+                for owner in question.owners:
+                    by_owner.setdefault(owner, []).append(question)
+            self._questions, self._by_owner, self._signature = questions, by_owner, signature
+        return True
+
+    def _load(self) -> Dict[str, Question]:
+        """Lit config.dat, puis les types et les mots de passe."""
+        questions: Dict[str, Question] = {}
+        for record in _read_records(self.config_path, _QUESTION_FIELDS):
+            name = record.get('Name')
+            if not name:
+                continue
+            questions[name] = Question(
+                name,
+                record.get('Template', name),
+                record.get('Value'),
+                [owner.strip() for owner in record.get('Owners', '').split(',') if owner.strip()],
+                {flag.strip() for flag in record.get('Flags', '').split(',') if flag.strip()},
+            )
+
+        templates: Dict[str, Dict[str, str]] = {}
+        try:
+            for record in _read_records(self.templates_path, _TEMPLATE_FIELDS):
+                if 'Name' in record:
+                    templates[record['Name']] = record
+        except OSError:
+            pass
+        for question in questions.values():
+            template = templates.get(question.template, {})
+            question.type = template.get('Type', 'string')
+            # Sans valeur enregistrée, debconf répond la valeur par défaut du modèle
+            if question.value is None:
+                question.value = template.get('Default')
+
+        # Valeurs des questions de type password (fichier lisible par root seulement)
+        try:
+            for record in _read_records(self.passwords_path, _QUESTION_FIELDS):
+                question = questions.get(record.get('Name', ''))
+                if question is not None and 'Value' in record:
+                    question.value = question.stored_value = record['Value']
+                if question is not None and record.get('Flags'):
+                    question.flags |= {flag.strip() for flag in record['Flags'].split(',') if flag.strip()}
+        except OSError:
+            pass
+        return questions
+
+    @property
+    def available(self) -> bool:
+        """Indique si la base debconf est lisible."""
+        return self.refresh()
+
+    def get(self, question_name: str) -> Optional[Question]:
+        """
+        Retourne une question.
+
+        Args:
+            question_name: Nom complet de la question
+
+        Returns:
+            Optional[Question]: Question, ou None si inconnue
+        """
+        self.refresh()
+        return self._questions.get(question_name)
+
+    def questions_for(self, package_name: str) -> List[Question]:
+        """
+        Liste les questions dont un paquet est propriétaire (comme debconf-show).
+
+        Args:
+            package_name: Nom du paquet
+
+        Returns:
+            List[Question]: Questions triées par nom
+        """
+        self.refresh()
+        return sorted(self._by_owner.get(package_name, []), key=lambda question: question.name)
+
+    def selections(self, package_name: str) -> Dict[Tuple[str, str], str]:
+        """
+        Retourne les sélections d'un paquet (comme debconf-get-selections).
+
+        Args:
+            package_name: Nom du paquet
+
+        Returns:
+            Dict[Tuple[str, str], str]: {(question, type): valeur}
+        """
+        return {(question.name, question.type): question.value or ''
+                for question in self.questions_for(package_name)}
+
+    def diff(self, desired: Dict[Tuple[str, str], Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[str, str, Optional[str]]]:
+        """
+        Compare des pré-réponses souhaitées à la base.
+
+        Args:
+            desired: {(paquet, question): (type, valeur)}, le format de
+                     DpkgCommands._debconf_selections
+
+        Seule la valeur enregistrée compte, pas celle par défaut du modèle: une
+        question jamais posée (drapeau seen absent) reçoit toujours sa
+        pré-réponse, que debconf-set-selections enregistre et marque comme vue.
+
+        Returns:
+            Dict: {(paquet, question): (type, valeur souhaitée, valeur actuelle ou None)}
+            pour les seules pré-réponses absentes, différentes ou non vues
+        """
+        self.refresh()
+        differences = {}
+        for (package, question_name), (q_type, value) in desired.items():
+            question = self._questions.get(question_name)
+            current = question.stored_value if question is not None else None
+            if current is None or current != value or not question.seen:
+                differences[(package, question_name)] = (q_type, value, current)
+        return differences
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._questions)
+
+# Index partagé par les utilitaires du processus, par dossier de base
+_indexes: Dict[str, DebconfIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_index(directory: str = DEBCONF_DIR) -> DebconfIndex:
+    """
+    Retourne l'index partagé de la base debconf.
+
+    Args:
+        directory: Dossier de la base debconf
+
+    Returns:
+        DebconfIndex: Index (vérifier available avant usage)
+    """
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = _indexes[directory] = DebconfIndex(directory)
+        return index
@@ -6,6 +6,7 @@ Vérifie la présence de commandes, paquets, modules Python, fichiers, etc.
 """
 
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import dpkg_status
 import os
 import importlib.util
 from pathlib import Path
@@ -81,11 +82,13 @@ class DependencyChecker(PluginsUtilsBase):
                  self.log_warning(f"Paquet '{package_name}' installé mais impossible de récupérer sa version.", log_levels=log_levels)
                  # Considérer comme échec si une version minimale est requise
                  return False
-            # Comparer les versions (nécessite une logique de comparaison robuste)
-            # Utiliser dpkg --compare-versions via self.run
-            cmd_compare = ['dpkg', '--compare-versions', current_version, 'ge', min_version] # ge = greater or equal
-            success_cmp, _, _ = self.run(cmd_compare, check=False, no_output=True, error_as_warning=True)
-            if not success_cmp:
+            # Comparaison Debian en Python (même algorithme que dpkg --compare-versions)
+            try:
+                satisfied = dpkg_status.version_satisfies(current_version, 'ge', min_version)
+            except ValueError:
+                cmd_compare = ['dpkg', '--compare-versions', current_version, 'ge', min_version] # ge = greater or equal
+                satisfied, _, _ = self.run(cmd_compare, check=False, no_output=True, error_as_warning=True)
+            if not satisfied:
                  self.log_warning(f"Paquet '{package_name}' installé (version {current_version}) mais ne satisfait pas la version minimale requise ({min_version}).", log_levels=log_levels)
                  return False
             self.log_info(f"Paquet '{package_name}' (version {current_version}) satisfait la version minimale ({min_version}).", log_levels=log_levels)
@@ -2,13 +2,20 @@
 """
 Module utilitaire pour manipuler les fichiers de configuration Dovecot.
 Hérite de ConfigFileCommands pour réutiliser les fonctionnalités de gestion de fichiers.
-Implémente un modèle cohérent "lire, modifier, écrire" pour les configurations Dovecot.
+Implémente un modèle cohérent "lire, modifier, écrire" pour les configurations Dovecot:
+les modifications passent par un modèle sans perte (dovecot_conf) qui ne
+réécrit que les lignes modifiées, et edit_config/edit_acl regroupent
+plusieurs modifications en une seule écriture.
 """
 
 from plugins_utils.config_files import ConfigFileCommands
+from plugins_utils import parse_cache
+from plugins_utils import dovecot_conf
+from plugins_utils.dovecot_conf import DovecotConfig, AclFile
+from contextlib import contextmanager
 from pathlib import Path
 import os
-from typing import Union, Optional, Dict, Any, List, Tuple
+from typing import Union, Optional, Dict, Any, List, Tuple, Generator
 import re
 
 
@@ -42,7 +49,6 @@ class DovecotCommands(ConfigFileCommands):
         """
         super().__init__(logger, target_ip)
         self.config_dir = Path(config_dir)
-        self.loaded_configs = {}  # Cache pour les configurations chargées
 
     def get_config_path(self, config_type: str, log_levels: Optional[Dict[str, str]] = None) -> Path:
         """
@@ -67,7 +73,7 @@ class DovecotCommands(ConfigFileCommands):
     def read_config(self, config_type: str, force_reload: bool = False, log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict]:
         """
         Lit un fichier de configuration Dovecot.
-        Utilise un cache pour éviter de relire les fichiers inutilement.
+        Utilise le cache partagé (parse_cache): le fichier n'est relu que s'il a changé.
 
         Args:
             config_type: Type de configuration ('main', 'mail', 'auth', etc.) ou chemin
@@ -78,64 +84,11 @@ class DovecotCommands(ConfigFileCommands):
         """
         config_path = self.get_config_path(config_type)
 
-        # Utiliser le cache sauf si force_reload est True
-        if not force_reload and str(config_path) in self.loaded_configs:
-            self.log_debug(f"Utilisation de la configuration en cache pour {config_path}", log_levels=log_levels)
-            return self.loaded_configs[str(config_path)]
+        if force_reload:
+            parse_cache.get_cache().invalidate(config_path)
 
         self.log_debug(f"Lecture de la configuration Dovecot: {config_path}", log_levels=log_levels)
-
-        # Utiliser _read_file_content de ConfigFileCommands
-        content = self._read_file_content(config_path)
-        if content is None:
-            return None
-
-        config = self.parse_dovecot_config(content)
-
-        if config is not None:
-            # Mettre en cache
-            self.loaded_configs[str(config_path)] = config
-
-        return config
-
-    def _strip_comment(self, line: str) -> str:
-        """
-        Supprime les commentaires d'une ligne, en préservant les # à l'intérieur des guillemets.
-
-        Args:
-            line: La ligne à traiter
-
-        Returns:
-            La ligne sans les commentaires
-        """
-        pattern = r'^((?:[^#"]*|"[^"]*")*?)(?:#.*)?$'
-        match = re.match(pattern, line)
-        if match:
-            return match.group(1).strip()
-        return ""
-
-    def _parse_line(self, line: str) -> Tuple[str, str]:
-        """
-        Parse une ligne d'assignation (key = value).
-
-        Args:
-            line: La ligne à parser
-
-        Returns:
-            Tuple contenant (clé, valeur)
-        """
-        if '=' not in line:
-            return line.strip(), ""
-
-        parties = line.split('=', 1)
-        key = parties[0].strip()
-        value = parties[1].strip()
-
-        # Supprimer les points-virgules en fin de valeur
-        if value.endswith(';'):
-            value = value[:-1].strip()
-
-        return key, value
+        return self._read_parsed(config_path, 'dovecot', self.parse_dovecot_config, log_levels=log_levels)
 
     def parse_dovecot_config(self, content: Union[str, List[str]], log_levels: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """
@@ -149,194 +102,80 @@ class DovecotCommands(ConfigFileCommands):
         """
         self.log_debug("Parsing d'un fichier de configuration Dovecot", log_levels=log_levels)
 
-        # Convertir le contenu en liste de lignes si nécessaire
-        if isinstance(content, str):
-            content_lines = content.splitlines()
-        else:
-            content_lines = content
-
-        # Structure finale
-        config = {}
-
-        # Variables pour le suivi des blocs
-        block_stack = []  # Pile pour suivre les blocs imbriqués [(type, name), ...]
-        current_content = []  # Contenu du bloc courant
-        in_block = False
-
-        # Analyser ligne par ligne
-        for line in content_lines:
-            # Nettoyer la ligne
-            clean_line = self._strip_comment(line.strip())
-            if not clean_line:
-                continue
-
-            # Détecter le début d'un bloc
-            if '{' in clean_line and not in_block:
-                in_block = True
-
-                # Extraire le type et le nom du bloc
-                # Pour les lignes comme "namespace USER {" ou "plugin {"
-                block_header = clean_line.split('{')[0].strip()
-                parts = block_header.split(None, 1)
+        # Convertir le contenu en texte si nécessaire
+        if not isinstance(content, str):
+            content = '\n'.join(content)
 
-                if len(parts) >= 2:
-                    # C'est un bloc avec type et nom, comme "namespace USER"
-                    block_type, block_name = parts
-                else:
-                    # C'est un bloc sans nom spécifique, comme "plugin"
-                    block_type = parts[0]
-                    block_name = ""
-
-                # Empiler ce bloc
-                block_stack.append((block_type, block_name))
-                current_content = []
-
-                # Traiter tout ce qui suit l'accolade sur cette ligne
-                remainder = clean_line.split('{', 1)[1].strip()
-                if remainder and remainder != '}':
-                    current_content.append(remainder)
-
-                # Si le bloc se termine sur la même ligne
-                if '}' in remainder:
-                    in_block = False
-                    self._process_block_content(config, block_stack.pop(), current_content)
-
-            # Détecter la fin d'un bloc
-            elif '}' in clean_line and in_block:
-                # Ajouter le contenu jusqu'à l'accolade fermante
-                if '{' not in clean_line:  # Ignorer les nouvelles ouvertures sur la même ligne
-                    content_before_brace = clean_line.split('}')[0].strip()
-                    if content_before_brace:
-                        current_content.append(content_before_brace)
-
-                # Fermer ce bloc et le traiter
-                in_block = False
-                if block_stack:
-                    self._process_block_content(config, block_stack.pop(), current_content)
-
-                # Vérifier s'il y a du contenu après l'accolade fermante
-                remainder = clean_line.split('}', 1)[1].strip()
-                if remainder:
-                    if '{' in remainder:
-                        # Nouvelle ouverture de bloc
-                        self.log_warning(f"Nouvelle ouverture de bloc sur la même ligne: {remainder}", log_levels=log_levels)
-                    else:
-                        # Traiter comme une ligne normale
-                        key, value = self._parse_line(remainder)
-                        if key:
-                            config[key] = value
-
-            # Ligne à l'intérieur d'un bloc
-            elif in_block:
-                current_content.append(clean_line)
-
-            # Ligne normale hors bloc
-            else:
-                key, value = self._parse_line(clean_line)
-                if key:
-                    config[key] = value
+        return dovecot_conf.parse(content).to_dict()
 
-        # Vérifier si tous les blocs ont été fermés
-        if block_stack:
-            self.log_warning(f"Des blocs n'ont pas été fermés: {block_stack}", log_levels=log_levels)
-
-        return config
-
-    def _process_block_content(self, config: Dict[str, Any], block_info: Tuple[str, str], content: List[str]):
+    def read_document(self, config_type: str, force_reload: bool = False, log_levels: Optional[Dict[str, str]] = None) -> Optional[DovecotConfig]:
         """
-        Traite le contenu d'un bloc et l'ajoute à la configuration.
+        Lit un fichier de configuration Dovecot sous forme de document sans perte.
+        Utilise le cache partagé (parse_cache) comme read_config.
 
         Args:
-            config: Dictionnaire de configuration à mettre à jour
-            block_info: Tuple (type_bloc, nom_bloc)
-            content: Liste des lignes de contenu du bloc
+            config_type: Type de configuration ('main', 'mail', 'auth', etc.) ou chemin
+            force_reload: Si True, force la relecture même si déjà en cache
+
+        Returns:
+            Optional[DovecotConfig]: Document (copie modifiable) ou None en cas d'erreur
         """
-        block_type, block_name = block_info
-        block_config = {}
+        config_path = self.get_config_path(config_type)
 
-        # Parcourir le contenu du bloc
-        i = 0
-        while i < len(content):
-            line = content[i]
-            i += 1
+        if force_reload:
+            parse_cache.get_cache().invalidate(config_path)
 
-            # Ignorer les accolades isolées
-            if line == '{' or line == '}':
-                continue
+        return self._read_parsed(config_path, 'dovecot_conf', dovecot_conf.parse, log_levels=log_levels)
 
-            # Sous-bloc
-            if '{' in line:
-                # Extraire l'en-tête du sous-bloc
-                sub_header = line.split('{')[0].strip()
-                sub_parts = sub_header.split(None, 1)
+    @contextmanager
+    def edit_config(self, config_type: str = 'mail', backup: bool = True,
+                    log_levels: Optional[Dict[str, str]] = None) -> Generator[DovecotConfig, None, None]:
+        """
+        Ouvre une session d'édition d'un fichier de configuration Dovecot.
 
-                if len(sub_parts) >= 2:
-                    sub_type, sub_name = sub_parts
-                else:
-                    sub_type = sub_parts[0]
-                    sub_name = ""
-
-                # Collecter le contenu du sous-bloc
-                sub_content = []
-                brace_level = 1
-
-                # Ajouter le reste de la ligne d'ouverture
-                remainder = line.split('{', 1)[1].strip()
-                if remainder and remainder != '}':
-                    sub_content.append(remainder)
-
-                # Si le bloc ne se termine pas sur la même ligne
-                if '}' not in remainder:
-                    while i < len(content) and brace_level > 0:
-                        sub_line = content[i]
-                        i += 1
-
-                        if '{' in sub_line:
-                            brace_level += 1
-                        if '}' in sub_line:
-                            brace_level -= 1
-
-                        # Si c'est la dernière accolade, ne pas inclure ce qui suit
-                        if brace_level == 0 and '}' in sub_line:
-                            before_brace = sub_line.split('}')[0].strip()
-                            if before_brace:
-                                sub_content.append(before_brace)
-                        else:
-                            sub_content.append(sub_line)
+        Toutes les modifications faites sur le document dans le bloc `with`
+        (paramètres, blocs plugin, namespaces...) sont écrites en une seule
+        fois à la sortie, seulement si le contenu a changé; seules les lignes
+        modifiées diffèrent du fichier d'origine. Une exception dans le bloc
+        annule l'écriture.
 
-                # Traiter récursivement ce sous-bloc
-                sub_config = {}
-                self._process_block_content(sub_config, (sub_type, sub_name), sub_content)
+        Exemple:
+            with dovecot.edit_config('mail') as doc:
+                doc.set('mail_location', 'maildir:~/Maildir')
+                doc.block('plugin', create=True).set('acl', 'vfile:/etc/dovecot/dovecot-acl')
+                doc.add_block('namespace', 'PUBLIC_BT', {'type': 'public', 'prefix': 'Archives_BT/'})
+            if not doc.committed: ...
 
-                # Fusionner avec la configuration du bloc parent
-                block_config.update(sub_config)
+        Args:
+            config_type: Type de configuration ('main', 'mail', 'auth', etc.) ou chemin
+            backup: Si True, crée une sauvegarde du fichier original avant l'écriture
 
-            # Ligne normale d'assignation
-            else:
-                key, value = self._parse_line(line)
-                if key:
-                    block_config[key] = value
-
-        # Ajouter ce bloc à la configuration globale
-        if block_type:
-            # Créer la section si elle n'existe pas
-            if block_type not in config:
-                config[block_type] = {}
-
-            # Ajouter le bloc nommé à la section
-            if block_name:
-                config[block_type][block_name] = block_config
-            else:
-                # Si pas de nom spécifique, fusionner directement avec la section
-                config[block_type].update(block_config)
-        else:
-            # Si pas de type spécifique, fusionner avec la configuration globale
-            config.update(block_config)
+        Yields:
+            DovecotConfig: Document (voir committed après le bloc)
+        """
+        config_path = self.get_config_path(config_type)
+        self.log_debug(f"Édition de la configuration Dovecot: {config_path}", log_levels=log_levels)
+
+        with self.edit(config_path, backup=backup, log_levels=log_levels) as session:
+            if session.content is None:
+                self.log_error(f"Impossible de lire la configuration Dovecot {config_path}", log_levels=log_levels)
+            document = dovecot_conf.parse(session.content or "")
+            yield document
+            if session.content is not None:
+                session.content = document.render()
+
+        document.committed = session.committed
+        if session.committed and session.changed:
+            self.log_success(f"Configuration Dovecot {config_path} mise à jour avec succès", log_levels=log_levels)
 
     def write_config(self, config_type: str, config: Dict, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
         Écrit une structure de configuration dans un fichier.
 
+        Le fichier existant est aligné sur la structure (valeurs modifiées,
+        ajoutées ou supprimées) sans toucher aux commentaires ni aux lignes
+        inchangées.
+
         Args:
             config_type: Type de configuration ('main', 'mail', 'auth', etc.) ou chemin
             config: Structure de configuration à écrire
@@ -345,23 +184,12 @@ class DovecotCommands(ConfigFileCommands):
         Returns:
             bool: True si l'écriture réussit, False sinon
         """
-        config_path = self.get_config_path(config_type)
-        self.log_debug(f"Écriture de la configuration Dovecot: {config_path}", log_levels=log_levels)
-
-        # Générer la représentation texte de la configuration
-        config_content = self.generate_config_string(config)
+        with self.edit_config(config_type, backup=backup, log_levels=log_levels) as document:
+            document.apply(config, replace=True)
 
-        # Utiliser _write_file_content de ConfigFileCommands pour écrire le fichier
-        success = self._write_file_content(config_path, config_content, backup=backup)
-
-        if success:
-            # Mettre à jour le cache
-            self.loaded_configs[str(config_path)] = config
-            self.log_success(f"Configuration Dovecot {config_path} mise à jour avec succès", log_levels=log_levels)
-        else:
-            self.log_error(f"Échec de l'écriture de la configuration Dovecot {config_path}", log_levels=log_levels)
-
-        return success
+        if not document.committed:
+            self.log_error(f"Échec de l'écriture de la configuration Dovecot {self.get_config_path(config_type)}", log_levels=log_levels)
+        return document.committed
 
     def generate_config_string(self, config: Dict[str, Any], indent_level: int = 0, log_levels: Optional[Dict[str, str]] = None) -> str:
         """
@@ -491,14 +319,14 @@ class DovecotCommands(ConfigFileCommands):
         Args:
             config_type: Type de configuration spécifique à vider, ou None pour tout vider
         """
+        cache = parse_cache.get_cache()
         if config_type is None:
-            self.loaded_configs = {}
+            cache.invalidate()
             self.log_debug("Cache de configurations vidé", log_levels=log_levels)
         else:
-            config_path = str(self.get_config_path(config_type))
-            if config_path in self.loaded_configs:
-                del self.loaded_configs[config_path]
-                self.log_debug(f"Cache vidé pour {config_path}", log_levels=log_levels)
+            config_path = self.get_config_path(config_type)
+            cache.invalidate(config_path)
+            self.log_debug(f"Cache vidé pour {config_path}", log_levels=log_levels)
 
     def get_global_setting(self, setting_name: str, default: Any = None, log_levels: Optional[Dict[str, str]] = None) -> Any:
         """
@@ -529,16 +357,9 @@ class DovecotCommands(ConfigFileCommands):
         Returns:
             bool: True si la mise à jour réussit, False sinon
         """
-        config = self.read_config('main')
-        if config is None:
-            self.log_error("Impossible de lire la configuration principale", log_levels=log_levels)
-            return False
-
-        # Mettre à jour le paramètre
-        config[setting_name] = value
-
-        # Écrire la configuration mise à jour
-        return self.write_config('main', config, backup=backup)
+        with self.edit_config('main', backup=backup, log_levels=log_levels) as document:
+            document.set(setting_name, value)
+        return document.committed
 
     def get_mail_setting(self, setting_name: str, default: Any = None, log_levels: Optional[Dict[str, str]] = None) -> Any:
         """
@@ -569,16 +390,9 @@ class DovecotCommands(ConfigFileCommands):
         Returns:
             bool: True si la mise à jour réussit, False sinon
         """
-        config = self.read_config('mail')
-        if config is None:
-            self.log_error("Impossible de lire la configuration mail", log_levels=log_levels)
-            return False
-
-        # Mettre à jour le paramètre
-        config[setting_name] = value
-
-        # Écrire la configuration mise à jour
-        return self.write_config('mail', config, backup=backup)
+        with self.edit_config('mail', backup=backup, log_levels=log_levels) as document:
+            document.set(setting_name, value)
+        return document.committed
 
     def get_mail_plugins(self, log_levels: Optional[Dict[str, str]] = None) -> List[str]:
         """
@@ -677,20 +491,10 @@ class DovecotCommands(ConfigFileCommands):
         Returns:
             bool: True si la mise à jour réussit, False sinon
         """
-        config = self.read_config(plugin_type)
-        if config is None:
-            self.log_error(f"Impossible de lire la configuration du plugin {plugin_type}", log_levels=log_levels)
-            return False
-
-        # Créer la section 'plugin' si elle n'existe pas
-        if 'plugin' not in config:
-            config['plugin'] = {}
-
-        # Mettre à jour le paramètre
-        config['plugin'][setting_name] = value
-
-        # Écrire la configuration mise à jour
-        return self.write_config(plugin_type, config, backup=backup)
+        with self.edit_config(plugin_type, backup=backup, log_levels=log_levels) as document:
+            # Le bloc 'plugin' est créé s'il n'existe pas
+            document.block('plugin', create=True).set(setting_name, value)
+        return document.committed
 
     def get_namespace(self, namespace_name: str, config_type: str = 'mail', log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict]:
         """
@@ -725,24 +529,14 @@ class DovecotCommands(ConfigFileCommands):
         Returns:
             bool: True si l'ajout réussit, False sinon
         """
-        config = self.read_config(config_type)
-        if config is None:
-            self.log_error(f"Impossible de lire la configuration {config_type}", log_levels=log_levels)
-            return False
-
-        # Créer la section namespace si elle n'existe pas
-        if 'namespace' not in config:
-            config['namespace'] = {}
-
-        # Vérifier si le namespace existe déjà
-        if namespace_name in config['namespace']:
-            self.log_warning(f"Le namespace '{namespace_name}' existe déjà et sera écrasé", log_levels=log_levels)
-
-        # Ajouter le namespace
-        config['namespace'][namespace_name] = namespace_config
-
-        # Écrire la configuration mise à jour
-        return self.write_config(config_type, config, backup=backup)
+        with self.edit_config(config_type, backup=backup, log_levels=log_levels) as document:
+            namespace = document.block('namespace', namespace_name)
+            if namespace is None:
+                document.add_block('namespace', namespace_name, namespace_config)
+            else:
+                self.log_warning(f"Le namespace '{namespace_name}' existe déjà et sera écrasé", log_levels=log_levels)
+                namespace.apply(namespace_config, replace=True)
+        return document.committed
 
     def update_namespace(self, namespace_name: str, namespace_config: Dict, config_type: str = 'mail', backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -757,21 +551,13 @@ class DovecotCommands(ConfigFileCommands):
         Returns:
             bool: True si la mise à jour réussit, False sinon
         """
-        config = self.read_config(config_type)
-        if config is None:
-            self.log_error(f"Impossible de lire la configuration {config_type}", log_levels=log_levels)
-            return False
-
-        # Vérifier si le namespace existe
-        if 'namespace' not in config or namespace_name not in config['namespace']:
-            self.log_warning(f"Le namespace '{namespace_name}' n'existe pas", log_levels=log_levels)
-            return False
-
-        # Mettre à jour le namespace
-        config['namespace'][namespace_name] = namespace_config
-
-        # Écrire la configuration mise à jour
-        return self.write_config(config_type, config, backup=backup)
+        with self.edit_config(config_type, backup=backup, log_levels=log_levels) as document:
+            namespace = document.block('namespace', namespace_name)
+            if namespace is None:
+                self.log_warning(f"Le namespace '{namespace_name}' n'existe pas", log_levels=log_levels)
+                return False
+            namespace.apply(namespace_config, replace=True)
+        return document.committed
 
     def delete_namespace(self, namespace_name: str, config_type: str = 'mail', backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -785,25 +571,11 @@ class DovecotCommands(ConfigFileCommands):
         Returns:
             bool: True si la suppression réussit, False sinon
         """
-        config = self.read_config(config_type)
-        if config is None:
-            self.log_error(f"Impossible de lire la configuration {config_type}", log_levels=log_levels)
-            return False
-
-        # Vérifier si le namespace existe
-        if 'namespace' not in config or namespace_name not in config['namespace']:
-            self.log_warning(f"Le namespace '{namespace_name}' n'existe pas", log_levels=log_levels)
-            return False
-
-        # Supprimer le namespace
-        del config['namespace'][namespace_name]
-
-        # Si plus aucun namespace, supprimer la section namespace
-        if not config['namespace']:
-            del config['namespace']
-
-        # Écrire la configuration mise à jour
-        return self.write_config(config_type, config, backup=backup)
+        with self.edit_config(config_type, backup=backup, log_levels=log_levels) as document:
+            if not document.remove_block('namespace', namespace_name):
+                self.log_warning(f"Le namespace '{namespace_name}' n'existe pas", log_levels=log_levels)
+                return False
+        return document.committed
 
     def create_public_namespace(self, unite: str, location: Optional[str] = None, config_type: str = 'mail', backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -1038,6 +810,12 @@ backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
 
     # --- Méthodes pour la gestion des ACL ---
 
+    def _acl_path(self, acl_path: Optional[str] = None) -> Path:
+        """Chemin du fichier ACL (emplacement par défaut si None)."""
+        if acl_path is None:
+            return self.get_config_path('acl')
+        return Path(acl_path)
+
     def read_acl_file(self, acl_path: Optional[str] = None, log_levels: Optional[Dict[str, str]] = None) -> List[Tuple[str, str, str, str]]:
         """
         Lit un fichier d'ACL Dovecot et retourne les règles sous forme de liste.
@@ -1049,52 +827,77 @@ backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         Returns:
             List[Tuple[str, str, str, str]]: Liste de (mailbox, identifier, rights, comment)
         """
-        if acl_path is None:
-            acl_path = self.get_config_path('acl')
-        else:
-            acl_path = Path(acl_path)
+        acl_path = self._acl_path(acl_path)
 
         self.log_debug(f"Lecture du fichier ACL: {acl_path}", log_levels=log_levels)
 
-        # Lire le contenu du fichier
-        content = self._read_file_content(acl_path)
-        if content is None:
+        acl_entries = self._read_parsed(acl_path, 'dovecot_acl',
+                                        lambda content: self._parse_acl_content(content, log_levels=log_levels),
+                                        log_levels=log_levels)
+        if acl_entries is None:
             self.log_error(f"Impossible de lire le fichier ACL {acl_path}.", log_levels=log_levels)
             return []
+        return acl_entries
+
+    def _parse_acl_content(self, content: str, log_levels: Optional[Dict[str, str]] = None) -> List[Tuple[str, str, str, str]]:
+        """
+        Analyse le contenu d'un fichier d'ACL Dovecot.
 
+        Args:
+            content: Contenu du fichier ACL
+
+        Returns:
+            List[Tuple[str, str, str, str]]: Liste de (mailbox, identifier, rights, comment)
+        """
         acl_entries = []
 
         for line in content.splitlines():
-            line = line.strip()
+            entry = AclFile.parse_line(line)
+            if entry is not None:
+                acl_entries.append(entry)
+            elif line.strip() and not line.strip().startswith('#'):
+                self.log_warning(f"Format ACL invalide, ignoré: {line.strip()}", log_levels=log_levels)
 
-            # Ignorer les lignes vides et les commentaires complets
-            if not line or line.startswith('#'):
-                continue
+        return acl_entries
 
-            # Extraire le commentaire éventuel
-            comment = ""
-            if '#' in line:
-                line_parts = line.split('#', 1)
-                line = line_parts[0].strip()
-                comment = line_parts[1].strip()
-
-            # Extraire les parties de la règle
-            parts = line.split(maxsplit=2)
-            if len(parts) < 3:
-                self.log_warning(f"Format ACL invalide, ignoré: {line}", log_levels=log_levels)
-                continue
+    @contextmanager
+    def edit_acl(self, acl_path: Optional[str] = None, backup: bool = True,
+                 log_levels: Optional[Dict[str, str]] = None) -> Generator[AclFile, None, None]:
+        """
+        Ouvre une session d'édition du fichier d'ACL.
 
-            mailbox = parts[0]
-            identifier = parts[1]
-            rights = parts[2]
+        Les entrées ajoutées, modifiées ou supprimées dans le bloc `with`
+        sont écrites en une seule fois à la sortie, seulement si le contenu a
+        changé; commentaires et autres lignes sont conservés.
 
-            acl_entries.append((mailbox, identifier, rights, comment))
+        Exemple:
+            with dovecot.edit_acl() as acl:
+                for group in groups:
+                    acl.set('Archives_BT', f'group={group}', 'lrwts')
 
-        return acl_entries
+        Args:
+            acl_path: Chemin du fichier ACL ou None pour utiliser l'emplacement par défaut
+            backup: Si True, crée une sauvegarde du fichier original avant l'écriture
+
+        Yields:
+            AclFile: Fichier d'ACL (voir committed après le bloc)
+        """
+        acl_path = self._acl_path(acl_path)
+        self.log_debug(f"Édition du fichier ACL: {acl_path}", log_levels=log_levels)
+
+        with self.edit(acl_path, backup=backup, log_levels=log_levels) as session:
+            if session.content is None:
+                self.log_error(f"Impossible de lire le fichier ACL {acl_path}.", log_levels=log_levels)
+            acl_file = AclFile(session.content or "")
+            yield acl_file
+            if session.content is not None:
+                session.content = acl_file.render()
+
+        acl_file.committed = session.committed
 
     def write_acl_file(self, acl_entries: List[Tuple[str, str, str, str]], acl_path: Optional[str] = None, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
-        Écrit les règles ACL dans un fichier.
+        Écrit les règles ACL dans un fichier (remplace tout son contenu).
 
         Args:
             acl_entries: Liste de (mailbox, identifier, rights, comment)
@@ -1104,22 +907,12 @@ backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         Returns:
             bool: True si l'écriture réussit, False sinon
         """
-        if acl_path is None:
-            acl_path = self.get_config_path('acl')
-        else:
-            acl_path = Path(acl_path)
+        acl_path = self._acl_path(acl_path)
 
         self.log_debug(f"Écriture du fichier ACL: {acl_path}", log_levels=log_levels)
 
         # Formater le contenu
-        lines = []
-        for entry in acl_entries:
-            mailbox, identifier, rights, comment = entry
-            line = f"{mailbox} {identifier} {rights}"
-            if comment:
-                line += f" #{comment}"
-            lines.append(line)
-
+        lines = [AclFile.format_line(*entry) for entry in acl_entries]
         content = '\n'.join(lines) + '\n'
 
         # Écrire le fichier
@@ -1160,18 +953,11 @@ acl_path: Optional[str] = None, backup: bool = True, log_levels: Optional[Dict[s
         Returns:
             bool: True si l'ajout réussit, False sinon
         """
-        acl_entries = self.read_acl_file(acl_path)
-
-        # Vérifier si l'entrée existe déjà
-        for i, entry in enumerate(acl_entries):
-            if entry[0] == mailbox and entry[1] == identifier:
+        with self.edit_acl(acl_path, backup=backup, log_levels=log_levels) as acl_file:
+            if acl_file.get(mailbox, identifier) is not None:
                 self.log_warning(f"L'entrée ACL pour {mailbox} {identifier} existe déjà, mise à jour", log_levels=log_levels)
-                acl_entries[i] = (mailbox, identifier, rights, comment)
-                return self.write_acl_file(acl_entries, acl_path, backup)
-
-        # Ajouter la nouvelle entrée
-        acl_entries.append((mailbox, identifier, rights, comment))
-        return self.write_acl_file(acl_entries, acl_path, backup)
+            acl_file.set(mailbox, identifier, rights, comment)
+        return acl_file.committed
 
     def update_acl_entry(self, mailbox: str, identifier: str, rights: str, comment: Optional[str] = None,
 acl_path: Optional[str] = None, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
@@ -1189,23 +975,12 @@ acl_path: Optional[str] = None, backup: bool = True, log_levels: Optional[Dict[s
         Returns:
             bool: True si la mise à jour réussit, False sinon
         """
-        acl_entries = self.read_acl_file(acl_path)
-
-        # Rechercher l'entrée à mettre à jour
-        entry_found = False
-        for i, entry in enumerate(acl_entries):
-            if entry[0] == mailbox and entry[1] == identifier:
-                # Conserver le commentaire existant si aucun nouveau n'est spécifié
-                current_comment = entry[3] if comment is None else comment
-                acl_entries[i] = (mailbox, identifier, rights, current_comment)
-                entry_found = True
-                break
-
-        if not entry_found:
-            self.log_warning(f"L'entrée ACL pour {mailbox} {identifier} n'existe pas", log_levels=log_levels)
-            return False
-
-        return self.write_acl_file(acl_entries, acl_path, backup)
+        with self.edit_acl(acl_path, backup=backup, log_levels=log_levels) as acl_file:
+            if acl_file.get(mailbox, identifier) is None:
+                self.log_warning(f"L'entrée ACL pour {mailbox} {identifier} n'existe pas", log_levels=log_levels)
+                return False
+            acl_file.set(mailbox, identifier, rights, comment)
+        return acl_file.committed
 
     def delete_acl_entry(self, mailbox: str, identifier: str, acl_path: Optional[str] = None, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -1220,16 +995,11 @@ acl_path: Optional[str] = None, backup: bool = True, log_levels: Optional[Dict[s
         Returns:
             bool: True si la suppression réussit, False sinon
         """
-        acl_entries = self.read_acl_file(acl_path)
-
-        # Filtrer l'entrée à supprimer
-        new_entries = [entry for entry in acl_entries if not (entry[0] == mailbox and entry[1] == identifier)]
-
-        if len(new_entries) == len(acl_entries):
-            self.log_warning(f"L'entrée ACL pour {mailbox} {identifier} n'existe pas", log_levels=log_levels)
-            return False
-
-        return self.write_acl_file(new_entries, acl_path, backup)
+        with self.edit_acl(acl_path, backup=backup, log_levels=log_levels) as acl_file:
+            if not acl_file.remove(mailbox, identifier):
+                self.log_warning(f"L'entrée ACL pour {mailbox} {identifier} n'existe pas", log_levels=log_levels)
+                return False
+        return acl_file.committed
 
     def delete_all_mailbox_acls(self, mailbox: str, acl_path: Optional[str] = None, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -1243,16 +1013,11 @@ acl_path: Optional[str] = None, backup: bool = True, log_levels: Optional[Dict[s
         Returns:
             bool: True si la suppression réussit, False sinon
         """
-        acl_entries = self.read_acl_file(acl_path)
-
-        # Filtrer les entrées pour la boîte aux lettres
-        new_entries = [entry for entry in acl_entries if entry[0] != mailbox]
-
-        if len(new_entries) == len(acl_entries):
-            self.log_warning(f"Aucune entrée ACL trouvée pour la boîte aux lettres {mailbox}", log_levels=log_levels)
-            return False
-
-        return self.write_acl_file(new_entries, acl_path, backup)
+        with self.edit_acl(acl_path, backup=backup, log_levels=log_levels) as acl_file:
+            if not acl_file.remove(mailbox):
+                self.log_warning(f"Aucune entrée ACL trouvée pour la boîte aux lettres {mailbox}", log_levels=log_levels)
+                return False
+        return acl_file.committed
 
     def enable_acl_plugin(self, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
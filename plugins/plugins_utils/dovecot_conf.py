@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modèle sans perte des fichiers de configuration Dovecot.
+
+DovecotCommands analysait chaque fichier en dictionnaire puis régénérait
+le fichier entier avec generate_config_string à chaque set_mail_setting,
+add_namespace, add_acl_entry...: commentaires, ordre et mise en forme
+étaient perdus, et chaque modification coûtait une analyse et une
+sérialisation complètes.
+
+Ici, chaque ligne du fichier devient un nœud qui garde son texte d'origine
+(paramètre `clé = valeur`, en-tête et fin de bloc `type nom { ... }`,
+commentaire, ligne vide, !include). Une modification ne régénère que le
+nœud concerné; render() restitue tout le reste octet pour octet. Un
+document peut recevoir autant de modifications que nécessaire avant une
+seule écriture (voir DovecotCommands.edit_config).
+
+AclFile applique le même principe au fichier d'ACL globales
+(`boîte identifiant droits [#commentaire]`).
+
+Ce module n'importe rien de plugins_utils.
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# Paramètre `clé = valeur` (la valeur peut contenir des accolades: %{user})
+_SETTING_RE = re.compile(r'^(\s*)([^\s=#{}]+)\s*=[ \t]*(.*?)\s*$')
+# En-tête de bloc `type [nom] {` suivi éventuellement d'un contenu sur la même ligne
+_HEADER_RE = re.compile(r'^(\s*)([^\s=#{}]+)(?:\s+([^={}]+?))?\s*\{(.*)$')
+
+# Entrée d'ACL: (boîte et identifiant)(droits)(commentaire éventuel)
+_ACL_RIGHTS_RE = re.compile(r'^(\s*\S+\s+\S+\s+)([^#]*?)(\s*(?:#.*)?)$')
+
+# Indentation par niveau des lignes créées, à défaut de voisines
+DEFAULT_INDENT = "  "
+
+def _split_comment(line: str) -> Tuple[str, str]:
+    """
+    Sépare le code et le commentaire d'une ligne.
+
+    Un # commence un commentaire en début de ligne ou après un blanc, hors
+    guillemets (`mail_location = maildir:~/#Mail` n'en contient pas).
+
+    Returns:
+        Tuple[str, str]: (code, commentaire avec les blancs qui le précèdent)
+    """
+    in_quotes = False
+    for i, char in enumerate(line):
+        if char == '"' and (i == 0 or line[i - 1] != '\\'):
+            in_quotes = not in_quotes
+        elif char == '#' and not in_quotes and (i == 0 or line[i - 1] in ' \t'):
+            code = line[:i].rstrip(' \t')
+            return code, line[len(code):]
+    return line, ""
+
+def _eol(raw: str) -> str:
+    """Fin de ligne d'une ligne brute ('' pour la dernière ligne sans saut)."""
+    if raw.endswith('\r\n'):
+        return '\r\n'
+    if raw.endswith('\n'):
+        return '\n'
+    return ''
+
+class Trivia:
+    """
+    Ligne sans effet sur la configuration analysée: commentaire, ligne vide,
+    !include, ou ligne non reconnue (conservée telle quelle).
+    """
+
+    __slots__ = ('raw',)
+
+    def __init__(self, raw: str):
+        self.raw = raw
+
+    def render(self) -> str:
+        return self.raw
+
+    def __repr__(self) -> str:
+        return f"Trivia({self.raw!r})"
+
+class Setting:
+    """
+    Paramètre `clé = valeur`.
+
+    Attributs:
+        key: Nom du paramètre.
+        value: Valeur brute (guillemets et variables conservés).
+        indent: Indentation de la ligne.
+        comment: Commentaire de fin de ligne, avec ses blancs.
+        raw: Texte de la ligne, régénéré quand la valeur change.
+    """
+
+    __slots__ = ('key', 'value', 'indent', 'comment', 'raw')
+
+    def __init__(self, key: str, value: str, indent: str = "", comment: str = "", raw: Optional[str] = None):
+        self.key = key
+        self.value = value
+        self.indent = indent
+        self.comment = comment
+        self.raw = raw if raw is not None else self._format('\n')
+
+    def _format(self, eol: str) -> str:
+        value = f" {self.value}" if self.value != "" else ""
+        return f"{self.indent}{self.key} ={value}{self.comment}{eol}"
+
+    def set_value(self, value: str) -> bool:
+        """
+        Change la valeur en conservant indentation et commentaire.
+
+        Returns:
+            bool: True si la valeur a changé
+        """
+        if value == self.value:
+            return False
+        self.value = value
+        self.raw = self._format(_eol(self.raw))
+        return True
+
+    def render(self) -> str:
+        return self.raw
+
+    def __repr__(self) -> str:
+        return f"Setting({self.key} = {self.value!r})"
+
+Node = Union[Trivia, Setting, 'Block']
+
+class Block:
+    """
+    Bloc `type [nom] { ... }`, ou racine du fichier.
+
+    Attributs:
+        type: Type du bloc ('namespace', 'plugin', 'service'...), '' pour la racine.
+        name: Nom du bloc ('inbox', 'imap-login'...), '' si anonyme.
+        indent: Indentation de l'en-tête.
+        children: Nœuds du bloc, dans l'ordre du fichier.
+    """
+
+    __slots__ = ('type', 'name', 'indent', 'children', 'header', 'footer', 'inline', 'unit')
+
+    def __init__(self, block_type: str = "", name: str = "", indent: str = "",
+                 header: Optional[str] = None, footer: Optional[str] = None):
+        self.type = block_type
+        self.name = name
+        self.indent = indent
+        self.children: List[Node] = []
+        if header is None and block_type:
+            header = f"{indent}{block_type}{' ' + name if name else ''} {{\n"
+            footer = f"{indent}}}\n"
+        self.header = header
+        self.footer = footer
+        self.inline = False  # Bloc écrit sur une seule ligne (`protocol lda { ... }`)
+        self.unit = DEFAULT_INDENT  # Décalage des lignes créées dans un bloc vide
+
+    # --- Rendu ---
+
+    def render(self) -> str:
+        """Texte du bloc: lignes d'origine, sauf celles modifiées."""
+        if self.inline:
+            return self.header or ""
+        parts = [self.header or ""]
+        parts.extend(child.render() for child in self.children)
+        parts.append(self.footer or "")
+        return "".join(parts)
+
+    def _expand(self) -> None:
+        """Réécrit un bloc d'une ligne sur plusieurs lignes avant de le modifier."""
+        if not self.inline:
+            return
+        eol = _eol(self.header) or '\n'
+        _, comment = _split_comment(self.header.rstrip('\r\n'))
+        self.header = f"{self.indent}{self.type}{' ' + self.name if self.name else ''} {{{comment}{eol}"
+        self.footer = f"{self.indent}}}{eol}"
+        child_indent = self.indent + self.unit
+        for child in self.children:
+            if isinstance(child, Setting):
+                child.indent = child_indent
+                child.comment = ""
+                child.raw = child._format(eol)
+        self.inline = False
+
+    def _child_indent(self) -> str:
+        """Indentation des nouvelles lignes, déduite des lignes existantes."""
+        for child in self.children:
+            if isinstance(child, Setting):
+                return child.indent
+            if isinstance(child, Block):
+                return child.indent
+        if not self.type:
+            return ""
+        return self.indent + self.unit
+
+    def _indent_unit(self) -> str:
+        """Décalage utilisé par les sous-blocs existants, à reproduire dans les nouveaux."""
+        for child in self.blocks():
+            for grandchild in child.children:
+                if isinstance(grandchild, (Setting, Block)) and grandchild.indent.startswith(child.indent):
+                    unit = grandchild.indent[len(child.indent):]
+                    if unit:
+                        return unit
+        return self.unit
+
+    def _insert(self, index: int, node: Node) -> None:
+        """Insère un nœud en garantissant un saut de ligne au nœud précédent."""
+        self._expand()
+        if index > 0:
+            _terminate(self.children[index - 1])
+        self.children.insert(index, node)
+
+    # --- Paramètres ---
+
+    def settings(self) -> Iterator[Setting]:
+        """Paramètres directs du bloc."""
+        return (child for child in self.children if isinstance(child, Setting))
+
+    def _last_setting(self, key: str) -> Optional[Setting]:
+        found = None
+        for child in self.children:
+            if isinstance(child, Setting) and child.key == key:
+                found = child
+        return found
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Valeur d'un paramètre du bloc (la dernière définition l'emporte, comme dans Dovecot).
+
+        Args:
+            key: Nom du paramètre
+            default: Valeur si le paramètre est absent
+
+        Returns:
+            Optional[str]: Valeur brute du paramètre
+        """
+        setting = self._last_setting(key)
+        return setting.value if setting is not None else default
+
+    def set(self, key: str, value: Any) -> bool:
+        """
+        Définit un paramètre: modifie sa dernière définition ou l'ajoute
+        après le dernier paramètre du bloc.
+
+        Args:
+            key: Nom du paramètre
+            value: Nouvelle valeur (convertie en chaîne)
+
+        Returns:
+            bool: True si le document a changé
+        """
+        value = str(value)
+        setting = self._last_setting(key)
+        if setting is not None:
+            if setting.value == value:
+                return False
+            self._expand()
+            return setting.set_value(value)
+
+        index = len(self.children)
+        for i, child in enumerate(self.children):
+            if isinstance(child, Setting):
+                index = i + 1
+        self._insert(index, Setting(key, value, indent=self._child_indent()))
+        return True
+
+    def delete(self, key: str) -> bool:
+        """
+        Supprime toutes les définitions d'un paramètre du bloc.
+
+        Returns:
+            bool: True si le document a changé
+        """
+        kept = [child for child in self.children if not (isinstance(child, Setting) and child.key == key)]
+        if len(kept) == len(self.children):
+            return False
+        self._expand()
+        self.children = kept
+        return True
+
+    # --- Sous-blocs ---
+
+    def blocks(self, block_type: Optional[str] = None) -> List['Block']:
+        """
+        Sous-blocs directs, éventuellement filtrés par type.
+
+        Args:
+            block_type: Type recherché, None pour tous
+
+        Returns:
+            List[Block]: Blocs dans l'ordre du fichier
+        """
+        return [child for child in self.children
+                if isinstance(child, Block) and (block_type is None or child.type == block_type)]
+
+    def block(self, block_type: str, name: str = "", create: bool = False) -> Optional['Block']:
+        """
+        Cherche un sous-bloc (le dernier du type et du nom demandés).
+
+        Args:
+            block_type: Type du bloc ('namespace', 'plugin'...)
+            name: Nom du bloc ('' pour un bloc anonyme)
+            create: Si True, crée le bloc s'il n'existe pas
+
+        Returns:
+            Optional[Block]: Bloc trouvé ou créé, None sinon
+        """
+        found = None
+        for child in self.blocks(block_type):
+            if child.name == name:
+                found = child
+        if found is None and create:
+            found = self.add_block(block_type, name)
+        return found
+
+    def add_block(self, block_type: str, name: str = "", values: Optional[Dict[str, Any]] = None) -> 'Block':
+        """
+        Ajoute un sous-bloc après le dernier bloc du même type (sinon à la fin).
+
+        Args:
+            block_type: Type du bloc
+            name: Nom du bloc ('' pour un bloc anonyme)
+            values: Contenu initial, au format de to_dict()
+
+        Returns:
+            Block: Bloc créé
+        """
+        self._expand()
+        new_block = Block(block_type, name, indent=self._child_indent())
+        new_block.unit = self._indent_unit()
+        if values:
+            new_block.apply(values)
+
+        index = len(self.children)
+        for i, child in enumerate(self.children):
+            if isinstance(child, Block) and child.type == block_type:
+                index = i + 1
+        # Ligne vide de séparation, comme le reste des fichiers de conf.d
+        previous = self.children[index - 1] if index > 0 else None
+        if previous is not None and not _is_blank(previous):
+            self._insert(index, Trivia('\n'))
+            index += 1
+        self._insert(index, new_block)
+        return new_block
+
+    def remove_block(self, block_type: str, name: str = "") -> bool:
+        """
+        Supprime les sous-blocs d'un type et d'un nom.
+
+        Returns:
+            bool: True si le document a changé
+        """
+        kept: List[Node] = []
+        removed = False
+        for child in self.children:
+            if isinstance(child, Block) and child.type == block_type and child.name == name:
+                # Ligne vide de séparation ajoutée avec le bloc: ne pas en laisser deux
+                if kept and _is_blank(kept[-1]):
+                    kept.pop()
+                removed = True
+            else:
+                kept.append(child)
+        if not removed:
+            return False
+        self._expand()
+        self.children = kept
+        return True
+
+    # --- Vue dictionnaire ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Vue dictionnaire du bloc, au format historique de parse_dovecot_config:
+        paramètres {clé: valeur}, blocs nommés {type: {nom: {...}}} et blocs
+        anonymes {type: {...}} (les blocs répétés sont fusionnés).
+        """
+        result: Dict[str, Any] = {}
+        for child in self.children:
+            if isinstance(child, Setting):
+                result[child.key] = child.value
+            elif isinstance(child, Block):
+                section = result.get(child.type)
+                if not isinstance(section, dict):
+                    section = result[child.type] = {}
+                if child.name:
+                    section[child.name] = child.to_dict()
+                else:
+                    section.update(child.to_dict())
+        return result
+
+    def apply(self, values: Dict[str, Any], replace: bool = False) -> bool:
+        """
+        Applique un dictionnaire au format de to_dict() au bloc, en ne
+        touchant que les lignes dont la valeur change.
+
+        Un dictionnaire dont toutes les valeurs sont des dictionnaires
+        décrit des blocs nommés ({'namespace': {'inbox': {...}}}); sinon un
+        bloc anonyme ({'plugin': {'quota': ...}}).
+
+        Args:
+            values: Contenu souhaité
+            replace: Si True, supprime aussi ce qui n'est pas dans values
+
+        Returns:
+            bool: True si le document a changé
+        """
+        changed = False
+        for key, value in values.items():
+            if not isinstance(value, dict):
+                changed |= self.set(key, value)
+            elif value and all(isinstance(item, dict) for item in value.values()):
+                for name, block_values in value.items():
+                    target = self.block(key, name)
+                    if target is None:
+                        self.add_block(key, name, block_values)
+                        changed = True
+                    else:
+                        changed |= target.apply(block_values, replace=replace)
+                if replace:
+                    for child in self.blocks(key):
+                        if child.name not in value:
+                            changed |= self.remove_block(key, child.name)
+            else:
+                target = self.block(key)
+                if target is None:
+                    self.add_block(key, "", value)
+                    changed = True
+                else:
+                    changed |= target.apply(value, replace=replace)
+
+        if replace:
+            for setting in list(self.settings()):
+                if setting.key not in values:
+                    changed |= self.delete(setting.key)
+            for child in self.blocks():
+                if child.type not in values:
+                    changed |= self.remove_block(child.type, child.name)
+        return changed
+
+    def __repr__(self) -> str:
+        label = f"{self.type} {self.name}".strip() or "racine"
+        return f"Block({label}, {len(self.children)} nœuds)"
+
+def _is_blank(node: Node) -> bool:
+    """Indique si un nœud est une ligne vide."""
+    return isinstance(node, Trivia) and not node.raw.strip()
+
+def _terminate(node: Node) -> None:
+    """Ajoute un saut de ligne à un nœud qui n'en a pas (dernière ligne du fichier)."""
+    if isinstance(node, Block):
+        if node.inline:
+            if not _eol(node.header):
+                node.header += '\n'
+        elif node.footer is not None and not _eol(node.footer):
+            node.footer += '\n'
+    elif not _eol(node.raw):
+        node.raw += '\n'
+
+class DovecotConfig(Block):
+    """
+    Document Dovecot complet (racine du fichier).
+
+    Exemple:
+        doc = DovecotConfig.parse(content)
+        doc.set("mail_location", "maildir:~/Maildir")
+        doc.block("plugin", create=True).set("quota_rule", "*:storage=1G")
+        doc.add_block("namespace", "PUBLIC_BT", {"type": "public", "prefix": "Archives_BT/"})
+        content = doc.render()  # seules ces lignes diffèrent de l'original
+
+    Attributs:
+        original: Texte analysé.
+        committed: Résultat de l'écriture quand le document provient de
+                   DovecotCommands.edit_config (None sinon).
+    """
+
+    __slots__ = ('original', 'committed')
+
+    def __init__(self):
+        super().__init__()
+        self.original = ""
+        self.committed: Optional[bool] = None
+
+    @classmethod
+    def parse(cls, content: str) -> 'DovecotConfig':
+        """
+        Analyse le texte d'un fichier de configuration Dovecot.
+
+        Les accolades non appariées ne font pas échouer l'analyse: une
+        fermeture en trop est conservée comme ligne inerte et les blocs non
+        fermés le sont en fin de fichier.
+
+        Args:
+            content: Contenu du fichier
+
+        Returns:
+            DovecotConfig: Document
+        """
+        document = cls()
+        document.original = content
+        stack: List[Block] = [document]
+
+        for raw in content.splitlines(keepends=True):
+            current = stack[-1]
+            code, _ = _split_comment(raw.rstrip('\r\n'))
+            stripped = code.strip()
+
+            if not stripped or stripped.startswith('!'):
+                current.children.append(Trivia(raw))
+                continue
+
+            if stripped == '}':
+                if len(stack) > 1:
+                    current.footer = raw
+                    stack.pop()
+                else:
+                    current.children.append(Trivia(raw))
+                continue
+
+            match = _SETTING_RE.match(code)
+            if match:
+                indent, key, value = match.groups()
+                current.children.append(Setting(key, value, indent, raw.rstrip('\r\n')[len(code):], raw))
+                continue
+
+            match = _HEADER_RE.match(code)
+            if match:
+                indent, block_type, name, remainder = match.groups()
+                block = Block(block_type, (name or "").strip(), indent, header=raw, footer="")
+                current.children.append(block)
+                remainder = remainder.strip()
+                if remainder.endswith('}'):
+                    # Bloc sur une ligne: `protocol lda { mail_plugins = $mail_plugins sieve }`
+                    block.inline = True
+                    inner = remainder[:-1].strip()
+                    inner_match = _SETTING_RE.match(inner) if inner else None
+                    if inner_match:
+                        block.children.append(Setting(inner_match.group(2), inner_match.group(3),
+                                                      indent + DEFAULT_INDENT, "", ""))
+                else:
+                    if remainder:
+                        block.children.append(Trivia(remainder + '\n'))
+                    stack.append(block)
+                continue
+
+            current.children.append(Trivia(raw))
+
+        # Blocs non fermés: les refermer pour garder un fichier valide au rendu
+        while len(stack) > 1:
+            block = stack.pop()
+            block.footer = f"{block.indent}}}\n"
+        return document
+
+    @property
+    def changed(self) -> bool:
+        """Indique si le rendu diffère du texte analysé."""
+        return self.render() != self.original
+
+    def find(self, path: str) -> Optional[Block]:
+        """
+        Cherche un bloc par chemin, par exemple 'service imap-login/inet_listener imap'.
+
+        Args:
+            path: Segments `type [nom]` séparés par '/'
+
+        Returns:
+            Optional[Block]: Bloc trouvé, None sinon
+        """
+        current: Optional[Block] = self
+        for segment in filter(None, path.split('/')):
+            block_type, _, name = segment.strip().partition(' ')
+            current = current.block(block_type, name.strip())
+            if current is None:
+                return None
+        return current
+
+class AclFile:
+    """
+    Fichier d'ACL globales Dovecot, modifié ligne par ligne.
+
+    Format d'une entrée: `boîte identifiant droits [#commentaire]`. Les
+    lignes vides, commentaires et lignes non reconnues sont conservées.
+    """
+
+    def __init__(self, content: str = ""):
+        """
+        Analyse le contenu d'un fichier d'ACL.
+
+        Args:
+            content: Contenu du fichier
+        """
+        self.original = content
+        self.lines: List[str] = content.splitlines(keepends=True)
+        self.committed: Optional[bool] = None
+
+    @staticmethod
+    def parse_line(line: str) -> Optional[Tuple[str, str, str, str]]:
+        """
+        Analyse une ligne d'ACL.
+
+        Returns:
+            Optional[Tuple[str, str, str, str]]: (boîte, identifiant, droits, commentaire),
+            None pour une ligne vide, un commentaire ou une ligne invalide
+        """
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return None
+        comment = ""
+        if '#' in line:
+            line, comment = (part.strip() for part in line.split('#', 1))
+        parts = line.split(maxsplit=2)
+        if len(parts) < 3:
+            return None
+        return parts[0], parts[1], parts[2], comment
+
+    @staticmethod
+    def format_line(mailbox: str, identifier: str, rights: str, comment: str = "") -> str:
+        """Texte d'une entrée d'ACL (sans fin de ligne)."""
+        line = f"{mailbox} {identifier} {rights}"
+        if comment:
+            line += f" #{comment}"
+        return line
+
+    def entries(self) -> List[Tuple[str, str, str, str]]:
+        """Entrées du fichier, dans l'ordre."""
+        return [entry for entry in map(self.parse_line, self.lines) if entry is not None]
+
+    def _indexes(self, mailbox: str, identifier: Optional[str] = None) -> List[int]:
+        indexes = []
+        for i, line in enumerate(self.lines):
+            entry = self.parse_line(line)
+            if entry and entry[0] == mailbox and (identifier is None or entry[1] == identifier):
+                indexes.append(i)
+        return indexes
+
+    def get(self, mailbox: str, identifier: str) -> Optional[Tuple[str, str, str, str]]:
+        """Entrée d'une boîte et d'un identifiant, None si absente."""
+        indexes = self._indexes(mailbox, identifier)
+        return self.parse_line(self.lines[indexes[-1]]) if indexes else None
+
+    def set(self, mailbox: str, identifier: str, rights: str, comment: Optional[str] = None) -> bool:
+        """
+        Ajoute ou met à jour une entrée; seule sa ligne est réécrite.
+
+        Args:
+            mailbox: Boîte aux lettres
+            identifier: Identifiant ('group=finance'...)
+            rights: Droits ('lrwts'...)
+            comment: Commentaire (None pour conserver celui de l'entrée existante)
+
+        Returns:
+            bool: True si le fichier a changé
+        """
+        indexes = self._indexes(mailbox, identifier)
+        if indexes:
+            i = indexes[-1]
+            current = self.parse_line(self.lines[i])
+            new_comment = current[3] if comment is None else comment
+            if current == (mailbox, identifier, rights, new_comment):
+                return False
+            match = _ACL_RIGHTS_RE.match(self.lines[i].rstrip('\r\n'))
+            if new_comment == current[3] and match:
+                # Seuls les droits changent: le reste de la ligne est conservé
+                line = f"{match.group(1)}{rights}{match.group(3)}"
+            else:
+                line = self.format_line(mailbox, identifier, rights, new_comment)
+            self.lines[i] = line + (_eol(self.lines[i]) or '\n')
+            return True
+
+        if self.lines and not _eol(self.lines[-1]):
+            self.lines[-1] += '\n'
+        self.lines.append(self.format_line(mailbox, identifier, rights, comment or "") + '\n')
+        return True
+
+    def remove(self, mailbox: str, identifier: Optional[str] = None) -> int:
+        """
+        Supprime les entrées d'une boîte (d'un identifiant, ou toutes).
+
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        indexes = set(self._indexes(mailbox, identifier))
+        if indexes:
+            self.lines = [line for i, line in enumerate(self.lines) if i not in indexes]
+        return len(indexes)
+
+    def render(self) -> str:
+        """Texte du fichier."""
+        return "".join(self.lines)
+
+    @property
+    def changed(self) -> bool:
+        """Indique si le rendu diffère du texte analysé."""
+        return self.render() != self.original
+
+def parse(content: str) -> DovecotConfig:
+    """Raccourci de DovecotConfig.parse."""
+    return DovecotConfig.parse(content)
@@ -8,6 +8,10 @@ Permet de gérer les sélections de paquets, les préréponses debconf et les op
 
 # Import de la classe de base et des types
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import dpkg_status
+from plugins_utils import debconf_db
+from plugins_utils import host_facts
+import fnmatch
 import os
 import re
 import tempfile
@@ -152,7 +156,7 @@ class DpkgCommands(PluginsUtilsBase):
 
     # --- Méthodes Debconf ---
 
-    def _ensure_debconf_commands(self) -> Tuple[bool, List[str]]:
+    def _ensure_debconf_commands(self, log_levels: Optional[Dict[str, str]] = None) -> Tuple[bool, List[str]]:
         """
         Vérifie quelles commandes debconf sont disponibles.
         Ne tente pas d'installer debconf-utils.
@@ -255,6 +259,17 @@ class DpkgCommands(PluginsUtilsBase):
             self.log_warning("Aucune pré-réponse debconf en attente à appliquer.", log_levels=log_levels)
             return True
 
+        differences = self.diff_debconf_selections(log_levels=log_levels)
+        if differences is not None:
+            unchanged = len(self._debconf_selections) - len(differences)
+            if unchanged:
+                self.log_info(f"{unchanged} pré-réponse(s) debconf déjà en place, ignorée(s).", log_levels=log_levels)
+                self._debconf_selections = {key: (q_type, value)
+                                            for key, (q_type, value, _) in differences.items()}
+            if not self._debconf_selections:
+                self.log_success("Toutes les pré-réponses debconf sont déjà appliquées.", log_levels=log_levels)
+                return True
+
         count = len(self._debconf_selections)
         self.log_info(f"Application de {count} pré-réponses debconf...", log_levels=log_levels)
         current_task_id = task_id or f"debconf_set_selections_{int(time.time())}"
@@ -370,7 +385,8 @@ class DpkgCommands(PluginsUtilsBase):
     def get_debconf_selections_for_package(self, package_name: str, log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict[Tuple[str, str], str]]:
         """
         Récupère les sélections debconf actuelles pour un paquet spécifique sans utiliser debconf-get-selections.
-        Utilise directement la commande debconf-show qui fait partie du paquet debconf de base.
+        Lit la base debconf (debconf_db), ou à défaut utilise la commande debconf-show
+        qui fait partie du paquet debconf de base.
 
         Args:
             package_name: Nom du paquet.
@@ -381,6 +397,13 @@ class DpkgCommands(PluginsUtilsBase):
         """
         self.log_debug(f"Récupération des sélections debconf pour le paquet: {package_name}", log_levels=log_levels)
 
+        index = debconf_db.get_index()
+        if index.available:
+            # Base debconf lue en mémoire: type réel et toutes les questions du paquet
+            selections = index.selections(package_name)
+            self.log_debug(f"{len(selections)} sélection(s) debconf trouvée(s) pour '{package_name}'.", log_levels=log_levels)
+            return selections
+
         # Créer un dictionnaire pour stocker les résultats
         selections: Dict[Tuple[str, str], str] = {}
 
@@ -486,6 +509,15 @@ class DpkgCommands(PluginsUtilsBase):
         """
         self.log_debug(f"Recherche de la valeur debconf pour: {package_name} -> {question_name}", log_levels=log_levels)
 
+        index = debconf_db.get_index()
+        if index.available:
+            question = index.get(question_name) or index.get(f"{package_name}/{question_name}")
+            if question is None or question.value is None:
+                self.log_debug(f"Aucune valeur debconf trouvée pour la question '{question_name}' du paquet '{package_name}'.", log_levels=log_levels)
+                return None
+            self.log_debug(f"Valeur trouvée pour '{question.name}' ({package_name}): '{question.value}' (type: {question.type})", log_levels=log_levels)
+            return question.value
+
         # Récupérer toutes les sélections pour le paquet
         package_selections = self.get_debconf_selections_for_package(package_name)
 
@@ -535,6 +567,29 @@ class DpkgCommands(PluginsUtilsBase):
         self.log_debug(f"Aucune valeur debconf trouvée pour la question '{question_name}' du paquet '{package_name}'.", log_levels=log_levels)
         return None
 
+    def diff_debconf_selections(self, selections: Optional[Dict[Tuple[str, str], Tuple[str, str]]] = None,
+                                log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict[Tuple[str, str], Tuple[str, str, Optional[str]]]]:
+        """
+        Compare des pré-réponses debconf à la base, sans sous-processus.
+
+        Args:
+            selections: {(paquet, question): (type, valeur)}; par défaut les
+                        pré-réponses en attente (add_debconf_selection).
+            log_levels: Niveaux de log personnalisés.
+
+        Returns:
+            {(paquet, question): (type, valeur souhaitée, valeur actuelle ou None)} pour
+            les pré-réponses absentes ou différentes, ou None si la base n'est pas lisible.
+        """
+        index = debconf_db.get_index()
+        if not index.available:
+            self.log_debug("Base debconf illisible, comparaison des pré-réponses impossible.", log_levels=log_levels)
+            return None
+        desired = self._debconf_selections if selections is None else selections
+        differences = index.diff(desired)
+        self.log_debug(f"{len(differences)}/{len(desired)} pré-réponse(s) debconf à appliquer", log_levels=log_levels)
+        return differences
+
     def list_installed_packages_with_pattern(
         self,
         pattern: str,
@@ -554,6 +609,15 @@ class DpkgCommands(PluginsUtilsBase):
         """
         # On encadre le motif pour la glob de dpkg
         glob = f"*{pattern}*"
+        index = dpkg_status.get_index()
+        if index.available:
+            # Même filtre que dpkg -l (glob puis regex), sans sous-processus
+            matches = [name for name in index.installed_packages(pattern)
+                       if fnmatch.fnmatchcase(name, glob)]
+            self.log_debug(f"{len(matches)} paquet(s) installés trouvés pour '{pattern}': {matches}",
+                           log_levels=log_levels)
+            return matches
+
         self.log_info(f"Recherche des paquets installés avec dpkg -l '{glob}'...", log_levels=log_levels)
 
         # Exécute dpkg -l avec le glob
@@ -626,6 +690,7 @@ class DpkgCommands(PluginsUtilsBase):
             error_as_warning=error_as_warning,
             log_levels=log_levels
         )
+        host_facts.invalidate(*host_facts.PACKAGE_FACTS)
         if success:
             self.log_success(f"Purge réussie des paquets: {packages}", log_levels=log_levels)
             return True
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index en mémoire de la base dpkg (/var/lib/dpkg/status).
+
+AptCommands et DpkgCommands interrogeaient dpkg-query, dpkg -l et
+dpkg --compare-versions à chaque question (installé ? quelle version ?
+version suffisante ?). Ce module lit la base une fois par processus et
+répond aux mêmes questions sans sous-processus, individuellement ou en lot.
+
+L'index est reconstruit dès que la base change (taille, date de
+modification ou inode du fichier status, ou contenu du dossier updates/
+où dpkg journalise les modifications pas encore reportées dans status):
+une installation faite entre deux questions est donc prise en compte.
+
+La comparaison de versions reproduit celle de dpkg (époque, version amont,
+révision Debian, ~ trié avant tout).
+
+Ce module n'importe rien de plugins_utils.
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DPKG_STATUS = '/var/lib/dpkg/status'
+
+# États dpkg d'un paquet considéré comme installé (dépendances satisfaites)
+INSTALLED_STATES = {'installed', 'triggers-awaited', 'triggers-pending'}
+
+# Champs de la base conservés dans l'index
+_FIELDS = {'Package', 'Status', 'Version', 'Architecture'}
+
+# Opérateurs acceptés par version_satisfies (ceux de dpkg --compare-versions)
+_OPERATORS = {
+    'lt': lambda c: c < 0, '<<': lambda c: c < 0,
+    'le': lambda c: c <= 0, '<=': lambda c: c <= 0,
+    'eq': lambda c: c == 0, '=': lambda c: c == 0,
+    'ne': lambda c: c != 0,
+    'ge': lambda c: c >= 0, '>=': lambda c: c >= 0,
+    'gt': lambda c: c > 0, '>>': lambda c: c > 0,
+}
+
+# --- Comparaison de versions ---
+
+def _order(char: str) -> int:
+    """Poids d'un caractère non numérique (fonction order() de dpkg)."""
+    if char == '~':
+        return -1
+    if 'a' <= char <= 'z' or 'A' <= char <= 'Z':
+        return ord(char)
+    return ord(char) + 256
+
+def _is_digit(char: str) -> bool:
+    return '0' <= char <= '9'
+
+def _compare_fragment(a: str, b: str) -> int:
+    """
+    Compare deux versions amont ou deux révisions (fonction verrevcmp() de dpkg).
+
+    Les parties non numériques sont comparées caractère par caractère
+    (lettres avant symboles, ~ avant tout, y compris la fin de chaîne), les
+    parties numériques par valeur.
+    """
+    i = j = 0
+    len_a, len_b = len(a), len(b)
+    while i < len_a or j < len_b:
+        while (i < len_a and not _is_digit(a[i])) or (j < len_b and not _is_digit(b[j])):
+            order_a = _order(a[i]) if i < len_a and not _is_digit(a[i]) else 0
+            order_b = _order(b[j]) if j < len_b and not _is_digit(b[j]) else 0
+            if order_a != order_b:
+                return order_a - order_b
+            i += 1
+            j += 1
+        while i < len_a and a[i] == '0':
+            i += 1
+        while j < len_b and b[j] == '0':
+            j += 1
+        first_diff = 0
+        while i < len_a and _is_digit(a[i]) and j < len_b and _is_digit(b[j]):
+            if not first_diff:
+                first_diff = ord(a[i]) - ord(b[j])
+            i += 1
+            j += 1
+        if i < len_a and _is_digit(a[i]):
+            return 1
+        if j < len_b and _is_digit(b[j]):
+            return -1
+        if first_diff:
+            return first_diff
+    return 0
+
+@lru_cache(maxsize=4096)
+def parse_version(version: str) -> Tuple[int, str, str]:
+    """
+    Découpe une version Debian en (époque, version amont, révision).
+
+    Args:
+        version: Version (ex: '1:2.30-1ubuntu2')
+
+    Returns:
+        Tuple[int, str, str]: Époque (0 par défaut), version amont, révision ('' si absente)
+
+    Raises:
+        ValueError: Si l'époque n'est pas un entier
+    """
+    version = version.strip()
+    epoch = 0
+    if ':' in version:
+        epoch_text, version = version.split(':', 1)
+        epoch = int(epoch_text)
+    upstream, _, revision = version.rpartition('-')
+    if not upstream:
+        upstream, revision = revision, ''
+    return epoch, upstream, revision
+
+def compare_versions(a: str, b: str) -> int:
+    """
+    Compare deux versions Debian comme dpkg --compare-versions.
+
+    Args:
+        a: Première version
+        b: Seconde version
+
+    Returns:
+        int: Négatif si a < b, 0 si égales, positif si a > b
+
+    Raises:
+        ValueError: Si l'une des versions a une époque invalide
+    """
+    epoch_a, upstream_a, revision_a = parse_version(a)
+    epoch_b, upstream_b, revision_b = parse_version(b)
+    if epoch_a != epoch_b:
+        return epoch_a - epoch_b
+    return _compare_fragment(upstream_a, upstream_b) or _compare_fragment(revision_a, revision_b)
+
+def version_satisfies(version: str, operator: str, reference: str) -> bool:
+    """
+    Évalue une relation entre versions (opérateurs de dpkg --compare-versions).
+
+    Args:
+        version: Version testée
+        operator: 'lt', 'le', 'eq', 'ne', 'ge', 'gt' ou '<<', '<=', '=', '>=', '>>'
+        reference: Version de référence
+
+    Returns:
+        bool: True si la relation est vraie
+
+    Raises:
+        ValueError: Si l'opérateur est inconnu ou une version invalide
+    """
+    if operator not in _OPERATORS:
+        raise ValueError(f"Opérateur de comparaison inconnu: {operator}")
+    return _OPERATORS[operator](compare_versions(version, reference))
+
+# --- Base dpkg ---
+
+class PackageStatus:
+    """
+    État d'un paquet dans la base dpkg.
+    """
+
+    __slots__ = ('name', 'architecture', 'version', 'want', 'flag', 'state')
+
+    def __init__(self, name: str, architecture: str, version: Optional[str], status: str):
+        """
+        Initialise l'état.
+
+        Args:
+            name: Nom du paquet
+            architecture: Architecture ('all', 'amd64'...)
+            version: Version ou None (paquet connu mais jamais installé)
+            status: Champ Status ('install ok installed')
+        """
+        self.name = name
+        self.architecture = architecture
+        self.version = version
+        parts = status.split()
+        self.want, self.flag, self.state = (parts + ['', '', ''])[:3]
+
+    @property
+    def installed(self) -> bool:
+        """Indique si le paquet est installé (ligne 'ii' de dpkg -l)."""
+        return self.state in INSTALLED_STATES
+
+    def __repr__(self) -> str:
+        return f"PackageStatus({self.name}:{self.architecture} {self.version} {self.want} {self.state})"
+
+def _read_stanzas(path: str) -> Iterable[Dict[str, str]]:
+    """
+    Lit les paragraphes d'un fichier au format de la base dpkg.
+
+    Seuls les champs utiles à l'index sont extraits; les lignes de
+    continuation (descriptions, conffiles) sont ignorées.
+    """
+    stanza: Dict[str, str] = {}
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line == '\n':
+                if stanza:
+                    yield stanza
+                    stanza = {}
+                continue
+            if line[0] in ' \t':
+                continue
+            key, _, value = line.partition(':')
+            if key in _FIELDS:
+                stanza[key] = value.strip()
+    if stanza:
+        yield stanza
+
+class DpkgStatusIndex:
+    """
+    Index des paquets de la base dpkg, reconstruit quand la base change.
+    """
+
+    def __init__(self, path: str = DPKG_STATUS):
+        """
+        Initialise l'index (la base est lue à la première question).
+
+        Args:
+            path: Fichier status de dpkg
+        """
+        self.path = path
+        self.updates_dir = os.path.join(os.path.dirname(path), 'updates')
+        self._packages: Dict[str, List[PackageStatus]] = {}
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def _current_signature(self) -> Optional[Tuple]:
+        """Identité de la base (status et journal updates/), None si elle est illisible."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        updates: Tuple = ()
+        try:
+            updates_stat = os.stat(self.updates_dir)
+            updates = (updates_stat.st_mtime_ns, tuple(sorted(
+                name for name in os.listdir(self.updates_dir) if name.isdigit())))
+        except OSError:
+            pass
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino, updates
+
+    def refresh(self) -> bool:
+        """
+        Relit la base si elle a changé depuis la dernière lecture.
+
+        Returns:
+            bool: True si la base est disponible
+        """
+        signature = self._current_signature()
+        if signature is None:
+            with self._lock:
+                self._packages, self._signature = {}, None
+            return False
+        if signature == self._signature:
+            return True
+
+        with self._lock:
+            if signature == self._signature:
+                return True
+            packages: Dict[Tuple[str, str], PackageStatus] = {}
+            sources = [self.path] + [os.path.join(self.updates_dir, name)
+                                     for name in sorted(signature[3][1] if signature[3] else (), key=int)]
+            try:
+                for source in sources:
+                    # Les entrées du journal remplacent celles de status, dans l'ordre
+                    for stanza in _read_stanzas(source):
+                        name = stanza.get('Package')
+                        if not name:
+                            continue
+                        architecture = stanza.get('Architecture', '')
+                        packages[(name, architecture)] = PackageStatus(
+                            name, architecture, stanza.get('Version'), stanza.get('Status', ''))
+            except OSError:
+                self._packages, self._signature = {}, None
+                return False
+
+            index: Dict[str, List[PackageStatus]] = {}
+            for package in packages.values():
+                index.setdefault(package.name, []).append(package)
+            self._packages, self._signature = index, signature
+        return True
+
+    @property
+    def available(self) -> bool:
+        """Indique si la base dpkg est lisible (système Debian)."""
+        return self.refresh()
+
+    def get(self, package_name: str) -> Optional[PackageStatus]:
+        """
+        Retourne l'état d'un paquet.
+
+        Pour un paquet multi-architecture, l'entrée installée est préférée.
+        Le nom peut être qualifié par l'architecture ('libc6:i386').
+
+        Args:
+            package_name: Nom du paquet
+
+        Returns:
+            Optional[PackageStatus]: État, ou None si dpkg ne connaît pas le paquet
+        """
+        self.refresh()
+        return self._lookup(package_name)
+
+    def _lookup(self, package_name: str) -> Optional[PackageStatus]:
+        """Recherche un paquet dans l'index, sans vérifier si la base a changé."""
+        name, _, architecture = package_name.partition(':')
+        entries = self._packages.get(name)
+        if not entries:
+            return None
+        if architecture:
+            entries = [entry for entry in entries if entry.architecture == architecture]
+            if not entries:
+                return None
+        for entry in entries:
+            if entry.installed:
+                return entry
+        return entries[0]
+
+    def is_installed(self, package_name: str, min_version: Optional[str] = None) -> bool:
+        """
+        Indique si un paquet est installé, en version suffisante le cas échéant.
+
+        Args:
+            package_name: Nom du paquet
+            min_version: Version minimale requise (optionnel)
+
+        Returns:
+            bool: True si le paquet est installé (et sa version >= min_version)
+        """
+        self.refresh()
+        return self._is_installed(package_name, min_version)
+
+    def _is_installed(self, package_name: str, min_version: Optional[str]) -> bool:
+        entry = self._lookup(package_name)
+        if entry is None or not entry.installed:
+            return False
+        if min_version:
+            return bool(entry.version) and compare_versions(entry.version, min_version) >= 0
+        return True
+
+    def version(self, package_name: str) -> Optional[str]:
+        """
+        Retourne la version installée d'un paquet.
+
+        Args:
+            package_name: Nom du paquet
+
+        Returns:
+            Optional[str]: Version, ou None si le paquet n'est pas installé
+        """
+        self.refresh()
+        return self._version(package_name)
+
+    def _version(self, package_name: str) -> Optional[str]:
+        entry = self._lookup(package_name)
+        return entry.version if entry is not None and entry.installed else None
+
+    def are_installed(self, package_names: Iterable[str],
+                      min_versions: Optional[Dict[str, str]] = None) -> Dict[str, bool]:
+        """
+        Indique pour chaque paquet s'il est installé (base lue une seule fois).
+
+        Args:
+            package_names: Noms des paquets
+            min_versions: Versions minimales requises, par paquet (optionnel)
+
+        Returns:
+            Dict[str, bool]: {paquet: installé}
+        """
+        self.refresh()
+        min_versions = min_versions or {}
+        return {name: self._is_installed(name, min_versions.get(name)) for name in package_names}
+
+    def versions(self, package_names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Retourne la version installée de chaque paquet.
+
+        Args:
+            package_names: Noms des paquets
+
+        Returns:
+            Dict[str, Optional[str]]: {paquet: version ou None}
+        """
+        self.refresh()
+        return {name: self._version(name) for name in package_names}
+
+    def statuses(self, package_names: Iterable[str]) -> Dict[str, Optional[PackageStatus]]:
+        """
+        Retourne l'état de chaque paquet.
+
+        Args:
+            package_names: Noms des paquets
+
+        Returns:
+            Dict[str, Optional[PackageStatus]]: {paquet: état ou None si inconnu}
+        """
+        self.refresh()
+        return {name: self._lookup(name) for name in package_names}
+
+    def installed_packages(self, pattern: Optional[str] = None) -> List[str]:
+        """
+        Liste les paquets installés, éventuellement filtrés.
+
+        Args:
+            pattern: Expression régulière recherchée dans le nom (optionnel)
+
+        Returns:
+            List[str]: Noms des paquets installés, triés
+        """
+        self.refresh()
+        regex = re.compile(pattern) if pattern else None
+        return sorted(name for name, entries in self._packages.items()
+                      if any(entry.installed for entry in entries)
+                      and (regex is None or regex.search(name)))
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._packages)
+
+# Index partagé par les utilitaires du processus, par fichier status
+_indexes: Dict[str, DpkgStatusIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_index(path: str = DPKG_STATUS) -> DpkgStatusIndex:
+    """
+    Retourne l'index partagé de la base dpkg.
+
+    Args:
+        path: Fichier status de dpkg
+
+    Returns:
+        DpkgStatusIndex: Index (vérifier available avant usage hors Debian)
+    """
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = DpkgStatusIndex(path)
+        return index
@@ -8,6 +8,7 @@ Inclut des vérifications et des considérations pour le dépannage.
 """
 
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import host_facts
 import os
 import re
 import shlex
@@ -54,7 +55,10 @@ class EfiCommands(PluginsUtilsBase):
 
     def _is_efi_system(self) -> bool:
         """Vérifie si le système a démarré en mode EFI en testant l'existence de /sys/firmware/efi."""
-        is_efi, _, _ = self.run(['test', '-d', '/sys/firmware/efi'], check=False, no_output=True, needs_sudo=False)
+        if host_facts.has_fact('efi'):
+            is_efi = bool(host_facts.get_fact('efi'))
+        else:
+            is_efi, _, _ = self.run(['test', '-d', '/sys/firmware/efi'], check=False, no_output=True, needs_sudo=False)
         if not is_efi:
             self.log_warning("Le système ne semble pas démarré en mode EFI (/sys/firmware/efi absent). Les commandes efibootmgr échoueront probablement.")
         else:
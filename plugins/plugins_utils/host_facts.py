@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profil de la machine (« faits ») partagé entre les plugins.
+
+Le profil regroupe les informations que les utilitaires sondaient chacun
+de leur côté (uname, répertoires home, EFI, commandes et services présents,
+SGBD, serveur web, SELinux/AppArmor, valeurs debconf et LRPGN utilisées par
+MetierCommands). Il est collecté une fois par exécution et transmis aux
+plugins dans la clé host_facts de leur configuration; les utilitaires le
+consultent avant de lancer leurs propres commandes.
+
+Ce module n'importe rien de plugins_utils: il peut être exécuté seul,
+y compris via « python3 - » sur une machine distante, et affiche alors le
+profil en JSON. Le profil est mis en cache sur la machine pendant --ttl
+secondes (~/.cache/pcUtils/host_facts.json), tant que les fichiers dont il
+dépend (base dpkg, comptes, debconf, LRPGN) ne sont pas modifiés.
+
+Un fait absent du profil n'a pas pu être déterminé: l'utilitaire concerné
+sonde alors la machine comme auparavant. Le profil reflète l'état de la
+machine au démarrage du plugin: les utilitaires qui la modifient (comptes,
+paquets, services) appellent invalidate() pour que les lectures suivantes
+sondent de nouveau la machine. L'état des services ne dépend d'aucun
+fichier: il est relu à chaque chargement du cache.
+"""
+
+import os
+import sys
+import json
+import pwd
+import time
+import shutil
+import argparse
+import subprocess
+import configparser
+from typing import Any, Dict, List, Optional
+
+FACTS_VERSION = 1
+
+# Durée de validité par défaut du cache, en secondes
+DEFAULT_TTL = 900
+
+CACHE_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'pcUtils', 'host_facts.json'
+)
+
+# Commandes dont la présence est relevée (remplace les appels à which)
+COMMANDS = [
+    'mysql', 'psql', 'mysqldump', 'pg_dump', 'createdb', 'dropdb', 'createuser', 'dropuser',
+    'apache2ctl', 'apachectl', 'httpd', 'nginx',
+    'sestatus', 'aa-status', 'debconf-show', 'efibootmgr', 'findmnt',
+]
+
+# Services dont l'état est relevé
+SERVICES = ['mysql', 'mariadb', 'postgresql', 'apache2', 'httpd', 'nginx']
+
+# Valeurs debconf relevées: {paquet: [questions]}
+DEBCONF_QUESTIONS = {
+    'gend-base-config-debconf': ['gendebconf/srfic'],
+}
+DEBCONF_DB = '/var/cache/debconf/config.dat'
+
+# Valeurs LRPGN relevées (section DEFAULT)
+LRPGN_CONFIG_FILE = "/usr/lib/lrpgn/travail/configuration/conf.ini"
+LRPGN_KEYS = ['dossier.configuration', 'dossier.procedures']
+
+# Fichiers dont la modification invalide le cache (installation de paquets, comptes...)
+SOURCE_FILES = ['/var/lib/dpkg/status', '/etc/passwd', DEBCONF_DB, LRPGN_CONFIG_FILE]
+
+# Faits rendus obsolètes par chaque type de modification, pour invalidate()
+USER_FACTS = ('user_homes',)
+PACKAGE_FACTS = ('commands', 'services', 'db_type', 'webserver', 'mac_system', 'debconf')
+SERVICE_FACTS = ('services', 'webserver')
+
+# Profil courant du processus, défini par Main.start()
+_facts: Optional[Dict[str, Any]] = None
+
+def set_facts(facts: Optional[Dict[str, Any]]) -> None:
+    """
+    Définit le profil utilisé par les utilitaires du processus.
+
+    Args:
+        facts: Profil reçu dans la configuration (None pour le désactiver)
+    """
+    global _facts
+    _facts = facts if isinstance(facts, dict) and facts.get('version') == FACTS_VERSION else None
+
+def invalidate(*names: str) -> None:
+    """
+    Oublie des faits du profil courant après une modification de la machine.
+
+    Les utilitaires sondent alors la machine eux-mêmes pour ces faits.
+
+    Args:
+        *names: Faits à oublier (USER_FACTS, PACKAGE_FACTS...), tous si aucun
+    """
+    global _facts
+    if _facts is None:
+        return
+    if not names:
+        _facts = None
+        return
+    for name in names:
+        _facts.pop(name, None)
+
+def has_fact(name: str) -> bool:
+    """Indique si un fait est connu."""
+    return _facts is not None and name in _facts
+
+def get_fact(name: str, default: Any = None) -> Any:
+    """
+    Retourne un fait du profil courant.
+
+    Args:
+        name: Nom du fait
+        default: Valeur retournée si le fait est inconnu
+
+    Returns:
+        Any: Valeur du fait
+    """
+    if _facts is None:
+        return default
+    return _facts.get(name, default)
+
+def command_path(name: str) -> Optional[str]:
+    """
+    Retourne le chemin d'une commande relevée dans le profil.
+
+    Args:
+        name: Nom de la commande
+
+    Returns:
+        Optional[str]: Chemin, '' si la commande est absente, None si inconnu
+    """
+    commands = get_fact('commands')
+    if not isinstance(commands, dict) or name not in commands:
+        return None
+    return commands[name] or ''
+
+# --- Collecte ---
+
+def _run(cmd: List[str]) -> Optional[str]:
+    """Exécute une commande et retourne sa sortie standard (None en cas d'échec)."""
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True, timeout=10)
+        return result.stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _collect_uname() -> Dict[str, str]:
+    """Équivalent de KernelCommands.get_uname_info()."""
+    uname = os.uname()
+    info = {
+        'kernel_name': uname.sysname,
+        'node_name': uname.nodename,
+        'kernel_release': uname.release,
+        'kernel_version': uname.version,
+        'machine': uname.machine,
+    }
+    for flag, key in (('-o', 'operating_system'), ('-a', 'all')):
+        output = _run(['uname', flag])
+        info[key] = output.strip() if output else "N/A"
+    return info
+
+def _collect_user_homes() -> List[List[str]]:
+    """Équivalent de UserGroupCommands.get_all_user_homes()."""
+    user_homes = []
+    for entry in pwd.getpwall():
+        if (entry.pw_uid >= 1000 and entry.pw_dir.startswith('/home/')
+                and os.path.isdir(entry.pw_dir)
+                and entry.pw_name not in ['nobody', 'guest']):
+            user_homes.append([entry.pw_name, entry.pw_dir])
+
+    if not user_homes and os.path.isdir('/home/'):
+        for name in sorted(os.listdir('/home/')):
+            path = os.path.join('/home', name)
+            if os.path.isdir(path) and not name.startswith('.'):
+                user_homes.append([name, path])
+    return user_homes
+
+def _collect_services() -> Dict[str, str]:
+    """État systemd des services relevés (un seul appel à systemctl)."""
+    if not shutil.which('systemctl'):
+        return {}
+    output = _run(['systemctl', 'is-active'] + SERVICES)
+    if output is None:
+        return {}
+    states = output.split()
+    if len(states) != len(SERVICES):
+        return {}
+    return dict(zip(SERVICES, states))
+
+def _detect_db_type(commands: Dict[str, Optional[str]]) -> str:
+    """Équivalent de DatabaseCommands.detect_db_type()."""
+    if commands.get('mysql'):
+        return 'mysql'
+    if commands.get('psql'):
+        return 'postgres'
+    return 'unknown'
+
+def _detect_webserver(commands: Dict[str, Optional[str]], services: Dict[str, str]) -> Optional[str]:
+    """Équivalent de WebServerCommands.detect_webserver() (None si indéterminé)."""
+    apache_cmd = next((commands[name] for name in ['apache2ctl', 'apachectl', 'httpd'] if commands.get(name)), None)
+    nginx_cmd = commands.get('nginx')
+
+    if apache_cmd or nginx_cmd:
+        if not services:
+            # État des services inconnu: laisser l'utilitaire décider
+            return None
+        if apache_cmd:
+            if 'apache2ctl' in apache_cmd:
+                apache_service = 'apache2'
+            elif 'httpd' in apache_cmd:
+                apache_service = 'httpd'
+            else:
+                apache_service = 'apache2' if os.path.exists('/etc/init.d/apache2') else 'httpd'
+            if services.get(apache_service) == 'active':
+                return 'apache'
+        if nginx_cmd and services.get('nginx') == 'active':
+            return 'nginx'
+    if apache_cmd:
+        return 'apache'
+    if nginx_cmd:
+        return 'nginx'
+    return 'unknown'
+
+def _detect_mac_system(commands: Dict[str, Optional[str]]) -> Optional[str]:
+    """
+    Équivalent de MandatoryAccessControl.detect_mac_system(), sans droits root.
+
+    AppArmor est détecté via /sys/module/apparmor plutôt que par aa-status
+    (qui nécessite sudo). Retourne None si le résultat n'est pas certain.
+    """
+    sestatus = _run(['sestatus']) if commands.get('sestatus') else None
+    if sestatus and "SELinux status:" in sestatus and "enabled" in sestatus:
+        return 'selinux'
+
+    try:
+        with open('/sys/module/apparmor/parameters/enabled', 'r') as f:
+            if f.read().strip() == 'Y':
+                return 'apparmor'
+    except OSError:
+        pass
+
+    if sestatus and "disabled" in sestatus:
+        return 'none'
+    return None
+
+def _collect_debconf() -> Optional[Dict[str, Optional[str]]]:
+    """
+    Lit les valeurs debconf relevées dans la base de debconf.
+
+    Returns:
+        Optional[Dict[str, Optional[str]]]: {question: valeur ou None}, None si
+            la base n'est pas lisible
+    """
+    try:
+        with open(DEBCONF_DB, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    wanted = {question: package for package, questions in DEBCONF_QUESTIONS.items() for question in questions}
+    values: Dict[str, Optional[str]] = {question: None for question in wanted}
+    for record in content.split('\n\n'):
+        fields = {}
+        for line in record.splitlines():
+            key, separator, value = line.partition(':')
+            if separator and not line.startswith(' '):
+                fields[key.strip()] = value.strip()
+        question = fields.get('Name')
+        if question in wanted:
+            owners = [owner.strip() for owner in fields.get('Owners', '').split(',')]
+            if wanted[question] in owners:
+                values[question] = fields.get('Value')
+    return values
+
+def _collect_lrpgn() -> Optional[Dict[str, Optional[str]]]:
+    """Lit les valeurs LRPGN relevées (None si le fichier est absent ou illisible)."""
+    try:
+        with open(LRPGN_CONFIG_FILE, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+    except OSError:
+        return None
+
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    try:
+        parser.read_string(content)
+    except configparser.MissingSectionHeaderError:
+        parser.read_string("[DEFAULT]\n" + content)
+    except configparser.Error:
+        return None
+    return {key: parser.defaults().get(key) for key in LRPGN_KEYS}
+
+def _sources_stamp() -> Dict[str, Optional[int]]:
+    """Date de modification (ns) des fichiers sources du profil (None si absent)."""
+    stamp: Dict[str, Optional[int]] = {}
+    for path in SOURCE_FILES:
+        try:
+            stamp[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            stamp[path] = None
+    return stamp
+
+def collect() -> Dict[str, Any]:
+    """
+    Collecte le profil de la machine locale.
+
+    Returns:
+        Dict[str, Any]: Profil (les faits indéterminés sont absents)
+    """
+    commands = {name: shutil.which(name) for name in COMMANDS}
+    services = _collect_services()
+
+    facts: Dict[str, Any] = {
+        'version': FACTS_VERSION,
+        'collected_at': time.time(),
+        'sources': _sources_stamp(),
+        'uname': _collect_uname(),
+        'user_homes': _collect_user_homes(),
+        'efi': os.path.isdir('/sys/firmware/efi'),
+        'commands': commands,
+        'services': services,
+        'db_type': _detect_db_type(commands),
+    }
+
+    optional_facts = {
+        'webserver': _detect_webserver(commands, services),
+        'mac_system': _detect_mac_system(commands),
+        'debconf': _collect_debconf(),
+        'lrpgn': _collect_lrpgn(),
+    }
+    facts.update({name: value for name, value in optional_facts.items() if value is not None})
+    return facts
+
+def load(ttl: int = DEFAULT_TTL, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Retourne le profil de la machine locale, depuis le cache s'il est récent
+    et que ses fichiers sources n'ont pas changé.
+
+    Args:
+        ttl: Durée de validité du cache en secondes
+        refresh: Si True, ignore le cache
+
+    Returns:
+        Dict[str, Any]: Profil
+    """
+    if not refresh:
+        try:
+            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if (isinstance(cached, dict) and cached.get('version') == FACTS_VERSION
+                    and 0 <= time.time() - cached.get('collected_at', 0) < ttl
+                    and cached.get('sources') == _sources_stamp()):
+                # Services démarrés ou arrêtés depuis: aucun fichier source ne le signale
+                services = _collect_services()
+                cached['services'] = services
+                webserver = _detect_webserver(cached.get('commands') or {}, services)
+                if webserver is None:
+                    cached.pop('webserver', None)
+                else:
+                    cached['webserver'] = webserver
+                return cached
+        except (OSError, ValueError):
+            pass
+
+    facts = collect()
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), mode=0o700, exist_ok=True)
+        tmp_path = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(facts, f)
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError:
+        pass
+    return facts
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Affiche le profil de la machine en JSON")
+    parser.add_argument('--ttl', type=int, default=DEFAULT_TTL, help='Durée de validité du cache (secondes)')
+    parser.add_argument('--refresh', action='store_true', help='Ignorer le cache')
+    args = parser.parse_args()
+    json.dump(load(args.ttl, args.refresh), sys.stdout)
+    sys.stdout.write('\n')
@@ -6,6 +6,7 @@ Permet de lire/modifier les paramètres sysctl et de gérer les modules du noyau
 """
 
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import host_facts
 from typing import Union, Optional, List, Dict, Any
 
 class KernelCommands(PluginsUtilsBase):
@@ -28,6 +29,11 @@ class KernelCommands(PluginsUtilsBase):
             kernel_release, kernel_version, machine, operating_system).
         """
         self.log_info("Récupération des informations uname", log_levels=log_levels)
+        if host_facts.has_fact('uname'):
+            info = dict(host_facts.get_fact('uname'))
+            self.log_debug(f"Informations uname issues du profil de la machine: {info}", log_levels=log_levels)
+            return info
+
         info = {}
         options = {
             '-s': 'kernel_name',
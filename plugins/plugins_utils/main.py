@@ -3,6 +3,9 @@ import sys
 import json
 import traceback
 from plugins_utils import plugin_logger
+from plugins_utils import host_facts
+from plugins_utils import command_profiler
+from plugins_utils import apt_freshness
 
 
 
@@ -19,6 +22,16 @@ class Main:
             self.logger.error(error_msg)
             return returnValue
 
+        # Profil de la machine collecté par l'exécuteur, consulté par les utilitaires
+        host_facts.set_facts(config.pop('host_facts', None))
+
+        # Profilage des commandes demandé par l'exécuteur (option --profile)
+        command_profiler.enable(config.pop('profile_commands', False))
+
+        # Durée pendant laquelle un apt update d'un plugin précédent est réutilisé
+        if 'apt_update_max_age' in config:
+            apt_freshness.set_max_age(config.pop('apt_update_max_age'))
+
                 # Vérifier si la configuration est correcte
         if 'config' not in config:
             # Pour la compatibilité avec l'exécution locale, créer la structure attendue
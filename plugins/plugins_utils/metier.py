@@ -7,6 +7,7 @@ Module utilitaire pour les fonctions métier
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
 from plugins_utils.dpkg import DpkgCommands
 from plugins_utils.config_files import ConfigFileCommands
+from plugins_utils import host_facts
 import traceback
 LRPGN_CONFIG_FILE = "/usr/lib/lrpgn/travail/configuration/conf.ini"
 
@@ -27,19 +28,30 @@ class MetierCommands(PluginsUtilsBase):
         self.ssh_sms_enabled = config.get("ssh_sms_enabled",False)
         self.ssh_lrpgn_enabled = config.get("ssh_lrpgn_enabled",False)
         self.ssh_lrpgn = config.get("ssh_lrpgn","travail/commun/Icare/Configuration/")
-    #debug
+    #debug (reporté dans ui/execution_screen/preflight.py: METIER_FORCED_CHECKS)
         self.is_ssh = True
         self.ssh_sms_enabled = True
         self.ssh_lrpgn_enabled = True
     #fin debug
 
+    def _lrpgn_fact(self, key):
+        """Valeur LRPGN issue du profil de la machine (None si inconnue)."""
+        lrpgn = host_facts.get_fact('lrpgn')
+        if isinstance(lrpgn, dict) and key in lrpgn:
+            return lrpgn[key]
+        return None
+
     def get_lrpgn_config_line(self):
+        if host_facts.has_fact('lrpgn'):
+            return self._lrpgn_fact("dossier.configuration")
         try:
             return self.cfc.get_ini_value(LRPGN_CONFIG_FILE,"DEFAULT", "dossier.configuration")
         except Exception as e:
             return ""
 
     def get_lrpgn_procedures_line(self):
+        if host_facts.has_fact('lrpgn'):
+            return self._lrpgn_fact("dossier.procedures")
         try:
             return self.cfc.get_ini_value(LRPGN_CONFIG_FILE,"DEFAULT", "dossier.procedures")
         except Exception as e:
@@ -71,7 +83,11 @@ class MetierCommands(PluginsUtilsBase):
 
     def get_sms(self):
         try:
-            current_sms=self.dpkg.get_debconf_value("gend-base-config-debconf","gendebconf/srfic")
+            debconf = host_facts.get_fact('debconf')
+            if isinstance(debconf, dict) and "gendebconf/srfic" in debconf:
+                current_sms=debconf["gendebconf/srfic"]
+            else:
+                current_sms=self.dpkg.get_debconf_value("gend-base-config-debconf","gendebconf/srfic")
             if current_sms is None:
                 return []
             current_sms_tbl=current_sms.split(';')
@@ -81,4 +97,5 @@ class MetierCommands(PluginsUtilsBase):
             return []
 
     def should_process(self) -> bool:
+            # Toute modification doit être reportée dans preflight._metier_command (ui)
             return not self.config.get('ssh_mode', False) or (self.is_good_sms() and self.is_good_lrpgn())
\ No newline at end of file
@@ -4,17 +4,26 @@ Module utilitaire pour la gestion complète des fichiers de configuration et pr
 des applications Mozilla (Firefox, Thunderbird).
 Fournit des fonctionnalités avancées pour lire, écrire et manipuler les fichiers prefs.js,
 user.js, mozilla.cfg, policies.json et autres fichiers de configuration.
+Les modifications passent par un modèle sans perte (prefs_js) qui ne réécrit que
+les instructions modifiées; apply_prefs_policy applique des préférences à tous les
+profils Firefox/Thunderbird de tous les utilisateurs.
 """
 
 from plugins_utils.config_files import ConfigFileCommands
+from plugins_utils import prefs_js
+from plugins_utils.prefs_js import PrefsDocument, CFG_FUNCTIONS
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 import os
 import re
 import json
+import time
 import shutil
 import configparser
 import uuid
-from typing import Union, Optional, Dict, List, Any, Tuple
+import threading
+from typing import Union, Optional, Dict, List, Any, Tuple, Generator, Iterable
 
 
 class MozillaPrefsCommands(ConfigFileCommands):
@@ -24,6 +33,17 @@ class MozillaPrefsCommands(ConfigFileCommands):
     Gère les fichiers prefs.js, user.js, mozilla.cfg, policies.json et autres configurations.
     """
 
+    # Dossiers de profils par application, relatifs au home (paquet, snap, flatpak)
+    PROFILE_DIRS = {
+        'firefox': ['.mozilla/firefox', 'snap/firefox/common/.mozilla/firefox',
+                    '.var/app/org.mozilla.firefox/.mozilla/firefox'],
+        'thunderbird': ['.thunderbird', 'snap/thunderbird/common/.thunderbird',
+                        '.var/app/org.mozilla.Thunderbird/.thunderbird'],
+    }
+
+    # Première ligne d'un fichier .cfg créé (Mozilla ignore la première ligne)
+    CFG_HEADER = "// Mozilla Configuration File\n"
+
     def __init__(self, logger=None, target_ip=None):
         """
         Initialise le gestionnaire de fichiers de préférences Mozilla.
@@ -33,53 +53,6 @@ class MozillaPrefsCommands(ConfigFileCommands):
             target_ip: IP cible (pour les opérations à distance)
         """
         super().__init__(logger, target_ip)
-        self._pref_cache = {}  # Cache pour les préférences
-
-    def read_prefs_file(self, path: Union[str, Path], log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
-        """
-        Lit un fichier de préférences Mozilla (prefs.js ou user.js).
-        Utilise une analyse plus précise pour préserver le formatage exact.
-        """
-        file_path = Path(path) if isinstance(path, str) else path
-        self.log_debug(f"Lecture du fichier de préférences: {file_path}", log_levels=log_levels)
-
-        # Vérifier si les préférences sont déjà en cache
-        cache_key = str(file_path)
-        if cache_key in self._pref_cache:
-            self.log_debug(f"Utilisation des préférences en cache pour {file_path}", log_levels=log_levels)
-            return self._pref_cache[cache_key].copy()
-
-        # Lire le contenu du fichier
-        content = self._read_file_content(file_path)
-        if content is None:
-            return None
-
-        preferences = {}
-        # Utiliser une expression régulière plus précise
-        pref_pattern = re.compile(r'user_pref\("([^"]+)",\s*(.*?)\);')
-
-        for match in pref_pattern.finditer(content):
-            key = match.group(1)
-            value_str = match.group(2).strip()
-
-            # Stocker la valeur exacte telle qu'elle apparaît dans le fichier
-            if value_str.startswith('"') and value_str.endswith('"'):
-                # Préserver la valeur exacte de la chaîne (avec ses échappements)
-                raw_string = value_str[1:-1]
-                preferences[key] = {"_raw_value": True, "value": raw_string}
-            else:
-                # Pour les non-chaînes (booléens, nombres, etc.)
-                try:
-                    preferences[key] = self._convert_pref_value(value_str)
-                except Exception as e:
-                    self.log_warning(f"Erreur lors de la conversion de la valeur pour {key}: {e}", log_levels=log_levels)
-                    preferences[key] = value_str
-
-        # Mettre en cache les préférences lues
-        self._pref_cache[cache_key] = preferences.copy()
-        self.log_debug(f"Fichier de préférences lu: {len(preferences)} préférences trouvées", log_levels=log_levels)
-
-        return preferences
 
     def write_prefs_file(self, path: Union[str, Path], prefs: Dict[str, Any], backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -115,9 +88,7 @@ class MozillaPrefsCommands(ConfigFileCommands):
         # Écrire le fichier
         success = self._write_file_content(file_path, content, backup=backup)
 
-        # Mettre à jour le cache si l'écriture réussit
         if success:
-            self._pref_cache[str(file_path)] = prefs.copy()
             self.log_success(f"Fichier de préférences écrit avec succès: {len(prefs)} préférences", log_levels=log_levels)
         else:
             self.log_error(f"Échec de l'écriture du fichier de préférences: {file_path}", log_levels=log_levels)
@@ -155,17 +126,7 @@ class MozillaPrefsCommands(ConfigFileCommands):
         Returns:
             bool: True si la modification réussit, False sinon
         """
-        # Lire les préférences existantes
-        prefs = self.read_prefs_file(path)
-        if prefs is None:
-            # Si le fichier n'existe pas, créer un nouveau dictionnaire
-            prefs = {}
-
-        # Mettre à jour la préférence
-        prefs[pref_name] = value
-
-        # Écrire les préférences mises à jour
-        return self.write_prefs_file(path, prefs, backup=backup)
+        return self.set_multiple_prefs(path, {pref_name: value}, backup=backup, log_levels=log_levels)
 
     def remove_pref(self, path: Union[str, Path], pref_name: str, backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
@@ -179,21 +140,16 @@ class MozillaPrefsCommands(ConfigFileCommands):
         Returns:
             bool: True si la suppression réussit, False sinon
         """
-        # Lire les préférences existantes
-        prefs = self.read_prefs_file(path)
-        if prefs is None:
+        file_path = Path(path) if isinstance(path, str) else path
+        if not file_path.exists():
+            self.log_error(f"Fichier de préférences introuvable: {file_path}", log_levels=log_levels)
             return False
 
-        # Vérifier si la préférence existe
-        if pref_name not in prefs:
-            self.log_warning(f"La préférence '{pref_name}' n'existe pas dans {path}", log_levels=log_levels)
-            return True  # Considéré comme un succès puisque le résultat est le même
-
-        # Supprimer la préférence
-        del prefs[pref_name]
-
-        # Écrire les préférences mises à jour
-        return self.write_prefs_file(path, prefs, backup=backup)
+        with self.edit_prefs(file_path, backup=backup, log_levels=log_levels) as document:
+            if not document.remove(pref_name):
+                self.log_warning(f"La préférence '{pref_name}' n'existe pas dans {path}", log_levels=log_levels)
+                return True  # Considéré comme un succès puisque le résultat est le même
+        return document.committed
 
     def get_prefs_by_prefix(self, path: Union[str, Path], prefix: str, log_levels: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """
@@ -225,17 +181,53 @@ class MozillaPrefsCommands(ConfigFileCommands):
         Returns:
             bool: True si la modification réussit, False sinon
         """
-        # Lire les préférences existantes
-        prefs = self.read_prefs_file(path)
-        if prefs is None:
-            # Si le fichier n'existe pas, créer un nouveau dictionnaire
-            prefs = {}
+        literals = {name: self._format_pref_value(value) for name, value in prefs_to_set.items()}
+        with self.edit_prefs(path, backup=backup, log_levels=log_levels) as document:
+            changed = document.set_many(literals)
+        if document.committed and changed:
+            self.log_debug(f"{changed} préférence(s) modifiée(s) dans {path}", log_levels=log_levels)
+        return document.committed
+
+    @contextmanager
+    def edit_prefs(self, path: Union[str, Path], backup: bool = True, header: Optional[str] = None,
+                   log_levels: Optional[Dict[str, str]] = None) -> Generator[PrefsDocument, None, None]:
+        """
+        Ouvre une session d'édition d'un fichier de préférences (prefs.js, user.js, .cfg).
 
-        # Mettre à jour les préférences
-        prefs.update(prefs_to_set)
+        Toutes les modifications faites sur le document dans le bloc `with`
+        sont écrites en une seule fois à la sortie, seulement si le contenu a
+        changé; commentaires, code et instructions non modifiées sont
+        conservés tels quels. Une exception dans le bloc annule l'écriture.
+        Les valeurs se passent sous forme littérale (voir _format_pref_value).
 
-        # Écrire les préférences mises à jour
-        return self.write_prefs_file(path, prefs, backup=backup)
+        Exemple:
+            with mozilla.edit_prefs(prefs_path) as doc:
+                doc.set('browser.startup.homepage', mozilla._format_pref_value('https://intranet'))
+                doc.remove('network.proxy.http')
+
+        Args:
+            path: Chemin du fichier (il sera créé s'il n'existe pas)
+            backup: Si True, crée une sauvegarde du fichier original avant l'écriture
+            header: Texte initial d'un fichier créé ou vide
+
+        Yields:
+            PrefsDocument: Document (voir committed après le bloc)
+        """
+        file_path = Path(path) if isinstance(path, str) else path
+        self.log_debug(f"Édition du fichier de préférences: {file_path}", log_levels=log_levels)
+
+        with self.edit(file_path, backup=backup, log_levels=log_levels) as session:
+            if session.content is None:
+                self.log_error(f"Impossible de lire le fichier de préférences {file_path}", log_levels=log_levels)
+            document = prefs_js.parse(session.content or "")
+            yield document
+            if session.content is not None:
+                content = document.render()
+                if header and not session.content.strip() and content.strip():
+                    content = header + content
+                session.content = content
+
+        document.committed = session.committed
 
     def find_profile_path(self, app_name: str = "thunderbird", profile_name: Optional[str] = None, log_levels: Optional[Dict[str, str]] = None) -> Optional[Path]:
         """
@@ -273,37 +265,194 @@ class MozillaPrefsCommands(ConfigFileCommands):
 
         # Analyser les fichiers profiles.ini trouvés
         for ini_path in ini_paths:
-            try:
-                config = configparser.ConfigParser()
-                config.read(ini_path)
-
-                # Chercher les sections de profil (Profile0, Profile1, etc.)
-                for section in config.sections():
-                    if section.startswith('Profile'):
-                        # Vérifier si c'est le profil par défaut ou celui spécifié
-                        if (profile_name is None and config.getboolean(section, 'Default', fallback=False)) or \
-                           (profile_name is not None and config.get(section, 'Name', fallback='') == profile_name):
-
-                            # Obtenir le chemin du profil
-                            if config.getboolean(section, 'IsRelative', fallback=True):
-                                # Chemin relatif au dossier parent de profiles.ini
-                                profile_path = os.path.join(os.path.dirname(ini_path),
-                                                           config.get(section, 'Path'))
-                            else:
-                                # Chemin absolu
-                                profile_path = config.get(section, 'Path')
-
-                            if os.path.isdir(profile_path):
-                                self.log_debug(f"Profil {app_name} trouvé: {profile_path}", log_levels=log_levels)
-                                return Path(profile_path)
-
-            except (configparser.Error, IOError) as e:
-                self.log_warning(f"Erreur lors de la lecture de {ini_path}: {e}", log_levels=log_levels)
+            for profile in self._read_profiles_ini(ini_path, log_levels=log_levels):
+                # Vérifier si c'est le profil par défaut ou celui spécifié
+                if (profile_name is None and profile['default']) or \
+                   (profile_name is not None and profile['name'] == profile_name):
+                    if profile['path'].is_dir():
+                        self.log_debug(f"Profil {app_name} trouvé: {profile['path']}", log_levels=log_levels)
+                        return profile['path']
 
         self.log_warning(f"Aucun profil {app_name} trouvé" +
                         (f" avec le nom '{profile_name}'" if profile_name else ""), log_levels=log_levels)
         return None
 
+    def _read_profiles_ini(self, ini_path: Union[str, Path], log_levels: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Lit les profils déclarés dans un fichier profiles.ini.
+
+        Args:
+            ini_path: Chemin du fichier profiles.ini
+
+        Returns:
+            List[Dict[str, Any]]: Profils {name, path, default}, dans l'ordre du fichier
+        """
+        profiles = []
+        try:
+            config = configparser.ConfigParser()
+            config.read(ini_path)
+
+            # Sections de profil (Profile0, Profile1, etc.)
+            for section in config.sections():
+                if not section.startswith('Profile') or not config.has_option(section, 'Path'):
+                    continue
+                if config.getboolean(section, 'IsRelative', fallback=True):
+                    # Chemin relatif au dossier de profiles.ini
+                    profile_path = os.path.join(os.path.dirname(ini_path), config.get(section, 'Path'))
+                else:
+                    profile_path = config.get(section, 'Path')
+                profiles.append({
+                    'name': config.get(section, 'Name', fallback=''),
+                    'path': Path(profile_path),
+                    'default': config.getboolean(section, 'Default', fallback=False),
+                })
+        except (configparser.Error, IOError, ValueError) as e:
+            self.log_warning(f"Erreur lors de la lecture de {ini_path}: {e}", log_levels=log_levels)
+        return profiles
+
+    def _profile_homes(self, users: Optional[Iterable[str]] = None,
+                       log_levels: Optional[Dict[str, str]] = None) -> List[Tuple[str, str]]:
+        """Répertoires home à parcourir (utilisateurs et root), éventuellement filtrés."""
+        from .users_groups import UserGroupCommands
+        homes = list(UserGroupCommands(self.logger, self.target_ip).get_all_user_homes(log_levels=log_levels))
+        if os.path.isdir('/root') and all(name != 'root' for name, _ in homes):
+            homes.append(('root', '/root'))
+        if users is not None:
+            wanted = set(users)
+            homes = [(name, home) for name, home in homes if name in wanted]
+        return homes
+
+    def find_all_profiles(self, apps: Iterable[str] = ('firefox', 'thunderbird'),
+                          users: Optional[Iterable[str]] = None,
+                          log_levels: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Trouve tous les profils Firefox/Thunderbird de tous les utilisateurs.
+
+        Les profils sont lus dans les profiles.ini des installations paquet,
+        snap et flatpak (PROFILE_DIRS) de chaque répertoire home.
+
+        Args:
+            apps: Applications recherchées ('firefox', 'thunderbird')
+            users: Noms des utilisateurs à retenir, None pour tous
+
+        Returns:
+            List[Dict[str, Any]]: Profils {user, home, app, name, path, default}
+        """
+        profiles = []
+        seen = set()
+        for user, home in self._profile_homes(users, log_levels=log_levels):
+            for app in apps:
+                for relative_dir in self.PROFILE_DIRS.get(app, []):
+                    ini_path = os.path.join(home, relative_dir, 'profiles.ini')
+                    if not os.path.isfile(ini_path):
+                        continue
+                    for profile in self._read_profiles_ini(ini_path, log_levels=log_levels):
+                        real_path = os.path.realpath(profile['path'])
+                        if real_path in seen or not profile['path'].is_dir():
+                            continue
+                        seen.add(real_path)
+                        profiles.append(dict(profile, user=user, home=home, app=app))
+
+        self.log_debug(f"{len(profiles)} profil(s) Mozilla trouvé(s)", log_levels=log_levels)
+        return profiles
+
+    def apply_prefs_policy(self, prefs: Dict[str, Any], apps: Iterable[str] = ('firefox', 'thunderbird'),
+                           users: Optional[Iterable[str]] = None, remove: Optional[Iterable[str]] = None,
+                           prefs_file: str = 'user.js', max_workers: int = 8, backup: bool = True,
+                           log_levels: Optional[Dict[str, str]] = None) -> Dict[str, bool]:
+        """
+        Applique des préférences à tous les profils Mozilla de tous les utilisateurs.
+
+        Chaque fichier est lu, modifié et écrit une seule fois (edit_prefs), et
+        seulement s'il change; les profils sont traités en parallèle, chaque
+        thread avec sa propre instance (le mode sudo et les sauvegardes sont
+        décidés par instance). Par défaut les préférences vont dans user.js,
+        relu à chaque démarrage: prefs.js est réécrit par l'application à sa
+        fermeture. Un fichier créé appartient au propriétaire du profil.
+
+        Args:
+            prefs: Préférences à définir {nom: valeur}
+            apps: Applications concernées ('firefox', 'thunderbird')
+            users: Noms des utilisateurs concernés, None pour tous
+            remove: Noms des préférences à supprimer
+            prefs_file: Fichier du profil à modifier ('user.js' ou 'prefs.js')
+            max_workers: Nombre maximal de profils traités simultanément
+            backup: Si True, sauvegarde chaque fichier avant modification
+
+        Returns:
+            Dict[str, bool]: {chemin du fichier: succès}
+        """
+        profiles = self.find_all_profiles(apps, users, log_levels=log_levels)
+        if not profiles:
+            self.log_warning("Aucun profil Mozilla trouvé, aucune préférence appliquée", log_levels=log_levels)
+            return {}
+
+        # Valeurs formatées une seule fois pour tous les profils
+        literals = {name: self._format_pref_value(value) for name, value in prefs.items()}
+        to_remove = list(remove or [])
+
+        # Une instance par thread: _sudo_mode ne doit pas être partagé entre profils
+        local = threading.local()
+
+        def worker_commands() -> 'MozillaPrefsCommands':
+            if not hasattr(local, 'commands'):
+                local.commands = self.__class__(self.logger, self.target_ip)
+            return local.commands
+
+        def apply_profile(profile: Dict[str, Any]) -> Tuple[str, bool]:
+            commands = worker_commands()
+            file_path = profile['path'] / prefs_file
+            created = not file_path.exists()
+            try:
+                with commands.edit_prefs(file_path, backup=backup, log_levels=log_levels) as document:
+                    document.set_many(literals)
+                    for name in to_remove:
+                        document.remove(name)
+                success = bool(document.committed)
+                if success and created and file_path.exists():
+                    success = commands._give_to_profile_owner(file_path, profile['path'], log_levels=log_levels)
+            except Exception as e:
+                self.log_error(f"Erreur lors de l'application des préférences à {file_path}: {e}", log_levels=log_levels)
+                success = False
+            return str(file_path), success
+
+        workers = max(1, min(max_workers, len(profiles)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(executor.map(apply_profile, profiles))
+
+        failed = [path for path, success in results.items() if not success]
+        if failed:
+            self.log_warning(f"Préférences non appliquées à {len(failed)}/{len(results)} profil(s): {', '.join(failed)}",
+                             log_levels=log_levels)
+        else:
+            self.log_success(f"Préférences appliquées à {len(results)} profil(s) Mozilla", log_levels=log_levels)
+        return results
+
+    def _give_to_profile_owner(self, file_path: Path, profile_path: Path,
+                               log_levels: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Donne un fichier créé dans un profil au propriétaire de ce profil.
+
+        Args:
+            file_path: Fichier créé
+            profile_path: Dossier du profil
+
+        Returns:
+            bool: True si le fichier appartient au propriétaire du profil
+        """
+        profile_stat = os.stat(profile_path)
+        file_stat = os.stat(file_path)
+        if (file_stat.st_uid, file_stat.st_gid) == (profile_stat.st_uid, profile_stat.st_gid):
+            return True
+        if os.geteuid() == 0:
+            os.chown(file_path, profile_stat.st_uid, profile_stat.st_gid)
+            return True
+        success, _, stderr = self.run(['chown', f"{profile_stat.st_uid}:{profile_stat.st_gid}", str(file_path)],
+                                      check=False, needs_sudo=True, no_output=True)
+        if not success:
+            self.log_error(f"Impossible de donner {file_path} au propriétaire du profil: {stderr}", log_levels=log_levels)
+        return success
+
     def backup_prefs_file(self, path: Union[str, Path], log_levels: Optional[Dict[str, str]] = None) -> Optional[str]:
         """
         Crée une sauvegarde d'un fichier de préférences.
@@ -342,18 +491,20 @@ class MozillaPrefsCommands(ConfigFileCommands):
         """
         file_path = Path(path) if isinstance(path, str) else path
         self.log_debug(f"Lecture du fichier de préférences: {file_path}", log_levels=log_levels)
+        return self._read_parsed(file_path, 'mozilla_prefs',
+                                 lambda content: self._parse_prefs_content(content, log_levels=log_levels),
+                                 log_levels=log_levels)
 
-        # Vérifier si les préférences sont déjà en cache
-        cache_key = str(file_path)
-        if cache_key in self._pref_cache:
-            self.log_debug(f"Utilisation des préférences en cache pour {file_path}", log_levels=log_levels)
-            return self._pref_cache[cache_key].copy()
+    def _parse_prefs_content(self, content: str, log_levels: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Analyse le contenu d'un fichier de préférences Mozilla.
 
-        # Lire le contenu du fichier
-        content = self._read_file_content(file_path)
-        if content is None:
-            return None
+        Args:
+            content: Contenu du fichier prefs.js ou user.js
 
+        Returns:
+            Dict[str, Any]: Dictionnaire des préférences {nom: valeur}
+        """
         preferences = {}
         # Utiliser une expression régulière pour extraire les préférences correctement
         pref_pattern = re.compile(r'user_pref\("([^"]+)",\s*(.*?)\);')
@@ -371,8 +522,6 @@ class MozillaPrefsCommands(ConfigFileCommands):
                 # Conserver la valeur brute en cas d'erreur
                 preferences[key] = value_str
 
-        # Mettre en cache les préférences lues
-        self._pref_cache[cache_key] = preferences.copy()
         self.log_debug(f"Fichier de préférences lu: {len(preferences)} préférences trouvées", log_levels=log_levels)
 
         return preferences
@@ -390,12 +539,21 @@ class MozillaPrefsCommands(ConfigFileCommands):
         """
         file_path = Path(path) if isinstance(path, str) else path
         self.log_debug(f"Lecture du fichier policies.json: {file_path}", log_levels=log_levels)
+        return self._read_parsed(file_path, 'mozilla_policies',
+                                 lambda content: self._parse_policies_content(file_path, content, log_levels=log_levels),
+                                 log_levels=log_levels)
 
-        # Lire le contenu du fichier
-        content = self._read_file_content(file_path)
-        if content is None:
-            return None
+    def _parse_policies_content(self, file_path: Path, content: str, log_levels: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Analyse le contenu d'un fichier policies.json.
+
+        Args:
+            file_path: Chemin du fichier (pour les messages)
+            content: Contenu du fichier
 
+        Returns:
+            Optional[Dict[str, Any]]: Structure de politiques ou None en cas d'erreur
+        """
         try:
             # Parser le JSON
             policies = json.loads(content)
@@ -496,13 +654,20 @@ install_dir: Optional[Union[str, Path]] = None, log_levels: Optional[Dict[str, s
         """
         file_path = Path(path) if isinstance(path, str) else path
         self.log_debug(f"Lecture du fichier .cfg: {file_path}", log_levels=log_levels)
+        return self._read_parsed(file_path, 'mozilla_cfg',
+                                 lambda content: self._parse_cfg_content(content, log_levels=log_levels),
+                                 log_levels=log_levels)
 
-        # Lire le contenu du fichier
-        content = self._read_file_content(file_path)
-        if content is None:
-            return None
+    def _parse_cfg_content(self, content: str, log_levels: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyse le contenu d'un fichier .cfg de Mozilla.
+
+        Args:
+            content: Contenu du fichier .cfg
 
-        # Analyse du fichier .cfg
+        Returns:
+            Dict[str, Dict[str, Any]]: Dictionnaire des préférences {nom: {value, type}}
+        """
         prefs = {}
 
         # Patterns pour les différents types de préférences
@@ -603,16 +768,7 @@ backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         Returns:
             bool: True si l'ajout réussit, False sinon
         """
-        # Lire les préférences existantes
-        prefs = self.read_cfg_file(path)
-        if prefs is None:
-            prefs = {}
-
-        # Ajouter ou mettre à jour la préférence verrouillée
-        prefs[pref_name] = {"value": value, "type": "lockPref"}
-
-        # Écrire les préférences mises à jour
-        return self.write_cfg_file(path, prefs, backup=backup)
+        return self.set_cfg_prefs(path, {pref_name: value}, pref_type="lockPref", backup=backup, log_levels=log_levels)
 
     def add_defaultpref_to_cfg(self, path: Union[str, Path], pref_name: str, value: Any,
 backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
@@ -628,17 +784,36 @@ backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
         Returns:
             bool: True si l'ajout réussit, False sinon
         """
-        # Lire les préférences existantes
-        prefs = self.read_cfg_file(path)
-        if prefs is None:
-            prefs = {}
+        return self.set_cfg_prefs(path, {pref_name: value}, pref_type="defaultPref", backup=backup, log_levels=log_levels)
+
+    def set_cfg_prefs(self, path: Union[str, Path], prefs: Dict[str, Any], pref_type: str = "lockPref",
+                      backup: bool = True, log_levels: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Définit plusieurs préférences d'un fichier .cfg en une seule écriture.
+
+        Une préférence déjà présente (pref, defaultPref ou lockPref) est
+        convertie sur place; une préférence verrouillée n'est jamais
+        rétrogradée en defaultPref.
+
+        Args:
+            path: Chemin du fichier .cfg
+            prefs: Préférences à définir {nom: valeur}
+            pref_type: Fonction des préférences ('lockPref', 'defaultPref' ou 'pref')
+            backup: Si True, crée une sauvegarde du fichier original
 
-        # Ajouter ou mettre à jour la préférence par défaut (sauf si déjà verrouillée)
-        if pref_name not in prefs or prefs[pref_name]["type"] != "lockPref":
-            prefs[pref_name] = {"value": value, "type": "defaultPref"}
+        Returns:
+            bool: True si la modification réussit, False sinon
+        """
+        if pref_type not in CFG_FUNCTIONS:
+            self.log_error(f"Type de préférence .cfg invalide: {pref_type}", log_levels=log_levels)
+            return False
 
-        # Écrire les préférences mises à jour
-        return self.write_cfg_file(path, prefs, backup=backup)
+        with self.edit_prefs(path, backup=backup, header=self.CFG_HEADER, log_levels=log_levels) as document:
+            for name, value in prefs.items():
+                if pref_type != "lockPref" and document.get(name, ("lockPref",)) is not None:
+                    continue
+                document.set(name, self._format_pref_value(value), func=pref_type, replace=CFG_FUNCTIONS)
+        return document.committed
 
     def configure_autoconfig(self, install_dir: Optional[Union[str, Path]] = None, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
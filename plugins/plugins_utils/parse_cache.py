@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache partagé des fichiers de configuration analysés.
+
+ConfigFileCommands relisait et ré-analysait le fichier à chaque
+read_ini_file, read_json_file, read_block_config_file ou
+get_line_containing; DovecotCommands et MozillaPrefsCommands gardaient
+leur propre cache par instance, sans jamais vérifier si le fichier avait
+changé. Ce module conserve, pour tout le processus, le résultat de
+l'analyse de chaque fichier et de chaque format, associé à la signature
+du fichier (date de modification, taille, inode) relevée avant la
+lecture: une entrée n'est servie que si la signature est inchangée.
+
+Le nombre d'entrées est borné (les moins récemment utilisées sont
+oubliées) et ConfigFileCommands invalide le fichier après chacune de ses
+propres écritures. Les valeurs sont copiées à l'entrée et à la sortie du
+cache: les appelants peuvent modifier ce qu'ils reçoivent.
+
+Ce module n'importe rien de plugins_utils.
+"""
+
+import os
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple, Union
+
+# Nombre maximal d'analyses conservées (tous formats confondus)
+DEFAULT_MAX_ENTRIES = 256
+
+def file_signature(path: Union[str, os.PathLike]) -> Optional[Tuple[int, int, int]]:
+    """
+    Identité d'un fichier pour le cache.
+
+    Args:
+        path: Chemin du fichier
+
+    Returns:
+        Optional[Tuple[int, int, int]]: (mtime_ns, taille, inode), None si le
+        fichier n'existe pas ou ne peut pas être examiné
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+class ParseCache:
+    """
+    Cache borné des analyses de fichiers, par chemin et par format.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialise un cache vide.
+
+        Args:
+            max_entries: Nombre maximal d'entrées conservées
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[Tuple[int, int, int], Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: Union[str, os.PathLike], kind: str) -> Tuple[str, str]:
+        return (os.path.abspath(os.fspath(path)), kind)
+
+    def get(self, path: Union[str, os.PathLike], kind: str,
+            signature: Optional[Tuple[int, int, int]]) -> Tuple[bool, Any]:
+        """
+        Cherche l'analyse d'un fichier.
+
+        Args:
+            path: Chemin du fichier
+            kind: Format de l'analyse ('ini', 'json', 'dovecot'...)
+            signature: Signature actuelle du fichier (file_signature)
+
+        Returns:
+            Tuple[bool, Any]: (trouvée, copie de la valeur)
+        """
+        if signature is None:
+            return False, None
+        key = self._key(path, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return True, copy.deepcopy(value)
+
+    def put(self, path: Union[str, os.PathLike], kind: str,
+            signature: Optional[Tuple[int, int, int]], value: Any) -> None:
+        """
+        Enregistre l'analyse d'un fichier.
+
+        Args:
+            path: Chemin du fichier
+            kind: Format de l'analyse
+            signature: Signature du fichier relevée avant sa lecture
+            value: Résultat de l'analyse
+        """
+        if signature is None or self.max_entries <= 0:
+            return
+        key = self._key(path, kind)
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: Optional[Union[str, os.PathLike]] = None) -> None:
+        """
+        Oublie les analyses d'un fichier (tous formats), ou tout le cache.
+
+        Args:
+            path: Chemin du fichier, None pour vider le cache
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            file_path = os.path.abspath(os.fspath(path))
+            for key in [key for key in self._entries if key[0] == file_path]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Cache partagé par les utilitaires du processus
+_cache: Optional[ParseCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> ParseCache:
+    """
+    Retourne le cache partagé des fichiers analysés.
+
+    Returns:
+        ParseCache: Cache du processus
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ParseCache()
+        return _cache
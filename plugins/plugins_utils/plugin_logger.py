@@ -21,6 +21,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional, Union, List, Tuple, Deque
 from collections import deque
 
+from plugins_utils.command_profiler import PROFILE_TYPE, format_profile
+
 # Logger interne pour les problèmes du PluginLogger lui-même
 internal_logger = logging.getLogger(__name__)
 internal_logger.setLevel(logging.WARNING)
@@ -39,6 +41,7 @@ ANSI_COLORS = {
     "debug": "\033[0;36m",     # Cyan
     "start": "\033[0;34m",     # Bleu
     "end": "\033[0;35m",       # Magenta
+    "profile": "\033[0;90m",   # Gris
     "timestamp": "\033[0;90m", # Gris
     "target_ip": "\033[0;95m", # Magenta clair
     "progress_bar": "\033[0;34m", # Bleu pour la barre par défaut
@@ -459,7 +462,7 @@ class PluginLogger:
         # Redirection de niveau si définie
         override_level = (log_levels or {}).get(level, level)
 
-        known_levels = {"info", "warning", "error", "success", "debug", "start", "end", "progress", "progress-text"}
+        known_levels = {"info", "warning", "error", "success", "debug", "start", "end", "progress", "progress-text", "profile"}
         if override_level not in known_levels:
             return
 
@@ -510,6 +513,13 @@ class PluginLogger:
     def end(self, message: str, target_ip: Optional[str] = None, force_flush: bool = False, log_levels: Optional[Dict[str, str]] = None):
         self._emit_log("end", message, target_ip, force_flush)
 
+    def profile(self, data: Dict[str, Any], target_ip: Optional[str] = None):
+        """Émet le profil d'une commande (voir command_profiler), agrégé par le contrôleur."""
+        if self.text_mode:
+            self._emit_log("profile", format_profile(data), target_ip)
+        else:
+            self._emit_log("profile", {"type": PROFILE_TYPE, "data": data}, target_ip)
+
     # --- Gestion Progression Numérique (JSONL) ---
 
     def set_total_steps(self, total: int, pb_id: Optional[str] = None, log_levels: Optional[Dict[str, str]] = None):
@@ -20,6 +20,7 @@ import asyncio
 from typing import Union, Optional, List, Tuple, Dict, Any, Set
 
 from plugins_utils.plugin_logger import PluginLogger, is_debugger_active
+from plugins_utils import command_profiler
 
 DEFAULT_COMMAND_TIMEOUT = 300  # 5 minutes par défaut
 
@@ -379,6 +380,7 @@ show_progress: bool = True, log_levels: Optional[Dict[str, str]] = None) -> Tupl
             stdout_data = []
             stderr_data = []
             process = None
+            return_code = None
             start_time = time.monotonic()
 
             try:
@@ -598,6 +600,12 @@ show_progress: bool = True, log_levels: Optional[Dict[str, str]] = None) -> Tupl
                         except Exception:
                             pass  # Ignorer les erreurs finales
 
+                # Profil de la commande (option --profile), agrégé par le contrôleur
+                if command_profiler.is_enabled():
+                    self._emit_command_profile(cmd_list, use_sudo, time.monotonic() - start_time,
+                                               process, return_code, stdout_data, stderr_data,
+                                               sudo_password)
+
                 # Dernier flush des logs pour s'assurer que tout est bien traité
                 if hasattr(self.logger, 'flush'):
                     try:
@@ -605,6 +613,34 @@ show_progress: bool = True, log_levels: Optional[Dict[str, str]] = None) -> Tupl
                     except Exception:
                         pass  # Ignorer les erreurs lors du flush final
 
+    def _emit_command_profile(self, cmd: Union[str, List[str]], use_sudo: bool, duration: float,
+                              process: Optional[subprocess.Popen], return_code: Optional[int],
+                              stdout_data: List[str], stderr_data: List[str],
+                              sudo_password: Optional[str]) -> None:
+        """
+        Émet le profil d'une commande exécutée par run() dans le flux de logs.
+
+        Args:
+            cmd: Commande exécutée (sans le préfixe sudo)
+            use_sudo: Si la commande a été lancée via sudo
+            duration: Durée en secondes
+            process: Processus lancé (None si le lancement a échoué)
+            return_code: Code de retour connu (None si la commande n'a pas abouti)
+            stdout_data: Lignes de la sortie standard
+            stderr_data: Lignes de la sortie d'erreur
+            sudo_password: Mot de passe sudo à masquer
+        """
+        try:
+            if process is not None and process.returncode is not None and return_code is not None:
+                return_code = process.returncode
+            self.logger.profile(command_profiler.build_profile(
+                cmd, use_sudo, duration, return_code,
+                "\n".join(stdout_data), "\n".join(stderr_data), sudo_password
+            ))
+        except Exception as e:
+            # Le profilage ne doit jamais faire échouer la commande
+            self.log_debug(f"Profil de commande non émis: {e}")
+
     def _read_process_output_optimized(self, process, timeout, task_id, is_apt,
                                   log_output, error_as_warning, show_progress, log_levels: Optional[Dict[str, str]] = None):
         """
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modèle sans perte des fichiers de préférences Mozilla (prefs.js, user.js,
+mozilla.cfg, autoconfig.js).
+
+MozillaPrefsCommands lisait et analysait tout prefs.js puis le régénérait
+(en-tête, préférences triées) à chaque set_pref; set_multiple_prefs et
+add_lockpref_to_cfg faisaient de même, et les commentaires ou le code
+JavaScript d'un mozilla.cfg étaient perdus.
+
+Ici, le fichier est découpé en instructions `user_pref(...)`, `pref(...)`,
+`defaultPref(...)`, `lockPref(...)`, `sticky_pref(...)` et en texte
+intermédiaire (commentaires, code, blancs) conservé tel quel. Une
+modification ne régénère que l'instruction concernée; un index par nom de
+préférence rend chaque modification indépendante de la taille du fichier,
+et un document peut en recevoir autant que nécessaire avant une seule
+écriture (voir MozillaPrefsCommands.edit_prefs).
+
+Les valeurs sont manipulées sous leur forme littérale JavaScript
+(`true`, `42`, `"texte"`): la conversion depuis et vers Python reste
+celle de MozillaPrefsCommands (_convert_pref_value, _format_pref_value).
+
+Ce module n'importe rien de plugins_utils.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Union
+
+# Fonctions de préférence reconnues
+PREF_FUNCTIONS = ('user_pref', 'pref', 'defaultPref', 'lockPref', 'sticky_pref')
+# Fonctions d'un fichier .cfg (autoconfig)
+CFG_FUNCTIONS = ('pref', 'defaultPref', 'lockPref')
+
+_STRING = r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\''
+# Commentaires (ignorés) ou instruction de préférence
+_TOKEN_RE = re.compile(
+    r'//[^\n]*|/\*.*?\*/'
+    r'|(?<![\w.])(?P<func>' + '|'.join(PREF_FUNCTIONS) + r')\s*\(\s*'
+    r'(?P<name>' + _STRING + r')\s*,\s*'
+    r'(?P<value>' + _STRING + r'|[^()"\';\n]*?)\s*\)[ \t]*;?',
+    re.S,
+)
+
+def _unquote(literal: str) -> str:
+    """Nom d'une préférence à partir de son littéral JavaScript."""
+    return re.sub(r'\\(.)', r'\1', literal[1:-1])
+
+class PrefStatement:
+    """
+    Instruction `fonction("nom", valeur);`.
+
+    Attributs:
+        func: Fonction ('user_pref', 'lockPref'...).
+        name: Nom de la préférence.
+        literal: Valeur sous forme littérale JavaScript.
+        raw: Texte de l'instruction, régénéré quand elle change.
+    """
+
+    __slots__ = ('func', 'name', 'name_literal', 'literal', 'raw')
+
+    def __init__(self, func: str, name: str, literal: str, name_literal: Optional[str] = None,
+                 raw: Optional[str] = None):
+        self.func = func
+        self.name = name
+        self.name_literal = name_literal or '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        self.literal = literal
+        self.raw = raw if raw is not None else self._format()
+
+    def _format(self) -> str:
+        return f'{self.func}({self.name_literal}, {self.literal});'
+
+    def update(self, literal: str, func: Optional[str] = None) -> bool:
+        """
+        Change la valeur (et éventuellement la fonction) de l'instruction.
+
+        Returns:
+            bool: True si l'instruction a changé
+        """
+        func = func or self.func
+        if literal == self.literal and func == self.func:
+            return False
+        self.literal = literal
+        self.func = func
+        self.raw = self._format()
+        return True
+
+    def __repr__(self) -> str:
+        return f"PrefStatement({self.raw})"
+
+class PrefsDocument:
+    """
+    Fichier de préférences Mozilla, modifié instruction par instruction.
+
+    Exemple:
+        doc = PrefsDocument.parse(content)
+        doc.set("browser.startup.homepage", '"https://intranet"')
+        doc.set("app.update.enabled", "false", func="lockPref", replace=CFG_FUNCTIONS)
+        doc.remove("network.proxy.http")
+        content = doc.render()  # seules ces instructions diffèrent de l'original
+
+    Attributs:
+        original: Texte analysé.
+        committed: Résultat de l'écriture quand le document provient de
+                   MozillaPrefsCommands.edit_prefs (None sinon).
+    """
+
+    def __init__(self):
+        self.original = ""
+        self.segments: List[Union[str, PrefStatement]] = []
+        self._by_name: Dict[str, List[PrefStatement]] = {}
+        self.committed: Optional[bool] = None
+
+    @classmethod
+    def parse(cls, content: str) -> 'PrefsDocument':
+        """
+        Analyse le texte d'un fichier de préférences.
+
+        Les instructions en commentaire sont ignorées; tout ce qui n'est pas
+        une instruction reconnue est conservé comme texte.
+
+        Args:
+            content: Contenu du fichier
+
+        Returns:
+            PrefsDocument: Document
+        """
+        document = cls()
+        document.original = content
+        position = 0
+        for match in _TOKEN_RE.finditer(content):
+            if match.group('func') is None:
+                continue
+            if match.start() > position:
+                document.segments.append(content[position:match.start()])
+            statement = PrefStatement(match.group('func'), _unquote(match.group('name')),
+                                      match.group('value').strip(), match.group('name'), match.group(0))
+            document.segments.append(statement)
+            document._by_name.setdefault(statement.name, []).append(statement)
+            position = match.end()
+        if position < len(content):
+            document.segments.append(content[position:])
+        return document
+
+    def render(self) -> str:
+        """Texte du fichier: texte d'origine, sauf les instructions modifiées."""
+        return "".join(segment if isinstance(segment, str) else segment.raw for segment in self.segments)
+
+    @property
+    def changed(self) -> bool:
+        """Indique si le rendu diffère du texte analysé."""
+        return self.render() != self.original
+
+    # --- Lecture ---
+
+    def get(self, name: str, funcs: Optional[Iterable[str]] = None) -> Optional[PrefStatement]:
+        """
+        Dernière instruction d'une préférence (celle qui l'emporte au chargement).
+
+        Args:
+            name: Nom de la préférence
+            funcs: Fonctions acceptées, None pour toutes
+
+        Returns:
+            Optional[PrefStatement]: Instruction, None si absente
+        """
+        for statement in reversed(self._by_name.get(name, [])):
+            if funcs is None or statement.func in funcs:
+                return statement
+        return None
+
+    def items(self, funcs: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Préférences du fichier.
+
+        Args:
+            funcs: Fonctions retenues, None pour toutes
+
+        Returns:
+            Dict[str, str]: {nom: valeur littérale}, dans l'ordre du fichier
+        """
+        result = {}
+        for segment in self.segments:
+            if isinstance(segment, PrefStatement) and (funcs is None or segment.func in funcs):
+                result[segment.name] = segment.literal
+        return result
+
+    def __contains__(self, name: str) -> bool:
+        return bool(self._by_name.get(name))
+
+    def __len__(self) -> int:
+        return sum(len(statements) for statements in self._by_name.values())
+
+    # --- Modifications ---
+
+    def set(self, name: str, literal: str, func: str = 'user_pref',
+            replace: Optional[Iterable[str]] = None) -> bool:
+        """
+        Définit une préférence: modifie sa dernière instruction ou en ajoute
+        une en fin de fichier.
+
+        Args:
+            name: Nom de la préférence
+            literal: Valeur sous forme littérale JavaScript
+            func: Fonction de l'instruction
+            replace: Fonctions dont une instruction existante peut être
+                     convertie en func (par défaut, func seulement)
+
+        Returns:
+            bool: True si le document a changé
+        """
+        statement = self.get(name, tuple(replace) if replace is not None else (func,))
+        if statement is not None:
+            return statement.update(literal, func)
+
+        statement = PrefStatement(func, name, literal)
+        if self.segments:
+            last = self.segments[-1]
+            if isinstance(last, PrefStatement) or not last.endswith('\n'):
+                self.segments.append('\n')
+        self.segments.append(statement)
+        self.segments.append('\n')
+        self._by_name.setdefault(name, []).append(statement)
+        return True
+
+    def set_many(self, literals: Dict[str, str], func: str = 'user_pref',
+                 replace: Optional[Iterable[str]] = None) -> int:
+        """
+        Définit plusieurs préférences en une passe.
+
+        Args:
+            literals: {nom: valeur littérale}
+            func: Fonction des instructions
+            replace: Voir set
+
+        Returns:
+            int: Nombre de préférences modifiées ou ajoutées
+        """
+        return sum(1 for name, literal in literals.items() if self.set(name, literal, func, replace))
+
+    def remove(self, name: str, funcs: Optional[Iterable[str]] = None) -> int:
+        """
+        Supprime les instructions d'une préférence, avec leur fin de ligne.
+
+        Args:
+            name: Nom de la préférence
+            funcs: Fonctions concernées, None pour toutes
+
+        Returns:
+            int: Nombre d'instructions supprimées
+        """
+        targets = [statement for statement in self._by_name.get(name, [])
+                   if funcs is None or statement.func in funcs]
+        if not targets:
+            return 0
+        target_ids = {id(statement) for statement in targets}
+
+        segments: List[Union[str, PrefStatement]] = []
+        drop_newline = False
+        for segment in self.segments:
+            if isinstance(segment, PrefStatement) and id(segment) in target_ids:
+                # Instruction seule sur sa ligne: retirer aussi la fin de ligne
+                previous = segments[-1] if segments else '\n'
+                drop_newline = isinstance(previous, str) and (previous == '' or previous.endswith('\n'))
+                continue
+            if drop_newline and isinstance(segment, str):
+                stripped = segment.lstrip(' \t')
+                if stripped.startswith('\r\n'):
+                    segment = stripped[2:]
+                elif stripped.startswith('\n'):
+                    segment = stripped[1:]
+            drop_newline = False
+            if segment != '':
+                segments.append(segment)
+        self.segments = segments
+
+        remaining = [statement for statement in self._by_name[name] if id(statement) not in target_ids]
+        if remaining:
+            self._by_name[name] = remaining
+        else:
+            del self._by_name[name]
+        return len(targets)
+
+def parse(content: str) -> PrefsDocument:
+    """Raccourci de PrefsDocument.parse."""
+    return PrefsDocument.parse(content)
@@ -6,6 +6,7 @@ SELinux et AppArmor via leurs commandes système respectives.
 """
 
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import host_facts
 import os
 import re
 from pathlib import Path
@@ -57,6 +58,12 @@ class MandatoryAccessControl(PluginsUtilsBase):
         if self._mac_system:
             return self._mac_system
 
+        # 0. Profil de la machine collecté une fois par exécution
+        if host_facts.has_fact('mac_system'):
+            self._mac_system = host_facts.get_fact('mac_system')
+            self.log_debug(f"Système MAC issu du profil de la machine: {self._mac_system}", log_levels=log_levels)
+            return self._mac_system
+
         # 1. Vérifier SELinux via sestatus
         sestatus_success, sestatus_stdout, _ = self.run(['sestatus'], check=False, no_output=True, error_as_warning=True)
         if sestatus_success and "SELinux status:" in sestatus_stdout:
@@ -9,10 +9,15 @@ et vérifier l'état des services du système.
 
 # Import de la classe de base et des types
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import host_facts
 import json # Pour parser la sortie de systemctl show
 import time # Pour les délais potentiels
 from typing import Union, Optional, List, Dict, Any, Tuple
 
+# Sous-commandes systemctl qui changent l'état des services
+MUTATING_VERBS = {'start', 'stop', 'restart', 'reload', 'try-restart', 'reload-or-restart',
+                  'enable', 'disable', 'mask', 'unmask', 'kill'}
+
 class ServiceCommands(PluginsUtilsBase):
     """
     Classe pour gérer les services systemd via systemctl.
@@ -57,7 +62,11 @@ class ServiceCommands(PluginsUtilsBase):
         else:
              cmd = [self._systemctl_path] + args
         # La plupart des commandes systemctl nécessitent root
-        return self.run(cmd, check=check, needs_sudo=needs_sudo, **kwargs)
+        result = self.run(cmd, check=check, needs_sudo=needs_sudo, **kwargs)
+        if args and args[0] in MUTATING_VERBS:
+            # Le profil de la machine ne reflète plus l'état des services
+            host_facts.invalidate(*host_facts.SERVICE_FACTS)
+        return result
 
     def start(self, service_name: str, log_levels: Optional[Dict[str, str]] = None) -> bool:
         """
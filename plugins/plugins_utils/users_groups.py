@@ -8,6 +8,7 @@ Inclut le cryptage interne des mots de passe via le module 'crypt'.
 """
 
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import host_facts
 import os
 import re
 import crypt # Pour le cryptage des mots de passe
@@ -158,6 +159,7 @@ class UserGroupCommands(PluginsUtilsBase):
             return False
 
         self.log_success(f"Utilisateur '{username}' ajouté avec succès via useradd.", log_levels=log_levels)
+        host_facts.invalidate(*host_facts.USER_FACTS)
 
         # Définir le mot de passe en clair si fourni (et si pas déjà fait via -p)
         if password_to_set_later:
@@ -179,6 +181,7 @@ class UserGroupCommands(PluginsUtilsBase):
         cmd.append(username)
         success, stdout, stderr = self.run(cmd, check=False, needs_sudo=True)
         if success:
+            host_facts.invalidate(*host_facts.USER_FACTS)
             self.log_success(f"Utilisateur '{username}' supprimé avec succès.", log_levels=log_levels)
             return True
         else:
@@ -229,6 +232,8 @@ class UserGroupCommands(PluginsUtilsBase):
         cmd.append(username)
         success, stdout, stderr = self.run(cmd, check=False, needs_sudo=True)
         if success:
+            if new_username or uid is not None or home_dir:
+                host_facts.invalidate(*host_facts.USER_FACTS)
             self.log_success(f"Utilisateur '{username}' modifié avec succès.", log_levels=log_levels)
             return True
         else:
@@ -449,6 +454,12 @@ class UserGroupCommands(PluginsUtilsBase):
         """
         self.log_debug("Recherche de tous les répertoires home des utilisateurs", log_levels=log_levels)
 
+        # Profil de la machine collecté une fois par exécution
+        if host_facts.has_fact('user_homes'):
+            user_homes = [tuple(item) for item in host_facts.get_fact('user_homes')]
+            self.log_debug(f"Trouvé {len(user_homes)} utilisateur(s) avec répertoire home (profil de la machine)", log_levels=log_levels)
+            return user_homes
+
         user_homes = []
 
         # Utiliser getent passwd pour obtenir tous les utilisateurs
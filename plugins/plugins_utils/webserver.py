@@ -6,6 +6,7 @@ Utilise les commandes système spécifiques (apachectl/httpd, a2en*/a2dis*, ngin
 """
 
 from plugins_utils.plugins_utils_base import PluginsUtilsBase
+from plugins_utils import host_facts
 import os
 import glob
 from pathlib import Path
@@ -43,8 +44,12 @@ class WebServerCommands(PluginsUtilsBase):
         """Vérifie si les commandes serveur web sont disponibles."""
         # Apache: chercher apache2ctl, apachectl, httpd
         for cmd_name in ['apache2ctl', 'apachectl', 'httpd']:
-            success, path, _ = self.run(['which', cmd_name], check=False, no_output=True, error_as_warning=True)
-            if success:
+            # Commande relevée dans le profil de la machine, sinon which
+            path = host_facts.command_path(cmd_name)
+            if path is None:
+                success, path, _ = self.run(['which', cmd_name], check=False, no_output=True, error_as_warning=True)
+                path = path if success else ''
+            if path:
                 self._apache_cmd = path.strip()
                 # Déterminer le nom du service associé
                 if 'apache2ctl' in self._apache_cmd:
@@ -60,8 +65,11 @@ class WebServerCommands(PluginsUtilsBase):
             self.log_debug("Aucune commande Apache (apache2ctl, apachectl, httpd) trouvée.", log_levels=log_levels)
 
         # Nginx
-        success_nginx, path_nginx, _ = self.run(['which', 'nginx'], check=False, no_output=True, error_as_warning=True)
-        if success_nginx:
+        path_nginx = host_facts.command_path('nginx')
+        if path_nginx is None:
+            success_nginx, path_nginx, _ = self.run(['which', 'nginx'], check=False, no_output=True, error_as_warning=True)
+            path_nginx = path_nginx if success_nginx else ''
+        if path_nginx:
             self._nginx_cmd = path_nginx.strip()
             self.log_debug(f"Commande Nginx trouvée: {self._nginx_cmd}", log_levels=log_levels)
         else:
@@ -82,6 +90,11 @@ class WebServerCommands(PluginsUtilsBase):
         Returns:
             'apache', 'nginx', ou 'unknown'.
         """
+        if host_facts.has_fact('webserver'):
+            webserver = host_facts.get_fact('webserver')
+            self.log_info(f"Serveur web détecté (profil de la machine): {webserver}", log_levels=log_levels)
+            return webserver
+
         apache_present = bool(self._apache_cmd)
         nginx_present = bool(self._nginx_cmd)
 
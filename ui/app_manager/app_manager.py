@@ -13,6 +13,7 @@ from ..utils.logging import get_logger
 from ..choice_screen.choice_screen import Choice
 from ..config_screen.config_screen import PluginConfig
 from ..execution_screen.execution_screen import ExecutionScreen
+from ..execution_screen.run_journal import RunJournal
 from ..config_screen.auto_config import AutoConfig
 from .argument_parser import ArgumentParser
 from .config_loader import ConfigLoader
@@ -47,7 +48,10 @@ class AppManager:
         Lance l'application dans le mode approprié selon les arguments.
         """
         try:
-            if self.args.auto:
+            if self.args.resume:
+                logger.info(f"Reprise de l'exécution: {self.args.resume}")
+                self._run_resume_mode()
+            elif self.args.auto:
                 logger.info("Démarrage en mode automatique")
                 self._run_auto_mode()
             elif self.args.plugin:
@@ -129,6 +133,31 @@ class AppManager:
             logger.info("Configuration complète, lancement de l'exécution")
             self._run_execution_screen(plugin_instances, config)
 
+    def _run_resume_mode(self):
+        """
+        Reprend une exécution interrompue à partir de son journal.
+
+        La configuration des plugins est relue dans le journal, et ses valeurs
+        sensibles dans le fichier annexe de l'exécution; la reprise est refusée
+        s'il en manque. Les couples (plugin, hôte) déjà terminés avec succès
+        ne sont pas relancés.
+        """
+        try:
+            journal = RunJournal.open(self.args.resume)
+        except (OSError, ValueError) as e:
+            logger.error(f"Impossible de reprendre l'exécution {self.args.resume}: {e}")
+            runs = RunJournal.list_runs()
+            if runs:
+                logger.error(f"Exécutions disponibles: {', '.join(runs[:10])}")
+            sys.exit(1)
+
+        plugin_instances = []
+        for plugin_id, plugin_config in journal.plugins_config.items():
+            plugin_name = plugin_config.get('plugin_name', plugin_id)
+            plugin_instances.append((plugin_name, plugin_config.get('instance_id', 0)))
+
+        self._run_execution_screen(plugin_instances, journal.plugins_config, resume_journal=journal)
+
     def _check_config_completeness(self, config: Dict[str, Any]) -> bool:
         """
         Vérifie si tous les champs de configuration sont remplis.
@@ -212,27 +241,37 @@ class AppManager:
         app = ConfigApp(plugin_instances, sequence_file)
         app.run()
 
-    def _run_execution_screen(self, plugin_instances: List[Tuple[str, int]], plugins_config: Dict[str, Any] = None):
+    def _run_execution_screen(self, plugin_instances: List[Tuple[str, int]], plugins_config: Dict[str, Any] = None,
+                              resume_journal: Optional[RunJournal] = None):
         """
         Lance l'écran d'exécution.
 
         Args:
             plugin_instances: Liste des tuples (nom_plugin, id_instance)
             plugins_config: Configuration des plugins (optionnel)
+            resume_journal: Journal d'une exécution à reprendre (optionnel)
         """
         class ExecutionApp(App):
-            def __init__(self, instances, config, auto_exec=False):
+            def __init__(self, instances, config, auto_exec=False, journal=None, force=False,
+                         profile=False):
                 super().__init__()
                 self.instances = instances
                 self.config = config
                 self.auto_execute = auto_exec
+                self.journal = journal
+                self.force = force
+                self.profile = profile
 
             def on_mount(self) -> None:
                 self.push_screen(ExecutionScreen(
-                    self.instances,
                     plugins_config=self.config,
-                    auto_execute=self.auto_execute
+                    auto_execute=self.auto_execute,
+                    resume_journal=self.journal,
+                    force=self.force,
+                    profile=self.profile
                 ))
 
-        app = ExecutionApp(plugin_instances, plugins_config, auto_exec=self.args.auto)
+        app = ExecutionApp(plugin_instances, plugins_config, auto_exec=self.args.auto,
+                           journal=resume_journal, force=self.args.force,
+                           profile=self.args.profile)
         app.run()
\ No newline at end of file
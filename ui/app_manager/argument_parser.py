@@ -51,6 +51,10 @@ class ArgumentParser:
                           type=Path)
         sequence_group.add_argument('--shortcut',
                           help='Raccourci de la séquence à utiliser')
+        sequence_group.add_argument('--resume', '-r',
+                          help="Reprend une exécution interrompue (identifiant ou fichier du journal): "
+                               "seuls les plugins en échec ou non terminés sont relancés",
+                          metavar='RUN')
         
         # Mode plugin unique
         plugin_group.add_argument('--plugin', '-p',
@@ -63,6 +67,14 @@ class ArgumentParser:
                           nargs='*')
         
         # Options communes
+        parser.add_argument('--force', '-f',
+                          help="Relance les plugins idempotents même s'ils ont déjà été appliqués "
+                               "avec la même configuration",
+                          action='store_true')
+        parser.add_argument('--profile',
+                          help="Mesure chaque commande lancée par les plugins et affiche "
+                               "les plus lentes en fin d'exécution",
+                          action='store_true')
         parser.add_argument('--verbose', '-v',
                           help='Augmente le niveau de détail des logs',
                           action='count',
@@ -94,10 +106,10 @@ class ArgumentParser:
         Raises:
             SystemExit: Si les arguments sont incohérents
         """
-        # Mode automatique avec séquence ou shortcut requis
-        if args.auto and not (args.sequence or args.shortcut):
-            parser.error("Le mode automatique (--auto) nécessite soit un fichier de séquence (--sequence) "
-                        "soit un raccourci (--shortcut)")
+        # Mode automatique avec séquence, shortcut ou reprise requis
+        if args.auto and not (args.sequence or args.shortcut or args.resume):
+            parser.error("Le mode automatique (--auto) nécessite soit un fichier de séquence (--sequence), "
+                        "soit un raccourci (--shortcut), soit une exécution à reprendre (--resume)")
         
         # Mode plugin avec nom de plugin requis
         if args.plugin and not args.plugin.strip():
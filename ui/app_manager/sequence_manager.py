@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Dict, Any, Tuple, Optional, List, Union
 from ruamel.yaml import YAML
 from ..utils.logging import get_logger
+from ..utils.yaml_cache import load_yaml, invalidate_yaml
 
 logger = get_logger('sequence_manager')
 
@@ -20,7 +21,7 @@ class SequenceManager:
     à partir de leur nom de fichier ou de leur raccourci.
     """
     
-    # Instance YAML partagée pour toute la classe
+    # Instance YAML partagée pour les écritures (mode aller-retour)
     _yaml = YAML()
     
     # Cache des séquences chargées
@@ -111,13 +112,7 @@ class SequenceManager:
         if isinstance(sequence_path, str):
             sequence_path = Path(sequence_path)
             
-        # Vérifier d'abord dans le cache
-        cache_key = str(sequence_path)
-        if cache_key in cls._sequence_cache:
-            logger.debug(f"Séquence trouvée dans le cache: {cache_key}")
-            return cls._sequence_cache[cache_key]
-            
-        # Charger depuis le fichier
+        # Charger depuis le fichier (le cache YAML tient compte des modifications)
         return cls._load_sequence_file(sequence_path)
         
     @classmethod
@@ -136,24 +131,23 @@ class SequenceManager:
                 logger.error(f"Fichier de séquence non trouvé: {sequence_path}")
                 return None
                 
-            with open(sequence_path, 'r', encoding='utf-8') as f:
-                sequence = cls._yaml.load(f)
-                
-                # Vérifier que la séquence est valide
-                if not isinstance(sequence, dict):
-                    logger.error(f"Format de séquence invalide dans {sequence_path}")
-                    return None
-                    
-                # Vérifier les champs requis
-                if 'name' not in sequence or 'plugins' not in sequence:
-                    logger.error(f"Champs requis manquants dans la séquence {sequence_path}")
-                    return None
-                    
-                # Mettre en cache
-                cls._sequence_cache[str(sequence_path)] = sequence
-                logger.debug(f"Séquence chargée et mise en cache: {sequence_path}")
-                
-                return sequence
+            sequence = load_yaml(sequence_path)
+
+            # Vérifier que la séquence est valide
+            if not isinstance(sequence, dict):
+                logger.error(f"Format de séquence invalide dans {sequence_path}")
+                return None
+
+            # Vérifier les champs requis
+            if 'name' not in sequence or 'plugins' not in sequence:
+                logger.error(f"Champs requis manquants dans la séquence {sequence_path}")
+                return None
+
+            # Mettre en cache
+            cls._sequence_cache[str(sequence_path)] = sequence
+            logger.debug(f"Séquence chargée et mise en cache: {sequence_path}")
+
+            return sequence
                 
         except Exception as e:
             logger.error(f"Erreur lors du chargement de la séquence {sequence_path}: {e}")
@@ -231,7 +225,8 @@ class SequenceManager:
             # Sauvegarder dans le fichier
             with open(sequence_path, 'w', encoding='utf-8') as f:
                 cls._yaml.dump(sequence_data, f)
-                
+            invalidate_yaml(sequence_path)
+
             # Mettre à jour le cache
             cls._sequence_cache[str(sequence_path)] = sequence_data
             
@@ -261,4 +256,5 @@ class SequenceManager:
         """
         cls._sequence_cache.clear()
         cls._shortcut_cache.clear()
+        invalidate_yaml()
         logger.debug("Caches des séquences vidés")
\ No newline at end of file
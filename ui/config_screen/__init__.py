@@ -11,6 +11,7 @@ from .checkbox_field import CheckboxField
 from .select_field import SelectField
 from .config_container import ConfigContainer
 from .plugin_config_container import PluginConfigContainer
+from .lazy_plugin_container import LazyPluginContainer
 
 __all__ = [
     'ConfigField',
@@ -21,5 +22,6 @@ __all__ = [
     'SelectField',
     'ConfigContainer',
     'PluginConfigContainer',
+    'LazyPluginContainer',
     'PasswordField'
 ]
\ No newline at end of file
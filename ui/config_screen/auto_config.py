@@ -435,15 +435,13 @@ class AutoConfig:
         try:
             # Vérifier si c'est un plugin SSH
             if 'ssh_ips' in config['config']:
-                # Gérer les IPs multiples ou wildcards
+                # Valider les motifs sans développer les IPs: l'exécuteur SSH
+                # parcourt l'ensemble paresseusement au moment de l'exécution
                 from ..ssh_manager.ip_utils import get_target_ips
-                target_ips = get_target_ips(
-                    config['config'].get('ssh_ips', ''), 
-                    config['config'].get('ssh_exception_ips', [])
-                )
+                target_ips = get_target_ips(config['config'])
                 if target_ips:
-                    config['config']['ssh_ips'] = ','.join(target_ips)
-                    logger.debug(f"IPs SSH traitées: {config['config']['ssh_ips']}")
+                    config['config']['ssh_ips'] = ','.join(target_ips.patterns)
+                    logger.debug(f"IPs SSH traitées: {config['config']['ssh_ips']} ({len(target_ips)} IPs)")
         except Exception as e:
             logger.error(f"Erreur lors du traitement de la configuration SSH: {e}")
             
@@ -1,12 +1,12 @@
 from textual.app import ComposeResult
 from textual.containers import VerticalGroup, HorizontalGroup
 from textual.widgets import Checkbox, Label
+from textual.worker import get_current_worker
 import os
-import importlib.util
-import sys
 import traceback
 
 from .config_field import ConfigField
+from .dynamic_options_service import DynamicOptionsService, LOADING_LABEL
 from ..utils.logging import get_logger
 
 logger = get_logger('checkbox_group_field')
@@ -21,6 +21,7 @@ class CheckboxGroupField(ConfigField):
         self.options = []
         self.selected_values = []
         self.raw_data = None
+        self._options_loading = False  # Options dynamiques en cours de chargement
 
         # Initialiser la dépendance si elle est définie dans la configuration
         self.depends_on = field_config.get('depends_on')
@@ -35,11 +36,13 @@ class CheckboxGroupField(ConfigField):
     def compose(self) -> ComposeResult:
         # Créer le conteneur pour les checkboxes
         with VerticalGroup(classes="field-input-container checkbox-group-container"):
-            # Get options for checkboxes
-            self.options = self._get_options()
+            # Get options for checkboxes (dynamic options not yet cached are loaded on mount)
+            self.options = self._get_options(use_cache_only=True)
             logger.debug(f"Checkbox group options for {self.field_id}: {self.options}")
 
-            if not self.options:
+            if self._options_loading:
+                yield Label(LOADING_LABEL, classes="no-options-label")
+            elif not self.options:
                 logger.warning(f"No options available for checkbox group {self.field_id}")
             else:
                 label = self.field_config.get('label', self.field_id)
@@ -67,23 +70,38 @@ class CheckboxGroupField(ConfigField):
                         yield checkbox
                         yield Label(option_label, classes="checkbox-group-label")
 
-    def _get_options(self) -> list:
-        """Get options for the checkbox group, either static or dynamic"""
+    def on_mount(self) -> None:
+        """Start loading dynamic options if they were not cached"""
+        if self._options_loading:
+            self._refresh_dynamic_options()
+
+    def _get_options(self, use_cache_only: bool = False) -> list:
+        """Get options for the checkbox group, either static or dynamic
+
+        Args:
+            use_cache_only: If True, dynamic options are only read from the
+                DynamicOptionsService cache; on a miss the field is flagged as loading
+        """
         if 'options' in self.field_config:
             logger.debug(f"Using static options from config: {self.field_config['options']}")
             return self._normalize_options(self.field_config['options'])
 
         if 'dynamic_options' in self.field_config:
+            if use_cache_only:
+                return self._get_cached_dynamic_options()
             return self._get_dynamic_options()
 
         # Fallback if no options defined
         return [("No options defined", "no_options_defined")]
 
-    def _get_dynamic_options(self) -> list:
-        """Récupère les options dynamiques depuis un script externe"""
-        dynamic_config = self.field_config['dynamic_options']
-        logger.debug(f"Loading dynamic options with config: {dynamic_config}")
+    def _get_dynamic_call(self, dynamic_config):
+        """Résout le script, la fonction et les arguments des options dynamiques
 
+        Doit être appelée sur le thread de l'interface (lit la valeur des autres champs).
+
+        Returns:
+            tuple: (script_path, func_name, args, kwargs)
+        """
         # Determine script path (global or plugin)
         if dynamic_config.get('global', False):
             # Script in utils folder
@@ -94,45 +112,38 @@ class CheckboxGroupField(ConfigField):
             script_path = os.path.join(os.path.dirname(__file__), '..', '..', 'plugins', self.source_id, dynamic_config['script'])
 
         logger.debug(f"Loading script from: {script_path}")
-        logger.debug(f"Script exists: {os.path.exists(script_path)}")
 
+        # Préparer les arguments
+        args, kwargs = self._prepare_function_args(dynamic_config)
+        return script_path, dynamic_config.get('function'), tuple(args), kwargs
+
+    def _get_cached_dynamic_options(self):
+        """Options dynamiques déjà mémorisées par le service, ou option provisoire de chargement"""
+        dynamic_config = self.field_config['dynamic_options']
         try:
-            # Import the script module
-            sys.path.append(os.path.dirname(script_path))
-            logger.debug(f"Python path: {sys.path}")
-
-            spec = importlib.util.spec_from_file_location("dynamic_script", script_path)
-            if not spec:
-                logger.error("Failed to create module spec")
-                return [("Error loading module", "error_loading")]
-
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            # Get the function name
-            func_name = dynamic_config.get('function')
-            if not func_name or not hasattr(module, func_name):
-                logger.error(f"Function {func_name} not found in script")
-                return [("Function not found", "function_not_found")]
-
-            logger.debug(f"Using function: {func_name}")
-
-            # Préparer les arguments
-            args, kwargs = self._prepare_function_args(dynamic_config)
-
-            logger.debug(f"Calling {func_name} with args={args}, kwargs={kwargs}")
-
-            # Call the function with arguments
-            if args and kwargs:
-                result = getattr(module, func_name)(*args, **kwargs)
-            elif args:
-                result = getattr(module, func_name)(*args)
-            elif kwargs:
-                result = getattr(module, func_name)(**kwargs)
-            else:
-                result = getattr(module, func_name)()
+            script_path, func_name, args, kwargs = self._get_dynamic_call(dynamic_config)
+            found, result = DynamicOptionsService.get_instance().get_cached(script_path, func_name, args, kwargs)
+        except Exception as e:
+            logger.error(f"Error reading cached dynamic options: {e}")
+            found, result = False, None
+
+        if found:
+            self.raw_data = result
+            return self._process_dynamic_result(result, dynamic_config)
+
+        self._options_loading = True
+        return []
+
+    def _get_dynamic_options(self) -> list:
+        """Récupère les options dynamiques depuis un script externe (appel synchrone, résultat mémorisé)"""
+        dynamic_config = self.field_config['dynamic_options']
+        logger.debug(f"Loading dynamic options with config: {dynamic_config}")
 
-            logger.debug(f"Result from {func_name}: {result}")
+        try:
+            script_path, func_name, args, kwargs = self._get_dynamic_call(dynamic_config)
+            result = self._call_dynamic_function(script_path, func_name, args, kwargs)
+            if isinstance(result, list):
+                return result
 
             # Stocker les données brutes pour une utilisation ultérieure
             self.raw_data = result
@@ -144,6 +155,68 @@ class CheckboxGroupField(ConfigField):
             logger.error(traceback.format_exc())
             return [(f"Error: {str(e)}", "script_exception")]
 
+    def _call_dynamic_function(self, script_path, func_name, args, kwargs):
+        """Appelle la fonction via DynamicOptionsService (sans toucher aux widgets)
+
+        Returns:
+            Le résultat brut de la fonction, ou une liste d'options d'erreur
+        """
+        if not func_name:
+            logger.error("Function not specified in dynamic_options")
+            return [("Function not found", "function_not_found")]
+
+        logger.debug(f"Calling {func_name} with args={args}, kwargs={kwargs}")
+        dynamic_config = self.field_config['dynamic_options']
+        try:
+            result = DynamicOptionsService.get_instance().call(
+                script_path, func_name, args, kwargs, ttl=dynamic_config.get('cache_ttl')
+            )
+        except ImportError:
+            return [("Error loading module", "error_loading")]
+        except AttributeError:
+            logger.error(f"Function {func_name} not found in script")
+            return [("Function not found", "function_not_found")]
+
+        logger.debug(f"Result from {func_name}: {result}")
+        return result
+
+    def _refresh_dynamic_options(self) -> None:
+        """Recharge les options dynamiques dans un worker, sans bloquer l'interface
+
+        Un nouveau chargement annule le précédent pour ce champ.
+        """
+        dynamic_config = self.field_config['dynamic_options']
+        try:
+            script_path, func_name, args, kwargs = self._get_dynamic_call(dynamic_config)
+        except Exception as e:
+            logger.error(f"Error preparing dynamic options: {e}")
+            self._apply_dynamic_result([(f"Error: {str(e)}", "script_exception")])
+            return
+
+        def load_options() -> None:
+            try:
+                result = self._call_dynamic_function(script_path, func_name, args, kwargs)
+            except Exception as e:
+                logger.error(f"Error loading dynamic options: {e}")
+                logger.error(traceback.format_exc())
+                result = [(f"Error: {str(e)}", "script_exception")]
+
+            if not get_current_worker().is_cancelled:
+                self.app.call_from_thread(self._apply_dynamic_result, result)
+
+        self.run_worker(load_options, thread=True, exclusive=True,
+                        group=f"dynamic_options_{self.field_id}")
+
+    def _apply_dynamic_result(self, result) -> None:
+        """Traite un résultat de script chargé en arrière-plan et met à jour l'affichage"""
+        self._options_loading = False
+        if isinstance(result, list):
+            new_options = result
+        else:
+            self.raw_data = result
+            new_options = self._process_dynamic_result(result, self.field_config['dynamic_options'])
+        self._apply_options(new_options)
+
     def _prepare_function_args(self, dynamic_config):
         """Prépare les arguments pour l'appel de fonction dynamique
         
@@ -407,7 +480,9 @@ class CheckboxGroupField(ConfigField):
 
     def update_dynamic_options(self, **kwargs):
         """Met à jour les options dynamiques du champ et affiche/masque son label
-        
+
+        Les options sont rechargées en arrière-plan si elles sont dynamiques.
+
         Args:
             **kwargs: Arguments variables passés par le conteneur parent
                     Ces arguments sont utilisés par _get_options() si nécessaire
@@ -415,9 +490,19 @@ class CheckboxGroupField(ConfigField):
         # Stocker les arguments pour les utiliser dans _get_options
         self._dynamic_args = kwargs
         logger.debug(f"Mise à jour des options pour {self.field_id} avec arguments: {kwargs}")
-        
-        new_options = self._get_options()
 
+        if 'dynamic_options' in self.field_config and 'options' not in self.field_config:
+            self._refresh_dynamic_options()
+            return
+
+        self._apply_options(self._get_options())
+
+    def _apply_options(self, new_options):
+        """Applique de nouvelles options et reconstruit les checkboxes
+
+        Args:
+            new_options: Options (label, value), ou None si le champ doit être supprimé
+        """
         # Si les options sont None ou vides, le champ doit être supprimé
         if new_options is None:
             logger.debug(f"Aucune option disponible pour {self.field_id}, le champ sera supprimé")
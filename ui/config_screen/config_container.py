@@ -3,7 +3,8 @@ from textual.containers import VerticalGroup, HorizontalGroup
 from textual.widgets import Label, Input, Select, Button, Checkbox
 from textual.reactive import reactive
 from textual.widget import Widget
-from typing import Dict, List, Any, Optional, Set, Type
+from typing import Dict, List, Any, Optional, Set, Tuple, Type
+from contextlib import nullcontext
 
 from .text_field import TextField
 from .directory_field import DirectoryField
@@ -12,6 +13,7 @@ from .checkbox_field import CheckboxField
 from .select_field import SelectField
 from .checkbox_group_field import CheckboxGroupField
 from .password_field import PasswordField
+from .dependency_graph import FieldDependencyGraph
 
 from ..utils.logging import get_logger
 
@@ -45,7 +47,8 @@ class ConfigContainer(VerticalGroup):
 
     def __init__(self, source_id: str, title: str, icon: str, description: str,
                  fields_by_id: Dict[str, Any], config_fields: List[Dict[str, Any]],
-                 is_global: bool = False, **kwargs):
+                 is_global: bool = False, dependency_graph: Optional[FieldDependencyGraph] = None,
+                 **kwargs):
         """
         Initialise un conteneur de configuration.
 
@@ -57,6 +60,7 @@ class ConfigContainer(VerticalGroup):
             fields_by_id: Dictionnaire des champs par ID
             config_fields: Liste des configurations de champs
             is_global: Si True, c'est une configuration globale
+            dependency_graph: Graphe de dépendances partagé par l'écran (créé si None)
             **kwargs: Arguments supplémentaires pour le VerticalGroup
         """
         # Ajouter la classe CSS du conteneur
@@ -79,15 +83,10 @@ class ConfigContainer(VerticalGroup):
         self.fields_by_id = fields_by_id            # Tous les champs référencés par ID
         self.config_fields = config_fields          # Configurations des champs
 
-        # Structures de dépendances (mappings directs)
-        self.enabled_if_map = {}     # {field_id: {dep_field_id: required_value}}
-        self.value_deps_map = {}     # {field_id: dep_field_id}
-        self.dynamic_options_map = {}  # {field_id: {dep_fields: [field_ids], args: [arg_configs]}}
-
-        # Structures miroirs (mappings inversés)
-        self.mirror_enabled_if = {}    # {field_id: [fields qui dépendent de field_id pour enabled_if]}
-        self.mirror_value_deps = {}    # {field_id: [fields qui dépendent de field_id pour leur valeur]}
-        self.mirror_dynamic_options = {} # {field_id: [fields qui dépendent de field_id pour leurs options]}
+        # Graphe des dépendances entre champs (partagé par les conteneurs de l'écran)
+        self.dependency_graph = dependency_graph or FieldDependencyGraph()
+        self._local_fields = {}         # {field_id: champ} pour les champs de ce conteneur
+        self._options_args_cache = {}   # {field_id: arguments du dernier chargement d'options}
 
         # État interne
         self._updating_dependencies = False  # Flag pour éviter les cycles
@@ -171,213 +170,108 @@ class ConfigContainer(VerticalGroup):
             logger.error(traceback.format_exc())
             return None
 
+    @property
+    def dependency_scope(self) -> str:
+        """Portée des champs de ce conteneur dans le graphe de dépendances."""
+        return self.id or self.source_id
+
+    def _index_local_fields(self) -> Dict[str, Widget]:
+        """
+        Indexe les champs de ce conteneur par field_id.
+
+        Les dépendances font référence aux field_id, alors que fields_by_id est
+        partagé entre instances et indexé par ID unique.
+
+        Returns:
+            Dict[str, Widget]: Champs du conteneur {field_id: champ}
+        """
+        local_fields = {}
+        for field_config in self.config_fields:
+            field_id = field_config.get('id')
+            if not field_id:
+                continue
+            field = self.fields_by_id.get(field_config.get('unique_id', field_id))
+            if field is not None and getattr(field, 'source_id', None) == self.source_id:
+                local_fields[field_id] = field
+
+        self._local_fields = local_fields
+        return local_fields
+
+    def _get_local_field(self, field_id: str) -> Optional[Widget]:
+        """
+        Récupère un champ de ce conteneur à partir de son field_id.
+
+        Args:
+            field_id: Identifiant du champ
+
+        Returns:
+            Optional[Widget]: Champ trouvé ou None
+        """
+        field = self._local_fields.get(field_id)
+        if field is None:
+            field = self.fields_by_id.get(field_id)
+        return field
+
     def _analyze_field_dependencies(self) -> None:
         """
-        Analyse les dépendances entre tous les champs du conteneur.
-        Cette méthode construit les dictionnaires de dépendances directes et inversées.
+        Analyse les dépendances entre les champs du conteneur.
+
+        Enregistre les dépendances (depends_on, enabled_if, dynamic_options.args)
+        dans le graphe de l'écran et renseigne les champs dépendants de chaque champ.
         """
-        logger.debug(f"DÉBUT _analyze_field_dependencies pour {self.source_id} avec {len(self.fields_by_id)} champs")
-        
-        # Afficher les champs disponibles pour le débogage
-        field_ids = list(self.fields_by_id.keys())
-        logger.debug(f"Champs disponibles: {field_ids}")
-
-        # Réinitialiser les dictionnaires de dépendances
-        self.enabled_if_map = {}
-        self.value_deps_map = {}
-        self.dynamic_options_map = {}
-        self.mirror_enabled_if = {}
-        self.mirror_value_deps = {}
-        self.mirror_dynamic_options = {}
-
-        # Parcourir tous les champs pour collecter les dépendances
-        for field_id, field in self.fields_by_id.items():
-            # Ignorer les champs qui n'appartiennent pas à ce conteneur
-            if not hasattr(field, 'source_id') or field.source_id != self.source_id:
+        local_fields = self._index_local_fields()
+        logger.debug(f"Analyse des dépendances pour {self.dependency_scope} ({len(local_fields)} champs)")
+
+        # Réinitialiser les champs dépendants connus par chaque champ
+        for field in local_fields.values():
+            if hasattr(field, 'dependencies'):
+                for dependents in field.dependencies['dependent_fields'].values():
+                    dependents.clear()
+
+        dependencies = {}
+        for field_id, field in local_fields.items():
+            field_dependencies = getattr(field, 'dependencies', None)
+            if not field_dependencies:
                 continue
 
-            # Vérifier les dépendances de type 'enabled_if'
-            if hasattr(field, 'dependencies') and field.dependencies['enabled_if']:
-                enabled_if = field.dependencies['enabled_if']
-                
-                # Vérifier si c'est l'ancien format (compatible) ou le nouveau format avec conditions multiples
-                if 'conditions' in enabled_if:
-                    # Nouveau format avec conditions multiples
-                    conditions = enabled_if['conditions']
-                    operator = enabled_if.get('operator', 'AND')
-                    
-                    # Enregistrer chaque condition
-                    for condition in conditions:
-                        dep_field_id = condition['field_id']
-                        required_value = condition['required_value']
-                        
-                        # Enregistrer la dépendance directe
-                        if field_id not in self.enabled_if_map:
-                            self.enabled_if_map[field_id] = {}
-                        
-                        # Stocker la condition avec l'opérateur
-                        if 'conditions' not in self.enabled_if_map[field_id]:
-                            self.enabled_if_map[field_id]['conditions'] = []
-                            self.enabled_if_map[field_id]['operator'] = operator
-                        
-                        self.enabled_if_map[field_id]['conditions'].append({
-                            'field_id': dep_field_id,
-                            'required_value': required_value
-                        })
-                        
-                        # Enregistrer aussi la valeur directement pour la rétro-compatibilité
-                        self.enabled_if_map[field_id][dep_field_id] = required_value
-                        
-                        # Enregistrer la dépendance inverse (miroir)
-                        if dep_field_id not in self.mirror_enabled_if:
-                            self.mirror_enabled_if[dep_field_id] = []
-                        if field_id not in self.mirror_enabled_if[dep_field_id]:
-                            self.mirror_enabled_if[dep_field_id].append(field_id)
-                    
-                    logger.debug(f"Dépendance enabled_if multiple: {field_id} dépend de {len(conditions)} conditions avec opérateur {operator}")
-                    
-                elif 'field_id' in enabled_if and 'required_value' in enabled_if:
-                    # Ancien format (compatible)
-                    dep_field_id = enabled_if['field_id']
-                    required_value = enabled_if['required_value']
-
-                    # Enregistrer la dépendance directe
-                    if field_id not in self.enabled_if_map:
-                        self.enabled_if_map[field_id] = {}
-                    self.enabled_if_map[field_id][dep_field_id] = required_value
-                    
-                    # Ajouter également au nouveau format pour uniformité
-                    self.enabled_if_map[field_id]['conditions'] = [{
-                        'field_id': dep_field_id,
-                        'required_value': required_value
-                    }]
-                    self.enabled_if_map[field_id]['operator'] = 'AND'
-
-                    # Enregistrer la dépendance inverse (miroir)
-                    if dep_field_id not in self.mirror_enabled_if:
-                        self.mirror_enabled_if[dep_field_id] = []
-                    if field_id not in self.mirror_enabled_if[dep_field_id]:
-                        self.mirror_enabled_if[dep_field_id].append(field_id)
-
-                    logger.debug(f"Dépendance enabled_if simple: {field_id} dépend de {dep_field_id}={required_value}")
-
-            # Vérifier les dépendances de type 'depends_on' (valeur)
-            if hasattr(field, 'dependencies') and field.dependencies['depends_on']:
-                depends_on = field.dependencies['depends_on']
-                
-                # Vérifier si c'est l'ancien format (chaîne simple) ou le nouveau format (dictionnaire avec fields)
-                if isinstance(depends_on, dict) and 'fields' in depends_on:
-                    # Nouveau format avec plusieurs champs
-                    fields = depends_on['fields']
-                    operator = depends_on.get('operator', 'AND')
-                    
-                    # Créer une entrée pour ce champ s'il n'existe pas déjà
-                    if field_id not in self.value_deps_map:
-                        self.value_deps_map[field_id] = {}
-                    
-                    # Stocker la configuration complète
-                    self.value_deps_map[field_id]['fields'] = fields
-                    self.value_deps_map[field_id]['operator'] = operator
-                    
-                    # Enregistrer aussi chaque champ individuellement pour rétro-compatibilité
-                    for dep_field_id in fields:
-                        # Stocker aussi le champ directement pour la rétro-compatibilité
-                        if isinstance(self.value_deps_map[field_id], dict) and 'direct' not in self.value_deps_map[field_id]:
-                            self.value_deps_map[field_id]['direct'] = dep_field_id
-                        
-                        # Enregistrer la dépendance inverse (miroir)
-                        if dep_field_id not in self.mirror_value_deps:
-                            self.mirror_value_deps[dep_field_id] = []
-                        if field_id not in self.mirror_value_deps[dep_field_id]:
-                            self.mirror_value_deps[dep_field_id].append(field_id)
-                    
-                    logger.debug(f"Dépendance depends_on multiple: {field_id} dépend de {len(fields)} champs avec opérateur {operator}")
-                else:
-                    # Ancien format (chaîne simple) ou format de transition (liste)
-                    dep_field_id = depends_on[0] if isinstance(depends_on, list) and depends_on else depends_on
-                    
-                    # Enregistrer la dépendance directe
-                    self.value_deps_map[field_id] = dep_field_id
-                    
-                    # Enregistrer la dépendance inverse (miroir)
-                    if dep_field_id not in self.mirror_value_deps:
-                        self.mirror_value_deps[dep_field_id] = []
-                    if field_id not in self.mirror_value_deps[dep_field_id]:
-                        self.mirror_value_deps[dep_field_id].append(field_id)
-                    
-                    logger.debug(f"Dépendance de valeur: {field_id} dépend de {dep_field_id}")
-
-            # Vérifier les dépendances de type 'dynamic_options'
-            if hasattr(field, 'dependencies') and field.dependencies['dynamic_options']:
-                dynamic_options = field.dependencies['dynamic_options']
-
-                # Initialiser la structure pour ce champ
-                self.dynamic_options_map[field_id] = {
-                    'dep_fields': [],
-                    'args': dynamic_options.get('args', [])
-                }
-
-                # Collecter tous les champs dont dépendent les options
-                for arg in dynamic_options.get('args', []):
-                    # Support du format avec 'field_id' (converti depuis 'field' dans _init_dependencies)
-                    if 'field_id' in arg:
-                        dep_field_id = arg['field_id']
-                        
-                        # S'assurer que l'ID du champ est une chaîne
-                        dep_field_id = str(dep_field_id)
-
-                        # Ajouter à la liste des dépendances
-                        if dep_field_id not in self.dynamic_options_map[field_id]['dep_fields']:
-                            self.dynamic_options_map[field_id]['dep_fields'].append(dep_field_id)
-
-                        # Enregistrer la dépendance inverse (miroir)
-                        if dep_field_id not in self.mirror_dynamic_options:
-                            self.mirror_dynamic_options[dep_field_id] = []
-                        if field_id not in self.mirror_dynamic_options[dep_field_id]:
-                            self.mirror_dynamic_options[dep_field_id].append(field_id)
-
-                        logger.debug(f"Dépendance dynamic_options: {field_id} dépend de {dep_field_id}")
-                    # Support de l'ancien format avec 'field_id'
-                    elif 'field_id' in arg:
-                        dep_field_id = arg['field_id']
-                        
-                        # S'assurer que l'ID du champ est une chaîne
-                        dep_field_id = str(dep_field_id)
+            kinds = {}
+            enabled_if = field_dependencies.get('enabled_if')
+            if enabled_if:
+                kinds['enabled'] = [str(c['field_id']) for c in enabled_if.get('conditions', [])]
 
-                        # Ajouter à la liste des dépendances
-                        if dep_field_id not in self.dynamic_options_map[field_id]['dep_fields']:
-                            self.dynamic_options_map[field_id]['dep_fields'].append(dep_field_id)
+            depends_on = field_dependencies.get('depends_on')
+            if depends_on:
+                kinds['value'] = [str(f) for f in depends_on.get('fields', [])]
 
-                        # Enregistrer la dépendance inverse (miroir)
-                        if dep_field_id not in self.mirror_dynamic_options:
-                            self.mirror_dynamic_options[dep_field_id] = []
-                        if field_id not in self.mirror_dynamic_options[dep_field_id]:
-                            self.mirror_dynamic_options[dep_field_id].append(field_id)
+            dynamic_options = field_dependencies.get('dynamic_options')
+            if dynamic_options:
+                kinds['options'] = [str(arg['field_id']) for arg in dynamic_options.get('args', [])
+                                    if 'field_id' in arg]
 
-                            
-                        # Enregistrer aussi avec l'ID unique du champ source
-                        dep_unique_id = f"{dep_field_id}_{self.source_id}"
-                        if dep_unique_id != dep_field_id:
-                            if dep_unique_id not in self.mirror_dynamic_options:
-                                self.mirror_dynamic_options[dep_unique_id] = []
-                            if field_id not in self.mirror_dynamic_options[dep_unique_id]:
-                                self.mirror_dynamic_options[dep_unique_id].append(field_id)
-
-                        logger.debug(f"Dépendance dynamic_options: {field_id} dépend de {dep_field_id} ({dep_unique_id}) (via field_id)")
-
-        # Afficher le contenu des dictionnaires miroirs pour le débogage
-        logger.debug(f"Analyse des dépendances terminée: {len(self.enabled_if_map)} enabled_if, " +
-                   f"{len(self.value_deps_map)} value_deps, {len(self.dynamic_options_map)} dynamic_options")
-        
-        # Afficher le contenu des dictionnaires miroirs
-        logger.debug(f"mirror_enabled_if: {self.mirror_enabled_if}")
-        logger.debug(f"mirror_value_deps: {self.mirror_value_deps}")
-        logger.debug(f"mirror_dynamic_options: {self.mirror_dynamic_options}")
+            kinds = {kind: sources for kind, sources in kinds.items() if sources}
+            if not kinds:
+                continue
+            dependencies[field_id] = kinds
+
+            # Renseigner le champ source avec ses dépendants
+            for kind, sources in kinds.items():
+                for source_id in sources:
+                    source = local_fields.get(source_id)
+                    if source is not None and hasattr(source, 'dependencies'):
+                        source.dependencies['dependent_fields'][kind].add(field_id)
+
+        self.dependency_graph.set_scope(self.dependency_scope, dependencies)
+        self._options_args_cache = {}
+        logger.debug(f"Analyse des dépendances terminée: {len(dependencies)} champs dépendants")
 
     def update_dependent_fields(self, source_field: Widget) -> None:
         """
         Met à jour les champs qui dépendent du champ source.
 
+        Seuls les champs en aval du champ source sont recalculés, dans l'ordre
+        topologique, et un champ n'est recalculé que si l'une de ses sources
+        a effectivement changé.
+
         Args:
             source_field: Champ source dont la valeur a changé
         """
@@ -385,37 +279,22 @@ class ConfigContainer(VerticalGroup):
         if self._updating_dependencies:
             return
 
+        source_field_id = getattr(source_field, 'field_id', None)
+        if not source_field_id:
+            logger.warning("Impossible de mettre à jour les dépendances: champ source sans field_id")
+            return
+
         try:
-            # Marquer le début de la mise à jour
             self._updating_dependencies = True
-            
-            # S'assurer que les dépendances sont correctement analysées
-            logger.debug("Dépendances réanalysées avant la mise à jour")
 
-            # Récupérer les identifiants du champ source
-            source_field_id = getattr(source_field, 'field_id', None)
-            source_unique_id = getattr(source_field, 'unique_id', source_field_id)
-
-            if not source_field_id:
-                logger.warning("Impossible de mettre à jour les dépendances: champ source sans field_id")
+            affected = self.dependency_graph.affected(self.dependency_scope, [source_field_id])
+            if not affected:
                 return
 
-            logger.debug(f"Mise à jour des champs dépendant de {source_field_id} (unique_id: {source_unique_id})")
-
-            # 1. METTRE À JOUR LES OPTIONS DYNAMIQUES
-            self._update_dynamic_options_dependencies(source_field_id, source_unique_id, source_field)
-
-            # 2. METTRE À JOUR LES VALEURS DÉPENDANTES
-            self._update_value_dependencies(source_field_id, source_unique_id, source_field)
-
-            # 3. METTRE À JOUR LES ÉTATS ENABLED/DISABLED
-            self._update_enabled_if_dependencies(source_field_id, source_unique_id, source_field)
-
-            # 4. TRAITER LES SUPPRESSIONS DE CHAMPS SI NÉCESSAIRE
+            logger.debug(f"Mise à jour de {len(affected)} champs dépendant de {source_field_id}")
+            self._recompute_fields(affected, changed={source_field_id})
             self.process_fields_to_remove()
 
-            logger.debug(f"Mise à jour des dépendances terminée pour {source_field_id}")
-
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour des dépendances: {e}")
             import traceback
@@ -424,6 +303,60 @@ class ConfigContainer(VerticalGroup):
             # CRUCIAL: Toujours réinitialiser le flag pour permettre des mises à jour futures
             self._updating_dependencies = False
 
+    def update_all_dependencies(self) -> None:
+        """
+        Recalcule tous les champs dépendants du conteneur, en ordre topologique.
+        """
+        if self._updating_dependencies:
+            return
+
+        try:
+            self._updating_dependencies = True
+            self._recompute_fields(self.dependency_graph.dependents(self.dependency_scope))
+            self.process_fields_to_remove()
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour de toutes les dépendances: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+        finally:
+            self._updating_dependencies = False
+
+    def _recompute_fields(self, affected: List[Tuple[str, Set[str]]],
+                          changed: Optional[Set[str]] = None) -> None:
+        """
+        Recalcule options, valeur et activation des champs affectés.
+
+        Les mises à jour de l'interface sont regroupées en un seul rafraîchissement.
+
+        Args:
+            affected: (field_id, types à recalculer) en ordre topologique
+            changed: Champs modifiés; si None, tous les champs sont recalculés
+        """
+        batch = self.app.batch_update() if self.is_mounted else nullcontext()
+        with batch:
+            for field_id, kinds in affected:
+                field = self._get_local_field(field_id)
+                if field is None:
+                    continue
+
+                # Ignorer les champs dont aucune source n'a changé
+                if changed is not None:
+                    sources = self.dependency_graph.sources(self.dependency_scope, field_id)
+                    if not changed.intersection(sources):
+                        continue
+
+                before = (self._get_field_value(field), getattr(field, 'disabled', False))
+
+                if 'options' in kinds:
+                    self._recompute_dynamic_options(field_id, field)
+                if 'value' in kinds:
+                    self._recompute_value(field, changed)
+                if 'enabled' in kinds:
+                    self._recompute_enabled_state(field)
+
+                if changed is not None and before != (self._get_field_value(field), getattr(field, 'disabled', False)):
+                    changed.add(field_id)
+
     def process_fields_to_remove(self) -> None:
         """
         Traite les champs à supprimer suite aux mises à jour de dépendances.
@@ -442,20 +375,6 @@ class ConfigContainer(VerticalGroup):
             if field_id in self.fields_by_id:
                 field = self.fields_by_id[field_id]
 
-                # Supprimer des structures de dépendances
-                if field_id in self.enabled_if_map:
-                    del self.enabled_if_map[field_id]
-                if field_id in self.value_deps_map:
-                    del self.value_deps_map[field_id]
-                if field_id in self.dynamic_options_map:
-                    del self.dynamic_options_map[field_id]
-
-                # Supprimer des structures miroirs
-#                for mirror_dict in [self.mirror_enabled_if, self.mirror_value_deps, self.mirror_dynamic_options]:
-#                    for dep_id, deps in list(mirror_dict.items()):
-#                        if field_id in deps:
-#                            deps.remove(field_id)
-
                 # Supprimer du dictionnaire des champs
                 del self.fields_by_id[field_id]
 
@@ -468,6 +387,9 @@ class ConfigContainer(VerticalGroup):
         # Réinitialiser la liste des champs à supprimer
         self._fields_to_remove.clear()
 
+        # Retirer les champs supprimés du graphe
+        self._analyze_field_dependencies()
+
     def _normalize_value_for_comparison(self, value: Any) -> Any:
         """
         Normalise une valeur pour la comparaison dans le cadre des dépendances.
@@ -495,346 +417,167 @@ class ConfigContainer(VerticalGroup):
             
         # Retourner la valeur telle quelle pour les autres types
         return value
-        
-    def _update_enabled_if_dependencies(self, source_field_id: str, source_unique_id: str, source_field: Widget) -> None:
+
+    def _recompute_enabled_state(self, field: Widget) -> None:
         """
-        Met à jour l'état enabled/disabled des champs dont l'activation dépend du champ source.
+        Réévalue l'activation d'un champ à partir de ses conditions enabled_if.
         Supporte plusieurs conditions avec opérateurs logiques (AND/OR).
 
         Args:
-            source_field_id: Identifiant du champ source
-            source_unique_id: Identifiant unique du champ source
-            source_field: Widget du champ source
+            field: Champ dont l'activation dépend d'autres champs
         """
-        # Utiliser les dictionnaires miroirs pour une recherche directe
-        dependent_fields = []
-
-        # Chercher dans le dictionnaire miroir avec l'ID du champ
-        if source_field_id in self.mirror_enabled_if:
-            dependent_fields.extend(self.mirror_enabled_if[source_field_id])
-
-        # Chercher aussi avec l'ID unique si différent
-        if source_unique_id != source_field_id and source_unique_id in self.mirror_enabled_if:
-            dependent_fields.extend(self.mirror_enabled_if[source_unique_id])
-
-        # Si aucun champ dépendant trouvé, sortir rapidement
-        if not dependent_fields:
-            return
+        enabled_if = field.dependencies.get('enabled_if') or {}
 
-        # Récupérer la valeur actuelle du champ source
-        source_value = self._get_field_value(source_field)
-        logger.debug(f"Mise à jour de {len(dependent_fields)} champs enabled_if dépendant de {source_field_id}={source_value}")
-
-        # Mettre à jour chaque champ dépendant
-        for dep_field_id in dependent_fields:
-            # Récupérer le champ dépendant
-            dependent_field = self.fields_by_id.get(dep_field_id)
-            if not dependent_field:
+        condition_results = []
+        for condition in enabled_if.get('conditions', []):
+            condition_field = self._get_local_field(str(condition['field_id']))
+            if condition_field is None:
                 continue
 
-            # Vérifier si le champ utilise le nouveau format avec conditions multiples
-            if dep_field_id in self.enabled_if_map and 'conditions' in self.enabled_if_map[dep_field_id]:
-                # Nouveau format avec conditions multiples
-                conditions = self.enabled_if_map[dep_field_id]['conditions']
-                operator = self.enabled_if_map[dep_field_id].get('operator', 'AND')
-                
-                # Évaluer toutes les conditions
-                condition_results = []
-                for condition in conditions:
-                    condition_field_id = condition['field_id']
-                    required_value = condition['required_value']
-                    
-                    # Si la condition concerne le champ source actuel
-                    if condition_field_id == source_field_id or condition_field_id == source_unique_id:
-                        # Normaliser les valeurs pour la comparaison
-                        normalized_source_value = self._normalize_value_for_comparison(source_value)
-                        normalized_required_value = self._normalize_value_for_comparison(required_value)
-                        
-                        # Ajouter le résultat de cette condition
-                        condition_results.append(normalized_source_value == normalized_required_value)
-                        logger.debug(f"Condition pour {dep_field_id}: {condition_field_id}={required_value} vs {source_value} -> {normalized_source_value == normalized_required_value}")
-                    else:
-                        # Pour les autres champs, récupérer leur valeur actuelle
-                        other_field = self.fields_by_id.get(condition_field_id)
-                        if other_field:
-                            other_value = self._get_field_value(other_field)
-                            normalized_other_value = self._normalize_value_for_comparison(other_value)
-                            normalized_required_value = self._normalize_value_for_comparison(required_value)
-                            
-                            # Ajouter le résultat de cette condition
-                            condition_results.append(normalized_other_value == normalized_required_value)
-                            logger.debug(f"Condition pour {dep_field_id}: {condition_field_id}={required_value} vs {other_value} -> {normalized_other_value == normalized_required_value}")
-                
-                # Déterminer si le champ doit être activé selon l'opérateur
-                if condition_results:
-                    if operator.upper() == 'AND':
-                        should_enable = all(condition_results)
-                    elif operator.upper() == 'OR':
-                        should_enable = any(condition_results)
-                    else:
-                        # Opérateur non reconnu, utiliser AND par défaut
-                        should_enable = all(condition_results)
-                    
-                    # Mettre à jour l'état du champ
-                    self._update_field_enabled_state(dependent_field, should_enable)
-                    
-                    logger.debug(f"Champ {dep_field_id} {'' if should_enable else 'dés'}activé avec opérateur {operator} ({len(condition_results)} conditions évaluées)")
-            else:
-                # Ancien format (rétro-compatibilité)
-                # Récupérer la valeur requise pour l'activation
-                required_value = None
-                if dep_field_id in self.enabled_if_map and source_field_id in self.enabled_if_map[dep_field_id]:
-                    required_value = self.enabled_if_map[dep_field_id][source_field_id]
-                elif dep_field_id in self.enabled_if_map and source_unique_id in self.enabled_if_map[dep_field_id]:
-                    required_value = self.enabled_if_map[dep_field_id][source_unique_id]
-
-                if required_value is None:
-                    continue
-
-                # Normaliser les valeurs pour la comparaison
-                normalized_source_value = self._normalize_value_for_comparison(source_value)
-                normalized_required_value = self._normalize_value_for_comparison(required_value)
+            value = self._normalize_value_for_comparison(self._get_field_value(condition_field))
+            required_value = self._normalize_value_for_comparison(condition['required_value'])
+            condition_results.append(value == required_value)
 
-                # Déterminer si le champ doit être activé
-                should_enable = normalized_source_value == normalized_required_value
+        if not condition_results:
+            return
 
-                # Mettre à jour l'état du champ
-                self._update_field_enabled_state(dependent_field, should_enable)
+        # Déterminer si le champ doit être activé selon l'opérateur
+        operator = str(enabled_if.get('operator', 'AND')).upper()
+        should_enable = any(condition_results) if operator == 'OR' else all(condition_results)
 
-                logger.debug(f"Champ {dep_field_id} {'' if should_enable else 'dés'}activé (requis: {required_value}, actuel: {source_value})")
+        self._update_field_enabled_state(field, should_enable)
+        logger.debug(f"Champ {field.field_id} {'' if should_enable else 'dés'}activé avec opérateur {operator} ({len(condition_results)} conditions évaluées)")
 
-    def _update_dynamic_options_dependencies(self, source_field_id: str, source_unique_id: str, source_field: Widget) -> None:
+    def _recompute_dynamic_options(self, field_id: str, field: Widget) -> None:
         """
-        Met à jour les options dynamiques des champs qui dépendent du champ source.
+        Recharge les options dynamiques d'un champ si leurs arguments ont changé.
 
         Args:
-            source_field_id: Identifiant du champ source
-            source_unique_id: Identifiant unique du champ source
-            source_field: Widget du champ source
+            field_id: Identifiant du champ
+            field: Champ dont les options dépendent d'autres champs
         """
-        # Utiliser les dictionnaires miroirs pour une recherche directe
-        dependent_fields = []
-
-        # Déboguer le contenu du dictionnaire miroir
-        logger.debug(f"Vérification des dépendances pour {source_field_id} (unique: {source_unique_id})")
-        logger.debug(f"mirror_dynamic_options contient {len(self.mirror_dynamic_options)} clés: {list(self.mirror_dynamic_options.keys())}")
-        
-        # Chercher dans le dictionnaire miroir avec l'ID du champ
-        if source_field_id in self.mirror_dynamic_options:
-            logger.debug(f"Trouvé {len(self.mirror_dynamic_options[source_field_id])} dépendances pour {source_field_id}: {self.mirror_dynamic_options[source_field_id]}")
-            dependent_fields.extend(self.mirror_dynamic_options[source_field_id])
-        else:
-            logger.debug(f"Aucune dépendance trouvée pour {source_field_id} dans mirror_dynamic_options")
-
-        # Chercher aussi avec l'ID unique si différent
-        if source_unique_id != source_field_id and source_unique_id in self.mirror_dynamic_options:
-            logger.debug(f"Trouvé {len(self.mirror_dynamic_options[source_unique_id])} dépendances pour {source_unique_id}: {self.mirror_dynamic_options[source_unique_id]}")
-            dependent_fields.extend(self.mirror_dynamic_options[source_unique_id])
-        elif source_unique_id != source_field_id:
-            logger.debug(f"Aucune dépendance trouvée pour {source_unique_id} dans mirror_dynamic_options")
-
-        # Si aucun champ dépendant trouvé, sortir rapidement
-        if not dependent_fields:
-            logger.debug(f"Aucun champ dépendant trouvé pour {source_field_id} ou {source_unique_id}")
+        if not hasattr(field, 'update_dynamic_options'):
             return
 
-        logger.debug(f"Mise à jour de {len(dependent_fields)} champs avec options dynamiques dépendant de {source_field_id}: {dependent_fields}")
-
-        # Préparer les valeurs des arguments pour les options dynamiques
-        source_value = self._get_field_value(source_field)
-
-        # Mettre à jour chaque champ dépendant
-        for dep_field_id in dependent_fields:
-            # Récupérer le champ dépendant
-            dependent_field = self.fields_by_id.get(dep_field_id)
-            if not dependent_field or not hasattr(dependent_field, 'update_dynamic_options'):
-                continue
+        # Ne pas mettre à jour les options des champs désactivés
+        if hasattr(field, 'disabled') and field.disabled:
+            logger.debug(f"Champ {field_id} désactivé, options non mises à jour")
+            return
 
-            # Vérifier si le champ est activé (ne pas mettre à jour les options des champs désactivés)
-            if hasattr(dependent_field, 'disabled') and dependent_field.disabled:
-                logger.debug(f"Champ {dep_field_id} désactivé, options non mises à jour")
-                continue
+        update_kwargs = self._prepare_dynamic_options_args(field)
 
-            # Préparer les arguments pour la mise à jour des options
-            update_kwargs = self._prepare_dynamic_options_args(dependent_field, dep_field_id, source_field_id, source_value)
+        # Mêmes arguments que lors du dernier chargement: rien à recalculer
+        signature = repr(sorted(update_kwargs.items(), key=lambda item: item[0]))
+        if self._options_args_cache.get(field_id) == signature:
+            logger.debug(f"Arguments inchangés pour {field_id}, options conservées")
+            return
+        self._options_args_cache[field_id] = signature
 
-            # Mettre à jour les options
-            try:
-                result = dependent_field.update_dynamic_options(**update_kwargs)
-                logger.debug(f"Options mises à jour pour {dep_field_id}: {result}")
+        try:
+            result = field.update_dynamic_options(**update_kwargs)
+            logger.debug(f"Options mises à jour pour {field_id}: {result}")
 
-                # Vérifier s'il faut supprimer le champ (cas spécial: groupe de cases à cocher sans options)
-                if not result and hasattr(dependent_field, 'field_config') and dependent_field.field_config.get('type') == 'checkbox_group':
-                    logger.debug(f"Le champ {dep_field_id} n'a plus d'options, planifié pour suppression")
-                    self._fields_to_remove.add(dep_field_id)
-            except Exception as e:
-                logger.error(f"Erreur lors de la mise à jour des options pour {dep_field_id}: {e}")
+            # Vérifier s'il faut supprimer le champ (cas spécial: groupe de cases à cocher sans options)
+            if not result and field.field_config.get('type') == 'checkbox_group':
+                logger.debug(f"Le champ {field_id} n'a plus d'options, planifié pour suppression")
+                self._fields_to_remove.add(getattr(field, 'unique_id', field_id))
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour des options pour {field_id}: {e}")
 
-    def _prepare_dynamic_options_args(self, field: Widget, field_id: str, source_field_id: str, source_value: Any) -> Dict[str, Any]:
+    def _prepare_dynamic_options_args(self, field: Widget) -> Dict[str, Any]:
         """
         Prépare les arguments pour la mise à jour des options dynamiques.
 
         Args:
             field: Champ dont les options doivent être mises à jour
-            field_id: Identifiant du champ
-            source_field_id: Identifiant du champ qui a déclenché la mise à jour
-            source_value: Valeur du champ source
 
         Returns:
             Dict[str, Any]: Arguments à passer à update_dynamic_options
         """
         kwargs = {}
 
-        # Si le champ n'est pas dans notre mapping d'options dynamiques, retourner un dict vide
-        if field_id not in self.dynamic_options_map:
-            return kwargs
+        dynamic_options = field.dependencies.get('dynamic_options') or {}
+        for arg in dynamic_options.get('args', []):
+            if 'field_id' not in arg or 'param_name' not in arg:
+                continue
 
-        # Récupérer la configuration des options dynamiques
-        dynamic_config = self.dynamic_options_map[field_id]
+            dep_field = self._get_local_field(str(arg['field_id']))
+            # Ne pas inclure les valeurs des champs absents ou désactivés
+            if dep_field is None or (hasattr(dep_field, 'disabled') and dep_field.disabled):
+                continue
 
-        # Parcourir tous les arguments définis
-        for arg in dynamic_config.get('args', []):
-            # Support du nouveau format avec 'field' et 'param'
-            if 'field' in arg and 'param_name' in arg:
-                dep_field_id = arg['field']
-                param_name = arg['param_name']
-                
-                # Si c'est le champ source qui a déclenché la mise à jour, utiliser sa valeur
-                if dep_field_id == source_field_id:
-                    kwargs[param_name] = source_value
-                # Sinon, chercher la valeur dans les champs existants
-                elif dep_field_id in self.fields_by_id:
-                    dep_field = self.fields_by_id[dep_field_id]
-                    # Ne pas inclure les valeurs des champs désactivés
-                    if not (hasattr(dep_field, 'disabled') and dep_field.disabled):
-                        kwargs[param_name] = self._get_field_value(dep_field)
-                        
-                logger.debug(f"Argument dynamique: {param_name}={kwargs.get(param_name)} depuis {dep_field_id}")
-            # Support de l'ancien format avec 'field_id' et 'param_name'
-            elif 'field_id' in arg and 'param_name' in arg:
-                dep_field_id = arg['field_id']
-                param_name = arg['param_name']
-
-                # Si c'est le champ source qui a déclenché la mise à jour, utiliser sa valeur
-                if dep_field_id == source_field_id:
-                    kwargs[param_name] = source_value
-                # Sinon, chercher la valeur dans les champs existants
-                elif dep_field_id in self.fields_by_id:
-                    dep_field = self.fields_by_id[dep_field_id]
-                    # Ne pas inclure les valeurs des champs désactivés
-                    if not (hasattr(dep_field, 'disabled') and dep_field.disabled):
-                        kwargs[param_name] = self._get_field_value(dep_field)
-                        
-                logger.debug(f"Argument dynamique: {param_name}={kwargs.get(param_name)} depuis {dep_field_id}")
+            kwargs[arg['param_name']] = self._get_field_value(dep_field)
+            logger.debug(f"Argument dynamique: {arg['param_name']}={kwargs[arg['param_name']]} depuis {arg['field_id']}")
 
         return kwargs
 
-    def _update_value_dependencies(self, source_field_id: str, source_unique_id: str, source_field: Widget) -> None:
+    def _recompute_value(self, field: Widget, changed: Optional[Set[str]] = None) -> None:
         """
-        Met à jour les valeurs des champs qui dépendent du champ source.
+        Recalcule la valeur d'un champ à partir des champs dont il dépend.
         Supporte les dépendances multiples avec opérateurs logiques (AND/OR).
 
         Args:
-            source_field_id: Identifiant du champ source
-            source_unique_id: Identifiant unique du champ source
-            source_field: Widget du champ source
+            field: Champ dont la valeur dépend d'autres champs
+            changed: Champs modifiés, pour choisir la valeur source
         """
-        # Utiliser les dictionnaires miroirs pour une recherche directe
-        dependent_fields = []
+        depends_on = field.dependencies.get('depends_on') or {}
+        fields = [str(f) for f in depends_on.get('fields', [])]
+        if not fields:
+            return
 
-        # Chercher dans le dictionnaire miroir avec l'ID du champ
-        if source_field_id in self.mirror_value_deps:
-            dependent_fields.extend(self.mirror_value_deps[source_field_id])
+        # Un champ source est considéré valide s'il est activé et a une valeur non vide
+        validity = []
+        for dep_field_id in fields:
+            dep_field = self._get_local_field(dep_field_id)
+            if dep_field is None:
+                validity.append(False)
+                continue
+            validity.append(bool(not getattr(dep_field, 'disabled', False) and self._get_field_value(dep_field)))
 
-        # Chercher aussi avec l'ID unique si différent
-        if source_unique_id != source_field_id and source_unique_id in self.mirror_value_deps:
-            dependent_fields.extend(self.mirror_value_deps[source_unique_id])
+        operator = str(depends_on.get('operator', 'AND')).upper()
+        should_enable = any(validity) if operator == 'OR' else all(validity)
 
-        # Si aucun champ dépendant trouvé, sortir rapidement
-        if not dependent_fields:
+        if not should_enable:
+            # Désactiver le champ
+            if not getattr(field, 'disabled', False):
+                self._update_field_enabled_state(field, False)
             return
 
-        # Récupérer la valeur actuelle du champ source
-        source_value = self._get_field_value(source_field)
-        logger.debug(f"Mise à jour de {len(dependent_fields)} champs dont la valeur dépend de {source_field_id}={source_value}")
+        # Activer le champ s'il était désactivé
+        if getattr(field, 'disabled', False):
+            self._update_field_enabled_state(field, True)
 
-        # Mettre à jour chaque champ dépendant
-        for dep_field_id in dependent_fields:
-            # Récupérer le champ dépendant
-            dependent_field = self.fields_by_id.get(dep_field_id)
-            if not dependent_field:
-                continue
+        # La valeur source est celle du champ qui a changé, sinon celle du premier champ
+        trigger_id = next((f for f in fields if changed and f in changed), fields[0])
+        source_value = self._get_field_value(self._get_local_field(trigger_id))
 
-            # Vérifier si le champ utilise le nouveau format avec dépendances multiples
-            if dep_field_id in self.value_deps_map and isinstance(self.value_deps_map[dep_field_id], dict) and 'fields' in self.value_deps_map[dep_field_id]:
-                # Nouveau format avec dépendances multiples
-                fields = self.value_deps_map[dep_field_id]['fields']
-                operator = self.value_deps_map[dep_field_id].get('operator', 'AND')
-                
-                # Vérifier si le champ source fait partie des dépendances
-                if source_field_id in fields or source_unique_id in fields:
-                    # Pour les dépendances multiples, nous devons vérifier l'état de tous les champs dépendants
-                    all_fields_valid = True
-                    any_field_valid = False
-                    
-                    # Vérifier chaque champ dépendant
-                    for field_id in fields:
-                        field = self.fields_by_id.get(field_id)
-                        if field:
-                            # Un champ est considéré valide s'il est activé et a une valeur non vide
-                            field_value = self._get_field_value(field)
-                            field_valid = not (hasattr(field, 'disabled') and field.disabled) and field_value
-                            
-                            all_fields_valid = all_fields_valid and field_valid
-                            any_field_valid = any_field_valid or field_valid
-                        else:
-                            # Si un champ est manquant, il est considéré comme non valide
-                            all_fields_valid = False
-                    
-                    # Déterminer si le champ doit être activé selon l'opérateur
-                    should_enable = (operator.upper() == 'AND' and all_fields_valid) or \
-                                   (operator.upper() == 'OR' and any_field_valid)
-                    
-                    # Activer ou désactiver le champ selon l'état des dépendances
-                    if should_enable:
-                        # Activer le champ s'il était désactivé
-                        if hasattr(dependent_field, 'disabled') and dependent_field.disabled:
-                            self._update_field_enabled_state(dependent_field, True)
-                            
-                        # Déterminer la nouvelle valeur selon le type de dépendance
-                        new_value = self._compute_dependent_value(dependent_field, source_value)
-                        logger.debug(f"Mise à jour de {dep_field_id} avec dépendances multiples suite au changement de {source_field_id}")
-                    else:
-                        # Désactiver le champ
-                        if not hasattr(dependent_field, 'disabled') or not dependent_field.disabled:
-                            self._update_field_enabled_state(dependent_field, False)
-                        continue
-                else:
-                    # Le champ source ne fait pas partie des dépendances, ignorer
-                    continue
-            else:
-                # Ancien format (rétro-compatibilité)
-                # Vérifier si le champ source a une valeur valide
-                source_valid = source_value is not None and source_value != ''
-                
-                # Activer ou désactiver le champ selon l'état du champ source
-                if source_valid:
-                    # Activer le champ s'il était désactivé
-                    if hasattr(dependent_field, 'disabled') and dependent_field.disabled:
-                        self._update_field_enabled_state(dependent_field, True)
-                        
-                    # Déterminer la nouvelle valeur selon le type de dépendance
-                    new_value = self._compute_dependent_value(dependent_field, source_value)
-                else:
-                    # Désactiver le champ
-                    if not hasattr(dependent_field, 'disabled') or not dependent_field.disabled:
-                        self._update_field_enabled_state(dependent_field, False)
-                    continue
+        new_value = self._compute_dependent_value(field, source_value)
+        if new_value is not None:
+            success = self._update_field_value(field, new_value)
+            logger.debug(f"Valeur mise à jour pour {field.field_id}: {new_value} (succès: {success})")
+
+    def _update_field_value(self, field: Widget, value: Any) -> bool:
+        """
+        Applique une valeur calculée à un champ dépendant.
 
-            # Mettre à jour la valeur
-            if new_value is not None:
-                success = self._update_field_value(dependent_field, new_value)
-                logger.debug(f"Valeur mise à jour pour {dep_field_id}: {new_value} (succès: {success})")
+        Les champs en aval sont recalculés par le graphe: le champ ne notifie
+        donc pas lui-même ses dépendants.
+
+        Args:
+            field: Champ à mettre à jour
+            value: Nouvelle valeur
+
+        Returns:
+            bool: True si la mise à jour a réussi
+        """
+        try:
+            if hasattr(field, 'set_value'):
+                return bool(field.set_value(value, update_dependencies=False))
+            field.value = value
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour de la valeur de {field.field_id}: {e}")
+            return False
 
     def _compute_dependent_value(self, field: Widget, source_value: Any) -> Any:
         """
@@ -1,12 +1,12 @@
 from textual.app import ComposeResult
 from textual.containers import HorizontalGroup, VerticalGroup
 from textual.widgets import Label, Select
+from textual.worker import get_current_worker
 import os
 from typing import Dict, Any, Optional, Tuple, List, Set, Union, Callable
-import importlib.util
-import sys
 import traceback
 
+from .dynamic_options_service import DynamicOptionsService
 from ..utils.logging import get_logger
 
 logger = get_logger('config_field')
@@ -65,6 +65,10 @@ class ConfigField(VerticalGroup):
         # Initialiser les dépendances à partir de la configuration
         self._init_dependencies()
 
+        # Valeur par défaut dynamique non mémorisée: chargée en arrière-plan au montage
+        self._dynamic_default_pending = False
+        self._dynamic_default_placeholder = None
+
         # Valeur actuelle
         self.value = self._get_default_value()
         logger.debug(f"Champ {self.field_id} initialisé avec valeur: {self.value}")
@@ -239,11 +243,15 @@ class ConfigField(VerticalGroup):
             # Sinon, utiliser la méthode standard
             return self._get_dependent_value()
 
-        # Cas 2: Valeur par défaut dynamique via script
+        # Cas 2: Valeur par défaut dynamique via script (si déjà mémorisée,
+        # sinon la valeur statique sert en attendant le chargement en arrière-plan)
         if 'dynamic_default' in self.field_config:
-            dynamic_value = self._get_dynamic_default()
+            found, dynamic_value = self._get_dynamic_default(use_cache_only=True)
             if dynamic_value is not None:
                 return dynamic_value
+            if not found:
+                self._dynamic_default_pending = True
+                self._dynamic_default_placeholder = self.field_config.get('default')
 
         # Cas 3: Valeur par défaut statique dans la configuration
         if 'default' in self.field_config:
@@ -274,43 +282,62 @@ class ConfigField(VerticalGroup):
         # Si pas de correspondance, utiliser la valeur par défaut standard
         return self.field_config.get('default')
 
-    def _get_dynamic_default(self) -> Any:
+    def _get_dynamic_default_call(self) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Détermine le script, la fonction et les arguments de la valeur par défaut dynamique.
+
+        Returns:
+            Optional[Tuple[str, str, Dict[str, Any]]]: (chemin_script, fonction, arguments) ou None
+        """
+        if 'dynamic_default' not in self.field_config or 'script' not in self.field_config['dynamic_default']:
+            return None
+
+        dynamic_config = self.field_config['dynamic_default']
+
+        # Déterminer le chemin du script
+        script_path = self._resolve_script_path(dynamic_config)
+        if not os.path.exists(script_path):
+            logger.error(f"Script non trouvé: {script_path}")
+            return None
+
+        # Déterminer la fonction à appeler et préparer les arguments
+        function_name = dynamic_config.get('function', 'get_default_value')
+        function_args = self._prepare_function_args(dynamic_config)
+
+        return script_path, function_name, function_args
+
+    def _get_dynamic_default(self, use_cache_only: bool = False) -> Any:
         """
         Récupère une valeur par défaut dynamique via un script.
 
+        Les résultats sont mémorisés par DynamicOptionsService.
+
+        Args:
+            use_cache_only: Si True, ne consulte que les résultats mémorisés et
+                retourne (trouvé, valeur) sans appeler le script
+
         Returns:
             Any: Valeur obtenue dynamiquement ou None en cas d'échec
+                 ((trouvé, valeur) si use_cache_only)
         """
         try:
-            if 'dynamic_default' not in self.field_config or 'script' not in self.field_config['dynamic_default']:
-                return None
+            call = self._get_dynamic_default_call()
+            if not call:
+                return (True, None) if use_cache_only else None
 
+            script_path, function_name, function_args = call
             dynamic_config = self.field_config['dynamic_default']
-            script_name = dynamic_config['script']
-            logger.debug(f"Chargement de valeur dynamique pour {self.field_id} via script: {script_name}")
-
-            # Déterminer le chemin du script
-            script_path = self._resolve_script_path(dynamic_config)
-            if not os.path.exists(script_path):
-                logger.error(f"Script non trouvé: {script_path}")
-                return None
+            service = DynamicOptionsService.get_instance()
 
-            # Importer le script
-            module = self._import_script_module(script_path)
-            if not module:
-                return None
-
-            # Déterminer la fonction à appeler
-            function_name = dynamic_config.get('function', 'get_default_value')
-            if not hasattr(module, function_name):
-                logger.error(f"Fonction {function_name} non trouvée dans {script_name}")
-                return None
+            if use_cache_only:
+                found, result = service.get_cached(script_path, function_name, kwargs=function_args)
+                if not found:
+                    return False, None
+                return True, self._process_dynamic_result(result, dynamic_config)
 
-            # Préparer les arguments
-            function_args = self._prepare_function_args(dynamic_config)
-
-            # Appeler la fonction
-            result = getattr(module, function_name)(**function_args)
+            logger.debug(f"Chargement de valeur dynamique pour {self.field_id} via script: {dynamic_config['script']}")
+            result = service.call(script_path, function_name, kwargs=function_args,
+                                  ttl=dynamic_config.get('cache_ttl'))
             logger.debug(f"Résultat obtenu du script: {result}")
 
             # Traiter le résultat
@@ -319,7 +346,63 @@ class ConfigField(VerticalGroup):
         except Exception as e:
             logger.error(f"Erreur lors de l'obtention de la valeur dynamique: {e}")
             logger.error(traceback.format_exc())
-            return None
+            return (True, None) if use_cache_only else None
+
+    def on_mount(self) -> None:
+        """Lance le chargement de la valeur par défaut dynamique si elle n'est pas encore disponible."""
+        if self._dynamic_default_pending:
+            self._load_dynamic_default()
+
+    def _load_dynamic_default(self) -> None:
+        """
+        Calcule la valeur par défaut dynamique dans un worker, sans bloquer l'interface.
+        """
+        call = self._get_dynamic_default_call()
+        if not call:
+            self._dynamic_default_pending = False
+            return
+
+        script_path, function_name, function_args = call
+        dynamic_config = self.field_config['dynamic_default']
+
+        def load_default() -> None:
+            try:
+                result = DynamicOptionsService.get_instance().call(
+                    script_path, function_name, kwargs=function_args,
+                    ttl=dynamic_config.get('cache_ttl')
+                )
+                value = self._process_dynamic_result(result, dynamic_config)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'obtention de la valeur dynamique: {e}")
+                value = None
+
+            if not get_current_worker().is_cancelled:
+                self.app.call_from_thread(self._apply_dynamic_default, value)
+
+        self.run_worker(load_default, thread=True, exclusive=True,
+                        group=f"dynamic_default_{self.field_id}")
+
+    def _apply_dynamic_default(self, value: Any) -> None:
+        """
+        Applique la valeur par défaut dynamique chargée, sauf si la valeur a été
+        modifiée entre-temps (saisie ou configuration restaurée).
+
+        Args:
+            value: Valeur obtenue du script
+        """
+        self._dynamic_default_pending = False
+        if value is None:
+            return
+
+        # Comparaison sous forme de chaînes: les champs texte stockent des str
+        current_value = "" if self.value is None else str(self.value)
+        placeholder = "" if self._dynamic_default_placeholder is None else str(self._dynamic_default_placeholder)
+        if current_value != placeholder:
+            logger.debug(f"Valeur de {self.field_id} modifiée pendant le chargement, valeur dynamique ignorée")
+            return
+
+        logger.debug(f"Valeur dynamique appliquée à {self.field_id}: {value}")
+        self.set_value(value, update_input=True, update_dependencies=True)
 
     def _resolve_script_path(self, dynamic_config: Dict[str, Any]) -> str:
         """
@@ -356,7 +439,7 @@ class ConfigField(VerticalGroup):
 
     def _import_script_module(self, script_path: str) -> Optional[Any]:
         """
-        Importe un module Python depuis un chemin de fichier.
+        Importe un module Python depuis un chemin de fichier (module mis en cache par le service).
 
         Args:
             script_path: Chemin vers le script à importer
@@ -364,27 +447,7 @@ class ConfigField(VerticalGroup):
         Returns:
             Optional[Any]: Module importé ou None en cas d'échec
         """
-        try:
-            # Ajouter le dossier du script au chemin de recherche
-            script_dir = os.path.dirname(script_path)
-            if script_dir not in sys.path:
-                sys.path.append(script_dir)
-
-            # Créer un spécificateur de module
-            spec = importlib.util.spec_from_file_location("dynamic_module", script_path)
-            if not spec:
-                logger.error(f"Impossible de créer un spécificateur pour {script_path}")
-                return None
-
-            # Charger le module
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            return module
-
-        except Exception as e:
-            logger.error(f"Erreur lors de l'importation du module {script_path}: {e}")
-            return None
+        return DynamicOptionsService.get_instance().load_module(script_path)
 
     def _prepare_function_args(self, dynamic_config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -12,6 +12,8 @@ from pathlib import Path
 from ..utils.logging import get_logger
 from ..choice_screen.plugin_utils import get_plugin_folder_name, get_plugin_settings_path
 from .plugin_config_container import PluginConfigContainer
+from .lazy_plugin_container import LazyPluginContainer
+from .dependency_graph import FieldDependencyGraph
 from .text_field import TextField
 from .checkbox_field import CheckboxField
 from .config_manager import ConfigManager
@@ -58,6 +60,15 @@ class PluginConfig(Screen):
             self.containers_by_id = {}
             self.plugins_remote_enabled = {}
             self.ssh_container = None
+
+            # Modèle des valeurs des plugins dont le conteneur n'est pas encore créé
+            self.config_values = {}      # {plugin_instance_id: {variable: valeur}}
+            self.remote_values = {}      # {plugin_instance_id: exécution distante activée}
+            self.lazy_containers = {}    # {plugin_instance_id: LazyPluginContainer}
+            self.remote_plugins = []
+
+            # Graphe des dépendances entre champs, partagé par tous les conteneurs
+            self.dependency_graph = FieldDependencyGraph()
             self.sequence_file = sequence_file
             self.returning_from_execution = False
 
@@ -187,8 +198,8 @@ class PluginConfig(Screen):
             yield Header()
 
             # Vérifier si des plugins supportent l'exécution à distance
-            remote_plugins = self._get_remote_execution_plugins()
-            has_remote_plugins = len(remote_plugins) > 0
+            self.remote_plugins = self._get_remote_execution_plugins()
+            has_remote_plugins = len(self.remote_plugins) > 0
             logger.debug(f"Has remote plugins: {has_remote_plugins}")
 
             # Titre de la configuration
@@ -196,7 +207,8 @@ class PluginConfig(Screen):
 
             # Conteneur principal avec défilement
             with ScrollableContainer(id="config-container-list"):
-                # Ajouter les configurations de plugins
+                # Ajouter un emplacement replié par plugin: le conteneur réel
+                # n'est créé que lorsqu'il devient visible ou reçoit le focus
                 for plugin_data in self.plugin_instances:
                     # Extraire les données du plugin
                     if len(plugin_data) >= 3:
@@ -208,20 +220,21 @@ class PluginConfig(Screen):
                     if plugin_name.startswith('__sequence__'):
                         continue
 
-                    logger.debug(f"Creating config for plugin: {plugin_name}_{instance_id}")
-                    plugin_container = self._create_plugin_config(plugin_name, instance_id)
-
-                    # Vérifier que le container a été créé
-                    if plugin_container is None:
-                        logger.warning(f"Impossible de créer le conteneur pour {plugin_name}_{instance_id}")
-                        continue
-
-                    # Ajouter la case à cocher d'exécution distante si nécessaire
-                    if plugin_name in remote_plugins:
-                        self._add_remote_execution_checkbox(plugin_container, plugin_name, instance_id)
+                    plugin_instance_id = f"{plugin_name}_{instance_id}"
+                    self._init_plugin_model(plugin_instance_id)
+
+                    plugin_settings = self.config_manager.plugin_configs.get(plugin_name, {})
+                    logger.debug(f"Création de l'emplacement pour {plugin_instance_id}")
+                    placeholder = LazyPluginContainer(
+                        plugin_instance_id,
+                        title=plugin_settings.get('name', plugin_name),
+                        icon=plugin_settings.get('icon', '📦'),
+                        loader=lambda p=plugin_name, i=instance_id: self._load_plugin_container(p, i),
+                        id=f"lazy_{plugin_instance_id}"
+                    )
+                    self.lazy_containers[plugin_instance_id] = placeholder
 
-                    # Monter le conteneur
-                    yield plugin_container
+                    yield placeholder
 
                 # Ajouter le conteneur SSH vide si nécessaire
                 if has_remote_plugins:
@@ -262,6 +275,11 @@ class PluginConfig(Screen):
             # Créer les conteneurs et les champs
             self.call_after_refresh(self.create_config_fields)
 
+            # Créer les conteneurs visibles, puis ceux qui le deviennent au défilement
+            scroll = self.query_one("#config-container-list", ScrollableContainer)
+            self.watch(scroll, "scroll_y", self._expand_visible_containers, init=False)
+            self.call_after_refresh(self._expand_visible_containers)
+
             # Restaurer les valeurs si on revient de l'écran d'exécution
             if self.returning_from_execution and self.current_config:
                 logger.debug(f"Restauration de la configuration préservée")
@@ -303,6 +321,10 @@ class PluginConfig(Screen):
             if self.ssh_container:
                 self._populate_ssh_container()
 
+                # Activer la configuration SSH si un plugin encore replié l'utilise
+                if any(self._is_remote_enabled(key) for key in self.remote_values):
+                    self.call_after_refresh(self.toggle_ssh_config, True)
+
             logger.debug(f"Total de {len(self.containers_by_id)} containers et {len(self.fields_by_id)} champs")
         except Exception as e:
             logger.error(f"Erreur lors de la création des champs de configuration: {e}")
@@ -353,6 +375,155 @@ class PluginConfig(Screen):
             logger.error(f"Erreur lors du remplissage du conteneur SSH: {e}")
             logger.error(traceback.format_exc())
 
+    def _init_plugin_model(self, plugin_instance_id: str) -> None:
+        """
+        Initialise le modèle de valeurs d'une instance à partir de current_config.
+
+        Args:
+            plugin_instance_id: Identifiant de l'instance (plugin_instanceid)
+        """
+        predefined = self.current_config.get(plugin_instance_id, {})
+        self.config_values[plugin_instance_id] = dict(predefined.get('config', {}) or {})
+        self.remote_values[plugin_instance_id] = bool(predefined.get('remote_execution', False))
+
+    def _load_plugin_container(self, plugin_name: str, instance_id: int) -> Optional[Container]:
+        """
+        Crée le conteneur réel d'une instance à la demande de son emplacement.
+
+        Args:
+            plugin_name: Nom du plugin
+            instance_id: ID d'instance
+
+        Returns:
+            Optional[Container]: Conteneur créé ou None en cas d'erreur
+        """
+        plugin_instance_id = f"{plugin_name}_{instance_id}"
+
+        # Repartir des valeurs du modèle pour les valeurs prédéfinies des champs
+        if plugin_instance_id in self.current_config:
+            self.current_config[plugin_instance_id]['config'] = dict(self.config_values.get(plugin_instance_id, {}))
+
+        container = self._create_plugin_config(plugin_name, instance_id)
+        if container is None:
+            return None
+
+        if plugin_name in self.remote_plugins:
+            self._add_remote_execution_checkbox(container, plugin_name, instance_id)
+
+        self.call_after_refresh(self._register_container, container)
+        return container
+
+    def _register_container(self, container: Container) -> None:
+        """
+        Indexe un conteneur créé à la demande et ses champs.
+
+        Args:
+            container: Conteneur de configuration monté
+        """
+        if not getattr(container, 'id', None):
+            return
+
+        self.containers_by_id[container.id] = container
+        if hasattr(container, 'fields_by_id'):
+            self.fields_by_id.update(container.fields_by_id)
+        logger.debug(f"Conteneur créé à la demande: {container.id}")
+
+    def _expand_visible_containers(self) -> None:
+        """
+        Crée le conteneur réel du premier emplacement replié visible.
+
+        Un seul emplacement est déplié à la fois: le suivant n'est examiné
+        qu'après le rafraîchissement, une fois la mise en page recalculée.
+        """
+        try:
+            scroll = self.query_one("#config-container-list", ScrollableContainer)
+            top = scroll.scroll_offset.y
+            bottom = top + scroll.size.height
+
+            for placeholder in self.lazy_containers.values():
+                if placeholder.expanded or not placeholder.is_mounted:
+                    continue
+                region = placeholder.virtual_region
+                if region.y >= bottom:
+                    # Les emplacements suivants sont plus bas: rien d'autre n'est visible
+                    break
+                if region.bottom > top:
+                    if placeholder.expand() is not None:
+                        self.call_after_refresh(self._expand_visible_containers)
+                    break
+        except Exception as e:
+            logger.error(f"Erreur lors de la création des conteneurs visibles: {e}")
+            logger.error(traceback.format_exc())
+
+    def on_resize(self) -> None:
+        """Crée les conteneurs rendus visibles par un agrandissement de l'écran."""
+        self.call_after_refresh(self._expand_visible_containers)
+
+    def _is_remote_enabled(self, plugin_instance_id: str) -> bool:
+        """
+        Indique si l'exécution distante est activée pour une instance.
+
+        Args:
+            plugin_instance_id: Identifiant de l'instance (plugin_instanceid)
+
+        Returns:
+            bool: Valeur de la case à cocher si le conteneur existe, sinon celle du modèle
+        """
+        if plugin_instance_id in self.plugins_remote_enabled:
+            return bool(self.plugins_remote_enabled[plugin_instance_id].get_value())
+        return self.remote_values.get(plugin_instance_id, False)
+
+    def _is_plugin_expanded(self, plugin_instance_id: str) -> bool:
+        """
+        Indique si le conteneur réel d'une instance a été créé.
+
+        Args:
+            plugin_instance_id: Identifiant de l'instance (plugin_instanceid)
+
+        Returns:
+            bool: True si les champs de l'instance existent
+        """
+        placeholder = self.lazy_containers.get(plugin_instance_id)
+        return placeholder is None or placeholder.expanded
+
+    def _get_model_values(self, plugin_name: str, instance_id: int) -> Dict[str, Any]:
+        """
+        Récupère les valeurs d'une instance repliée depuis le modèle.
+
+        Les valeurs par défaut dynamiques absentes du modèle sont calculées
+        via le script du champ (résultats mémorisés par DynamicOptionsService).
+
+        Args:
+            plugin_name: Nom du plugin
+            instance_id: ID d'instance
+
+        Returns:
+            Dict[str, Any]: Valeurs {nom_variable: valeur}
+        """
+        values = dict(self.config_values.get(f"{plugin_name}_{instance_id}", {}))
+        plugin_settings = self.config_manager.plugin_configs.get(plugin_name, {})
+
+        for field_id, field_config in plugin_settings.get('config_fields', {}).items():
+            if not isinstance(field_config, dict) or 'dynamic_default' not in field_config:
+                continue
+            variable_name = field_config.get('variable', field_id)
+            if variable_name in values and values[variable_name] != field_config.get('default'):
+                continue
+
+            try:
+                # Champ détaché, jamais monté, utilisé uniquement pour résoudre le script
+                field_config_copy = dict(field_config, id=field_id, unique_id=f"{field_id}_{instance_id}")
+                field_class = PluginConfigContainer.FIELD_TYPES.get(
+                    field_config.get('type', 'text'), PluginConfigContainer.FIELD_TYPES['text'])
+                field = field_class(plugin_name, field_id, field_config_copy, {}, is_global=False)
+                dynamic_value = field._get_dynamic_default()
+                if dynamic_value is not None:
+                    values[variable_name] = dynamic_value
+            except Exception as e:
+                logger.error(f"Erreur lors du calcul de la valeur dynamique de {plugin_name}.{field_id}: {e}")
+
+        return values
+
     def _create_plugin_config(self, plugin: str, instance_id: int) -> Optional[Container]:
         """
         Crée un conteneur de configuration pour un plugin.
@@ -422,6 +593,7 @@ class PluginConfig(Screen):
                 fields_by_plugin=self.fields_by_plugin,
                 fields_by_id=fields_by_id,
                 config_fields=config_fields,
+                dependency_graph=self.dependency_graph,
                 id=f"plugin_{plugin}_{instance_id}",
                 classes="config-container"
             )
@@ -451,7 +623,7 @@ class PluginConfig(Screen):
                 "type": "checkbox",
                 "label": "⚠️  Activer l'exécution distante pour ce plugin",
                 "description": "Cochez cette case pour exécuter ce plugin via SSH sur des machines distantes",
-                "default": False,
+                "default": self.remote_values.get(f"{plugin_name}_{instance_id}", False),
                 "id": remote_field_id,
                 "variable": "remote_execution_enabled",
                 "required": True
@@ -553,9 +725,9 @@ class PluginConfig(Screen):
                     remote_field = self.plugins_remote_enabled[plugin_id]
                     remote_field.set_value(remote_enabled)
 
-                    # Activer/désactiver la configuration SSH
-                    if remote_enabled:
-                        self.toggle_ssh_config(True)
+                # Activer la configuration SSH (y compris pour un conteneur encore replié)
+                if remote_enabled:
+                    self.toggle_ssh_config(True)
 
             # Mettre à jour les dépendances
             self.update_all_dependencies()
@@ -587,65 +759,22 @@ class PluginConfig(Screen):
     def update_all_dependencies(self) -> None:
         """
         Met à jour toutes les dépendances entre champs.
-        Compatible avec la nouvelle structure standardisée des dépendances.
+
+        Chaque conteneur recalcule ses champs dépendants en ordre topologique
+        à partir du graphe de dépendances de l'écran.
         """
         try:
             logger.debug("Mise à jour de toutes les dépendances")
 
-            # Parcourir tous les conteneurs
             for container_id, container in self.containers_by_id.items():
-                # Vérifier si c'est un ConfigContainer avec notre nouvelle structure de dépendances
-                if hasattr(container, 'dependency_map'):
-                    # Nouvelle méthode pour ConfigContainer modifié
-                    self._update_dependencies_new(container)
-                elif hasattr(container, 'update_dependent_fields'):
-                    # Ancienne méthode pour compatibilité
-                    self._update_dependencies_legacy(container)
+                if hasattr(container, 'update_all_dependencies'):
+                    container.update_all_dependencies()
                 else:
                     logger.debug(f"Le conteneur {container_id} n'a pas de mécanisme de dépendances")
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour des dépendances: {e}")
-            import traceback
             logger.error(traceback.format_exc())
 
-    def _update_dependencies_new(self, container) -> None:
-        """
-        Met à jour les dépendances avec la nouvelle structure standardisée.
-        
-        Args:
-            container: Un conteneur utilisant la nouvelle structure dependency_map
-        """
-        # Stratégie : déclencher la mise à jour pour chaque champ source de dépendances
-        processed_fields = set()
-        
-        # Pour chaque type de dépendance
-        for dep_type in container.dependency_map:
-            # Pour chaque champ source dans le cache des dépendances
-            if hasattr(container, '_dependency_cache') and dep_type in container._dependency_cache:
-                for source_field_id in container._dependency_cache[dep_type]:
-                    # Éviter de traiter plusieurs fois le même champ
-                    if source_field_id in processed_fields:
-                        continue
-                        
-                    # Récupérer le champ source
-                    if source_field_id in container.fields_by_id:
-                        source_field = container.fields_by_id[source_field_id]
-                        # Déclencher la mise à jour des dépendances
-                        container.update_dependent_fields(source_field)
-                        processed_fields.add(source_field_id)
-
-    def _update_dependencies_legacy(self, container) -> None:
-        """
-        Met à jour les dépendances avec l'ancienne structure.
-        
-        Args:
-            container: Un conteneur utilisant l'ancienne structure de dépendances
-        """
-        # Ancienne méthode : mise à jour pour chaque champ du conteneur
-        for field_id, field in container.fields_by_id.items():
-            container.update_dependent_fields(field)
-            logger.debug(f"Dépendances mises à jour pour {field_id}")
-            
     async def on_button_pressed(self, event: Button.Pressed) -> None:
             """
             Gère les clics sur les boutons.
@@ -692,11 +821,7 @@ class PluginConfig(Screen):
         has_errors = False
 
         # Vérifier les champs SSH si nécessaires
-        has_remote_enabled = False
-        for plugin_key, field in self.plugins_remote_enabled.items():
-            if field.get_value():
-                has_remote_enabled = True
-                break
+        has_remote_enabled = any(self._is_remote_enabled(key) for key in self.remote_values)
 
         # Valider tous les champs de texte
         for field_id, field in self.fields_by_id.items():
@@ -715,18 +840,58 @@ class PluginConfig(Screen):
                     has_errors = True
                     logger.error(f"Erreur de validation pour {field_id}: {error_msg}")
 
+        # Valider les champs obligatoires des conteneurs encore repliés
+        if not self._validate_model_values():
+            has_errors = True
+
         if has_errors:
             self.notify("Veuillez corriger les erreurs de validation", severity="error")
             return False
 
         return True
 
+    def _validate_model_values(self) -> bool:
+        """
+        Vérifie les champs obligatoires des instances dont le conteneur n'est pas créé.
+
+        Une instance invalide est dépliée pour que l'utilisateur puisse la corriger.
+
+        Returns:
+            bool: True si toutes les instances repliées sont valides
+        """
+        is_valid = True
+
+        for plugin_instance_id, placeholder in self.lazy_containers.items():
+            if placeholder.expanded:
+                continue
+
+            plugin_name = plugin_instance_id.rsplit('_', 1)[0]
+            values = self.config_values.get(plugin_instance_id, {})
+            plugin_settings = self.config_manager.plugin_configs.get(plugin_name, {})
+
+            for field_id, field_config in plugin_settings.get('config_fields', {}).items():
+                if not isinstance(field_config, dict) or not field_config.get('required', False):
+                    continue
+                # Les champs conditionnels ou dynamiques sont validés une fois créés
+                if any(key in field_config for key in ('enabled_if', 'dynamic_default', 'depends_on')):
+                    continue
+
+                value = values.get(field_config.get('variable', field_id))
+                if value is None or value == '' or value == []:
+                    logger.error(f"Champ obligatoire vide pour {plugin_instance_id}: {field_id}")
+                    is_valid = False
+                    placeholder.expand()
+                    break
+
+        return is_valid
+
     def collect_configurations(self) -> None:
         """
         Collecte les configurations de tous les champs.
         """
         try:
             logger.debug("Collecte des configurations")
+            previous_config = self.current_config or {}
             self.current_config = {}
 
             # Récupérer la configuration SSH
@@ -752,12 +917,17 @@ class PluginConfig(Screen):
 
                 # Vérifier si l'exécution distante est activée pour ce plugin
                 plugin_key = f"{plugin_name}_{instance_id}"
-                remote_enabled = False
-                if plugin_key in self.plugins_remote_enabled:
-                    remote_enabled = self.plugins_remote_enabled[plugin_key].get_value()
+                remote_enabled = self._is_remote_enabled(plugin_key)
+
+                # Récupérer les valeurs des champs, ou celles du modèle si le conteneur est replié
+                if self._is_plugin_expanded(plugin_key):
+                    config_values = self._collect_plugin_field_values(plugin_name, instance_id)
+                else:
+                    config_values = self._get_model_values(plugin_name, instance_id)
 
-                # Récupérer les valeurs des champs
-                config_values = self._collect_plugin_field_values(plugin_name, instance_id)
+                # Garder le modèle à jour
+                self.config_values[plugin_key] = dict(config_values)
+                self.remote_values[plugin_key] = bool(remote_enabled)
 
                 # Ajouter les variables SSH si nécessaire
                 if supports_remote and remote_enabled:
@@ -777,6 +947,11 @@ class PluginConfig(Screen):
                     'remote_execution': supports_remote and remote_enabled
                 }
 
+                # Conserver les déclarations d'ordonnancement et de déploiement de la séquence
+                for key in ('after', 'requires', 'resources', 'rollout', 'force'):
+                    if key in previous_config.get(plugin_key, {}):
+                        self.current_config[plugin_key][key] = previous_config[plugin_key][key]
+
                 logger.debug(f"Configuration collectée pour {plugin_key}")
 
             logger.debug(f"Configuration finale: {len(self.current_config)} plugins")
@@ -903,11 +1078,7 @@ class PluginConfig(Screen):
 
             if is_remote_checkbox:
                 # Vérifier si au moins un plugin a l'exécution distante activée
-                has_remote_enabled = False
-                for _, field in self.plugins_remote_enabled.items():
-                    if field.get_value():
-                        has_remote_enabled = True
-                        break
+                has_remote_enabled = any(self._is_remote_enabled(key) for key in self.remote_values)
 
                 # Activer/désactiver la configuration SSH
                 self.toggle_ssh_config(has_remote_enabled)
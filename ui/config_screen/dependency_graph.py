@@ -0,0 +1,181 @@
+"""
+Graphe des dépendances entre champs de configuration.
+
+Le graphe est construit une fois par écran de configuration à partir des
+déclarations depends_on, enabled_if et dynamic_options.args des champs.
+Chaque conteneur y enregistre ses champs sous sa propre portée, et un
+changement de valeur ne recalcule que les champs situés en aval, dans
+l'ordre topologique.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..utils.logging import get_logger
+
+logger = get_logger('dependency_graph')
+
+# Types de dépendances, dans l'ordre où ils sont recalculés pour un même champ
+DEPENDENCY_KINDS = ('options', 'value', 'enabled')
+
+Node = Tuple[str, str]  # (portée, field_id)
+
+class FieldDependencyGraph:
+    """
+    Graphe orienté acyclique des dépendances entre champs.
+
+    Une arête source -> cible signifie que la cible doit être recalculée
+    (options, valeur ou activation) quand la source change.
+    """
+
+    def __init__(self):
+        """Initialise un graphe vide."""
+        # {noeud: {noeud_dépendant: {types}}}
+        self._edges: Dict[Node, Dict[Node, Set[str]]] = {}
+        # {noeud: {noeuds dont il dépend}}
+        self._reverse: Dict[Node, Set[Node]] = {}
+        self._nodes: Dict[Node, None] = {}          # Ordre d'insertion
+        self._rank: Optional[Dict[Node, int]] = None
+
+    def set_scope(self, scope: str, dependencies: Dict[str, Dict[str, Iterable[str]]]) -> None:
+        """
+        Remplace les champs et dépendances d'une portée (un conteneur).
+
+        Args:
+            scope: Identifiant de la portée
+            dependencies: {field_id: {type: [field_ids sources]}} avec type
+                parmi 'options', 'value' et 'enabled'
+        """
+        self.remove_scope(scope)
+
+        for field_id, kinds in dependencies.items():
+            target = (scope, field_id)
+            self._nodes.setdefault(target, None)
+            for kind, sources in kinds.items():
+                for source_id in sources:
+                    source = (scope, str(source_id))
+                    if source == target:
+                        logger.warning(f"Dépendance de {field_id} vers lui-même ignorée")
+                        continue
+                    self._nodes.setdefault(source, None)
+                    self._edges.setdefault(source, {}).setdefault(target, set()).add(kind)
+                    self._reverse.setdefault(target, set()).add(source)
+
+        self._rank = None
+        logger.debug(f"Graphe de dépendances: portée {scope} enregistrée ({len(dependencies)} champs)")
+
+    def remove_scope(self, scope: str) -> None:
+        """
+        Supprime tous les champs d'une portée.
+
+        Args:
+            scope: Identifiant de la portée
+        """
+        nodes = [node for node in self._nodes if node[0] == scope]
+        if not nodes:
+            return
+
+        for node in nodes:
+            del self._nodes[node]
+            for target in self._edges.pop(node, {}):
+                self._reverse.get(target, set()).discard(node)
+            for source in self._reverse.pop(node, set()):
+                self._edges.get(source, {}).pop(node, None)
+
+        self._rank = None
+
+    def has_scope(self, scope: str) -> bool:
+        """Indique si une portée est enregistrée."""
+        return any(node[0] == scope for node in self._nodes)
+
+    def _compute_ranks(self) -> Dict[Node, int]:
+        """
+        Calcule le rang topologique de chaque noeud (algorithme de Kahn).
+
+        Les noeuds pris dans un cycle sont placés après les autres, dans
+        l'ordre d'insertion, pour que la propagation reste bornée.
+        """
+        in_degree = {node: len(self._reverse.get(node, ())) for node in self._nodes}
+        queue = deque(node for node, degree in in_degree.items() if degree == 0)
+        ranks: Dict[Node, int] = {}
+
+        while queue:
+            node = queue.popleft()
+            ranks[node] = len(ranks)
+            for target in self._edges.get(node, {}):
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    queue.append(target)
+
+        if len(ranks) < len(self._nodes):
+            cyclic = [node for node in self._nodes if node not in ranks]
+            logger.warning(f"Cycle de dépendances détecté entre: {[n[1] for n in cyclic]}")
+            for node in cyclic:
+                ranks[node] = len(ranks)
+
+        return ranks
+
+    def affected(self, scope: str, field_ids: Iterable[str]) -> List[Tuple[str, Set[str]]]:
+        """
+        Détermine les champs à recalculer après le changement de certains champs.
+
+        Args:
+            scope: Portée des champs modifiés
+            field_ids: Champs dont la valeur a changé
+
+        Returns:
+            List[Tuple[str, Set[str]]]: (field_id, types à recalculer), en ordre topologique
+        """
+        if self._rank is None:
+            self._rank = self._compute_ranks()
+
+        changed = [(scope, str(field_id)) for field_id in field_ids]
+        kinds_by_node: Dict[Node, Set[str]] = {}
+        queue = deque(changed)
+        seen = set(changed)
+
+        while queue:
+            node = queue.popleft()
+            for target, kinds in self._edges.get(node, {}).items():
+                kinds_by_node.setdefault(target, set()).update(kinds)
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+
+        ordered = sorted(kinds_by_node, key=lambda node: self._rank.get(node, len(self._rank)))
+        return [(node[1], kinds_by_node[node]) for node in ordered]
+
+    def dependents(self, scope: str) -> List[Tuple[str, Set[str]]]:
+        """
+        Liste tous les champs d'une portée ayant des dépendances, en ordre topologique.
+
+        Args:
+            scope: Identifiant de la portée
+
+        Returns:
+            List[Tuple[str, Set[str]]]: (field_id, types de dépendances)
+        """
+        if self._rank is None:
+            self._rank = self._compute_ranks()
+
+        result = []
+        for node in sorted((n for n in self._nodes if n[0] == scope and n in self._reverse and self._reverse[n]),
+                           key=lambda n: self._rank[n]):
+            kinds = set()
+            for source in self._reverse[node]:
+                kinds.update(self._edges[source][node])
+            result.append((node[1], kinds))
+        return result
+
+    def sources(self, scope: str, field_id: str) -> List[str]:
+        """
+        Liste les champs dont dépend directement un champ.
+
+        Args:
+            scope: Identifiant de la portée
+            field_id: Identifiant du champ
+
+        Returns:
+            List[str]: Identifiants des champs sources
+        """
+        return [node[1] for node in self._reverse.get((scope, field_id), ())]
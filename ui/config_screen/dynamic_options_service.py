@@ -0,0 +1,218 @@
+"""
+Service centralisé pour les options et valeurs par défaut dynamiques des champs.
+
+Les scripts (get_users.py, get_usb.py, get_printer_models.py...) sont importés
+une seule fois par chemin et date de modification, et les résultats de leurs
+fonctions sont mémorisés par (script, fonction, arguments) avec une durée de vie.
+Les appels sont thread-safe pour pouvoir être exécutés dans un worker Textual
+plutôt que sur le thread de l'interface.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import importlib.util
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
+from threading import RLock, Lock
+
+from ..utils.logging import get_logger
+
+logger = get_logger('dynamic_options_service')
+
+# Valeur affichée dans les champs pendant le chargement des options
+LOADING_LABEL = "Chargement..."
+LOADING_VALUE = "__loading__"
+
+class DynamicOptionsService:
+    """
+    Cache des modules de scripts dynamiques et mémorisation de leurs résultats.
+    """
+
+    _instance = None
+    _lock = RLock()
+
+    def __init__(self):
+        """Initialise le service."""
+        self._modules: Dict[str, Tuple[float, ModuleType]] = {}
+        self._results: Dict[Tuple[str, str, str], Tuple[Any, float]] = {}
+        self._call_locks: Dict[Tuple[str, str, str], Lock] = {}
+        self._default_ttl = 60  # secondes
+        self._max_results = 200
+
+    @classmethod
+    def get_instance(cls) -> 'DynamicOptionsService':
+        """Récupère l'instance unique du service."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = DynamicOptionsService()
+        return cls._instance
+
+    def load_module(self, script_path: str) -> Optional[ModuleType]:
+        """
+        Importe un script, en réutilisant le module tant que le fichier n'a pas changé.
+
+        Args:
+            script_path: Chemin vers le script
+
+        Returns:
+            Optional[ModuleType]: Module importé ou None en cas d'échec
+        """
+        script_path = os.path.abspath(script_path)
+        try:
+            mtime = os.path.getmtime(script_path)
+        except OSError:
+            logger.error(f"Script non trouvé: {script_path}")
+            return None
+
+        with self._lock:
+            cached = self._modules.get(script_path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            try:
+                # Ajouter le dossier du script au chemin de recherche
+                script_dir = os.path.dirname(script_path)
+                if script_dir not in sys.path:
+                    sys.path.append(script_dir)
+
+                # Nom de module propre au script pour éviter les collisions
+                digest = hashlib.md5(script_path.encode('utf-8')).hexdigest()[:12]
+                module_name = f"pcutils_dynamic_{digest}"
+
+                spec = importlib.util.spec_from_file_location(module_name, script_path)
+                if not spec:
+                    logger.error(f"Impossible de créer un spécificateur pour {script_path}")
+                    return None
+
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'importation du module {script_path}: {e}")
+                return None
+
+            if cached:
+                # Le script a changé: ses résultats mémorisés ne sont plus valables
+                self.invalidate(script_path)
+            self._modules[script_path] = (mtime, module)
+            logger.debug(f"Module dynamique chargé: {script_path}")
+            return module
+
+    def _make_key(self, script_path: str, function_name: str,
+                  args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> Tuple[str, str, str]:
+        """Construit la clé de mémorisation d'un appel."""
+        frozen_args = json.dumps([list(args), kwargs or {}], sort_keys=True, default=str)
+        return (os.path.abspath(script_path), function_name, frozen_args)
+
+    def get_cached(self, script_path: str, function_name: str,
+                   args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> Tuple[bool, Any]:
+        """
+        Récupère un résultat mémorisé encore valide, sans appeler le script.
+
+        Args:
+            script_path: Chemin vers le script
+            function_name: Nom de la fonction
+            args: Arguments positionnels
+            kwargs: Arguments nommés
+
+        Returns:
+            Tuple[bool, Any]: (trouvé, résultat)
+        """
+        key = self._make_key(script_path, function_name, args, kwargs)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry and time.time() < entry[1]:
+                return True, entry[0]
+        return False, None
+
+    def call(self, script_path: str, function_name: str, args: Tuple = (),
+             kwargs: Optional[Dict[str, Any]] = None, ttl: Optional[float] = None,
+             force: bool = False) -> Any:
+        """
+        Appelle une fonction de script, en mémorisant son résultat.
+
+        Deux appels concurrents avec les mêmes arguments n'exécutent le script
+        qu'une fois. Les exceptions levées par le script sont propagées.
+
+        Args:
+            script_path: Chemin vers le script
+            function_name: Nom de la fonction
+            args: Arguments positionnels
+            kwargs: Arguments nommés
+            ttl: Durée de validité du résultat en secondes (défaut: 60)
+            force: Si True, ignore le résultat mémorisé
+
+        Returns:
+            Any: Résultat de la fonction
+
+        Raises:
+            ImportError: Si le script ne peut pas être importé
+            AttributeError: Si la fonction n'existe pas dans le script
+        """
+        key = self._make_key(script_path, function_name, args, kwargs)
+
+        with self._lock:
+            call_lock = self._call_locks.setdefault(key, Lock())
+
+        with call_lock:
+            if not force:
+                found, result = self.get_cached(script_path, function_name, args, kwargs)
+                if found:
+                    logger.debug(f"Résultat mémorisé utilisé pour {function_name}")
+                    return result
+
+            module = self.load_module(script_path)
+            if module is None:
+                raise ImportError(f"Import du script {script_path} échoué")
+            if not hasattr(module, function_name):
+                raise AttributeError(f"Fonction {function_name} non trouvée dans {script_path}")
+
+            start = time.time()
+            result = getattr(module, function_name)(*args, **(kwargs or {}))
+            logger.debug(f"{function_name} exécutée en {time.time() - start:.3f}s")
+
+            with self._lock:
+                if len(self._results) >= self._max_results:
+                    self._cleanup_results()
+                expires = time.time() + (self._default_ttl if ttl is None else ttl)
+                self._results[key] = (result, expires)
+
+            return result
+
+    def invalidate(self, script_path: Optional[str] = None, function_name: Optional[str] = None) -> None:
+        """
+        Oublie les résultats mémorisés.
+
+        Args:
+            script_path: Limiter aux résultats de ce script (tous si None)
+            function_name: Limiter aux résultats de cette fonction (toutes si None)
+        """
+        path = os.path.abspath(script_path) if script_path else None
+        with self._lock:
+            for key in list(self._results):
+                if (path is None or key[0] == path) and (function_name is None or key[1] == function_name):
+                    del self._results[key]
+                    self._call_locks.pop(key, None)
+
+    def _cleanup_results(self) -> None:
+        """Supprime les résultats expirés, puis les plus anciens si nécessaire."""
+        now = time.time()
+        for key in [k for k, (_, expires) in self._results.items() if expires <= now]:
+            del self._results[key]
+            self._call_locks.pop(key, None)
+
+        if len(self._results) >= self._max_results:
+            oldest = sorted(self._results.items(), key=lambda item: item[1][1])
+            for key, _ in oldest[:len(oldest) // 2]:
+                del self._results[key]
+                self._call_locks.pop(key, None)
+
+    def clear(self) -> None:
+        """Vide les modules et résultats mémorisés."""
+        with self._lock:
+            self._modules.clear()
+            self._results.clear()
+            self._call_locks.clear()
@@ -0,0 +1,105 @@
+"""
+Emplacement replié d'un conteneur de configuration de plugin.
+
+Le PluginConfigContainer (et tous ses champs, valeurs dynamiques comprises)
+n'est créé qu'au moment où l'emplacement devient visible, reçoit le focus ou
+est cliqué. Tant qu'il est replié, les valeurs du plugin restent dans le
+modèle de l'écran de configuration.
+"""
+
+from textual.app import ComposeResult
+from textual.widgets import Label
+from textual.containers import VerticalGroup
+from typing import Any, Callable, Optional
+import traceback
+
+from ..utils.logging import get_logger
+
+logger = get_logger('lazy_plugin_container')
+
+class LazyPluginContainer(VerticalGroup):
+    """
+    Emplacement replié remplacé à la demande par le conteneur de configuration réel.
+    """
+
+    can_focus = True
+
+    def __init__(self, plugin_instance_id: str, title: str, icon: str,
+                 loader: Callable[[], Optional[Any]], **kwargs):
+        """
+        Initialise l'emplacement.
+
+        Args:
+            plugin_instance_id: Identifiant de l'instance (plugin_instanceid)
+            title: Nom d'affichage du plugin
+            icon: Icône du plugin
+            loader: Fonction créant le conteneur réel (ou None en cas d'erreur)
+            **kwargs: Arguments supplémentaires pour le VerticalGroup
+        """
+        if "classes" in kwargs:
+            kwargs["classes"] += " lazy-config-container"
+        else:
+            kwargs["classes"] = "lazy-config-container"
+        super().__init__(**kwargs)
+
+        self.plugin_instance_id = plugin_instance_id
+        self.title = title
+        self.icon = icon
+        self.loader = loader
+        self.container = None       # Conteneur réel une fois créé
+        self._expanding = False
+
+    @property
+    def expanded(self) -> bool:
+        """Indique si le conteneur réel a été créé."""
+        return self.container is not None
+
+    def compose(self) -> ComposeResult:
+        """
+        Compose l'emplacement replié (titre seul).
+
+        Returns:
+            ComposeResult: Résultat de la composition
+        """
+        with VerticalGroup(classes="config-header lazy-config-header"):
+            yield Label(f"▸ {self.icon} {self.title}", classes="config-title")
+            yield Label("Sélectionner pour afficher la configuration", classes="config-description lazy-config-hint")
+
+    def on_focus(self) -> None:
+        """Crée le conteneur réel quand l'emplacement reçoit le focus."""
+        self.expand()
+
+    def on_click(self) -> None:
+        """Crée le conteneur réel au clic."""
+        self.expand()
+
+    def expand(self) -> Optional[Any]:
+        """
+        Remplace le contenu replié par le conteneur de configuration réel.
+
+        Returns:
+            Optional[Any]: Le conteneur réel, ou None si sa création a échoué
+        """
+        if self.container is not None or self._expanding:
+            return self.container
+
+        self._expanding = True
+        try:
+            logger.debug(f"Création à la demande du conteneur {self.plugin_instance_id}")
+            container = self.loader()
+            if container is None:
+                logger.warning(f"Impossible de créer le conteneur pour {self.plugin_instance_id}")
+                return None
+
+            self.container = container
+            self.can_focus = False
+            self.remove_class("lazy-config-container")
+            self.query(".lazy-config-header").remove()
+            self.mount(container)
+            return container
+        except Exception as e:
+            logger.error(f"Erreur lors de la création du conteneur {self.plugin_instance_id}: {e}")
+            logger.error(traceback.format_exc())
+            return None
+        finally:
+            self._expanding = False
@@ -1,13 +1,13 @@
 from textual.app import ComposeResult
 from textual.widgets import Select
 from textual.containers import VerticalGroup
+from textual.worker import get_current_worker
 from typing import Dict, List, Any, Optional, Tuple, Union, cast
 import os
-import importlib.util
-import sys
 import traceback
 
 from .config_field import ConfigField
+from .dynamic_options_service import DynamicOptionsService, LOADING_LABEL, LOADING_VALUE
 from ..utils.logging import get_logger
 
 logger = get_logger('select_field')
@@ -39,6 +39,10 @@ class SelectField(ConfigField):
         # Flag pour éviter les mises à jour cycliques
         self._updating_widget = False
 
+        # Chargement des options dynamiques en arrière-plan
+        self._options_loading = False  # True tant que les options affichées sont provisoires
+        self._requested_value = None   # Valeur à appliquer une fois les options chargées
+
         # Appeler l'initialisation du parent
         super().__init__(source_id, field_id, field_config, fields_by_id, is_global)
 
@@ -53,12 +57,17 @@ class SelectField(ConfigField):
         # Rendre les éléments de base (label, etc.)
         yield from super().compose()
 
-        # Charger les options
-        self.options = self.get_options()
+        # Charger les options (les options dynamiques non mémorisées sont
+        # chargées en arrière-plan au montage du champ)
+        self.options = self.get_options(use_cache_only=True)
         logger.debug(f"Options chargées pour {self.field_id}: {len(self.options)} options")
 
         # Déterminer la valeur initiale
-        self._initialize_value()
+        if self._options_loading:
+            self._requested_value = self._value
+            self._value = LOADING_VALUE
+        else:
+            self._initialize_value()
 
         # Conteneur pour le select
         with VerticalGroup(classes="field-input-container select-container"):
@@ -66,7 +75,7 @@ class SelectField(ConfigField):
                 # Créer le widget Select
                 self.select = Select(
                     options=self.options,
-                    value=self.value,
+                    value=LOADING_VALUE if self._options_loading else self.value,
                     id=f"select_{self.field_id}",
                     classes="field-select",
                     allow_blank=self.field_config.get('allow_blank', False)
@@ -83,6 +92,7 @@ class SelectField(ConfigField):
                 yield self.select
 
             except Exception as e:
+                self._options_loading = False
                 logger.error(f"Erreur lors de la création du widget Select pour {self.field_id}: {e}")
                 logger.error(traceback.format_exc())
 
@@ -95,41 +105,53 @@ class SelectField(ConfigField):
                 )
                 yield self.select
 
+    def on_mount(self) -> None:
+        """Lance le chargement des options dynamiques si elles ne sont pas encore disponibles."""
+        if self._options_loading:
+            self.refresh_dynamic_options()
+
     def _initialize_value(self) -> None:
         """
         Initialise la valeur en tenant compte des options disponibles.
         """
+        value = self.value
+        self._value = self._match_option_value(value)
+        logger.debug(f"Valeur initiale pour {self.field_id}: {self._value}")
+
+    def _match_option_value(self, value: Any) -> Optional[str]:
+        """
+        Trouve l'option correspondant à une valeur souhaitée.
+
+        Args:
+            value: Valeur souhaitée (None pour la première option)
+
+        Returns:
+            Optional[str]: Valeur d'option retenue ou None si aucune option
+        """
         # Extraire les valeurs disponibles
         available_values = [opt[1] for opt in self.options]
+        if not available_values:
+            logger.debug(f"Aucune option disponible pour {self.field_id}")
+            return None
 
-        # Cas 1: Pas de valeur définie
-        if self.value is None:
-            # Utiliser la première option si disponible
-            if available_values:
-                self._value = available_values[0]
-                logger.debug(f"Valeur initiale pour {self.field_id}: {self._value}")
-            else:
-                self._value = None
-                logger.debug(f"Aucune option disponible pour {self.field_id}")
-            return
+        # Cas 1: Pas de valeur définie, utiliser la première option
+        if value is None:
+            return available_values[0]
 
-        # Cas 2: Valeur définie mais pas dans les options
-        if str(self.value) not in available_values:
-            # Essayer de trouver une correspondance partielle
-            for option_value in available_values:
-                if (str(option_value).startswith(str(self.value)) or
-                    str(self.value).startswith(str(option_value).split('.')[0])):
-                    self._value = option_value
-                    logger.debug(f"Correspondance partielle trouvée pour {self.field_id}: {self._value}")
-                    return
-
-            # Si aucune correspondance, utiliser la première option
-            if available_values:
-                self._value = available_values[0]
-                logger.debug(f"Aucune correspondance trouvée pour {self.value}, utilisation de {self._value}")
-            else:
-                self._value = None
-                logger.debug(f"Aucune option disponible pour {self.field_id}")
+        # Cas 2: Valeur présente dans les options
+        if str(value) in available_values:
+            return str(value)
+
+        # Cas 3: Essayer de trouver une correspondance partielle
+        for option_value in available_values:
+            if (str(option_value).startswith(str(value)) or
+                str(value).startswith(str(option_value).split('.')[0])):
+                logger.debug(f"Correspondance partielle trouvée pour {self.field_id}: {option_value}")
+                return option_value
+
+        # Si aucune correspondance, utiliser la première option
+        logger.debug(f"Aucune correspondance trouvée pour {value}, utilisation de {available_values[0]}")
+        return available_values[0]
 
     def normalize_options(self, options: List[Any]) -> List[Tuple[str, str]]:
         """
@@ -180,10 +202,15 @@ class SelectField(ConfigField):
 
         return unique_options
 
-    def get_options(self) -> List[Tuple[str, str]]:
+    def get_options(self, use_cache_only: bool = False) -> List[Tuple[str, str]]:
         """
         Récupère les options du champ, soit statiques, soit dynamiques.
 
+        Args:
+            use_cache_only: Si True, les options dynamiques non mémorisées ne sont
+                pas calculées: une option provisoire est retournée et le champ
+                passe en état de chargement
+
         Returns:
             List[Tuple[str, str]]: Liste des options au format (label, value)
         """
@@ -194,6 +221,13 @@ class SelectField(ConfigField):
 
         # Cas 2: Options dynamiques via script
         if 'dynamic_options' in self.field_config:
+            if use_cache_only:
+                cached_options = self.get_cached_dynamic_options()
+                if cached_options is not None:
+                    return cached_options
+                self._options_loading = True
+                return [(LOADING_LABEL, LOADING_VALUE)]
+
             logger.debug(f"Chargement des options dynamiques pour {self.field_id}")
             return self.get_dynamic_options()
 
@@ -201,59 +235,152 @@ class SelectField(ConfigField):
         logger.warning(f"Aucune option définie pour {self.field_id}")
         return [("Aucune option disponible", "no_options")]
 
-    def get_dynamic_options(self) -> List[Tuple[str, str]]:
+    def _get_dynamic_call(self) -> Tuple[Optional[Tuple[str, str, Dict[str, Any]]], Optional[List[Tuple[str, str]]]]:
         """
-        Récupère les options dynamiques via un script externe.
+        Détermine le script, la fonction et les arguments des options dynamiques.
+
+        Doit être appelée sur le thread de l'interface (lit la valeur des autres champs).
 
         Returns:
-            List[Tuple[str, str]]: Liste des options générées dynamiquement
+            Tuple: ((chemin_script, fonction, arguments), None) ou (None, options_erreur)
         """
-        try:
-            # Récupérer la configuration des options dynamiques
-            dynamic_config = self.field_config['dynamic_options']
-            script_name = dynamic_config.get('script')
+        # Récupérer la configuration des options dynamiques
+        dynamic_config = self.field_config['dynamic_options']
+        script_name = dynamic_config.get('script')
 
-            if not script_name:
-                logger.error(f"Nom de script non spécifié pour {self.field_id}")
-                return [("Erreur: script non spécifié", "error_script")]
+        if not script_name:
+            logger.error(f"Nom de script non spécifié pour {self.field_id}")
+            return None, [("Erreur: script non spécifié", "error_script")]
 
-            # Déterminer le chemin du script
-            script_path = self.resolve_script_path(dynamic_config)
+        # Déterminer le chemin du script
+        script_path = self.resolve_script_path(dynamic_config)
 
-            if not os.path.exists(script_path):
-                logger.error(f"Script {script_path} non trouvé pour {self.field_id}")
-                return [("Erreur: script non trouvé", "error_not_found")]
+        if not os.path.exists(script_path):
+            logger.error(f"Script {script_path} non trouvé pour {self.field_id}")
+            return None, [("Erreur: script non trouvé", "error_not_found")]
 
-            # Importer le module
+        # Déterminer la fonction à appeler
+        function_name = dynamic_config.get('function')
+        if not function_name:
+            # Essayer de trouver une fonction qui commence par get_
             module = self.import_script_module(script_path)
             if not module:
-                return [("Erreur: import du module échoué", "error_import")]
-
-            # Déterminer la fonction à appeler
-            function_name = dynamic_config.get('function')
+                return None, [("Erreur: import du module échoué", "error_import")]
+            function_name = next((name for name in dir(module)
+                                 if name.startswith('get_') and callable(getattr(module, name))), None)
             if not function_name:
-                # Essayer de trouver une fonction qui commence par get_
-                function_name = next((name for name in dir(module)
-                                     if name.startswith('get_') and callable(getattr(module, name))), None)
+                logger.error(f"Aucune fonction get_* trouvée dans {script_name}")
+                return None, [("Erreur: fonction non trouvée", "error_function")]
+
+        # Préparer les arguments
+        function_args = self.prepare_dynamic_function_args(dynamic_config)
+
+        return (script_path, function_name, function_args), None
 
-            if not function_name or not hasattr(module, function_name):
-                logger.error(f"Fonction {function_name} non trouvée dans {script_name}")
-                return [("Erreur: fonction non trouvée", "error_function")]
+    def _call_dynamic_function(self, call: Tuple[str, str, Dict[str, Any]], force: bool = False) -> List[Tuple[str, str]]:
+        """
+        Appelle la fonction d'options dynamiques via le service (résultat mémorisé).
+
+        Peut être exécutée dans un worker: ne touche pas aux widgets.
 
-            # Préparer les arguments
-            function_args = self.prepare_dynamic_function_args(dynamic_config)
+        Args:
+            call: (chemin_script, fonction, arguments)
+            force: Si True, ignore le résultat mémorisé
 
-            # Appeler la fonction
-            result = getattr(module, function_name)(**function_args)
+        Returns:
+            List[Tuple[str, str]]: Options traitées
+        """
+        script_path, function_name, function_args = call
+        dynamic_config = self.field_config['dynamic_options']
+        try:
+            result = DynamicOptionsService.get_instance().call(
+                script_path, function_name, kwargs=function_args,
+                ttl=dynamic_config.get('cache_ttl'), force=force
+            )
+        except ImportError:
+            return [("Erreur: import du module échoué", "error_import")]
+        except AttributeError:
+            logger.error(f"Fonction {function_name} non trouvée dans {dynamic_config.get('script')}")
+            return [("Erreur: fonction non trouvée", "error_function")]
 
-            # Traiter le résultat
-            return self.process_dynamic_result(result, dynamic_config)
+        # Traiter le résultat
+        return self.process_dynamic_result(result, dynamic_config)
+
+    def get_cached_dynamic_options(self) -> Optional[List[Tuple[str, str]]]:
+        """
+        Récupère les options dynamiques déjà mémorisées par le service, sans appeler le script.
+
+        Returns:
+            Optional[List[Tuple[str, str]]]: Options ou None si elles doivent être calculées
+        """
+        try:
+            call, error_options = self._get_dynamic_call()
+            if error_options:
+                return error_options
+
+            script_path, function_name, function_args = call
+            found, result = DynamicOptionsService.get_instance().get_cached(
+                script_path, function_name, kwargs=function_args
+            )
+            if not found:
+                return None
+            return self.process_dynamic_result(result, self.field_config['dynamic_options'])
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture du cache d'options pour {self.field_id}: {e}")
+            return None
+
+    def get_dynamic_options(self) -> List[Tuple[str, str]]:
+        """
+        Récupère les options dynamiques via un script externe (appel synchrone).
+
+        Returns:
+            List[Tuple[str, str]]: Liste des options générées dynamiquement
+        """
+        try:
+            call, error_options = self._get_dynamic_call()
+            if error_options:
+                return error_options
+            return self._call_dynamic_function(call)
 
         except Exception as e:
             logger.error(f"Erreur lors du chargement des options dynamiques pour {self.field_id}: {e}")
             logger.error(traceback.format_exc())
             return [("Erreur: " + str(e)[:30], "error_exception")]
 
+    def refresh_dynamic_options(self, force: bool = False) -> None:
+        """
+        Recharge les options dynamiques dans un worker, sans bloquer l'interface.
+
+        Un nouveau chargement annule le précédent pour ce champ: seul le
+        résultat correspondant aux dernières valeurs des dépendances est appliqué.
+
+        Args:
+            force: Si True, ignore le résultat mémorisé
+        """
+        try:
+            call, error_options = self._get_dynamic_call()
+        except Exception as e:
+            logger.error(f"Erreur lors de la préparation des options dynamiques pour {self.field_id}: {e}")
+            call, error_options = None, [("Erreur: " + str(e)[:30], "error_exception")]
+
+        if error_options:
+            self._apply_dynamic_options(error_options)
+            return
+
+        def load_options() -> None:
+            try:
+                options = self._call_dynamic_function(call, force=force)
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement des options dynamiques pour {self.field_id}: {e}")
+                logger.error(traceback.format_exc())
+                options = [("Erreur: " + str(e)[:30], "error_exception")]
+
+            if not get_current_worker().is_cancelled:
+                self.app.call_from_thread(self._apply_dynamic_options, options)
+
+        self.run_worker(load_options, thread=True, exclusive=True,
+                        group=f"dynamic_options_{self.field_id}")
+
     def resolve_script_path(self, dynamic_config: Dict[str, Any]) -> str:
         """
         Résout le chemin du script pour les options dynamiques.
@@ -291,7 +418,7 @@ class SelectField(ConfigField):
 
     def import_script_module(self, script_path: str) -> Optional[Any]:
         """
-        Importe un module Python depuis un chemin de fichier.
+        Importe un module Python depuis un chemin de fichier (module mis en cache par le service).
 
         Args:
             script_path: Chemin vers le script
@@ -299,27 +426,7 @@ class SelectField(ConfigField):
         Returns:
             Optional[Any]: Module importé ou None en cas d'erreur
         """
-        try:
-            # Ajouter le dossier du script au chemin de recherche
-            script_dir = os.path.dirname(script_path)
-            if script_dir not in sys.path:
-                sys.path.append(script_dir)
-
-            # Créer un spécificateur de module
-            spec = importlib.util.spec_from_file_location("dynamic_module", script_path)
-            if not spec:
-                logger.error(f"Impossible de créer un spécificateur pour {script_path}")
-                return None
-
-            # Charger le module
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            return module
-
-        except Exception as e:
-            logger.error(f"Erreur lors de l'importation du module {script_path}: {e}")
-            return None
+        return DynamicOptionsService.get_instance().load_module(script_path)
 
     def prepare_dynamic_function_args(self, dynamic_config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -452,6 +559,13 @@ class SelectField(ConfigField):
 
         logger.debug(f"set_value({value_str}) pour {self.field_id}")
 
+        # Options en cours de chargement: la valeur sera appliquée à leur arrivée
+        if self._options_loading:
+            self._requested_value = value_str
+            if update_dependencies:
+                self._notify_parent_containers()
+            return True
+
         # Vérifier si la valeur change réellement
         if self._value == value_str:
             logger.debug(f"Valeur déjà à '{value_str}' pour {self.field_id}")
@@ -547,6 +661,10 @@ class SelectField(ConfigField):
         if hasattr(self, 'disabled') and self.disabled:
             return None
 
+        # Options en cours de chargement: renvoyer la valeur demandée
+        if self._options_loading:
+            return self._requested_value if self._requested_value is not None else ""
+
         # Filtrer certaines valeurs d'erreur
         error_values = ["no_options", "placeholder", "fallback", "error_loading",
                        "error_function", "error_script", "error_format", "error_not_found",
@@ -565,6 +683,10 @@ class SelectField(ConfigField):
         Returns:
             str: Valeur du champ
         """
+        # Options en cours de chargement: le widget n'affiche qu'une option provisoire
+        if self._options_loading:
+            return self._requested_value if self._requested_value is not None else ""
+
         # Pour l'interface Select, priorité au widget s'il existe
         if hasattr(self, 'select'):
             return self.select.value
@@ -585,11 +707,14 @@ class SelectField(ConfigField):
         """
         Met à jour les options dynamiques du champ.
 
+        Le chargement est lancé en arrière-plan; les options actuelles restent
+        affichées jusqu'à l'arrivée des nouvelles.
+
         Args:
             **kwargs: Arguments dynamiques pour l'actualisation des options
 
         Returns:
-            bool: True si les options ont été mises à jour avec succès
+            bool: True si la mise à jour a été lancée
         """
         logger.debug(f"Mise à jour des options dynamiques pour {self.field_id} avec {kwargs}")
 
@@ -598,63 +723,59 @@ class SelectField(ConfigField):
             logger.debug(f"Champ {self.field_id} désactivé, pas de mise à jour des options")
             return False
 
+        if 'dynamic_options' not in self.field_config:
+            return False
+
         try:
-            # Sauvegarder la valeur actuelle
-            current_value = self._value
-
-            # Charger les nouvelles options
-            old_options = self.options
-            dynamic_config = self.field_config.get('dynamic_options', {})
-
-            # Préparer la configuration avec les arguments fournis
-            merged_config = dynamic_config.copy()
-            if 'args' in merged_config:
-                for arg in merged_config['args']:
-                    if 'field' in arg and 'param_name' in arg:
-                        param_name = arg['param_name']
-                        if param_name in kwargs:
-                            # Injecter les arguments fournis
-                            arg['_value'] = kwargs[param_name]
-
-            # Récupérer les options en utilisant les arguments fournis
-            new_options = self.get_dynamic_options()
+            self.refresh_dynamic_options()
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour des options dynamiques pour {self.field_id}: {e}")
+            logger.error(traceback.format_exc())
+            return False
 
-            # Si aucune option, c'est un échec
-            if not new_options or len(new_options) == 0:
-                logger.warning(f"Aucune option obtenue pour {self.field_id}")
-                self.options = [("Aucune option disponible", "no_options")]
+    def _apply_dynamic_options(self, new_options: List[Tuple[str, str]]) -> None:
+        """
+        Applique des options dynamiques chargées (sur le thread de l'interface).
 
-                # Mettre à jour le widget si existant
-                if hasattr(self, 'select'):
-                    self.select.options = self.options
-                    self.select.value = "no_options"
-                    self._value = "no_options"
+        Args:
+            new_options: Nouvelles options
+        """
+        try:
+            # Valeur à conserver: celle demandée pendant le chargement, sinon l'actuelle
+            if self._options_loading:
+                wanted_value = self._requested_value
+                self._options_loading = False
+                self._requested_value = None
+            else:
+                wanted_value = self._value
 
-                return False
+            # Si aucune option, c'est un échec
+            if not new_options:
+                logger.warning(f"Aucune option obtenue pour {self.field_id}")
+                new_options = [("Aucune option disponible", "no_options")]
 
             # Mettre à jour les options
             self.options = new_options
             logger.debug(f"Options mises à jour pour {self.field_id}: {len(new_options)} options")
 
+            new_value = self._match_option_value(wanted_value)
+            self._value = new_value
+
             # Mettre à jour le widget si existant
             if hasattr(self, 'select'):
-                self.select.options = new_options
-
-                # Essayer de restaurer la valeur précédente
-                available_values = [opt[1] for opt in new_options]
-
-                if current_value in available_values:
-                    # Valeur existante toujours disponible
-                    self.select.value = current_value
-                elif available_values:
-                    # Utiliser la première option disponible
-                    self.select.value = available_values[0]
-                    self._value = available_values[0]
-                    logger.debug(f"Valeur mise à jour pour {self.field_id}: '{current_value}' → '{available_values[0]}'")
+                self._updating_widget = True
+                try:
+                    self.select.set_options(new_options)
+                    if new_value is not None:
+                        self.select.value = new_value
+                finally:
+                    self._updating_widget = False
 
-            return True
+            if new_value != wanted_value:
+                logger.debug(f"Valeur mise à jour pour {self.field_id}: '{wanted_value}' → '{new_value}'")
+                self._notify_parent_containers()
 
         except Exception as e:
-            logger.error(f"Erreur lors de la mise à jour des options dynamiques pour {self.field_id}: {e}")
+            logger.error(f"Erreur lors de l'application des options dynamiques pour {self.field_id}: {e}")
             logger.error(traceback.format_exc())
-            return False
\ No newline at end of file
@@ -157,7 +157,8 @@ class SequenceConfigManager:
                 # Copier les attributs spéciaux au niveau principal
                 special_keys = {
                     'show_name', 'icon', 'remote_execution', 
-                    'template', 'ignore_errors', 'timeout'
+                    'template', 'ignore_errors', 'timeout',
+                    'after', 'requires', 'resources', 'rollout', 'force'
                 }
                 
                 for key in special_keys:
@@ -208,7 +209,8 @@ class SequenceConfigManager:
             # Identifier les clés spéciales vs. les clés de configuration
             special_keys = {
                 'plugin_name', 'instance_id', 'name', 'show_name', 
-                'icon', 'remote_execution', 'template'
+                'icon', 'remote_execution', 'template',
+                'after', 'requires', 'resources', 'rollout', 'force'
             }
             
             # Copier les valeurs non spéciales dans config
@@ -514,7 +516,8 @@ class SequenceConfigManager:
         """
         special_keys = {
             'name', 'show_name', 'icon', 'remote_execution', 
-            'template', 'ignore_errors', 'timeout'
+            'template', 'ignore_errors', 'timeout',
+            'after', 'requires', 'resources', 'rollout', 'force'
         }
         
         for key in special_keys:
@@ -546,7 +549,8 @@ class SequenceConfigManager:
             # Identifier les clés spéciales vs. les clés de configuration
             special_keys = {
                 'plugin_name', 'instance_id', 'name', 'show_name', 
-                'icon', 'remote_execution', 'template'
+                'icon', 'remote_execution', 'template',
+                'after', 'requires', 'resources', 'rollout', 'force'
             }
             
             # Copier les valeurs non spéciales dans config
@@ -9,8 +9,10 @@ from typing import Dict, List, Optional, Any, Tuple
 from ruamel.yaml import YAML
 from logging import getLogger
 
+from ..utils.yaml_cache import load_yaml, invalidate_yaml
+
 logger = getLogger('template_manager')
-yaml = YAML()
+yaml = YAML()  # Écritures uniquement (mode aller-retour), les lectures passent par load_yaml
 
 class TemplateManager:
     """
@@ -51,10 +53,9 @@ class TemplateManager:
         schema_file = self.templates_dir / 'template_schema.yml'
         try:
             if schema_file.exists():
-                with open(schema_file, 'r', encoding='utf-8') as f:
-                    schema = yaml.load(f)
-                    logger.debug("Schéma de validation chargé avec succès")
-                    return schema
+                schema = load_yaml(schema_file)
+                logger.debug("Schéma de validation chargé avec succès")
+                return schema
             logger.debug("Aucun schéma de validation trouvé, utilisation des validations par défaut")
         except Exception as e:
             logger.error(f"Erreur lors du chargement du schéma: {e}")
@@ -89,15 +90,14 @@ class TemplateManager:
                 continue
 
             try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    template_data = yaml.load(f)
-                    validation_result, error_message = self._validate_template(template_data)
-                    
-                    if validation_result:
-                        templates[template_file.stem] = template_data
-                        logger.debug(f"Template chargé: {template_file.name}")
-                    else:
-                        logger.warning(f"Template invalide ignoré ({template_file.name}): {error_message}")
+                template_data = load_yaml(template_file)
+                validation_result, error_message = self._validate_template(template_data)
+
+                if validation_result:
+                    templates[template_file.stem] = template_data
+                    logger.debug(f"Template chargé: {template_file.name}")
+                else:
+                    logger.warning(f"Template invalide ignoré ({template_file.name}): {error_message}")
             except Exception as e:
                 logger.error(f"Erreur lors du chargement du template {template_file}: {e}")
 
@@ -312,7 +312,8 @@ class TemplateManager:
             # Sauvegarder le template
             with open(template_path, 'w', encoding='utf-8') as f:
                 yaml.dump(template_data, f)
-                
+            invalidate_yaml(template_path)
+
             # Mettre à jour le cache si nécessaire
             if plugin_name in self.templates_cache:
                 self.templates_cache[plugin_name][template_name] = template_data
@@ -0,0 +1,242 @@
+"""
+Rapport des commandes les plus lentes d'une exécution.
+
+Avec l'option --profile, les plugins émettent dans leur flux de logs le
+profil de chaque commande lancée par PluginsUtilsBase.run() (voir
+plugins/plugins_utils/command_profiler.py). Les exécuteurs transmettent
+ces lignes au rapport, qui les agrège par plugin et par commande sur
+l'ensemble des machines. Le rapport est résumé à la fin de l'exécution et
+exporté à côté du journal.
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.logging import get_logger
+
+logger = get_logger('command_report')
+
+# Type des messages de profil (PROFILE_TYPE de command_profiler.py)
+PROFILE_TYPE = 'command_profile'
+
+# Clé de configuration activant le profilage dans le plugin
+PROFILE_CONFIG_KEY = 'profile_commands'
+
+# Nombre de commandes affichées dans le résumé
+DEFAULT_LIMIT = 10
+
+def parse_profile_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Extrait le profil de commande d'une ligne de log JSON.
+
+    Args:
+        line: Ligne émise par le plugin
+
+    Returns:
+        Optional[Dict[str, Any]]: Données du profil, ou None si la ligne n'en contient pas
+    """
+    if PROFILE_TYPE not in line:
+        return None
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    message = entry.get('message') if isinstance(entry, dict) else None
+    if not isinstance(message, dict) or message.get('type') != PROFILE_TYPE:
+        return None
+    data = message.get('data')
+    return data if isinstance(data, dict) else None
+
+def command_text(data: Dict[str, Any]) -> str:
+    """Commande d'un profil, sous forme de chaîne."""
+    return data.get('command') or ' '.join(str(arg) for arg in data.get('argv') or [])
+
+class CommandStats:
+    """
+    Mesures agrégées d'une commande d'un plugin, toutes machines confondues.
+    """
+
+    __slots__ = ('plugin', 'command', 'sudo', 'count', 'failures', 'total', 'longest',
+                 'longest_host', 'output_bytes', 'hosts')
+
+    def __init__(self, plugin: str, command: str, sudo: bool):
+        """
+        Initialise les mesures.
+
+        Args:
+            plugin: Plugin ayant lancé la commande
+            command: Commande nettoyée
+            sudo: Si la commande est lancée via sudo
+        """
+        self.plugin = plugin
+        self.command = command
+        self.sudo = sudo
+        self.count = 0
+        self.failures = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.longest_host = ''
+        self.output_bytes = 0
+        self.hosts = set()
+
+    def add(self, host: str, data: Dict[str, Any]) -> None:
+        """
+        Ajoute une exécution de la commande.
+
+        Args:
+            host: Machine sur laquelle la commande a été lancée
+            data: Données du profil
+        """
+        duration = float(data.get('duration') or 0)
+        self.count += 1
+        self.total += duration
+        if data.get('exit_code') != 0:
+            self.failures += 1
+        if duration >= self.longest:
+            self.longest, self.longest_host = duration, host
+        self.output_bytes += int(data.get('output_bytes') or 0)
+        self.hosts.add(host)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation JSON des mesures."""
+        return {
+            'plugin': self.plugin,
+            'command': self.command,
+            'sudo': self.sudo,
+            'count': self.count,
+            'failures': self.failures,
+            'total': round(self.total, 4),
+            'max': round(self.longest, 4),
+            'max_host': self.longest_host,
+            'output_bytes': self.output_bytes,
+            'hosts': sorted(self.hosts),
+        }
+
+class CommandReport:
+    """
+    Profils des commandes de l'exécution en cours, partagés par tous les exécuteurs.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'CommandReport':
+        """Récupère l'instance unique du rapport."""
+        if cls._instance is None:
+            cls._instance = CommandReport()
+        return cls._instance
+
+    def __init__(self):
+        """Initialise le rapport."""
+        self._stats: Dict[Tuple[str, str, bool], CommandStats] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Efface les profils (début d'une nouvelle exécution)."""
+        with self._lock:
+            self._stats = {}
+
+    def add(self, plugin: str, host: str, data: Dict[str, Any]) -> None:
+        """
+        Enregistre le profil d'une commande.
+
+        Args:
+            plugin: Plugin ayant lancé la commande
+            host: Machine sur laquelle la commande a été lancée
+            data: Données du profil
+        """
+        command = command_text(data)
+        sudo = bool(data.get('sudo'))
+        key = (plugin, command, sudo)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = CommandStats(plugin, command, sudo)
+            stats.add(host, data)
+
+    def add_line(self, plugin: Optional[str], host: str, line: str) -> bool:
+        """
+        Enregistre le profil contenu dans une ligne de log, s'il y en a un.
+
+        Args:
+            plugin: Plugin ayant émis la ligne
+            host: Machine d'origine de la ligne
+            line: Ligne de log
+
+        Returns:
+            bool: True si la ligne était un profil de commande (à ne pas afficher)
+        """
+        data = parse_profile_line(line)
+        if data is None:
+            return False
+        self.add(plugin or '?', host, data)
+        return True
+
+    def slowest(self, limit: int = DEFAULT_LIMIT) -> List[CommandStats]:
+        """
+        Retourne les commandes les plus lentes (durée maximale décroissante).
+
+        Args:
+            limit: Nombre de commandes retournées
+
+        Returns:
+            List[CommandStats]: Mesures agrégées
+        """
+        with self._lock:
+            stats = list(self._stats.values())
+        stats.sort(key=lambda item: (item.longest, item.total), reverse=True)
+        return stats[:limit]
+
+    def summary_lines(self, limit: int = DEFAULT_LIMIT) -> List[str]:
+        """
+        Résume les commandes les plus lentes: une ligne par commande.
+
+        Args:
+            limit: Nombre de commandes affichées
+
+        Returns:
+            List[str]: Lignes du résumé (vide si aucun profil)
+        """
+        slowest = self.slowest(limit)
+        if not slowest:
+            return []
+
+        lines = ["Commandes les plus lentes:"]
+        for stats in slowest:
+            sudo = " (sudo)" if stats.sudo else ""
+            line = f"  {stats.longest:.2f}s {stats.command}{sudo} [{stats.plugin}]"
+            if stats.count > 1:
+                line += (f" — {stats.count} exécutions sur {len(stats.hosts)} machine(s), "
+                         f"total {stats.total:.1f}s, max sur {stats.longest_host}")
+            elif stats.longest_host:
+                line += f" — {stats.longest_host}"
+            if stats.failures:
+                line += f", {stats.failures} échec(s)"
+            lines.append(line)
+        return lines
+
+    def export_json(self, path: str) -> Optional[str]:
+        """
+        Écrit l'ensemble des profils agrégés, du plus lent au plus rapide.
+
+        Args:
+            path: Chemin du fichier à écrire
+
+        Returns:
+            Optional[str]: Chemin écrit, ou None en cas d'erreur ou sans profil
+        """
+        with self._lock:
+            count = len(self._stats)
+        if not count:
+            return None
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'commands': [stats.to_dict() for stats in self.slowest(count)]}, f, indent=1)
+            logger.info(f"Profil des commandes exporté: {path}")
+            return path
+        except OSError as e:
+            logger.error(f"Impossible d'exporter le profil des commandes {path}: {e}")
+            return None
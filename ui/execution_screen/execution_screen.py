@@ -17,6 +17,7 @@ from textual.message import Message
 from ..utils.logging import get_logger
 from .execution_widget import ExecutionWidget
 from .logger_utils import LoggerUtils
+from .run_journal import RunJournal
 
 logger = get_logger('execution_screen')
 
@@ -38,7 +39,10 @@ class ExecutionScreen(Screen):
 
     def __init__(self, plugins_config: Optional[Dict[str, Any]] = None,
                 auto_execute: bool = False,
-                report_manager = None):
+                report_manager = None,
+                resume_journal: Optional[RunJournal] = None,
+                force: bool = False,
+                profile: bool = False):
         """
         Initialise l'écran avec la configuration des plugins.
 
@@ -46,11 +50,17 @@ class ExecutionScreen(Screen):
             plugins_config: Dictionnaire de configuration des plugins
             auto_execute: Si True, lance l'exécution automatiquement
             report_manager: Gestionnaire de rapports optionnel
+            resume_journal: Journal d'une exécution précédente à reprendre (optionnel)
+            force: Si True, relance les plugins idempotents déjà appliqués
+            profile: Si True, profile les commandes des plugins et résume les plus lentes
         """
         super().__init__()
         self.plugins_config = plugins_config or {}
         self.auto_execute = auto_execute
         self.report_manager = report_manager
+        self.resume_journal = resume_journal
+        self.force = force
+        self.profile = profile
         self._execution_running = False
         self._execution_task = None
         self._current_plugin_widget = None  # Ajout : Garder une référence au widget actuel
@@ -281,7 +291,8 @@ class ExecutionScreen(Screen):
         """
         try:
             # Créer le widget d'exécution avec la configuration des plugins
-            yield ExecutionWidget(self.plugins_config)
+            yield ExecutionWidget(self.plugins_config, resume_journal=self.resume_journal,
+                                  force=self.force, profile=self.profile)
         except Exception as e:
             logger.error(f"Erreur lors de la composition de l'écran d'exécution: {e}")
             logger.error(traceback.format_exc())
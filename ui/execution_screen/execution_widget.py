@@ -11,6 +11,7 @@ import sys
 import os
 import json
 import re
+import time
 import asyncio
 
 from textual.app import ComposeResult, App
@@ -24,8 +25,13 @@ from .local_executor import LocalExecutor
 from .ssh_executor import SSHExecutor
 from .logger_utils import LoggerUtils
 from ..utils.messaging import Message, MessageType
-from ..choice_screen.plugin_utils import get_plugin_folder_name
+from .sequence_scheduler import SequenceScheduler
+from .run_journal import RunJournal, LOCAL_HOST, RUNS_DIR
+from .timing import TimingRecorder
+from .command_report import CommandReport
+from ..choice_screen.plugin_utils import get_plugin_folder_name, load_plugin_info
 from ..utils.logging import get_logger
+from ..utils.yaml_cache import load_yaml
 from ..ssh_manager.ip_utils import get_target_ips
 
 logger = get_logger('execution_widget')
@@ -44,20 +50,30 @@ class ExecutionWidget(Container):
     show_logs = reactive(True)  # Logs visibles par défaut
     back_button_clicked = reactive(False)  # Suivi du bouton retour
 
-    def __init__(self, plugins_config: Optional[Dict[str, Any]] = None):
+    def __init__(self, plugins_config: Optional[Dict[str, Any]] = None,
+                 resume_journal: Optional[RunJournal] = None,
+                 force: bool = False, profile: bool = False):
         """
         Initialise le widget avec la configuration des plugins.
 
         Args:
             plugins_config: Dictionnaire de configuration des plugins
+            resume_journal: Journal d'une exécution précédente à reprendre (optionnel)
+            force: Si True, relance les plugins idempotents déjà appliqués
+            profile: Si True, profile les commandes des plugins et résume les plus lentes
         """
         super().__init__()
         self.plugins: Dict[str, PluginContainer] = {}
         self.plugins_config = plugins_config or {}
+        self.resume_journal = resume_journal
+        self.force = force
+        self.profile = profile
+        self.journal: Optional[RunJournal] = None  # Journal de l'exécution en cours
         self._current_plugin = None
         self._total_plugins = 0
         self._executed_plugins = 0
         self.sequence_name = None
+        self.max_parallel = 1  # Plugins exécutés simultanément (max_parallel de la séquence)
         self._app_ref = None  # Référence à l'application, définie lors du montage
 
         # Extraire le nom de la séquence si présent
@@ -74,8 +90,29 @@ class ExecutionWidget(Container):
                 sequence_file = plugin_name.replace('__sequence__', '')
                 self.sequence_name = sequence_file.replace('.yml', '')
                 logger.debug(f"Séquence détectée: {self.sequence_name}")
+                self._load_sequence_options(sequence_file)
                 break
 
+    def _load_sequence_options(self, sequence_file: str) -> None:
+        """
+        Charge les options d'exécution déclarées au niveau de la séquence.
+
+        Args:
+            sequence_file: Nom du fichier de séquence
+        """
+        if not sequence_file.endswith('.yml'):
+            sequence_file = f"{sequence_file}.yml"
+        sequence_path = os.path.join('sequences', sequence_file)
+        try:
+            if not os.path.exists(sequence_path):
+                return
+            sequence_data = load_yaml(sequence_path) or {}
+            self.max_parallel = max(1, int(sequence_data.get('max_parallel', 1) or 1))
+            logger.debug(f"Séquence {self.sequence_name}: max_parallel={self.max_parallel}")
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement des options de la séquence {sequence_file}: {e}")
+            logger.error(traceback.format_exc())
+
     async def execute_plugin(self, plugin_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Exécute un plugin spécifique localement ou via SSH.
@@ -119,7 +156,22 @@ class ExecutionWidget(Container):
 
             # Exécuter le plugin
             plugin_widget = self.plugins.get(plugin_id)
+            plugin_journal = self.journal.for_plugin(plugin_id, config) if self.journal else None
+            if remote_execution:
+                # Le journal est tenu hôte par hôte par l'exécuteur SSH
+                return await executor.execute_plugin(plugin_widget, folder_name, config, journal=plugin_journal)
+
+            if plugin_journal and plugin_journal.is_done(LOCAL_HOST):
+                logger.info(f"Plugin {plugin_id} déjà exécuté avec succès, ignoré (reprise)")
+                await LoggerUtils.add_log(self, f"{show_name}: déjà exécuté avec succès, ignoré", level="info")
+                return True, "Déjà exécuté"
+
+            if plugin_journal:
+                plugin_journal.start(LOCAL_HOST)
             status = await executor.execute_plugin(plugin_widget, folder_name, config)
+            if plugin_journal:
+                success = bool(status[0]) if isinstance(status, tuple) else bool(status)
+                plugin_journal.end(LOCAL_HOST, success, status[1] if isinstance(status, tuple) else '')
 
             return status
 
@@ -175,7 +227,8 @@ class ExecutionWidget(Container):
             return config['config']
 
         # Sinon, copier toutes les clés sauf celles spéciales
-        special_keys = {'plugin_name', 'instance_id', 'show_name', 'icon', 'remote_execution'}
+        special_keys = {'plugin_name', 'instance_id', 'show_name', 'icon', 'remote_execution',
+                        'after', 'requires', 'resources', 'rollout', 'force'}
         return {k: v for k, v in config.items() if k not in special_keys}
 
     def _create_executor(self, plugin_id: str, folder_name: str,
@@ -201,17 +254,20 @@ class ExecutionWidget(Container):
                 'config': plugin_config,
                 'ssh_debug': plugin_config.get('ssh_debug', False)
             }
-            return SSHExecutor(ssh_config)
+            return SSHExecutor(ssh_config, force=self.force, profile=self.profile)
         else:
             logger.debug(f"Création d'un exécuteur local pour {plugin_id}")
-            return LocalExecutor(self.app if self._app_ref is None else self._app_ref)
+            return LocalExecutor(self.app if self._app_ref is None else self._app_ref, force=self.force,
+                                 profile=self.profile)
 
     async def run_plugins(self) -> None:
         """
-        Exécute tous les plugins de façon séquentielle.
+        Exécute tous les plugins selon le graphe de dépendances de la séquence.
 
         Cette méthode est le cœur du processus d'exécution, gérant l'ordre,
-        les erreurs et la mise à jour de l'interface.
+        les erreurs et la mise à jour de l'interface. Les plugins indépendants
+        sont exécutés en parallèle dans la limite de max_parallel, ceux qui
+        partagent une ressource l'un après l'autre.
         """
         try:
             await LoggerUtils.start_logs_timer(self)
@@ -224,71 +280,176 @@ class ExecutionWidget(Container):
                 return
 
             total_plugins = len(ordered_plugins)
-            executed = 0
+            self._open_journal()
+            TimingRecorder.get_instance().reset()
+            CommandReport.get_instance().reset()
+            scheduler = SequenceScheduler(
+                ordered_plugins,
+                filtered_configs,
+                max_parallel=self.max_parallel,
+                resources={plugin_id: self._get_plugin_resources(config)
+                           for plugin_id, config in filtered_configs.items()}
+            )
 
             # Initialiser l'interface
             self._initialize_execution_ui()
             await LoggerUtils.add_log(self, f"Démarrage de l'exécution de {total_plugins} plugins", level="info")
-
-            # Exécuter chaque plugin dans l'ordre
-            for plugin_id in ordered_plugins:
+            if self.journal:
+                await LoggerUtils.add_log(self, f"Journal d'exécution: {self.journal.run_id} "
+                                                f"(reprise possible avec --resume {self.journal.run_id})", level="info")
+            if scheduler.max_parallel > 1:
+                await LoggerUtils.add_log(self, f"Exécution parallèle: {scheduler.max_parallel} plugins simultanés au maximum", level="info")
+
+            async def run_one(plugin_id: str) -> bool:
+                success = await self._run_scheduled_plugin(plugin_id, filtered_plugins[plugin_id],
+                                                           filtered_configs[plugin_id])
+                self.update_global_progress(scheduler.finished / total_plugins * 100)
+                return success
+
+            def should_continue() -> bool:
                 if not self.is_running:
                     logger.info("Exécution arrêtée par l'utilisateur")
-                    break
+                    return False
+                if scheduler.has_failures and not self.continue_on_error:
+                    logger.warning("Arrêt de l'exécution après erreur")
+                    return False
+                return True
 
-                # Récupérer le plugin et sa configuration
+            def on_skip(plugin_id: str, failed_id: str) -> None:
                 plugin_widget = filtered_plugins[plugin_id]
-                config = filtered_configs[plugin_id]
-                plugin_name = plugin_widget.plugin_name
+                plugin_widget.set_status("skipped", f"{failed_id} a échoué")
+                plugin_widget.update_progress(100.0, "Ignoré")
 
-                # Mettre à jour l'interface
-                self.set_current_plugin(plugin_name)
-                self.update_global_progress(executed / total_plugins * 100)
+            self.update_global_progress(0)
+            await scheduler.run(run_one, should_continue, on_skip)
 
-                try:
-                    # Initialiser la progression
-                    plugin_widget.update_progress(0.0, "En cours")
+            # Afficher un message de fin d'exécution
+            await self._display_execution_summary(scheduler.finished, total_plugins)
 
-                    # Exécuter le plugin
-                    logger.debug(f"Exécution du plugin {plugin_id}")
-                    result = await self.execute_plugin(plugin_id, config)
+            # Exporter la durée des phases (chrome://tracing)
+            trace_path = self._export_timings()
+            if trace_path:
+                await LoggerUtils.add_log(self, f"Durées d'exécution exportées: {trace_path}", level="info")
 
+            # Exporter le profil des commandes (option --profile)
+            commands_path = self._export_command_report()
+            if commands_path:
+                await LoggerUtils.add_log(self, f"Profil des commandes exporté: {commands_path}", level="info")
 
-                    # Mise à jour du statut et de la sortie
-                    self._update_plugin_status(plugin_widget, result)
+        except Exception as e:
+            logger.error(f"Erreur globale lors de l'exécution: {e}")
+            logger.error(traceback.format_exc())
+            await LoggerUtils.add_log(self, f"Erreur lors de l'exécution: {e}", level="error")
+        finally:
+            # Arrêter le timer d'affichage des logs
+            await LoggerUtils.stop_logs_timer()
 
+            # Afficher un dernier lot de messages en attente
+            await LoggerUtils.flush_pending_messages(self)
 
+    def _export_timings(self) -> Optional[str]:
+        """
+        Exporte les durées des phases d'exécution au format Chrome Trace.
 
-                except Exception as e:
-                    logger.error(f"Erreur lors de l'exécution de {plugin_id}: {e}")
-                    logger.error(traceback.format_exc())
+        Le fichier est écrit à côté du journal d'exécution.
 
-                    # Mise à jour du statut du plugin en cas d'erreur
-                    plugin_widget.set_status("error")
-                    plugin_widget.set_output(f"Erreur")
-                    plugin_widget.update_progress(100.0, "Erreur")
+        Returns:
+            Optional[str]: Chemin du fichier, ou None si rien n'a été exporté
+        """
+        if self.journal:
+            path = self.journal.path.rsplit('.jsonl', 1)[0] + '.trace.json'
+        else:
+            path = os.path.join(RUNS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}.trace.json")
+        return TimingRecorder.get_instance().export_chrome_trace(path)
 
-                    # Si on ne continue pas en cas d'erreur, arrêter l'exécution
-                    if not self.continue_on_error:
-                        logger.warning(f"Arrêt de l'exécution après erreur sur {plugin_id}")
-                        break
+    def _export_command_report(self) -> Optional[str]:
+        """
+        Exporte le profil agrégé des commandes des plugins, à côté du journal.
 
-                executed += 1
-                self.update_global_progress(executed / total_plugins * 100)
+        Returns:
+            Optional[str]: Chemin du fichier, ou None si rien n'a été exporté
+        """
+        if self.journal:
+            path = self.journal.path.rsplit('.jsonl', 1)[0] + '.commands.json'
+        else:
+            path = os.path.join(RUNS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}.commands.json")
+        return CommandReport.get_instance().export_json(path)
 
-            # Afficher un message de fin d'exécution
-            self._display_execution_summary(executed, total_plugins)
+    def _open_journal(self) -> None:
+        """
+        Ouvre le journal de l'exécution: celui de l'exécution reprise, ou un nouveau.
+        """
+        try:
+            if self.resume_journal is not None:
+                self.journal = self.resume_journal
+                self.resume_journal = None
+                logger.info(f"Reprise de l'exécution {self.journal.run_id}")
+            else:
+                self.journal = RunJournal.create(self.plugins_config, self.sequence_name)
+        except Exception as e:
+            logger.error(f"Impossible de créer le journal d'exécution: {e}")
+            logger.error(traceback.format_exc())
+            self.journal = None
+
+    async def _run_scheduled_plugin(self, plugin_id: str, plugin_widget: PluginContainer,
+                                    config: Dict[str, Any]) -> bool:
+        """
+        Exécute un plugin lancé par l'ordonnanceur et met à jour son affichage.
+
+        Args:
+            plugin_id: Identifiant du plugin
+            plugin_widget: Widget du plugin
+            config: Configuration du plugin
+
+        Returns:
+            bool: True si le plugin a réussi
+        """
+        # Mettre à jour l'interface
+        self.set_current_plugin(plugin_widget.plugin_name)
+
+        try:
+            # Initialiser la progression
+            plugin_widget.set_status("running")
+            plugin_widget.update_progress(0.0, "En cours")
+
+            # Exécuter le plugin
+            logger.debug(f"Exécution du plugin {plugin_id}")
+            result = await self.execute_plugin(plugin_id, config)
+
+            # Mise à jour du statut et de la sortie
+            self._update_plugin_status(plugin_widget, result)
+            return bool(result[0]) if isinstance(result, tuple) else bool(result)
 
         except Exception as e:
-            logger.error(f"Erreur globale lors de l'exécution: {e}")
+            logger.error(f"Erreur lors de l'exécution de {plugin_id}: {e}")
             logger.error(traceback.format_exc())
-            await LoggerUtils.add_log(self, f"Erreur lors de l'exécution: {e}", level="error")
-        finally:
-            # Arrêter le timer d'affichage des logs
-            await LoggerUtils.stop_logs_timer()
 
-            # Afficher un dernier lot de messages en attente
-            await LoggerUtils.flush_pending_messages(self)
+            # Mise à jour du statut du plugin en cas d'erreur
+            plugin_widget.set_status("error")
+            plugin_widget.set_output(f"Erreur")
+            plugin_widget.update_progress(100.0, "Erreur")
+            return False
+
+    def _get_plugin_resources(self, config: Dict[str, Any]) -> List[str]:
+        """
+        Récupère les ressources partagées déclarées dans le settings.yml d'un plugin.
+
+        Args:
+            config: Configuration du plugin
+
+        Returns:
+            List[str]: Ressources utilisées par le plugin (ex: apt-lock, cups)
+        """
+        plugin_name = config.get('plugin_name', '')
+        if not plugin_name:
+            return []
+        try:
+            settings = load_plugin_info(plugin_name) or {}
+            resources = settings.get('resources', [])
+            return [resources] if isinstance(resources, str) else list(resources or [])
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture des ressources de {plugin_name}: {e}")
+            return []
 
     def _prepare_plugins_execution(self) -> Tuple[Dict[str, Any], Dict[str, Any], List[str]]:
         """
@@ -397,6 +558,14 @@ class ExecutionWidget(Container):
 
         await LoggerUtils.add_log(self, message, level=level)
 
+        # Durée des phases, pour repérer celle qui domine et sur quelle machine
+        for line in TimingRecorder.get_instance().summary_lines():
+            await LoggerUtils.add_log(self, line, level="info")
+
+        # Commandes les plus lentes, toutes machines confondues (option --profile)
+        for line in CommandReport.get_instance().summary_lines():
+            await LoggerUtils.add_log(self, line, level="info")
+
     async def start_execution(self, auto_mode: bool = False) -> None:
         """
         Démarre l'exécution des plugins.
@@ -563,78 +732,6 @@ class ExecutionWidget(Container):
         """
         return ''.join(c if c.isalnum() or c in '-_' else '_' for c in id_string)
 
-    def _create_ssh_plugin_containers(self, plugin_id: str, config: Dict[str, Any],
-                                    plugin_name: str, show_name: str, icon: str) -> List[str]:
-        """
-        Crée des conteneurs pour un plugin SSH avec plusieurs IPs.
-
-        Args:
-            plugin_id: ID du plugin
-            config: Configuration du plugin
-            plugin_name: Nom du plugin
-            show_name: Nom à afficher
-            icon: Icône du plugin
-
-        Returns:
-            List[str]: Liste des IDs de conteneurs créés
-        """
-        created_containers = []
-        plugin_config = config.get('config', {})
-        ssh_ips = plugin_config.get('ssh_ips', '')
-        ssh_exception_ips = plugin_config.get('ssh_exception_ips', '')
-
-        # Si le plugin a plusieurs IPs
-        if ssh_ips and ('*' in ssh_ips or ',' in ssh_ips):
-            # Obtenir la liste des IPs cibles
-            target_ips = get_target_ips(ssh_ips, ssh_exception_ips)
-            logger.debug(f"Plugin SSH {plugin_id} avec {len(target_ips)} IPs: {target_ips}")
-
-            if target_ips:
-                # Créer un conteneur pour chaque IP
-                for ip in target_ips:
-                    # Créer un ID unique
-                    ip_plugin_id = f"{plugin_id}_{ip.replace('.', '_')}"
-
-                    # Vérifier si ce conteneur existe déjà
-                    if ip_plugin_id in self.plugins:
-                        logger.debug(f"Conteneur déjà existant pour {ip_plugin_id}")
-                        continue
-
-                    # Assainir l'ID
-                    sanitized_id = self.sanitize_id(ip_plugin_id)
-
-                    # Créer le conteneur avec l'IP dans le nom
-                    ip_show_name = f"{show_name} ({ip})"
-                    container = PluginContainer(sanitized_id, plugin_name, ip_show_name, icon)
-
-                    # Stocker l'IP cible
-                    container.target_ip = ip
-
-                    # Ajouter aux plugins
-                    self.plugins[ip_plugin_id] = container
-
-                    # Créer une copie de la configuration pour cette IP
-                    ip_config = config.copy()
-                    self.plugins_config[ip_plugin_id] = ip_config
-
-                    logger.debug(f"Conteneur ajouté pour {ip_plugin_id}: {ip_show_name}")
-                    created_containers.append(ip_plugin_id)
-
-                    yield container
-            else:
-                # Aucune IP valide, créer un conteneur d'erreur
-                if plugin_id not in self.plugins:
-                    sanitized_id = self.sanitize_id(plugin_id)
-                    container = PluginContainer(sanitized_id, plugin_name,
-                                              f"{show_name} (Aucune IP valide)", icon)
-                    self.plugins[plugin_id] = container
-                    logger.debug(f"Conteneur d'erreur ajouté pour {plugin_id}")
-                    created_containers.append(plugin_id)
-
-                    yield container
-
-        return created_containers
-
     def compose(self) -> ComposeResult:
         """
         Compose l'interface du widget d'exécution.
@@ -692,23 +789,17 @@ class ExecutionWidget(Container):
                 else:
                     logger.error(f"Impossible de créer un conteneur pour {plugin_id}")
 
-                # Créer des conteneurs supplémentaires pour SSH multi-IPs
+                # Plugin SSH: l'exécuteur parcourt les IPs au fil de l'eau,
+                # on n'affiche que le nombre de machines ciblées
                 plugin_config = config.get('config', {})
                 ssh_ips = plugin_config.get('ssh_ips', '')
 
-                if ssh_ips and ('*' in ssh_ips or ',' in ssh_ips):
-                    yield from self._create_ssh_plugin_containers(
-                        plugin_id, config, plugin_name, show_name, icon
-                    )
-                elif ssh_ips:
-                    # Plugin SSH avec une seule IP
-                    if plugin_id not in self.plugins:
-                        sanitized_id = self.sanitize_id(plugin_id)
-                        container = PluginContainer(sanitized_id, plugin_name, show_name, icon)
-                        container.target_ip = ssh_ips.strip()
-                        self.plugins[plugin_id] = container
-                        logger.debug(f"Conteneur SSH simple ajouté pour {plugin_id}")
-                        yield container
+                if ssh_ips and config.get('remote_execution', False):
+                    target_ips = get_target_ips(plugin_config)
+                    plugin_container.target_ips = target_ips
+                    if len(target_ips) == 1:
+                        plugin_container.target_ip = next(iter(target_ips))
+                    logger.debug(f"Plugin SSH {plugin_id} avec {len(target_ips)} IPs")
 
         # Zone des logs
         with Horizontal(id="logs"):
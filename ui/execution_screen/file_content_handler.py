@@ -3,9 +3,10 @@ Module pour gérer le contenu des fichiers de configuration.
 """
 
 import os
-from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
 
 from ..utils.logging import get_logger
+from ..utils.yaml_cache import load_yaml
 
 logger = get_logger('file_content_handler')
 
@@ -73,21 +74,18 @@ class FileContentHandler:
                 # Vérifier si le fichier existe
                 if os.path.exists(full_path):
                     try:
-                        # Lire le contenu du fichier
-                        with open(full_path, 'r', encoding='utf-8') as f:
-                            file_content_str = f.read()
-                            logger.info(f"Contenu du fichier lu avec succès pour {param_name}")
-                            
-                            # Essayer de parser le contenu comme YAML pour le convertir en dictionnaire
-                            try:
-                                parsed_content = YAML().load(file_content_str)
-                                logger.info(f"Contenu YAML parsé avec succès pour {param_name}: {type(parsed_content)}")
-                            except Exception as yaml_error:
-                                logger.warning(f"Impossible de parser le contenu comme YAML: {yaml_error}")
-                                parsed_content = file_content_str
-                            
-                            # Ajouter le contenu au dictionnaire
-                            file_content[param_name] = parsed_content
+                        # Parser le contenu comme YAML pour le convertir en dictionnaire
+                        # (lecture seule: passage par le cache YAML)
+                        try:
+                            parsed_content = load_yaml(full_path)
+                            logger.info(f"Contenu YAML parsé avec succès pour {param_name}: {type(parsed_content)}")
+                        except YAMLError as yaml_error:
+                            logger.warning(f"Impossible de parser le contenu comme YAML: {yaml_error}")
+                            with open(full_path, 'r', encoding='utf-8') as f:
+                                parsed_content = f.read()
+
+                        # Ajouter le contenu au dictionnaire
+                        file_content[param_name] = parsed_content
                     except Exception as e:
                         logger.error(f"Erreur lors de la lecture du fichier {full_path}: {str(e)}")
                 else:
@@ -0,0 +1,262 @@
+"""
+Empreintes d'idempotence des plugins.
+
+Après chaque exécution, son empreinte (code du plugin + configuration
+effective) et son résultat sont enregistrés sur la machine cible, dans un
+petit fichier d'état par plugin, sous la clé de l'instance du plugin (une
+séquence peut contenir plusieurs instances, ex: imprimantes). Avant
+l'exécution suivante, les exécuteurs comparent l'empreinte courante à la
+dernière exécution de la même instance: si elle a réussi avec la même
+empreinte, le plugin a déjà été appliqué à l'identique et n'est ni copié
+ni relancé. Seule la dernière exécution compte: après A puis B, appliquer
+de nouveau A relance le plugin.
+
+Seuls les plugins déclarant idempotent: true dans leur settings.yml sont
+concernés; la clé force (séquence) ou l'option --force les relance quand même.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils.logging import get_logger
+from .run_journal import config_hash
+
+logger = get_logger('fingerprint')
+
+# Dossier des fichiers d'état, relatif au répertoire personnel (local comme distant)
+STATE_DIR = os.path.join('.local', 'state', 'pcUtils', 'fingerprints')
+
+# Nombre maximal d'instances conservées par plugin
+MAX_INSTANCES = 32
+
+# Version du format des fichiers d'état (la version 1, sans instances, est ignorée)
+STATE_VERSION = 2
+
+# Clés de configuration qui ne changent pas l'effet du plugin sur la machine
+_IGNORED_PREFIXES = ('ssh_',)
+_IGNORED_KEYS = {'remote_execution', 'force', 'profile_commands', 'apt_update_max_age'}
+
+# Dossier partagé par tous les plugins, inclus dans l'empreinte du code
+SHARED_CODE_DIR = 'plugins_utils'
+
+_code_cache: Dict[str, Tuple[Tuple, str]] = {}
+_code_lock = threading.Lock()
+
+def _scan_directory(directory: str) -> Tuple:
+    """Liste (chemin relatif, mtime_ns, taille) des fichiers d'un dossier, hors caches."""
+    entries = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.pyc'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((os.path.relpath(path, directory), stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+def plugin_code_hash(plugin_dir: str) -> str:
+    """
+    Calcule l'empreinte du code d'un plugin (et des utilitaires partagés).
+
+    Le résultat est mémorisé tant que les dates et tailles des fichiers
+    ne changent pas.
+
+    Args:
+        plugin_dir: Dossier du plugin
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    directories = [plugin_dir, os.path.join(os.path.dirname(plugin_dir), SHARED_CODE_DIR)]
+    signature = tuple(_scan_directory(directory) for directory in directories)
+
+    with _code_lock:
+        cached = _code_cache.get(plugin_dir)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    digest = hashlib.sha256()
+    for directory, entries in zip(directories, signature):
+        for relative_path, _, _ in entries:
+            digest.update(relative_path.encode('utf-8'))
+            try:
+                with open(os.path.join(directory, relative_path), 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                continue
+    code_hash = digest.hexdigest()[:16]
+
+    with _code_lock:
+        _code_cache[plugin_dir] = (signature, code_hash)
+    return code_hash
+
+def effective_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extrait la configuration qui détermine l'effet du plugin sur la machine.
+
+    Les paramètres de connexion (ssh_*) et d'exécution sont ignorés: changer
+    la liste des machines cibles ne doit pas invalider les empreintes.
+
+    Args:
+        config: Configuration complète du plugin
+
+    Returns:
+        Dict[str, Any]: Configuration effective
+    """
+    values = config.get('config', config) if isinstance(config, dict) else {}
+    return {key: value for key, value in values.items()
+            if key not in _IGNORED_KEYS and not str(key).startswith(_IGNORED_PREFIXES)}
+
+def compute_fingerprint(plugin_dir: str, config: Dict[str, Any]) -> str:
+    """
+    Calcule l'empreinte d'une exécution (code du plugin + configuration effective).
+
+    Args:
+        plugin_dir: Dossier du plugin
+        config: Configuration du plugin
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    return f"{plugin_code_hash(plugin_dir)}-{config_hash(effective_config(config))}"
+
+def instance_key(config: Dict[str, Any]) -> str:
+    """
+    Clé de l'instance d'un plugin dans le fichier d'état.
+
+    Args:
+        config: Configuration du plugin (instance_id distingue les instances)
+
+    Returns:
+        str: Clé de l'instance
+    """
+    instance_id = config.get('instance_id') if isinstance(config, dict) else None
+    return str(instance_id if instance_id is not None else 0)
+
+def is_enabled(plugin_settings: Dict[str, Any], config: Dict[str, Any], force: bool = False) -> bool:
+    """
+    Indique si le contrôle d'idempotence s'applique à une exécution.
+
+    Args:
+        plugin_settings: Paramètres du plugin (settings.yml)
+        config: Configuration du plugin
+        force: Relance forcée demandée globalement
+
+    Returns:
+        bool: True si l'exécution peut être sautée quand l'empreinte est connue
+    """
+    if force or (isinstance(config, dict) and config.get('force')):
+        return False
+    return bool(plugin_settings and plugin_settings.get('idempotent', False))
+
+def state_file(folder_name: str) -> str:
+    """Chemin, relatif au répertoire personnel, du fichier d'état d'un plugin."""
+    return os.path.join(STATE_DIR, f"{folder_name}.json")
+
+def parse_state(content: Optional[str]) -> Dict[str, Any]:
+    """
+    Lit le contenu d'un fichier d'état.
+
+    Args:
+        content: Contenu JSON (None ou vide: aucun état)
+
+    Returns:
+        Dict[str, Any]: {instance: {'fingerprint': str, 'success': bool, 'time': float}}
+    """
+    if not content:
+        return {}
+    try:
+        state = json.loads(content)
+    except ValueError:
+        logger.warning("Fichier d'état d'idempotence illisible, ignoré")
+        return {}
+    if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+        # Ancien format: empreintes sans instance ni ordre fiable, le plugin sera relancé
+        return {}
+    instances = state.get('instances')
+    if not isinstance(instances, dict):
+        return {}
+    return {key: entry for key, entry in instances.items() if isinstance(entry, dict)}
+
+def is_applied(state: Dict[str, Any], fingerprint: str, instance: str) -> bool:
+    """
+    Indique si la dernière exécution d'une instance a réussi avec cette empreinte.
+
+    Args:
+        state: État lu par parse_state
+        fingerprint: Empreinte de l'exécution prévue
+        instance: Clé de l'instance (voir instance_key)
+
+    Returns:
+        bool: True si le plugin peut être sauté
+    """
+    entry = state.get(instance)
+    return (isinstance(entry, dict) and entry.get('fingerprint') == fingerprint
+            and bool(entry.get('success')))
+
+def dump_state(state: Dict[str, Any], fingerprint: str, success: bool, instance: str) -> str:
+    """
+    Remplace la dernière exécution d'une instance dans l'état et le sérialise.
+
+    Args:
+        state: État actuel
+        fingerprint: Empreinte de l'exécution
+        success: Résultat de l'exécution
+        instance: Clé de l'instance (voir instance_key)
+
+    Returns:
+        str: Contenu JSON du fichier d'état
+    """
+    state = dict(state)
+    state.pop(instance, None)
+    state[instance] = {'fingerprint': fingerprint, 'success': bool(success), 'time': time.time()}
+    # Ne garder que les instances exécutées le plus récemment
+    recent = sorted(state.items(), key=lambda item: item[1].get('time', 0))[-MAX_INSTANCES:]
+    return json.dumps({'version': STATE_VERSION, 'instances': dict(recent)}, indent=1)
+
+class LocalFingerprintStore:
+    """
+    Fichiers d'état d'idempotence de la machine locale.
+    """
+
+    def __init__(self, home: Optional[str] = None):
+        """
+        Initialise le stockage.
+
+        Args:
+            home: Répertoire personnel (par défaut celui de l'utilisateur)
+        """
+        self.home = home or os.path.expanduser('~')
+
+    def _path(self, folder_name: str) -> str:
+        return os.path.join(self.home, state_file(folder_name))
+
+    def load(self, folder_name: str) -> Dict[str, Any]:
+        """Charge l'état d'un plugin (vide si absent)."""
+        try:
+            with open(self._path(folder_name), 'r', encoding='utf-8') as f:
+                return parse_state(f.read())
+        except OSError:
+            return {}
+
+    def record(self, folder_name: str, fingerprint: str, success: bool, instance: str) -> None:
+        """Enregistre le résultat d'une exécution d'une instance (écriture atomique)."""
+        path = self._path(folder_name)
+        try:
+            content = dump_state(self.load(folder_name), fingerprint, success, instance)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Impossible d'enregistrer l'empreinte de {folder_name}: {e}")
@@ -0,0 +1,216 @@
+"""
+Cache des profils de machines (« faits ») côté contrôleur.
+
+Le profil d'une machine (voir plugins/plugins_utils/host_facts.py) est
+collecté par une seule commande, sans copie de fichier, puis transmis à
+chaque plugin dans la clé host_facts de sa configuration. Il est conservé
+ici pendant DEFAULT_TTL secondes, en mémoire et dans
+~/.cache/pcUtils/facts/<hôte>.json, pour que les plugins suivants de
+l'exécution (et les exécutions proches) ne le redemandent pas.
+
+Après l'exécution d'un plugin sur une machine, son profil est revalidé
+auprès de la machine avant d'être réutilisé: le cache distant n'est
+recalculé que si les fichiers dont il dépend ont changé.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import importlib.util
+from typing import Any, Dict, Optional, Set
+
+from ..utils.logging import get_logger
+
+logger = get_logger('host_facts_cache')
+
+FACTS_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'pcUtils', 'facts'
+)
+
+# Durée de validité des profils, en secondes
+DEFAULT_TTL = 900
+
+# Script de collecte, relatif au répertoire de base de l'application
+FACTS_SCRIPT = os.path.join('plugins', 'plugins_utils', 'host_facts.py')
+
+# Version du format de profil attendue (FACTS_VERSION de host_facts.py)
+FACTS_VERSION = 1
+
+def parse_facts(output: str) -> Optional[Dict[str, Any]]:
+    """
+    Lit le profil affiché par le script de collecte.
+
+    Args:
+        output: Sortie standard du script
+
+    Returns:
+        Optional[Dict[str, Any]]: Profil, ou None s'il est invalide
+    """
+    try:
+        facts = json.loads(output)
+    except ValueError:
+        return None
+    if not isinstance(facts, dict) or facts.get('version') != FACTS_VERSION:
+        return None
+    return facts
+
+class HostFactsCache:
+    """
+    Profils des machines cibles, partagés par tous les exécuteurs.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'HostFactsCache':
+        """Récupère l'instance unique du cache."""
+        if cls._instance is None:
+            cls._instance = HostFactsCache()
+        return cls._instance
+
+    def __init__(self, ttl: int = DEFAULT_TTL):
+        """
+        Initialise le cache.
+
+        Args:
+            ttl: Durée de validité des profils en secondes
+        """
+        self.ttl = ttl
+        self._facts: Dict[str, Dict[str, Any]] = {}
+        # Machines modifiées par un plugin depuis la collecte de leur profil
+        self._changed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._script: Optional[str] = None
+
+    def _path(self, host: str) -> str:
+        return os.path.join(FACTS_DIR, f"{host.replace(os.sep, '_')}.json")
+
+    def _is_fresh(self, facts: Dict[str, Any]) -> bool:
+        return 0 <= time.time() - facts.get('collected_at', 0) < self.ttl
+
+    def get(self, host: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne le profil d'une machine s'il est récent et toujours valide.
+
+        Args:
+            host: Adresse de la machine (LOCAL_HOST pour la machine locale)
+
+        Returns:
+            Optional[Dict[str, Any]]: Profil, ou None s'il faut le (re)demander
+        """
+        with self._lock:
+            if host in self._changed:
+                return None
+            facts = self._facts.get(host)
+
+        if facts is None:
+            try:
+                with open(self._path(host), 'r', encoding='utf-8') as f:
+                    facts = parse_facts(f.read())
+            except OSError:
+                facts = None
+            if facts is None:
+                return None
+
+        if not self._is_fresh(facts):
+            return None
+
+        with self._lock:
+            self._facts[host] = facts
+        return facts
+
+    def put(self, host: str, facts: Dict[str, Any]) -> None:
+        """
+        Enregistre le profil d'une machine.
+
+        Args:
+            host: Adresse de la machine
+            facts: Profil collecté
+        """
+        with self._lock:
+            self._facts[host] = facts
+            self._changed.discard(host)
+
+        path = self._path(host)
+        try:
+            os.makedirs(FACTS_DIR, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=FACTS_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(facts, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer le profil de {host}: {e}")
+
+    def mark_changed(self, host: str) -> None:
+        """
+        Signale qu'un plugin a été exécuté sur une machine.
+
+        Son profil sera revalidé auprès de la machine avant d'être réutilisé.
+
+        Args:
+            host: Adresse de la machine
+        """
+        with self._lock:
+            self._changed.add(host)
+
+    def remote_command(self) -> str:
+        """
+        Commande de collecte à exécuter sur une machine distante.
+
+        Le script est envoyé sur l'entrée standard de la commande.
+
+        Returns:
+            str: Commande shell
+        """
+        return f"python3 - --ttl {int(self.ttl)}"
+
+    def script_source(self, base_dir: str) -> Optional[str]:
+        """
+        Retourne le code du script de collecte.
+
+        Args:
+            base_dir: Répertoire de base de l'application
+
+        Returns:
+            Optional[str]: Code source, ou None si le script est introuvable
+        """
+        if self._script is None:
+            try:
+                with open(os.path.join(base_dir, FACTS_SCRIPT), 'r', encoding='utf-8') as f:
+                    self._script = f.read()
+            except OSError as e:
+                logger.warning(f"Script de collecte du profil introuvable: {e}")
+                return None
+        return self._script
+
+    def collect_local(self, host: str, base_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne le profil de la machine locale (cache ou collecte).
+
+        Fonction bloquante, à appeler hors de la boucle d'événements.
+
+        Args:
+            host: Clé de la machine locale dans le cache
+            base_dir: Répertoire de base de l'application
+
+        Returns:
+            Optional[Dict[str, Any]]: Profil, ou None en cas d'erreur
+        """
+        facts = self.get(host)
+        if facts is not None:
+            return facts
+
+        try:
+            spec = importlib.util.spec_from_file_location('pcutils_host_facts', os.path.join(base_dir, FACTS_SCRIPT))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            facts = module.load(self.ttl)
+        except Exception as e:
+            logger.warning(f"Impossible de collecter le profil de la machine locale: {e}")
+            return None
+
+        self.put(host, facts)
+        return facts
@@ -35,6 +35,12 @@ try:
     from ..choice_screen.plugin_utils import get_plugin_folder_name
     from .logger_utils import LoggerUtils
     from .file_content_handler import FileContentHandler
+    from .fingerprint import (LocalFingerprintStore, compute_fingerprint, is_applied, instance_key,
+                              is_enabled as is_fingerprint_enabled)
+    from .host_facts_cache import HostFactsCache
+    from .run_journal import LOCAL_HOST
+    from .timing import TimingRecorder, plugin_label
+    from .command_report import CommandReport, PROFILE_CONFIG_KEY
     INTERNAL_MODULES_AVAILABLE = True
 except ImportError:
     INTERNAL_MODULES_AVAILABLE = False
@@ -59,14 +65,26 @@ class LocalExecutor:
     et l'affichage des logs dans l'interface utilisateur.
     """
 
-    def __init__(self, app=None):
+    def __init__(self, app=None, force: bool = False, profile: bool = False):
         """
         Initialise l'exécuteur local.
 
         Args:
             app: Application Textual (optionnel)
+            force: Si True, relance les plugins idempotents déjà appliqués
+            profile: Si True, les plugins profilent chacune de leurs commandes
         """
         self.app = app
+        self.force = force
+        self.profile = profile
+        # Empreintes des plugins déjà appliqués sur cette machine
+        self.fingerprints = LocalFingerprintStore()
+        # Profil de la machine, partagé par les plugins de l'exécution
+        self.facts_cache = HostFactsCache.get_instance()
+        # Durée des phases d'exécution
+        self.timings = TimingRecorder.get_instance()
+        # Profils des commandes lancées par les plugins (option --profile)
+        self.command_report = CommandReport.get_instance()
         # Détecter si nous sommes dans un debugger
         self.debugger_mode = self._is_debugger_active()
         # État des commandes en cours
@@ -170,6 +188,9 @@ class LocalExecutor:
         stdout_text = ""
         stderr_text = ""
 
+        label = plugin_label(folder_name, config)
+        prepare_start = time.perf_counter()
+
         try:
             logger.info(f"Exécution locale du plugin {folder_name}")
 
@@ -208,9 +229,31 @@ class LocalExecutor:
             # Charger les paramètres du plugin depuis settings.yml
             plugin_settings = self._load_plugin_settings(plugin_dir)
 
+            # Plugin idempotent déjà appliqué à l'identique sur cette machine ?
+            fingerprint = None
+            instance = instance_key(config)
+            if is_fingerprint_enabled(plugin_settings, config, self.force):
+                fingerprint = compute_fingerprint(plugin_dir, config)
+                if is_applied(self.fingerprints.load(folder_name), fingerprint, instance):
+                    message = f"Plugin {folder_name} déjà appliqué avec cette configuration, ignoré"
+                    logger.info(message)
+                    self.log_message(message, "info")
+                    return True, message
+
             # Traiter le contenu des fichiers de configuration
             plugin_config_with_files = await self._process_file_content(plugin_settings, config, plugin_dir)
 
+            # Transmettre le profil de la machine aux utilitaires du plugin
+            if not is_bash_plugin:
+                with self.timings.span(label, LOCAL_HOST, 'facts'):
+                    facts = await asyncio.get_event_loop().run_in_executor(
+                        None, self.facts_cache.collect_local, LOCAL_HOST, base_dir
+                    )
+                if facts:
+                    plugin_config_with_files['host_facts'] = facts
+                if self.profile:
+                    plugin_config_with_files[PROFILE_CONFIG_KEY] = True
+
             # Préparer la commande en fonction du type de plugin
             cmd = self._prepare_command(is_bash_plugin, exec_path, plugin_config_with_files, config)
 
@@ -223,6 +266,8 @@ class LocalExecutor:
             self.log_message(f"Début de l'exécution du plugin {folder_name}", "start", target_ip)
 
             # Créer le processus
+            spawn_time = time.perf_counter()
+            self.timings.record(label, LOCAL_HOST, 'prepare', prepare_start, spawn_time - prepare_start)
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
@@ -240,7 +285,7 @@ class LocalExecutor:
 
             # Lire les sorties du processus de manière asynchrone
             stdout_lines, stderr_lines = await self._read_process_output(
-                process, plugin_widget, folder_name, target_ip
+                process, plugin_widget, folder_name, target_ip, label, spawn_time
             )
 
             # Attendre la fin du processus
@@ -257,6 +302,9 @@ class LocalExecutor:
             with self._lock:
                 self._running_processes.pop(process.pid, None)
 
+            # Le plugin a pu modifier la machine: revalider son profil avant réutilisation
+            self.facts_cache.mark_changed(LOCAL_HOST)
+
             # Combiner les lignes en texte
             stdout_text = "\n".join(stdout_lines)
             stderr_text = "\n".join(stderr_lines)
@@ -267,6 +315,8 @@ class LocalExecutor:
                 error_msg = stderr_text if stderr_text else f"Erreur inconnue (code {exit_code})"
                 logger.error(f"Plugin {folder_name} terminé avec erreur: {exit_code}")
                 self.log_message(f"Échec du plugin {folder_name}: {error_msg}", "error", target_ip)
+                if fingerprint:
+                    self.fingerprints.record(folder_name, fingerprint, False, instance)
 
 
                 return False, error_msg
@@ -274,6 +324,8 @@ class LocalExecutor:
             # Succès
             logger.info(f"Plugin {folder_name} terminé avec succès")
             self.log_message(f"Plugin {folder_name} exécuté avec succès", "success", target_ip)
+            if fingerprint:
+                self.fingerprints.record(folder_name, fingerprint, True, instance)
 
             # Flush LoggerUtils
 
@@ -516,7 +568,8 @@ class LocalExecutor:
 
         return safe_cmd
 
-    async def _read_process_output(self, process, plugin_widget, plugin_name, target_ip=None):
+    async def _read_process_output(self, process, plugin_widget, plugin_name, target_ip=None,
+                                   label: Optional[str] = None, spawn_time: Optional[float] = None):
         """
         Lit et traite les sorties du processus de manière asynchrone.
 
@@ -525,12 +578,17 @@ class LocalExecutor:
             plugin_widget: Widget du plugin dans l'interface
             plugin_name: Nom du plugin
             target_ip: Adresse IP cible (pour les plugins SSH)
+            label: Libellé du plugin pour les mesures de durée (optionnel)
+            spawn_time: Lancement du processus (time.perf_counter())
 
         Returns:
             Tuple[List[str], List[str]]: Lignes de stdout et stderr
         """
         stdout_lines = []
         stderr_lines = []
+        first_output = []
+        streaming_start = time.perf_counter()
+        streaming_time = [0.0]
 
         # Déterminer si nous sommes dans un contexte d'application ou de debugging
         enforce_sequential = self.debugger_mode
@@ -549,6 +607,14 @@ class LocalExecutor:
                     if not line_decoded:
                         continue
 
+                    line_start = time.perf_counter()
+                    if not is_stderr and not first_output:
+                        first_output.append(line_start)
+
+                    # Profil d'une commande du plugin: agrégé dans le rapport, pas affiché
+                    if not is_stderr and self.command_report.add_line(label or plugin_name, LOCAL_HOST, line_decoded):
+                        continue
+
                     # Stocker la ligne
                     lines.append(line_decoded)
 
@@ -626,6 +692,8 @@ class LocalExecutor:
                         logger.error(f"Erreur traitement ligne: {e}")
                         # Assurer que la ligne est loggée malgré l'erreur
                         self.log_message(line_decoded, "error" if is_stderr else "info", target_ip)
+                    finally:
+                        streaming_time[0] += time.perf_counter() - line_start
 
                 except asyncio.CancelledError:
                     raise
@@ -661,6 +729,15 @@ class LocalExecutor:
             if hasattr(LoggerUtils, 'flush_pending_messages') and self.app:
                 await LoggerUtils.flush_pending_messages(self.app)
 
+        if label:
+            end_time = time.perf_counter()
+            if spawn_time is not None:
+                first_time = first_output[0] if first_output else end_time
+                self.timings.record(label, LOCAL_HOST, 'startup', spawn_time, first_time - spawn_time)
+                self.timings.record(label, LOCAL_HOST, 'plugin', first_time, end_time - first_time)
+            # Temps cumulé de traitement des logs, placé au début de la lecture
+            self.timings.record(label, LOCAL_HOST, 'logs', streaming_start, streaming_time[0])
+
         return stdout_lines, stderr_lines
 
     def update_global_progress(self, app, progress: float):
@@ -60,7 +60,8 @@ class PluginContainer(Container):
         self.plugin_show_name = plugin_show_name
         self.plugin_icon = plugin_icon
         self.target_ip = None  # IP cible pour les plugins SSH avec plusieurs IPs
-        self.status = "waiting"  # Statut initial du plugin (waiting, running, success, error)
+        self.target_ips = None  # Ensemble paresseux des IPs cibles (IPRangeSet) pour les plugins SSH
+        self.status = "waiting"  # Statut initial du plugin (waiting, running, success, error, skipped)
         self.output = ""  # Initialiser l'attribut output
         self.classes = "plugin-container waiting"
         
@@ -189,7 +190,8 @@ class PluginContainer(Container):
             'waiting': 'En attente',
             'running': 'En cours',
             'success': 'Terminé',
-            'error': 'Erreur'
+            'error': 'Erreur',
+            'skipped': 'Ignoré'
         }
         status_text = status_map.get(status, status)
         if message:
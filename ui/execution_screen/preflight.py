@@ -0,0 +1,123 @@
+"""
+Prédicats de pré-vérification des plugins exécutés via SSH.
+
+Un plugin peut déclarer dans son settings.yml un prédicat évalué sur la
+machine distante par une seule commande, avant la création du répertoire
+temporaire et la copie des fichiers. Les machines non concernées sont
+ignorées sans transfert.
+
+    preflight: metier                   # Même contrôle que MetierCommands.should_process()
+
+    preflight:
+      command: "test -d {install_dir}"  # Commande shell, {clé} remplacé par la
+                                        # valeur de configuration (échappée)
+
+Code de retour de la commande: 0 = machine concernée, 1 = non concernée,
+autre = indéterminé (le plugin est exécuté et décide lui-même). Un
+prédicat ne doit jamais être plus strict que le contrôle fait par le
+plugin: dans le doute, il répond indéterminé.
+"""
+
+import shlex
+import string
+from typing import Any, Dict, Optional
+
+from ..utils.logging import get_logger
+
+logger = get_logger('preflight')
+
+# Code de retour signifiant « machine non concernée »
+NOT_CONCERNED = 1
+# Code de retour signifiant « indéterminé »: le plugin décide lui-même
+UNDETERMINED = 2
+
+# Valeurs par défaut de MetierCommands (plugins_utils/metier.py)
+LRPGN_CONFIG_FILE = "/usr/lib/lrpgn/travail/configuration/conf.ini"
+DEFAULT_SMS = "ggd027sf012027"
+DEFAULT_LRPGN = "travail/commun/Icare/Configuration/"
+# Bloc #debug de MetierCommands.__init__: contrôles SMS et LRPGN forcés,
+# quelle que soit la configuration (ssh_sms_enabled, ssh_lrpgn_enabled)
+METIER_FORCED_CHECKS = True
+
+def _metier_command(config: Dict[str, Any]) -> Optional[str]:
+    """
+    Construit la commande équivalente à MetierCommands.should_process().
+
+    Comme should_process(), la machine est toujours concernée hors mode SSH
+    (ssh_mode absent de la configuration): aucune commande n'est alors
+    envoyée. Sinon la SMS et le dossier LRPGN
+    sont vérifiés, avec les mêmes indicateurs que MetierCommands (voir
+    METIER_FORCED_CHECKS). Si debconf-show est absent, la réponse est
+    indéterminée et le plugin fait le contrôle lui-même.
+
+    Args:
+        config: Valeurs de configuration du plugin
+
+    Returns:
+        Optional[str]: Commande shell, ou None si toutes les machines sont concernées
+    """
+    if not config.get('ssh_mode', False):
+        return None
+
+    checks = []
+
+    if METIER_FORCED_CHECKS or config.get('ssh_sms_enabled', False):
+        sms = shlex.quote(f";{config.get('ssh_sms', DEFAULT_SMS)};")
+        checks.append(
+            f"command -v debconf-show >/dev/null 2>&1 || exit {UNDETERMINED}; "
+            "sms=$(debconf-show gend-base-config-debconf 2>/dev/null "
+            "| sed -n 's/^[* ] gendebconf\\/srfic: *//p'); "
+            f"case \";$sms;\" in *{sms}*) ;; *) exit {NOT_CONCERNED};; esac"
+        )
+
+    if METIER_FORCED_CHECKS or config.get('ssh_lrpgn_enabled', False):
+        lrpgn = shlex.quote(str(config.get('ssh_lrpgn', DEFAULT_LRPGN)))
+        checks.append(
+            f"grep -iE '^[[:space:]]*dossier\\.configuration[[:space:]]*[=:]' {LRPGN_CONFIG_FILE} 2>/dev/null "
+            f"| grep -qF -- {lrpgn} || exit {NOT_CONCERNED}"
+        )
+
+    checks.append("exit 0")
+    return "; ".join(checks)
+
+class _QuotingFormatter(string.Formatter):
+    """Formateur remplaçant {clé} par la valeur de configuration échappée pour le shell."""
+
+    def format_field(self, value: Any, format_spec: str) -> str:
+        return shlex.quote(str(super().format_field(value, format_spec)))
+
+# Prédicats prédéfinis, référencés par leur nom dans settings.yml
+BUILTIN_PREDICATES = {
+    'metier': _metier_command,
+}
+
+def build_preflight_command(spec: Any, config: Dict[str, Any]) -> Optional[str]:
+    """
+    Construit la commande de pré-vérification déclarée par un plugin.
+
+    Args:
+        spec: Valeur de la clé preflight du settings.yml (nom ou {command: ...})
+        config: Valeurs de configuration du plugin
+
+    Returns:
+        Optional[str]: Commande shell, ou None si aucun prédicat utilisable
+    """
+    if not spec:
+        return None
+
+    try:
+        if isinstance(spec, str):
+            builder = BUILTIN_PREDICATES.get(spec)
+            if builder is None:
+                logger.warning(f"Prédicat de pré-vérification inconnu: {spec}")
+                return None
+            # None: prédicat toujours vrai, pas de pré-vérification à envoyer
+            return builder(config)
+
+        if isinstance(spec, dict) and spec.get('command'):
+            return _QuotingFormatter().vformat(str(spec['command']), (), config)
+
+        logger.warning(f"Déclaration preflight invalide: {spec}")
+    except (KeyError, IndexError, ValueError) as e:
+        logger.warning(f"Impossible de construire la pré-vérification {spec}: {e}")
+    return None
@@ -0,0 +1,374 @@
+"""
+Journal d'exécution persistant.
+
+Chaque exécution écrit un journal en ajout seul (une ligne JSON par
+événement): la configuration des plugins, puis le début et la fin de chaque
+couple (plugin, hôte) avec l'empreinte de sa configuration. Si l'interface
+est fermée en cours de route, l'exécution peut être reprise avec
+--resume <run>: seuls les couples en échec ou non terminés sont rejoués.
+
+Les valeurs sensibles (mots de passe...) ne sont pas écrites dans le journal
+mais dans un fichier annexe <run>.secrets.json lisible par le seul
+propriétaire (0600), relu à la reprise. L'empreinte de configuration en
+tient compte sous forme d'un condensé salé par exécution: changer un mot de
+passe invalide donc les couples déjà terminés, sans que le journal ne
+révèle la valeur.
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.logging import get_logger
+
+logger = get_logger('run_journal')
+
+RUNS_DIR = os.path.join(
+    os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state'),
+    'pcUtils', 'runs'
+)
+
+# Hôte utilisé pour les exécutions locales
+LOCAL_HOST = 'local'
+
+# Fragments de noms de clés dont la valeur n'est jamais écrite dans le journal
+SENSITIVE_KEYS = ('passw', 'secret', 'token')
+
+def _is_sensitive(key: Any) -> bool:
+    return any(fragment in str(key).lower() for fragment in SENSITIVE_KEYS)
+
+def _redact(value: Any) -> Any:
+    """Retire récursivement les valeurs sensibles d'une configuration."""
+    if isinstance(value, dict):
+        return {key: _redact(item) for key, item in value.items() if not _is_sensitive(key)}
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+    return value
+
+def _extract_secrets(value: Any, path: Optional[List[Any]] = None) -> List[List[Any]]:
+    """
+    Liste les valeurs sensibles d'une configuration avec leur chemin.
+
+    Args:
+        value: Configuration (ou sous-partie)
+        path: Chemin de value depuis la racine
+
+    Returns:
+        List[List[Any]]: [[chemin, valeur], ...], chemin étant une liste de clés et d'indices
+    """
+    path = path or []
+    secrets = []
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if _is_sensitive(key):
+                secrets.append([path + [key], item])
+            else:
+                secrets.extend(_extract_secrets(item, path + [key]))
+    elif isinstance(value, (list, tuple)):
+        for index, item in enumerate(value):
+            secrets.extend(_extract_secrets(item, path + [index]))
+    return secrets
+
+def _restore_secrets(config: Any, secrets: List[List[Any]]) -> List[List[Any]]:
+    """
+    Réinjecte les valeurs sensibles dans une configuration expurgée.
+
+    Args:
+        config: Configuration expurgée (modifiée en place)
+        secrets: Valeurs sensibles, au format de _extract_secrets
+
+    Returns:
+        List[List[Any]]: Chemins qui n'ont pas pu être restaurés
+    """
+    missing = []
+    for path, value in secrets:
+        target = config
+        try:
+            for step in path[:-1]:
+                target = target[step]
+            target[path[-1]] = value
+        except (KeyError, IndexError, TypeError):
+            missing.append(path)
+    return missing
+
+def config_hash(config: Dict[str, Any], salt: Optional[str] = None) -> str:
+    """
+    Calcule l'empreinte d'une configuration de plugin.
+
+    Args:
+        config: Configuration du plugin
+        salt: Sel de l'exécution; s'il est fourni, les valeurs sensibles
+              entrent dans l'empreinte sous forme d'un condensé salé,
+              sinon elles sont ignorées
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    data = json.dumps(_redact(config), sort_keys=True, default=str)
+    if salt:
+        # Trier par chemin: l'ordre des clés change quand les secrets sont réinjectés
+        secrets = json.dumps(sorted(_extract_secrets(config), key=lambda entry: json.dumps(entry[0], default=str)),
+                             sort_keys=True, default=str)
+        data += hashlib.sha256((salt + secrets).encode('utf-8')).hexdigest()
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+class PluginJournal:
+    """
+    Vue du journal restreinte à un plugin et à l'empreinte de sa configuration.
+    """
+
+    def __init__(self, journal: 'RunJournal', plugin_id: str, digest: str):
+        """
+        Initialise la vue.
+
+        Args:
+            journal: Journal d'exécution
+            plugin_id: Identifiant du plugin
+            digest: Empreinte de la configuration du plugin
+        """
+        self.journal = journal
+        self.plugin_id = plugin_id
+        self.digest = digest
+
+    def is_done(self, host: str) -> bool:
+        """Indique si le plugin a déjà réussi sur cet hôte avec la même configuration."""
+        return self.journal.is_done(self.plugin_id, host, self.digest)
+
+    def start(self, host: str) -> None:
+        """Enregistre le début de l'exécution sur un hôte."""
+        self.journal.record_start(self.plugin_id, host, self.digest)
+
+    def end(self, host: str, success: bool, message: str = '') -> None:
+        """Enregistre la fin de l'exécution sur un hôte."""
+        self.journal.record_end(self.plugin_id, host, self.digest, success, message)
+
+class RunJournal:
+    """
+    Journal d'exécution en ajout seul, stocké dans RUNS_DIR/<run_id>.jsonl.
+    """
+
+    def __init__(self, path: str, run_id: str):
+        """
+        Initialise le journal (utiliser create() ou open()).
+
+        Args:
+            path: Chemin du fichier journal
+            run_id: Identifiant de l'exécution
+        """
+        self.path = path
+        self.run_id = run_id
+        self.plugins_config: Dict[str, Any] = {}
+        self.sequence_name: Optional[str] = None
+        # Sel des empreintes et chemins des valeurs sensibles (voir config_hash)
+        self.salt: Optional[str] = None
+        self.secret_paths: List[List[Any]] = []
+        # {(plugin_id, hôte): (statut, empreinte)} avec statut parmi running, success, error
+        self.states: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, plugins_config: Dict[str, Any], sequence_name: Optional[str] = None) -> 'RunJournal':
+        """
+        Crée le journal d'une nouvelle exécution.
+
+        Args:
+            plugins_config: Configuration des plugins à exécuter
+            sequence_name: Nom de la séquence exécutée (optionnel)
+
+        Returns:
+            RunJournal: Journal créé
+        """
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        os.makedirs(RUNS_DIR, mode=0o700, exist_ok=True)
+        journal = cls(os.path.join(RUNS_DIR, f"{run_id}.jsonl"), run_id)
+        journal.plugins_config = _redact(plugins_config)
+        journal.sequence_name = sequence_name
+        journal.salt = uuid.uuid4().hex
+        secrets = _extract_secrets(plugins_config)
+        journal.secret_paths = [path for path, _ in secrets]
+        if secrets:
+            journal._write_secrets(secrets)
+        journal._append({
+            'event': 'run',
+            'run_id': run_id,
+            'sequence': sequence_name,
+            'plugins_config': journal.plugins_config,
+            'salt': journal.salt,
+            'secret_paths': journal.secret_paths
+        })
+        logger.info(f"Journal d'exécution créé: {journal.path}")
+        return journal
+
+    @classmethod
+    def open(cls, run: str) -> 'RunJournal':
+        """
+        Ouvre le journal d'une exécution précédente pour la reprendre.
+
+        Args:
+            run: Identifiant de l'exécution, ou chemin du fichier journal
+
+        Returns:
+            RunJournal: Journal rechargé
+
+        Raises:
+            FileNotFoundError: Si le journal n'existe pas
+            ValueError: Si le journal ne contient pas de configuration, ou si
+                        des valeurs sensibles de la configuration sont introuvables
+        """
+        path = run if os.path.exists(run) else os.path.join(RUNS_DIR, f"{run}.jsonl")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Journal d'exécution introuvable: {run}")
+
+        journal = cls(path, os.path.basename(path).rsplit('.jsonl', 1)[0])
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        if content and not content.endswith('\n'):
+            # Terminer la ligne tronquée pour que les ajouts suivants restent lisibles
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+
+        for line_number, line in enumerate(content.splitlines(), 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # Dernière ligne tronquée par un arrêt brutal
+                logger.warning(f"Ligne {line_number} du journal illisible, ignorée")
+                continue
+            journal._apply(event)
+
+        if not journal.plugins_config:
+            raise ValueError(f"Journal sans configuration d'exécution: {path}")
+
+        if journal.secret_paths:
+            # Sans les mots de passe, les plugins seraient relancés avec des valeurs vides
+            secrets = journal._read_secrets()
+            available = {json.dumps(path) for path, _ in secrets}
+            lost = _restore_secrets(journal.plugins_config, secrets)
+            lost += [path for path in journal.secret_paths if json.dumps(path) not in available]
+            if lost:
+                fields = ', '.join('.'.join(str(step) for step in path) for path in lost)
+                raise ValueError(f"Valeurs sensibles introuvables dans {journal.secrets_path}: {fields}")
+
+        done = sum(1 for status, _ in journal.states.values() if status == 'success')
+        logger.info(f"Journal {journal.run_id} rechargé: {done}/{len(journal.states)} exécutions terminées avec succès")
+        return journal
+
+    @property
+    def secrets_path(self) -> str:
+        """Chemin du fichier des valeurs sensibles de l'exécution."""
+        return self.path.rsplit('.jsonl', 1)[0] + '.secrets.json'
+
+    def _write_secrets(self, secrets: List[List[Any]]) -> None:
+        """Écrit les valeurs sensibles dans un fichier lisible par le seul propriétaire."""
+        data = json.dumps(secrets, default=str, ensure_ascii=False)
+        try:
+            fd = os.open(self.secrets_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                os.write(fd, data.encode('utf-8'))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.error(f"Impossible d'écrire les valeurs sensibles {self.secrets_path}: {e}")
+
+    def _read_secrets(self) -> List[List[Any]]:
+        """Relit les valeurs sensibles de l'exécution (liste vide si absentes)."""
+        try:
+            with open(self.secrets_path, 'r', encoding='utf-8') as f:
+                secrets = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Impossible de lire les valeurs sensibles {self.secrets_path}: {e}")
+            return []
+        return [entry for entry in secrets if isinstance(entry, list) and len(entry) == 2 and entry[0]]
+
+    @staticmethod
+    def list_runs() -> List[str]:
+        """
+        Liste les exécutions journalisées, de la plus récente à la plus ancienne.
+
+        Returns:
+            List[str]: Identifiants des exécutions
+        """
+        try:
+            names = [name[:-len('.jsonl')] for name in os.listdir(RUNS_DIR) if name.endswith('.jsonl')]
+        except OSError:
+            return []
+        return sorted(names, reverse=True)
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        """Met à jour l'état en mémoire à partir d'un événement."""
+        kind = event.get('event')
+        if kind == 'run':
+            self.plugins_config = event.get('plugins_config') or {}
+            self.sequence_name = event.get('sequence')
+            self.salt = event.get('salt')
+            self.secret_paths = event.get('secret_paths') or []
+        elif kind == 'start':
+            self.states[(event['plugin_id'], event['host'])] = ('running', event.get('config_hash', ''))
+        elif kind == 'end':
+            status = 'success' if event.get('success') else 'error'
+            self.states[(event['plugin_id'], event['host'])] = (status, event.get('config_hash', ''))
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        """Ajoute un événement au journal et le force sur disque."""
+        event['time'] = time.time()
+        line = json.dumps(event, default=str, ensure_ascii=False) + '\n'
+        with self._lock:
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                try:
+                    os.write(fd, line.encode('utf-8'))
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                logger.error(f"Impossible d'écrire dans le journal {self.path}: {e}")
+            if event['event'] != 'run':
+                self._apply(event)
+
+    def for_plugin(self, plugin_id: str, config: Dict[str, Any]) -> PluginJournal:
+        """
+        Retourne la vue du journal pour un plugin.
+
+        Args:
+            plugin_id: Identifiant du plugin
+            config: Configuration du plugin (pour l'empreinte)
+
+        Returns:
+            PluginJournal: Vue du journal
+        """
+        return PluginJournal(self, plugin_id, config_hash(config, self.salt))
+
+    def is_done(self, plugin_id: str, host: str, digest: str) -> bool:
+        """
+        Indique si un couple (plugin, hôte) a réussi avec la même configuration.
+
+        Args:
+            plugin_id: Identifiant du plugin
+            host: Hôte (LOCAL_HOST pour une exécution locale)
+            digest: Empreinte de la configuration
+
+        Returns:
+            bool: True si l'exécution peut être sautée
+        """
+        with self._lock:
+            return self.states.get((plugin_id, host)) == ('success', digest)
+
+    def record_start(self, plugin_id: str, host: str, digest: str) -> None:
+        """Enregistre le début de l'exécution d'un plugin sur un hôte."""
+        self._append({'event': 'start', 'plugin_id': plugin_id, 'host': host, 'config_hash': digest})
+
+    def record_end(self, plugin_id: str, host: str, digest: str, success: bool, message: str = '') -> None:
+        """Enregistre la fin de l'exécution d'un plugin sur un hôte."""
+        event = {'event': 'end', 'plugin_id': plugin_id, 'host': host,
+                 'config_hash': digest, 'success': bool(success)}
+        if message and not success:
+            event['message'] = str(message)[:500]
+        self._append(event)
@@ -0,0 +1,237 @@
+"""
+Ordonnanceur d'exécution des plugins d'une séquence.
+
+Les plugins d'une séquence peuvent déclarer:
+- after: plugins qui doivent être terminés (succès ou échec) avant de démarrer
+- requires: plugins qui doivent avoir réussi (sinon le plugin est ignoré)
+- resources: ressources partagées (ex: apt-lock, cups) qu'un seul plugin
+  peut utiliser à la fois
+
+Les plugins prêts sont lancés en parallèle dans la limite de max_parallel.
+Avec max_parallel=1 et sans dépendance déclarée, l'ordre d'exécution est
+celui de la séquence.
+"""
+
+import asyncio
+import traceback
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from ..utils.logging import get_logger
+
+logger = get_logger('sequence_scheduler')
+
+# États possibles d'un plugin dans l'ordonnanceur
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCESS = 'success'
+ERROR = 'error'
+SKIPPED = 'skipped'
+
+def _as_list(value: Any) -> List[str]:
+    """Normalise une déclaration (chaîne, liste ou None) en liste de chaînes."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value if item is not None]
+    return [str(value)]
+
+class SequenceScheduler:
+    """
+    Ordonnanceur de plugins basé sur un graphe de dépendances.
+    """
+
+    def __init__(self, plugin_ids: List[str], configs: Dict[str, Dict[str, Any]],
+                 max_parallel: int = 1,
+                 resources: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Initialise l'ordonnanceur et construit le graphe des dépendances.
+
+        Args:
+            plugin_ids: Identifiants des plugins, dans l'ordre de la séquence
+            configs: Configurations des plugins indexées par identifiant
+                (clés after, requires et resources)
+            max_parallel: Nombre maximal de plugins exécutés simultanément
+            resources: Ressources par plugin, utilisées si la configuration
+                n'en déclare pas
+        """
+        self.plugin_ids = list(plugin_ids)
+        self.max_parallel = max(1, int(max_parallel or 1))
+        self.position = {plugin_id: index for index, plugin_id in enumerate(self.plugin_ids)}
+        self.states: Dict[str, str] = {plugin_id: PENDING for plugin_id in self.plugin_ids}
+
+        # {plugin_id: {plugin_ids à attendre}} et {plugin_id: {plugin_ids devant réussir}}
+        self.after: Dict[str, Set[str]] = {plugin_id: set() for plugin_id in self.plugin_ids}
+        self.requires: Dict[str, Set[str]] = {plugin_id: set() for plugin_id in self.plugin_ids}
+        self.resources: Dict[str, Set[str]] = {}
+
+        resources = resources or {}
+        for plugin_id in self.plugin_ids:
+            config = configs.get(plugin_id, {})
+            self.after[plugin_id] = self._resolve(plugin_id, _as_list(config.get('after')), configs)
+            self.requires[plugin_id] = self._resolve(plugin_id, _as_list(config.get('requires')), configs)
+            declared = config.get('resources')
+            if declared is None:
+                declared = resources.get(plugin_id)
+            self.resources[plugin_id] = set(_as_list(declared))
+
+        self._break_cycles()
+
+        logger.debug(f"Ordonnanceur initialisé: {len(self.plugin_ids)} plugins, "
+                     f"max_parallel={self.max_parallel}")
+
+    @property
+    def has_failures(self) -> bool:
+        """Indique si au moins un plugin a échoué."""
+        return any(state == ERROR for state in self.states.values())
+
+    @property
+    def finished(self) -> int:
+        """Nombre de plugins exécutés (succès ou échec)."""
+        return sum(1 for state in self.states.values() if state in (SUCCESS, ERROR))
+
+    def _resolve(self, plugin_id: str, references: List[str],
+                 configs: Dict[str, Dict[str, Any]]) -> Set[str]:
+        """
+        Convertit des références (nom de plugin ou identifiant d'instance) en identifiants.
+
+        Un nom de plugin désigne toutes ses instances de la séquence.
+
+        Args:
+            plugin_id: Plugin déclarant les références
+            references: Noms ou identifiants référencés
+            configs: Configurations des plugins
+
+        Returns:
+            Set[str]: Identifiants des plugins référencés
+        """
+        resolved = set()
+        for reference in references:
+            if reference in self.position:
+                matches = [reference]
+            else:
+                matches = [other for other in self.plugin_ids
+                           if configs.get(other, {}).get('plugin_name') == reference]
+            if not matches:
+                logger.warning(f"Dépendance inconnue pour {plugin_id}: {reference} (ignorée)")
+            resolved.update(match for match in matches if match != plugin_id)
+        return resolved
+
+    def _break_cycles(self) -> None:
+        """
+        Supprime les dépendances formant un cycle.
+
+        Pour les plugins pris dans un cycle, seules les dépendances vers des
+        plugins placés avant eux dans la séquence sont conservées, ce qui
+        rend le graphe acyclique.
+        """
+        in_degree = {plugin_id: len(self.after[plugin_id] | self.requires[plugin_id])
+                     for plugin_id in self.plugin_ids}
+        dependents: Dict[str, Set[str]] = {plugin_id: set() for plugin_id in self.plugin_ids}
+        for plugin_id in self.plugin_ids:
+            for dependency in self.after[plugin_id] | self.requires[plugin_id]:
+                dependents[dependency].add(plugin_id)
+
+        ready = [plugin_id for plugin_id, degree in in_degree.items() if degree == 0]
+        visited = set()
+        while ready:
+            plugin_id = ready.pop()
+            visited.add(plugin_id)
+            for dependent in dependents[plugin_id]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
+
+        cyclic = [plugin_id for plugin_id in self.plugin_ids if plugin_id not in visited]
+        if not cyclic:
+            return
+
+        logger.error(f"Cycle de dépendances entre les plugins: {cyclic}. "
+                     f"Les dépendances vers des plugins placés plus loin dans la séquence sont ignorées")
+        for plugin_id in cyclic:
+            for edges in (self.after, self.requires):
+                edges[plugin_id] = {dependency for dependency in edges[plugin_id]
+                                    if self.position[dependency] < self.position[plugin_id]}
+
+    def _failed_requirement(self, plugin_id: str) -> Optional[str]:
+        """Retourne le premier plugin requis ayant échoué ou été ignoré, sinon None."""
+        for dependency in sorted(self.requires[plugin_id], key=self.position.get):
+            if self.states[dependency] in (ERROR, SKIPPED):
+                return dependency
+        return None
+
+    def _is_ready(self, plugin_id: str, busy_resources: Set[str]) -> bool:
+        """Indique si toutes les dépendances d'un plugin sont terminées et ses ressources libres."""
+        for dependency in self.after[plugin_id] | self.requires[plugin_id]:
+            if self.states[dependency] in (PENDING, RUNNING):
+                return False
+        return not (self.resources[plugin_id] & busy_resources)
+
+    async def run(self, execute: Callable[[str], Awaitable[bool]],
+                  should_continue: Optional[Callable[[], bool]] = None,
+                  on_skip: Optional[Callable[[str, str], None]] = None) -> Dict[str, str]:
+        """
+        Exécute les plugins en respectant dépendances, ressources et limite de parallélisme.
+
+        Args:
+            execute: Coroutine exécutant un plugin et retournant son succès
+            should_continue: Fonction indiquant si de nouveaux plugins peuvent
+                être lancés (les plugins en cours vont à leur terme)
+            on_skip: Fonction appelée avec (plugin_id, plugin requis en échec)
+                pour chaque plugin ignoré
+
+        Returns:
+            Dict[str, str]: État final de chaque plugin
+        """
+        running: Dict[asyncio.Task, str] = {}
+        busy_resources: Set[str] = set()
+
+        while True:
+            if should_continue is None or should_continue():
+                launched = True
+                while launched and len(running) < self.max_parallel:
+                    launched = False
+                    for plugin_id in self.plugin_ids:
+                        if self.states[plugin_id] != PENDING:
+                            continue
+
+                        failed = self._failed_requirement(plugin_id)
+                        if failed is not None:
+                            self.states[plugin_id] = SKIPPED
+                            logger.info(f"Plugin {plugin_id} ignoré: {failed} n'a pas réussi")
+                            if on_skip:
+                                on_skip(plugin_id, failed)
+                            # Un plugin ignoré peut en débloquer d'autres: reprendre le parcours
+                            launched = True
+                            break
+
+                        if not self._is_ready(plugin_id, busy_resources):
+                            continue
+
+                        self.states[plugin_id] = RUNNING
+                        busy_resources.update(self.resources[plugin_id])
+                        running[asyncio.ensure_future(execute(plugin_id))] = plugin_id
+                        logger.debug(f"Plugin {plugin_id} lancé ({len(running)}/{self.max_parallel})")
+                        launched = True
+                        break
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                plugin_id = running.pop(task)
+                busy_resources.difference_update(self.resources[plugin_id])
+                try:
+                    self.states[plugin_id] = SUCCESS if task.result() else ERROR
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'exécution de {plugin_id}: {e}")
+                    logger.error(traceback.format_exc())
+                    self.states[plugin_id] = ERROR
+                logger.debug(f"Plugin {plugin_id} terminé: {self.states[plugin_id]}")
+
+        pending = [plugin_id for plugin_id, state in self.states.items() if state == PENDING]
+        if pending:
+            logger.info(f"Plugins non exécutés: {pending}")
+        return dict(self.states)
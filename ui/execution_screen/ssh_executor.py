@@ -31,7 +31,14 @@ try:
     from .file_content_handler import FileContentHandler
     from .root_credentials_manager import RootCredentialsManager
     from ..ssh_manager.ssh_config_loader import SSHConfigLoader
-    from ..ssh_manager.ip_utils import get_target_ips
+    from ..ssh_manager.ip_utils import IPRangeSet, get_target_ips
+    from .run_journal import PluginJournal
+    from .wave_scheduler import RolloutPolicy, WaveScheduler, HostUnreachable
+    from . import fingerprint as fingerprints
+    from .preflight import build_preflight_command, NOT_CONCERNED
+    from .host_facts_cache import HostFactsCache, parse_facts
+    from .timing import TimingRecorder, plugin_label
+    from .command_report import CommandReport, PROFILE_CONFIG_KEY
     INTERNAL_MODULES_AVAILABLE = True
 except ImportError:
     INTERNAL_MODULES_AVAILABLE = False
@@ -45,6 +52,9 @@ CONFIG_FILE = 'config.json'
 WRAPPER_CONFIG_FILE = 'wrapper_config.json'
 SSH_WRAPPER_FILE = 'ssh_wrapper.py'
 
+# Clé de la ligne JSON par laquelle le wrapper transmet ses mesures de durée
+REMOTE_TIMING_KEY = 'pcutils_timing'
+
 # Messages d'erreur
 ERROR_MESSAGES = {
     'no_ssh_creds': "Identifiants SSH manquants dans la configuration",
@@ -74,14 +84,18 @@ class SSHExecutor:
     la copie des fichiers nécessaires et l'affichage des logs dans l'interface utilisateur.
     """
 
-    def __init__(self, app=None):
+    def __init__(self, app=None, force: bool = False, profile: bool = False):
         """
         Initialise l'exécuteur SSH.
 
         Args:
             app: Application Textual (optionnel)
+            force: Si True, relance les plugins idempotents déjà appliqués
+            profile: Si True, les plugins profilent chacune de leurs commandes
         """
         self.app = app
+        self.force = force
+        self.profile = profile
 
         # Détecter si nous sommes dans un debugger
         self.debugger_mode = self._is_debugger_active()
@@ -95,6 +109,15 @@ class SSHExecutor:
         # Manager des identifiants root
         self.root_credentials_manager = RootCredentialsManager.get_instance()
 
+        # Profils des machines, partagés par les plugins de l'exécution
+        self.facts_cache = HostFactsCache.get_instance()
+
+        # Durée des phases d'exécution, par plugin et par hôte
+        self.timings = TimingRecorder.get_instance()
+
+        # Profils des commandes lancées par les plugins (option --profile)
+        self.command_report = CommandReport.get_instance()
+
         logger.debug(f"SSHExecutor initialisé, debugger_mode={self.debugger_mode}")
 
     def _is_debugger_active(self) -> bool:
@@ -175,7 +198,8 @@ class SSHExecutor:
                 message
             )
 
-    async def execute_plugin(self, plugin_widget, folder_name: str, config: dict) -> Tuple[bool, str]:
+    async def execute_plugin(self, plugin_widget, folder_name: str, config: dict,
+                             journal: Optional['PluginJournal'] = None) -> Tuple[bool, str]:
         """
         Exécute un plugin sur les machines distantes via SSH.
 
@@ -183,6 +207,8 @@ class SSHExecutor:
             plugin_widget: Le widget Textual représentant le plugin (peut être None)
             folder_name: Le nom du dossier du plugin
             config: La configuration du plugin
+            journal: Journal d'exécution du plugin: les hôtes déjà traités avec
+                succès sont ignorés, les autres y sont enregistrés (optionnel)
 
         Returns:
             Tuple[bool, str]: (succès, sortie)
@@ -206,7 +232,7 @@ class SSHExecutor:
                 self.log_message(error_msg, "error")
                 return False, error_msg
 
-            logger.info(f"IPs cibles trouvées: {target_ips}")
+            logger.info(f"IPs cibles trouvées: {len(target_ips)} ({', '.join(target_ips.patterns)})")
 
             # Récupérer les paramètres SSH
             ssh_user, ssh_password, ssh_port = self._get_ssh_credentials(ssh_config, plugin_config)
@@ -222,25 +248,71 @@ class SSHExecutor:
             target_ip = getattr(plugin_widget, 'target_ip', None) if plugin_widget else None
             self.log_message(f"Début de l'exécution SSH du plugin {folder_name}", "start", target_ip)
 
-            # Exécuter le plugin sur chaque machine
-            results = []
-            for ip in target_ips:
+            # Empreinte d'idempotence, vérifiée sur chaque machine avant la copie des fichiers
+            plugin_settings = self._load_plugin_settings_for_wrapper({'plugin_name': folder_name})
+            fingerprint = None
+            if fingerprints.is_enabled(plugin_settings, config, self.force):
+                plugin_dir = os.path.join(self._determine_base_dir(), "plugins", folder_name)
+                fingerprint = fingerprints.compute_fingerprint(plugin_dir, config)
+
+            # Prédicat évalué sur chaque machine avant tout transfert
+            preflight_command = build_preflight_command(plugin_settings.get('preflight'), plugin_config)
+
+            # Exécuter le plugin par vagues (canari puis vagues croissantes), au fil de l'itération des IPs
+            policy = RolloutPolicy.from_config(plugin_settings.get('rollout'), config.get('rollout'))
+            logger.debug(f"Politique de déploiement pour {folder_name}: {policy}")
+
+            async def execute_on_host(ip: str) -> Tuple[bool, str]:
+                if journal and journal.is_done(ip):
+                    logger.info(f"Plugin {folder_name} déjà exécuté avec succès sur {ip}, ignoré (reprise)")
+                    self.log_message(f"Déjà exécuté avec succès sur {ip}, ignoré", "info", ip)
+                    return True, f"{ip}: déjà exécuté"
+
                 logger.info(f"Exécution sur {ip}")
                 self.log_message(f"Connexion à {ip}...", "info", ip)
 
-                success, output = await self._execute_on_single_host(
-                    ip, ssh_user, ssh_password, ssh_port, folder_name, config, plugin_widget
+                if journal:
+                    journal.start(ip)
+                try:
+                    success, output = await self._execute_on_single_host(
+                        ip, ssh_user, ssh_password, ssh_port, folder_name, config, plugin_widget,
+                        fingerprint, preflight_command
+                    )
+                except HostUnreachable as e:
+                    if journal:
+                        journal.end(ip, False, f"injoignable: {e}")
+                    raise
+                if journal:
+                    journal.end(ip, success, output)
+                return success, output
+
+            def on_wave(wave_number: int, hosts: List[str]) -> None:
+                if policy.canary or policy.batch > 1:
+                    self.log_message(f"Vague {wave_number}: {len(hosts)} machine(s) ({', '.join(hosts)})", "info", target_ip)
+
+            waves = WaveScheduler(policy)
+            results = await waves.run(target_ips, execute_on_host, on_wave)
+
+            if waves.aborted:
+                abort_msg = f"Déploiement de {folder_name} interrompu: {waves.abort_reason}, machines restantes non traitées"
+                self.log_message(abort_msg, "error", target_ip)
+
+            if waves.unreachable:
+                self.log_message(
+                    f"{len(waves.unreachable)} machine(s) injoignable(s), plugin non exécuté: "
+                    f"{', '.join(waves.unreachable)}", "warning", target_ip
                 )
-                results.append((ip, success, output))
 
             # Consolider les résultats
-            all_success = all(success for _, success, _ in results)
+            all_success = all(success for _, success, _ in results) and not waves.aborted
 
             # Générer un résumé des exécutions
-            self._log_execution_summary(results, folder_name, all_success)
+            self._log_execution_summary(results, folder_name, all_success, waves.unreachable)
 
             # Retourner le résultat global
             all_outputs = [output for _, _, output in results]
+            if waves.aborted:
+                all_outputs.append(abort_msg)
             if all_success:
                 self.log_message(f"Plugin {folder_name} exécuté avec succès sur toutes les machines", "success", target_ip)
                 return True, "\n".join(all_outputs)
@@ -262,34 +334,29 @@ class SSHExecutor:
             )
             return False, error_msg
 
-    def _get_target_ips(self, plugin_config: Dict, config: Dict) -> List[str]:
+    def _get_target_ips(self, plugin_config: Dict, config: Dict) -> 'IPRangeSet':
         """
         Récupère les adresses IP cibles depuis la configuration.
 
+        Les motifs (jokers, plages, CIDR) ne sont pas développés: l'ensemble
+        retourné s'itère paresseusement, exceptions (ssh_exception_ips) déjà appliquées.
+
         Args:
             plugin_config: Configuration du plugin
             config: Configuration complète
 
         Returns:
-            List[str]: Liste des adresses IP cibles
+            IPRangeSet: Ensemble des adresses IP cibles
         """
-        target_ips = []
-
-        # Chercher dans la configuration du plugin
-        for key in ['ssh_ips', 'target_ip']:
-            if key in plugin_config:
-                value = plugin_config[key]
-                if isinstance(value, str):
-                    target_ips.extend(ip.strip() for ip in value.split(',') if ip.strip())
-                elif isinstance(value, list):
-                    target_ips.extend(ip.strip() for ip in value if ip.strip())
-
-        # Si pas trouvé, utiliser la fonction d'utilitaire
+        # Chercher dans la configuration du plugin, sinon dans la configuration complète
+        target_ips = get_target_ips(plugin_config)
         if not target_ips:
             target_ips = get_target_ips(config)
 
-        # Filtrer les IPs vides ou None
-        return [ip for ip in target_ips if ip and ip.strip()]
+        for pattern in target_ips.invalid_patterns:
+            logger.warning(f"Motif IP invalide ignoré: {pattern}")
+
+        return target_ips
 
     def _get_ssh_credentials(self, ssh_config: Dict, plugin_config: Dict) -> Tuple[str, str, int]:
         """
@@ -317,7 +384,8 @@ class SSHExecutor:
 
     async def _execute_on_single_host(self, host: str, ssh_user: str, ssh_password: str,
                                     ssh_port: int, folder_name: str, config: dict,
-                                    plugin_widget) -> Tuple[bool, str]:
+                                    plugin_widget, fingerprint: Optional[str] = None,
+                                    preflight_command: Optional[str] = None) -> Tuple[bool, str]:
         """
         Exécute le plugin sur un hôte spécifique.
 
@@ -329,6 +397,8 @@ class SSHExecutor:
             folder_name: Nom du dossier du plugin
             config: Configuration du plugin
             plugin_widget: Widget du plugin
+            fingerprint: Empreinte d'idempotence (None: toujours exécuter)
+            preflight_command: Commande de pré-vérification (None: aucune)
 
         Returns:
             Tuple[bool, str]: (succès, sortie)
@@ -336,6 +406,7 @@ class SSHExecutor:
         ssh_client = None
         sftp_client = None
         temp_dir = None
+        label = plugin_label(folder_name, config)
 
         try:
             # Créer la connexion SSH
@@ -343,41 +414,94 @@ class SSHExecutor:
             ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
             # Connexion avec timeout
-            await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: ssh_client.connect(
-                    host,
-                    port=ssh_port,
-                    username=ssh_user,
-                    password=ssh_password,
-                    timeout=30
-                )
-            )
+            with self.timings.span(label, host, 'connect'):
+                try:
+                    await asyncio.get_event_loop().run_in_executor(
+                        None,
+                        lambda: ssh_client.connect(
+                            host,
+                            port=ssh_port,
+                            username=ssh_user,
+                            password=ssh_password,
+                            timeout=30
+                        )
+                    )
+                except OSError as e:
+                    # Machine éteinte ou hors réseau (délai dépassé, connexion refusée...):
+                    # compté à part par l'ordonnanceur, pas comme un échec du plugin.
+                    # Les erreurs d'authentification (SSHException) restent des échecs.
+                    self.log_message(f"Machine {host} injoignable: {e}", "warning", host)
+                    raise HostUnreachable(str(e) or type(e).__name__) from e
 
             self.log_message(f"Connexion SSH établie avec {host}", "info", host)
 
-            # Créer le répertoire temporaire
-            temp_dir = f"/tmp/{TEMP_DIR_PREFIX}{int(time.time())}"
-            await self._create_remote_directory(ssh_client, temp_dir)
+            # Machine concernée par le plugin ? (une seule commande, avant tout transfert)
+            if preflight_command:
+                with self.timings.span(label, host, 'preflight'):
+                    exit_status = await self._run_preflight(ssh_client, preflight_command)
+                if exit_status == NOT_CONCERNED:
+                    message = f"{host}: ordinateur non concerné par {folder_name}, ignoré"
+                    logger.info(message)
+                    self.log_message(message, "info", host)
+                    return True, message
 
             # Ouvrir la session SFTP
-            sftp_client = await asyncio.get_event_loop().run_in_executor(
-                None, ssh_client.open_sftp
-            )
-
-            # Copier les fichiers du plugin
-            await self._copy_plugin_files(sftp_client, folder_name, temp_dir, config)
+            with self.timings.span(label, host, 'sftp'):
+                sftp_client = await asyncio.get_event_loop().run_in_executor(
+                    None, ssh_client.open_sftp
+                )
 
-            # Créer et copier le script wrapper
-            await self._setup_ssh_wrapper(sftp_client, temp_dir, config)
+            # Plugin déjà appliqué à l'identique sur cette machine ?
+            remote_state = {}
+            if fingerprint:
+                with self.timings.span(label, host, 'state'):
+                    remote_state = await self._read_remote_state(sftp_client, folder_name)
+                if fingerprints.is_applied(remote_state, fingerprint, fingerprints.instance_key(config)):
+                    message = f"Plugin {folder_name} déjà appliqué sur {host} avec cette configuration, ignoré"
+                    logger.info(message)
+                    self.log_message(message, "info", host)
+                    return True, message
+
+            # Profil de la machine transmis aux utilitaires du plugin (une commande, sans copie)
+            host_config = dict(config)
+            with self.timings.span(label, host, 'facts'):
+                facts = await self._get_host_facts(ssh_client, host)
+            if facts:
+                host_config['host_facts'] = facts
+            if self.profile:
+                host_config[PROFILE_CONFIG_KEY] = True
+
+            # Créer le répertoire temporaire, propre à cette exécution: plusieurs
+            # plugins peuvent être exécutés en même temps sur la même machine
+            with self.timings.span(label, host, 'mkdir'):
+                temp_dir = await self._create_remote_directory(ssh_client)
+
+            with self.timings.span(label, host, 'upload'):
+                # Copier les fichiers du plugin
+                await self._copy_plugin_files(sftp_client, folder_name, temp_dir, host_config)
+
+                # Créer et copier le script wrapper
+                await self._setup_ssh_wrapper(sftp_client, temp_dir, config)
 
             # Exécuter le plugin via le wrapper
-            success, output = await self._execute_plugin_on_host(
-                ssh_client, temp_dir, plugin_widget, host
-            )
+            with self.timings.span(label, host, 'run'):
+                success, output = await self._execute_plugin_on_host(
+                    ssh_client, temp_dir, plugin_widget, host, label
+                )
+
+            # Le plugin a pu modifier la machine: revalider son profil avant réutilisation
+            self.facts_cache.mark_changed(host)
+
+            if fingerprint:
+                with self.timings.span(label, host, 'state'):
+                    await self._write_remote_state(ssh_client, sftp_client, folder_name,
+                                                   fingerprints.instance_key(config), fingerprint, success)
 
             return success, output
 
+        except HostUnreachable:
+            raise
+
         except Exception as e:
             error_msg = f"Erreur lors de l'exécution sur {host}: {str(e)}"
             logger.error(error_msg)
@@ -405,22 +529,25 @@ class SSHExecutor:
             except Exception as e:
                 logger.warning(f"Erreur lors de la fermeture des connexions: {e}")
 
-    async def _create_remote_directory(self, ssh_client: paramiko.SSHClient, temp_dir: str):
+    async def _create_remote_directory(self, ssh_client: paramiko.SSHClient) -> str:
         """
-        Crée le répertoire temporaire sur la machine distante.
+        Crée un répertoire temporaire unique sur la machine distante (mktemp -d).
 
         Args:
             ssh_client: Client SSH
-            temp_dir: Chemin du répertoire temporaire
+
+        Returns:
+            str: Chemin du répertoire créé
         """
+        template = f"/tmp/{TEMP_DIR_PREFIX}{int(time.time())}_XXXXXXXX"
         stdin, stdout, stderr = await asyncio.get_event_loop().run_in_executor(
             None,
-            lambda: ssh_client.exec_command(f"mkdir -p {temp_dir}")
+            lambda: ssh_client.exec_command(f"mktemp -d {template}")
         )
 
         exit_status = await asyncio.get_event_loop().run_in_executor(
             None,
-            lambda: stderr.channel.recv_exit_status()
+            lambda: stdout.channel.recv_exit_status()
         )
 
         if exit_status != 0:
@@ -430,6 +557,136 @@ class SSHExecutor:
             )
             raise Exception(f"Erreur lors de la création du répertoire temporaire: {error_msg}")
 
+        temp_dir = await asyncio.get_event_loop().run_in_executor(
+            None,
+            lambda: stdout.read().decode().strip()
+        )
+        if not temp_dir.startswith(f"/tmp/{TEMP_DIR_PREFIX}"):
+            raise Exception(f"Répertoire temporaire inattendu: {temp_dir!r}")
+        return temp_dir
+
+    async def _run_preflight(self, ssh_client: paramiko.SSHClient, command: str) -> Optional[int]:
+        """
+        Évalue le prédicat de pré-vérification d'un plugin sur la machine distante.
+
+        Args:
+            ssh_client: Client SSH
+            command: Commande de pré-vérification
+
+        Returns:
+            Optional[int]: Code de retour de la commande, ou None en cas d'erreur
+        """
+        def run():
+            stdin, stdout, stderr = ssh_client.exec_command(command, timeout=30)
+            return stdout.channel.recv_exit_status()
+
+        try:
+            exit_status = await asyncio.get_event_loop().run_in_executor(None, run)
+            logger.debug(f"Pré-vérification terminée avec le code {exit_status}")
+            return exit_status
+        except Exception as e:
+            logger.warning(f"Pré-vérification impossible, le plugin sera exécuté: {e}")
+            return None
+
+    async def _get_host_facts(self, ssh_client: paramiko.SSHClient, host: str) -> Optional[Dict]:
+        """
+        Récupère le profil de la machine distante, depuis le cache si possible.
+
+        Le script de collecte est envoyé sur l'entrée standard de python3:
+        aucun fichier n'est copié.
+
+        Args:
+            ssh_client: Client SSH
+            host: Adresse de la machine
+
+        Returns:
+            Optional[Dict]: Profil, ou None s'il n'a pas pu être collecté
+        """
+        facts = self.facts_cache.get(host)
+        if facts is not None:
+            logger.debug(f"Profil de {host} issu du cache")
+            return facts
+
+        script = self.facts_cache.script_source(self._determine_base_dir())
+        if script is None:
+            return None
+
+        def collect():
+            stdin, stdout, stderr = ssh_client.exec_command(self.facts_cache.remote_command(), timeout=60)
+            stdin.write(script)
+            stdin.channel.shutdown_write()
+            output = stdout.read().decode('utf-8', errors='replace')
+            return stdout.channel.recv_exit_status(), output
+
+        try:
+            exit_status, output = await asyncio.get_event_loop().run_in_executor(None, collect)
+        except Exception as e:
+            logger.warning(f"Impossible de collecter le profil de {host}: {e}")
+            return None
+
+        facts = parse_facts(output) if exit_status == 0 else None
+        if facts is None:
+            logger.warning(f"Profil de {host} invalide (code {exit_status}), les plugins sonderont la machine")
+            return None
+
+        self.facts_cache.put(host, facts)
+        logger.debug(f"Profil de {host} collecté")
+        return facts
+
+    async def _read_remote_state(self, sftp_client, folder_name: str) -> Dict:
+        """
+        Lit le fichier d'état d'idempotence d'un plugin sur la machine distante.
+
+        Args:
+            sftp_client: Client SFTP
+            folder_name: Nom du dossier du plugin
+
+        Returns:
+            Dict: Empreintes enregistrées (vide si aucune)
+        """
+        def read():
+            try:
+                with sftp_client.open(fingerprints.state_file(folder_name), 'r') as f:
+                    return f.read().decode('utf-8')
+            except IOError:
+                return None
+
+        content = await asyncio.get_event_loop().run_in_executor(None, read)
+        return fingerprints.parse_state(content)
+
+    async def _write_remote_state(self, ssh_client: paramiko.SSHClient, sftp_client, folder_name: str,
+                                  instance: str, fingerprint: str, success: bool):
+        """
+        Enregistre le résultat d'une exécution dans le fichier d'état distant.
+
+        L'état est relu juste avant l'écriture: d'autres instances du plugin
+        ont pu s'exécuter sur la machine entre-temps.
+
+        Args:
+            ssh_client: Client SSH
+            sftp_client: Client SFTP
+            folder_name: Nom du dossier du plugin
+            instance: Clé de l'instance du plugin
+            fingerprint: Empreinte de l'exécution
+            success: Résultat de l'exécution
+        """
+        path = fingerprints.state_file(folder_name)
+        state = await self._read_remote_state(sftp_client, folder_name)
+        content = fingerprints.dump_state(state, fingerprint, success, instance)
+
+        def write():
+            stdin, stdout, stderr = ssh_client.exec_command(f"mkdir -p {fingerprints.STATE_DIR}")
+            stdout.channel.recv_exit_status()
+            tmp_path = f"{path}.tmp"
+            with sftp_client.open(tmp_path, 'w') as f:
+                f.write(content)
+            sftp_client.posix_rename(tmp_path, path)
+
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, write)
+        except Exception as e:
+            logger.error(f"Impossible d'enregistrer l'empreinte de {folder_name} sur la machine distante: {e}")
+
     async def _copy_plugin_files(self, sftp_client, folder_name: str, temp_dir: str, config: dict):
         """
         Copie les fichiers du plugin vers le répertoire temporaire distant.
@@ -597,7 +854,8 @@ class SSHExecutor:
 
 
     async def _execute_plugin_on_host(self, ssh_client: paramiko.SSHClient, temp_dir: str,
-                                    plugin_widget, target_ip: str) -> Tuple[bool, str]:
+                                    plugin_widget, target_ip: str,
+                                    label: Optional[str] = None) -> Tuple[bool, str]:
         """
         Exécute le plugin sur l'hôte via le wrapper SSH.
 
@@ -606,6 +864,7 @@ class SSHExecutor:
             temp_dir: Répertoire temporaire
             plugin_widget: Widget du plugin
             target_ip: Adresse IP cible
+            label: Libellé du plugin pour les mesures de durée (optionnel)
 
         Returns:
             Tuple[bool, str]: (succès, sortie)
@@ -619,7 +878,7 @@ class SSHExecutor:
 
         # Lire les sorties en temps réel
         collected_output, collected_errors = await self._read_ssh_output(
-            stdout, stderr, plugin_widget, target_ip
+            stdout, stderr, plugin_widget, target_ip, label
         )
 
         # Attendre la fin de l'exécution
@@ -635,21 +894,29 @@ class SSHExecutor:
         output_text = "\n".join(collected_output)
         return True, output_text
 
-    async def _read_ssh_output(self, stdout, stderr, plugin_widget, target_ip: str):
+    async def _read_ssh_output(self, stdout, stderr, plugin_widget, target_ip: str,
+                               label: Optional[str] = None):
         """
         Lit et traite les sorties SSH en temps réel.
 
+        Les durées mesurées par le wrapper sur la machine distante, et le
+        temps passé à traiter les logs, sont enregistrés pour le plugin; les
+        profils de commandes sont transmis au rapport des commandes.
+
         Args:
             stdout: Flux stdout SSH
             stderr: Flux stderr SSH
             plugin_widget: Widget du plugin
             target_ip: Adresse IP cible
+            label: Libellé du plugin pour les mesures de durée (optionnel)
 
         Returns:
             Tuple[List[str], List[str]]: (lignes_stdout, lignes_stderr)
         """
         collected_output = []
         collected_errors = []
+        streaming_start = time.perf_counter()
+        streaming_time = [0.0]
 
         # Fonction pour lire un flux de manière asynchrone
         async def read_stream(stream, is_stderr=False):
@@ -665,6 +932,14 @@ class SSHExecutor:
 
                 logger.debug(f"Ligne reçue de {target_ip}: {line_text}")
 
+                if REMOTE_TIMING_KEY in line_text and self._record_remote_timing(label, target_ip, line_text):
+                    continue
+
+                # Profil d'une commande du plugin: agrégé dans le rapport, pas affiché
+                if self.command_report.add_line(label, target_ip, line_text):
+                    continue
+
+                line_start = time.perf_counter()
                 try:
                     # Traiter via LoggerUtils si disponible
                     if hasattr(LoggerUtils, 'process_output_line') and self.app:
@@ -691,6 +966,8 @@ class SSHExecutor:
                             "error" if is_stderr else "info",
                             target_ip=target_ip
                         )
+                finally:
+                    streaming_time[0] += time.perf_counter() - line_start
 
         # Créer des tâches pour lire les flux stdout et stderr
         stdout_task = asyncio.create_task(read_stream(stdout))
@@ -699,8 +976,45 @@ class SSHExecutor:
         # Attendre que les tâches soient terminées
         await asyncio.gather(stdout_task, stderr_task, return_exceptions=True)
 
+        if label:
+            # Temps cumulé de traitement des logs, placé au début de l'exécution
+            self.timings.record(label, target_ip, 'logs', streaming_start, streaming_time[0])
+
         return collected_output, collected_errors
 
+    def _record_remote_timing(self, label: Optional[str], host: str, line_text: str) -> bool:
+        """
+        Enregistre les durées mesurées par le wrapper sur la machine distante.
+
+        Les phases distantes (wrapper, sudo ou démarrage, plugin) se suivent et
+        se terminent à la réception de la ligne.
+
+        Args:
+            label: Libellé du plugin
+            host: Adresse IP de l'hôte
+            line_text: Ligne reçue
+
+        Returns:
+            bool: True si la ligne contenait les durées (à ne pas afficher)
+        """
+        try:
+            data = json.loads(line_text).get(REMOTE_TIMING_KEY)
+        except (ValueError, AttributeError):
+            return False
+        if not isinstance(data, dict):
+            return False
+
+        if label:
+            phases = [('wrapper', data.get('wrapper', 0)),
+                      ('sudo' if data.get('sudo') else 'startup', data.get('startup', 0)),
+                      ('plugin', data.get('plugin', 0))]
+            end = time.perf_counter()
+            for phase, duration in reversed(phases):
+                duration = float(duration or 0)
+                self.timings.record(label, host, phase, end - duration, duration)
+                end -= duration
+        return True
+
     def _determine_base_dir(self) -> str:
         """
         Détermine le répertoire de base de l'application.
@@ -783,7 +1097,8 @@ class SSHExecutor:
             logger.error(f"Erreur lors du chargement des paramètres pour le wrapper: {e}")
             return {}
 
-    def _log_execution_summary(self, results: List[Tuple[str, bool, str]], plugin_name: str, all_success: bool):
+    def _log_execution_summary(self, results: List[Tuple[str, bool, str]], plugin_name: str, all_success: bool,
+                               unreachable: Optional[List[str]] = None):
         """
         Affiche un résumé des exécutions.
 
@@ -791,12 +1106,15 @@ class SSHExecutor:
             results: Liste des résultats (ip, succès, sortie)
             plugin_name: Nom du plugin
             all_success: True si toutes les exécutions ont réussi
+            unreachable: Machines qui n'ont pas pu être jointes (optionnel)
         """
         try:
+            unreachable_hosts = set(unreachable or [])
+
             # Générer un résumé des exécutions par IP
             summary_lines = []
             for ip, success, _ in results:
-                status = "Succès" if success else "Échec"
+                status = "Succès" if success else ("Injoignable" if ip in unreachable_hosts else "Échec")
                 summary_lines.append(f"{ip}: {plugin_name} - {status}")
 
             # Ajouter une ligne de résumé global
@@ -805,6 +1123,8 @@ class SSHExecutor:
             else:
                 success_count = sum(1 for _, success, _ in results if success)
                 summary_message = f"Exécution terminée avec {success_count}/{len(results)} succès"
+                if unreachable_hosts:
+                    summary_message += f", {len(unreachable_hosts)} machine(s) injoignable(s)"
 
             # Ajouter le résumé au journal
             if self.app and hasattr(LoggerUtils, 'add_log'):
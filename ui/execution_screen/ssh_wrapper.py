@@ -17,6 +17,9 @@ import select
 import time
 from datetime import datetime
 
+# Début du wrapper, pour les mesures de durée transmises à l'exécuteur SSH
+WRAPPER_START = time.monotonic()
+TIMING_KEY = 'pcutils_timing'
 
 # Ajouter le répertoire parent au chemin de recherche pour trouver les modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -127,6 +130,25 @@ def emit_json_log(level, message):
     }
     print(json.dumps(log_entry), flush=True)
 
+def emit_timing(needs_sudo, spawn_time, first_output_time, end_time):
+    """
+    Transmet à l'exécuteur SSH la durée des phases mesurées sur la machine.
+
+    Args:
+        needs_sudo: True si la commande a été lancée avec sudo
+        spawn_time: Lancement de la commande (time.monotonic())
+        first_output_time: Première ligne de sortie standard (None si aucune)
+        end_time: Fin de la commande
+    """
+    if first_output_time is None:
+        first_output_time = end_time
+    print(json.dumps({TIMING_KEY: {
+        'wrapper': round(spawn_time - WRAPPER_START, 6),
+        'startup': round(first_output_time - spawn_time, 6),
+        'plugin': round(end_time - first_output_time, 6),
+        'sudo': bool(needs_sudo),
+    }}), flush=True)
+
 def run_command_realtime(cmd, needs_sudo=False, root_password=None):
     """
     Exécute une commande avec ou sans sudo en affichant la sortie en temps réel.
@@ -155,6 +177,8 @@ def run_command_realtime(cmd, needs_sudo=False, root_password=None):
         emit_json_log("debug", f"Exécution de la commande: {' '.join(sudo_cmd)}")
 
         # Créer le processus avec des pipes séparés
+        spawn_time = time.monotonic()
+        first_output = []
         process = subprocess.Popen(
             sudo_cmd,
             stdin=subprocess.PIPE if needs_sudo and root_password else None,
@@ -194,6 +218,8 @@ def run_command_realtime(cmd, needs_sudo=False, root_password=None):
                     if not line:
                         continue
 
+                    if not is_stderr and not first_output:
+                        first_output.append(time.monotonic())
                     lines_collected.append(line)
 
                     # Afficher immédiatement la ligne
@@ -250,6 +276,7 @@ def run_command_realtime(cmd, needs_sudo=False, root_password=None):
 
         # Attendre la fin du processus
         return_code = process.wait()
+        emit_timing(needs_sudo, spawn_time, first_output[0] if first_output else None, time.monotonic())
 
         # Attendre que les threads de lecture terminent
         stdout_thread.join(timeout=5.0)
@@ -0,0 +1,242 @@
+"""
+Mesure de la durée des phases d'exécution des plugins.
+
+Les exécuteurs enregistrent une mesure par (plugin, hôte, phase): connexion
+SSH, pré-vérification, profil de la machine, création du répertoire, copie
+des fichiers, démarrage du wrapper, sudo, exécution du plugin, traitement
+des logs... Les mesures sont résumées à la fin de l'exécution et exportées
+au format Chrome Trace (chrome://tracing, https://ui.perfetto.dev).
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..utils.logging import get_logger
+
+logger = get_logger('timing')
+
+# Phases englobant d'autres phases (wrapper, sudo, plugin, logs...): elles ne
+# sont pas retenues comme phase dominante
+CONTAINER_PHASES = {'run'}
+
+class Span:
+    """
+    Durée d'une phase de l'exécution d'un plugin sur un hôte.
+    """
+
+    __slots__ = ('plugin', 'host', 'phase', 'start', 'duration')
+
+    def __init__(self, plugin: str, host: str, phase: str, start: float, duration: float):
+        """
+        Initialise la mesure.
+
+        Args:
+            plugin: Plugin mesuré
+            host: Hôte (LOCAL_HOST pour une exécution locale)
+            phase: Nom de la phase
+            start: Début de la phase (time.perf_counter())
+            duration: Durée en secondes
+        """
+        self.plugin = plugin
+        self.host = host
+        self.phase = phase
+        self.start = start
+        self.duration = duration
+
+def plugin_label(folder_name: str, config: Dict[str, Any]) -> str:
+    """
+    Nom sous lequel les mesures d'un plugin sont regroupées.
+
+    Args:
+        folder_name: Dossier du plugin
+        config: Configuration du plugin (instance_id distingue les instances)
+
+    Returns:
+        str: Libellé du plugin
+    """
+    instance_id = config.get('instance_id') if isinstance(config, dict) else None
+    return f"{folder_name}_{instance_id}" if instance_id is not None else folder_name
+
+class TimingRecorder:
+    """
+    Mesures de l'exécution en cours, partagées par tous les exécuteurs.
+    """
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls) -> 'TimingRecorder':
+        """Récupère l'instance unique de l'enregistreur."""
+        if cls._instance is None:
+            cls._instance = TimingRecorder()
+        return cls._instance
+
+    def __init__(self):
+        """Initialise l'enregistreur."""
+        self._spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._wall_origin = time.time()
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Efface les mesures (début d'une nouvelle exécution)."""
+        with self._lock:
+            self._spans = []
+            self._origin = time.perf_counter()
+            self._wall_origin = time.time()
+
+    def record(self, plugin: str, host: str, phase: str, start: float, duration: float) -> None:
+        """
+        Enregistre une mesure.
+
+        Args:
+            plugin: Plugin mesuré
+            host: Hôte
+            phase: Nom de la phase
+            start: Début de la phase (time.perf_counter())
+            duration: Durée en secondes
+        """
+        with self._lock:
+            self._spans.append(Span(plugin, host, phase, start, max(0.0, duration)))
+
+    @contextmanager
+    def span(self, plugin: str, host: str, phase: str) -> Iterator[None]:
+        """
+        Mesure la durée du bloc (utilisable autour de code asynchrone).
+
+        Args:
+            plugin: Plugin mesuré
+            host: Hôte
+            phase: Nom de la phase
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(plugin, host, phase, start, time.perf_counter() - start)
+
+    def spans(self, plugin: Optional[str] = None) -> List[Span]:
+        """
+        Retourne les mesures enregistrées.
+
+        Args:
+            plugin: Ne retourner que celles de ce plugin (optionnel)
+
+        Returns:
+            List[Span]: Mesures, dans l'ordre d'enregistrement
+        """
+        with self._lock:
+            return [span for span in self._spans if plugin is None or span.plugin == plugin]
+
+    def plugins(self) -> List[str]:
+        """Liste les plugins mesurés, dans l'ordre de leur première mesure."""
+        seen: Dict[str, None] = {}
+        for span in self.spans():
+            seen.setdefault(span.plugin, None)
+        return list(seen)
+
+    def phase_totals(self, plugin: str) -> Dict[str, Tuple[float, float, str]]:
+        """
+        Agrège les mesures d'un plugin par phase.
+
+        Args:
+            plugin: Plugin mesuré
+
+        Returns:
+            Dict[str, Tuple[float, float, str]]: {phase: (durée cumulée, durée
+                maximale, hôte de la durée maximale)}
+        """
+        totals: Dict[str, Tuple[float, float, str]] = {}
+        for span in self.spans(plugin):
+            total, longest, host = totals.get(span.phase, (0.0, -1.0, ''))
+            if span.duration > longest:
+                longest, host = span.duration, span.host
+            totals[span.phase] = (total + span.duration, longest, host)
+        return totals
+
+    def summary_lines(self) -> List[str]:
+        """
+        Résume les mesures: une ligne par plugin, phases par durée décroissante.
+
+        Returns:
+            List[str]: Lignes du résumé
+        """
+        lines = []
+        for plugin in self.plugins():
+            totals = self.phase_totals(plugin)
+            hosts = {span.host for span in self.spans(plugin)}
+            phases = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+            details = ", ".join(f"{phase} {total:.1f}s" for phase, (total, _, _) in phases)
+            dominant, (_, longest, host) = next(
+                (item for item in phases if item[0] not in CONTAINER_PHASES), phases[0])
+            line = f"Durées {plugin}: {details}"
+            if len(hosts) > 1:
+                line += f" — {dominant} le plus long sur {host} ({longest:.1f}s)"
+            lines.append(line)
+        return lines
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Convertit les mesures au format Chrome Trace.
+
+        Chaque plugin est un processus, chaque hôte un fil d'exécution.
+
+        Returns:
+            Dict[str, Any]: Document JSON {traceEvents: [...]}
+        """
+        events: List[Dict[str, Any]] = []
+        pids: Dict[str, int] = {}
+        tids: Dict[Tuple[str, str], int] = {}
+
+        for span in self.spans():
+            if span.plugin not in pids:
+                pids[span.plugin] = len(pids) + 1
+                events.append({'name': 'process_name', 'ph': 'M', 'pid': pids[span.plugin],
+                               'args': {'name': span.plugin}})
+            pid = pids[span.plugin]
+            if (span.plugin, span.host) not in tids:
+                tids[(span.plugin, span.host)] = len(tids) + 1
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid,
+                               'tid': tids[(span.plugin, span.host)], 'args': {'name': span.host}})
+            events.append({
+                'name': span.phase,
+                'cat': span.plugin,
+                'ph': 'X',
+                'ts': round((span.start - self._origin) * 1e6),
+                'dur': round(span.duration * 1e6),
+                'pid': pid,
+                'tid': tids[(span.plugin, span.host)],
+                'args': {'host': span.host},
+            })
+
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'start_time': self._wall_origin},
+        }
+
+    def export_chrome_trace(self, path: str) -> Optional[str]:
+        """
+        Écrit les mesures au format Chrome Trace.
+
+        Args:
+            path: Chemin du fichier à écrire
+
+        Returns:
+            Optional[str]: Chemin écrit, ou None en cas d'erreur ou sans mesure
+        """
+        if not self.spans():
+            return None
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.chrome_trace(), f)
+            logger.info(f"Trace d'exécution exportée: {path}")
+            return path
+        except OSError as e:
+            logger.error(f"Impossible d'exporter la trace d'exécution {path}: {e}")
+            return None
@@ -0,0 +1,215 @@
+"""
+Déploiement progressif d'un plugin sur plusieurs hôtes SSH.
+
+Les hôtes sont traités par vagues: une vague canari de quelques hôtes,
+puis des vagues de taille croissante exécutées en parallèle. Après chaque
+vague, le taux d'échec cumulé est comparé au seuil d'abandon: au-delà, les
+hôtes restants ne sont pas traités.
+
+Un hôte injoignable (éteint, hors réseau) n'a pas exécuté le plugin: il est
+compté à part (HostUnreachable) et n'entre ni dans la vérification du
+canari ni dans le taux d'échec.
+
+La politique est lue dans la clé rollout du settings.yml du plugin, et
+peut être surchargée par la clé rollout de la séquence:
+
+    rollout:
+      canary: 1               # Hôtes de la première vague (0: pas de canari)
+      batch: 2                # Taille de la vague suivant le canari
+      growth: 2               # Facteur d'augmentation de la taille des vagues
+      max_batch: 16           # Taille maximale d'une vague
+      max_failure_rate: 0.2   # Taux d'échec cumulé au-delà duquel on abandonne
+
+Sans politique, les hôtes sont traités un par un sans abandon, comme
+auparavant.
+"""
+
+import asyncio
+import itertools
+import traceback
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.logging import get_logger
+
+logger = get_logger('wave_scheduler')
+
+HostResult = Tuple[str, bool, str]  # (hôte, succès, sortie)
+
+class HostUnreachable(Exception):
+    """
+    Levée par la coroutine d'exécution quand l'hôte n'a pas pu être joint.
+    """
+
+class RolloutPolicy:
+    """
+    Paramètres d'un déploiement par vagues.
+    """
+
+    def __init__(self, canary: int = 0, batch: int = 1, growth: float = 1,
+                 max_batch: Optional[int] = None, max_failure_rate: Optional[float] = None):
+        """
+        Initialise la politique.
+
+        Args:
+            canary: Nombre d'hôtes de la vague canari (0 pour aucune)
+            batch: Taille de la première vague après le canari
+            growth: Facteur multiplicatif appliqué à la taille des vagues
+            max_batch: Taille maximale d'une vague (None: pas de limite)
+            max_failure_rate: Taux d'échec cumulé (0-1) provoquant l'abandon
+                (None: jamais d'abandon)
+        """
+        self.canary = max(0, int(canary))
+        self.batch = max(1, int(batch))
+        self.growth = max(1.0, float(growth))
+        self.max_batch = max(1, int(max_batch)) if max_batch else None
+        self.max_failure_rate = float(max_failure_rate) if max_failure_rate is not None else None
+
+    @classmethod
+    def from_config(cls, *sources: Optional[Dict[str, Any]]) -> 'RolloutPolicy':
+        """
+        Construit une politique à partir de déclarations rollout.
+
+        Les sources suivantes surchargent les précédentes, clé par clé.
+
+        Args:
+            *sources: Dictionnaires rollout (settings.yml, séquence...), None ignorés
+
+        Returns:
+            RolloutPolicy: Politique résultante (par défaut: un hôte à la fois)
+        """
+        values: Dict[str, Any] = {}
+        for source in sources:
+            if isinstance(source, dict):
+                values.update(source)
+
+        try:
+            return cls(
+                canary=values.get('canary', 0),
+                batch=values.get('batch', 1),
+                growth=values.get('growth', 1),
+                max_batch=values.get('max_batch'),
+                max_failure_rate=values.get('max_failure_rate')
+            )
+        except (TypeError, ValueError) as e:
+            logger.error(f"Politique de déploiement invalide {values}: {e}, traitement hôte par hôte")
+            return cls()
+
+    def wave_sizes(self) -> Iterator[int]:
+        """
+        Génère la taille des vagues successives.
+
+        Returns:
+            Iterator[int]: Tailles des vagues (générateur infini)
+        """
+        if self.canary:
+            yield self.canary
+        size = float(self.batch)
+        while True:
+            current = int(size)
+            if self.max_batch:
+                current = min(current, self.max_batch)
+            yield max(1, current)
+            size *= self.growth
+
+    def __repr__(self) -> str:
+        return (f"RolloutPolicy(canary={self.canary}, batch={self.batch}, growth={self.growth}, "
+                f"max_batch={self.max_batch}, max_failure_rate={self.max_failure_rate})")
+
+class WaveScheduler:
+    """
+    Exécute une coroutine par hôte, vague après vague.
+    """
+
+    def __init__(self, policy: RolloutPolicy):
+        """
+        Initialise l'ordonnanceur.
+
+        Args:
+            policy: Politique de déploiement
+        """
+        self.policy = policy
+        self.aborted = False
+        self.abort_reason = ''
+        self.unreachable: List[str] = []  # Hôtes injoignables, dans l'ordre de traitement
+
+    def _should_abort(self, results: List[HostResult], is_canary: bool) -> Optional[str]:
+        """
+        Détermine s'il faut abandonner après une vague.
+
+        Seuls les échecs du plugin comptent: les hôtes injoignables sont
+        exclus des échecs comme du nombre d'hôtes traités.
+
+        Args:
+            results: Résultats cumulés
+            is_canary: True si la vague qui vient de se terminer est le canari
+
+        Returns:
+            Optional[str]: Raison de l'abandon, ou None pour continuer
+        """
+        unreachable = set(self.unreachable)
+        reached = [success for host, success, _ in results if host not in unreachable]
+        failures = sum(1 for success in reached if not success)
+        if not failures:
+            return None
+        if is_canary:
+            return f"échec sur {failures} hôte(s) canari"
+        if self.policy.max_failure_rate is not None:
+            rate = failures / len(reached)
+            if rate > self.policy.max_failure_rate:
+                return f"taux d'échec {rate:.0%} supérieur au seuil de {self.policy.max_failure_rate:.0%}"
+        return None
+
+    async def run(self, hosts: Iterable[str],
+                  execute: Callable[[str], Awaitable[Tuple[bool, str]]],
+                  on_wave: Optional[Callable[[int, List[str]], None]] = None) -> List[HostResult]:
+        """
+        Exécute la coroutine sur tous les hôtes, par vagues.
+
+        Les hôtes sont consommés au fur et à mesure: un ensemble paresseux
+        (IPRangeSet) n'est jamais développé entièrement.
+
+        Args:
+            hosts: Hôtes cibles
+            execute: Coroutine exécutant le plugin sur un hôte, retournant (succès, sortie),
+                ou levant HostUnreachable si l'hôte n'a pas pu être joint
+            on_wave: Fonction appelée avec (numéro de vague, hôtes) avant chaque vague
+
+        Returns:
+            List[HostResult]: Résultats des hôtes traités (les hôtes non
+                traités après un abandon n'y figurent pas)
+        """
+        host_iterator = iter(hosts)
+        results: List[HostResult] = []
+
+        for wave_number, size in enumerate(self.policy.wave_sizes(), 1):
+            wave = list(itertools.islice(host_iterator, size))
+            if not wave:
+                break
+
+            if on_wave:
+                on_wave(wave_number, wave)
+            logger.debug(f"Vague {wave_number}: {len(wave)} hôte(s)")
+
+            outcomes = await asyncio.gather(*(execute(host) for host in wave), return_exceptions=True)
+            for host, outcome in zip(wave, outcomes):
+                if isinstance(outcome, HostUnreachable):
+                    logger.warning(f"Hôte {host} injoignable: {outcome}")
+                    self.unreachable.append(host)
+                    results.append((host, False, f"{host}: injoignable ({outcome})"))
+                elif isinstance(outcome, BaseException):
+                    logger.error(f"Erreur lors de l'exécution sur {host}: {outcome}")
+                    logger.error(''.join(traceback.format_exception(type(outcome), outcome, outcome.__traceback__)))
+                    results.append((host, False, f"Erreur lors de l'exécution sur {host}: {outcome}"))
+                else:
+                    success, output = outcome
+                    results.append((host, success, output))
+
+            is_canary = wave_number == 1 and self.policy.canary > 0
+            reason = self._should_abort(results, is_canary)
+            if reason:
+                self.aborted = True
+                self.abort_reason = reason
+                logger.warning(f"Déploiement interrompu après la vague {wave_number}: {reason}")
+                break
+
+        return results
@@ -1,122 +1,351 @@
 """
 Utilitaires pour la gestion des adresses IP, notamment l'expansion des motifs et la gestion des exceptions.
+
+Les motifs sont représentés par des blocs d'octets (produit de quatre plages)
+regroupés dans un IPRangeSet, qui s'itère paresseusement et répond aux tests
+d'appartenance et de cardinalité sans jamais matérialiser les adresses.
 """
 
-import re
 import ipaddress
-from typing import List, Set, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+# Un bloc est le produit cartésien de quatre plages d'octets
+OctetBlock = Tuple[range, range, range, range]
+
+FULL_OCTET = range(0, 256)
+HOST_OCTET = range(1, 255)  # Joker sur le dernier octet: ni réseau ni broadcast
+
+def _parse_octet(part: str, is_last: bool, hosts_only: bool) -> Optional[range]:
+    """
+    Convertit un octet de motif ('*', 'a-b' ou entier) en plage.
+
+    Args:
+        part: Octet du motif
+        is_last: True s'il s'agit du dernier octet
+        hosts_only: Si True, un joker sur le dernier octet exclut 0 et 255
+
+    Returns:
+        Optional[range]: Plage correspondante ou None si invalide
+    """
+    part = part.strip()
+    if part == '*':
+        return HOST_OCTET if (is_last and hosts_only) else FULL_OCTET
+
+    try:
+        if '-' in part:
+            start, end = map(int, part.split('-', 1))
+        else:
+            start = end = int(part)
+    except ValueError:
+        return None
+
+    if not (0 <= start <= end <= 255):
+        return None
+    return range(start, end + 1)
+
+def parse_ip_pattern(pattern: str, hosts_only: bool = True) -> List[OctetBlock]:
+    """
+    Analyse un motif d'adresse IP en blocs d'octets.
+
+    Formats acceptés: IP simple, joker ('192.168.1.*'), plage d'octet
+    ('192.168.1.10-20') et notation CIDR ('10.0.0.0/16').
+
+    Args:
+        pattern: Motif d'adresse IP
+        hosts_only: Si True, exclut les adresses réseau/broadcast des jokers et des CIDR
+
+    Returns:
+        List[OctetBlock]: Blocs couverts par le motif
+
+    Raises:
+        ValueError: Si le motif est invalide
+    """
+    pattern = pattern.strip()
+
+    if '/' in pattern:
+        network = ipaddress.IPv4Network(pattern, strict=False)
+        first = int(network.network_address)
+        last = int(network.broadcast_address)
+        # Un CIDR aligné est toujours un produit de plages d'octets
+        block = tuple(
+            range((first >> shift) & 0xFF, ((last >> shift) & 0xFF) + 1)
+            for shift in (24, 16, 8, 0)
+        )
+        return [block]
+
+    parts = pattern.split('.')
+    if len(parts) != 4:
+        raise ValueError(f"Motif IP invalide: {pattern}")
+
+    octets = []
+    for index, part in enumerate(parts):
+        octet = _parse_octet(part, index == 3, hosts_only)
+        if octet is None:
+            raise ValueError(f"Octet IP invalide dans {pattern}: {part}")
+        octets.append(octet)
+
+    return [tuple(octets)]
+
+def _cidr_edges(pattern: str) -> List[OctetBlock]:
+    """Retourne les adresses réseau et broadcast d'un CIDR sous forme de blocs."""
+    network = ipaddress.IPv4Network(pattern.strip(), strict=False)
+    if network.prefixlen >= 31:
+        return []
+    return [_ip_to_block(int(network.network_address)),
+            _ip_to_block(int(network.broadcast_address))]
+
+def _ip_to_block(value: int) -> OctetBlock:
+    """Convertit une adresse entière en bloc d'une seule adresse."""
+    return tuple(range(o, o + 1) for o in _int_to_octets(value))
+
+def _int_to_octets(value: int) -> Tuple[int, int, int, int]:
+    return ((value >> 24) & 0xFF, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+
+def _block_contains(block: OctetBlock, octets: Tuple[int, int, int, int]) -> bool:
+    return (octets[0] in block[0] and octets[1] in block[1]
+            and octets[2] in block[2] and octets[3] in block[3])
+
+def _covered_size(includes: List[OctetBlock], excludes: List[OctetBlock], dim: int = 0,
+                  memo: Optional[dict] = None) -> int:
+    """
+    Calcule le nombre d'adresses couvertes par l'union des blocs inclus,
+    privée de l'union des blocs exclus.
+
+    Chaque octet est découpé en intervalles élémentaires aux bornes des
+    blocs; sur chaque intervalle, le même ensemble de blocs est actif et
+    le calcul se poursuit sur l'octet suivant. Le coût est polynomial dans
+    le nombre de blocs (au plus (2n)^4 intervalles), contrairement à
+    l'inclusion-exclusion qui double à chaque bloc chevauchant.
+    """
+    if not includes:
+        return 0
+    if memo is None:
+        memo = {}
+    key = (dim, tuple(map(id, includes)), tuple(map(id, excludes)))
+    if key in memo:
+        return memo[key]
+
+    bounds = sorted({r for block in includes + excludes
+                     for r in (block[dim].start, block[dim].stop)})
+    total = 0
+    for lo, hi in zip(bounds, bounds[1:]):
+        active = [b for b in includes if b[dim].start <= lo and hi <= b[dim].stop]
+        if not active:
+            continue
+        blocking = [b for b in excludes if b[dim].start <= lo and hi <= b[dim].stop]
+        if dim == 3:
+            covered = 0 if blocking else 1
+        else:
+            covered = _covered_size(active, blocking, dim + 1, memo)
+        total += (hi - lo) * covered
+
+    memo[key] = total
+    return total
+
+class IPRangeSet:
+    """
+    Ensemble compact d'adresses IPv4 défini par des motifs d'inclusion et d'exclusion.
+
+    L'ensemble n'est jamais matérialisé: l'itération est paresseuse (ordre des
+    motifs, sans doublons), et l'appartenance comme le comptage se calculent
+    directement sur les blocs d'octets.
+    """
+
+    __slots__ = ('_patterns', '_includes', '_excludes', '_invalid', '_size')
+
+    def __init__(self, patterns: Union[str, Iterable[str], None] = None,
+                 exceptions: Union[str, Iterable[str], None] = None):
+        """
+        Initialise l'ensemble.
+
+        Args:
+            patterns: Motifs cibles (chaîne séparée par des virgules ou liste)
+            exceptions: Motifs à exclure (même format)
+        """
+        self._patterns: List[str] = []
+        self._includes: List[OctetBlock] = []
+        self._excludes: List[OctetBlock] = []
+        self._invalid: List[str] = []
+        self._size: Optional[int] = None
+
+        for pattern in split_ip_patterns(patterns):
+            self.add(pattern)
+        for pattern in split_ip_patterns(exceptions):
+            self.exclude(pattern)
+
+    def add(self, pattern: str) -> bool:
+        """
+        Ajoute un motif cible.
+
+        Args:
+            pattern: Motif d'adresse IP
+
+        Returns:
+            bool: True si le motif est valide
+        """
+        try:
+            blocks = parse_ip_pattern(pattern, hosts_only=True)
+            edges = _cidr_edges(pattern) if '/' in pattern else []
+        except ValueError:
+            self._invalid.append(pattern)
+            return False
+
+        self._patterns.append(pattern.strip())
+        self._includes.extend(blocks)
+        self._excludes.extend(edges)
+        self._size = None
+        return True
+
+    def exclude(self, pattern: str) -> bool:
+        """
+        Ajoute un motif d'exclusion (les jokers couvrent tout l'octet).
+
+        Args:
+            pattern: Motif d'adresse IP à exclure
+
+        Returns:
+            bool: True si le motif est valide
+        """
+        try:
+            self._excludes.extend(parse_ip_pattern(pattern, hosts_only=False))
+        except ValueError:
+            self._invalid.append(pattern)
+            return False
+        self._size = None
+        return True
+
+    @property
+    def patterns(self) -> List[str]:
+        """Motifs cibles valides, dans l'ordre d'ajout."""
+        return list(self._patterns)
+
+    @property
+    def invalid_patterns(self) -> List[str]:
+        """Motifs ignorés car invalides."""
+        return list(self._invalid)
+
+    def __contains__(self, ip: object) -> bool:
+        if not isinstance(ip, str):
+            return False
+        try:
+            octets = _int_to_octets(int(ipaddress.IPv4Address(ip.strip())))
+        except ValueError:
+            return False
+        if any(_block_contains(b, octets) for b in self._excludes):
+            return False
+        return any(_block_contains(b, octets) for b in self._includes)
+
+    def __iter__(self) -> Iterator[str]:
+        for index, block in enumerate(self._includes):
+            previous = self._includes[:index]
+            for a in block[0]:
+                for b in block[1]:
+                    for c in block[2]:
+                        for d in block[3]:
+                            octets = (a, b, c, d)
+                            if any(_block_contains(e, octets) for e in self._excludes):
+                                continue
+                            if any(_block_contains(p, octets) for p in previous):
+                                continue
+                            yield f"{a}.{b}.{c}.{d}"
+
+    def __len__(self) -> int:
+        if self._size is None:
+            self._size = _covered_size(self._includes, self._excludes)
+        return self._size
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f"IPRangeSet({','.join(self._patterns)!r}, {len(self)} IPs)"
+
+def split_ip_patterns(value: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Découpe une valeur de configuration (chaîne à virgules ou liste) en motifs.
+
+    Args:
+        value: Valeur brute de configuration
+
+    Returns:
+        List[str]: Motifs non vides
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        items = value.split(',')
+    else:
+        items = []
+        for item in value:
+            if isinstance(item, str):
+                items.extend(item.split(','))
+    return [item.strip() for item in items if item and item.strip()]
 
 def is_ip_match(ip: str, pattern: str) -> bool:
     """
     Vérifie si une adresse IP correspond à un motif.
-    
+
     Args:
         ip: Adresse IP à vérifier
-        pattern: Motif (peut contenir des *)
-        
+        pattern: Motif (peut contenir des *, des plages ou un CIDR)
+
     Returns:
         bool: True si l'IP correspond au motif
     """
-    # Convertir le motif en expression régulière
-    regex_pattern = pattern.replace('.', '\\.').replace('*', '.*')
-    return bool(re.match(f'^{regex_pattern}$', ip))
+    try:
+        octets = _int_to_octets(int(ipaddress.IPv4Address(ip.strip())))
+        blocks = parse_ip_pattern(pattern, hosts_only=False)
+    except ValueError:
+        return False
+    return any(_block_contains(b, octets) for b in blocks)
+
+def iter_ip_pattern(pattern: str) -> Iterator[str]:
+    """
+    Itère paresseusement sur les adresses d'un motif.
+
+    Args:
+        pattern: Motif d'adresse IP
+
+    Returns:
+        Iterator[str]: Adresses IP correspondantes
+    """
+    return iter(IPRangeSet(pattern))
 
 def expand_ip_pattern(pattern: str) -> List[str]:
     """
     Développe un motif d'adresse IP en liste d'adresses concrètes.
-    
+
+    Préférer iter_ip_pattern ou IPRangeSet pour les grandes plages.
+
     Args:
-        pattern: Motif d'adresse IP (peut contenir des *)
-        
+        pattern: Motif d'adresse IP (peut contenir des *, des plages ou un CIDR)
+
     Returns:
         List[str]: Liste des adresses IP correspondantes
     """
-    # Si c'est une IP simple sans wildcard
-    if '*' not in pattern:
-        try:
-            # Vérifier si c'est une IP valide
-            ipaddress.ip_address(pattern)
-            return [pattern]
-        except ValueError:
-            # Si ce n'est pas une IP valide, retourner une liste vide
-            return []
-    
-    # Si c'est un motif avec wildcard
-    parts = pattern.split('.')
-    if len(parts) != 4:
-        return []  # Format invalide
-    
-    # Générer toutes les combinaisons possibles
-    result = []
-    
-    # Déterminer les plages pour chaque octet
-    ranges = []
-    for part in parts:
-        if part == '*':
-            ranges.append(range(0, 256))
-        elif '-' in part:
-            # Gestion des plages comme "1-5"
-            try:
-                start, end = map(int, part.split('-'))
-                ranges.append(range(start, end + 1))
-            except (ValueError, IndexError):
-                return []  # Format invalide
-        else:
-            try:
-                # Octet spécifique
-                ranges.append([int(part)])
-            except ValueError:
-                return []  # Format invalide
-    
-    # Limiter le nombre d'IPs générées pour éviter des explosions combinatoires
-    max_ips = 1000
-    total_combinations = 1
-    for r in ranges:
-        total_combinations *= len(r)
-    
-    if total_combinations > max_ips:
-        # Trop d'IPs à générer, retourner un échantillon représentatif
-        # Par exemple, les 10 premières et les 10 dernières de chaque plage
-        return [f"{ranges[0][0]}.{ranges[1][0]}.{ranges[2][0]}.{ranges[3][0]}",
-                f"{ranges[0][-1]}.{ranges[1][-1]}.{ranges[2][-1]}.{ranges[3][-1]}"]
-    
-    # Générer toutes les combinaisons
-    for a in ranges[0]:
-        for b in ranges[1]:
-            for c in ranges[2]:
-                for d in ranges[3]:
-                    result.append(f"{a}.{b}.{c}.{d}")
-    
-    return result
-
-def get_target_ips(config: dict) -> List[str]:
-    """
-    Récupère la liste des IPs cibles à partir de la configuration.
-    
+    return list(iter_ip_pattern(pattern))
+
+def get_target_ips(config: Union[dict, str, List[str]],
+                   exception_ips: Union[str, List[str], None] = None) -> IPRangeSet:
+    """
+    Récupère l'ensemble des IPs cibles.
+
+    Accepte soit la configuration du plugin (ssh_ips/target_ip et
+    ssh_exception_ips), soit directement les motifs cibles et d'exception.
+
     Args:
-        config (dict): Configuration du plugin
-        
+        config: Configuration du plugin, ou motifs cibles
+        exception_ips: Motifs à exclure (si config contient directement les motifs)
+
     Returns:
-        List[str]: Liste des IPs cibles
-    """
-    target_ips = []
-    
-    # Vérifier d'abord ssh_ips
-    if 'ssh_ips' in config:
-        ip_value = config['ssh_ips']
-        if isinstance(ip_value, str):
-            target_ips = [ip.strip() for ip in ip_value.split(',')]
-        elif isinstance(ip_value, list):
-            target_ips = ip_value
-    # Sinon vérifier target_ip
-    elif 'target_ip' in config:
-        ip_value = config['target_ip']
-        if isinstance(ip_value, str):
-            target_ips = [ip.strip() for ip in ip_value.split(',')]
-        elif isinstance(ip_value, list):
-            target_ips = ip_value
-    
-    # Filtrer les IPs vides et None
-    target_ips = [ip for ip in target_ips if ip and ip.strip()]
-    
-    return target_ips
+        IPRangeSet: Ensemble paresseux des IPs cibles
+    """
+    if not isinstance(config, dict):
+        return IPRangeSet(config, exception_ips)
+
+    # Vérifier d'abord ssh_ips, sinon target_ip
+    patterns = config.get('ssh_ips') or config.get('target_ip')
+    if exception_ips is None:
+        exception_ips = config.get('ssh_exception_ips')
+
+    return IPRangeSet(patterns, exception_ips)
@@ -0,0 +1,163 @@
+"""
+Cache de lecture des fichiers YAML.
+
+Les lectures seules (séquences, templates, modèles, fichiers de contenu)
+n'ont pas besoin du mode aller-retour de ruamel, qui conserve commentaires
+et mise en forme au prix d'un parsing lent. Ce module parse les fichiers
+avec le chargeur 'safe' et conserve le résultat sérialisé avec marshal,
+en mémoire et sur disque, indexé par chemin, date de modification et taille.
+
+Les écritures (save_sequence...) continuent d'utiliser ruamel en mode
+aller-retour.
+"""
+
+import os
+import copy
+import marshal
+import hashlib
+import logging
+import tempfile
+from threading import RLock
+from typing import Any, Dict, Optional, Tuple, Union
+
+from ruamel.yaml import YAML
+
+logger = logging.getLogger('pcUtils.yaml_cache')
+
+# Version du format de cache sur disque (à incrémenter si le format change)
+CACHE_VERSION = 1
+
+CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'pcUtils', 'yaml'
+)
+
+Signature = Tuple[int, int]  # (mtime_ns, taille)
+
+_lock = RLock()
+# {chemin absolu: (signature, données sérialisées ou None, données si non sérialisables)}
+_memory_cache: Dict[str, Tuple[Signature, Optional[bytes], Any]] = {}
+_disk_cache_enabled = True
+
+def _get_signature(path: str) -> Signature:
+    """Retourne la signature (mtime_ns, taille) d'un fichier."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def _get_cache_file(path: str) -> str:
+    """Retourne le fichier de cache sur disque associé à un chemin."""
+    digest = hashlib.md5(path.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.marshal")
+
+def _serialize(data: Any) -> Optional[bytes]:
+    """
+    Sérialise des données avec marshal.
+
+    Returns:
+        Optional[bytes]: Données sérialisées ou None si elles contiennent des
+            types non supportés (dates...)
+    """
+    try:
+        return marshal.dumps(data)
+    except ValueError:
+        return None
+
+def _read_disk_cache(path: str, signature: Signature) -> Optional[bytes]:
+    """Lit les données sérialisées d'un fichier depuis le cache disque, si valides."""
+    if not _disk_cache_enabled:
+        return None
+    try:
+        with open(_get_cache_file(path), 'rb') as f:
+            version, cached_path, cached_signature, blob = marshal.load(f)
+        if version == CACHE_VERSION and cached_path == path and tuple(cached_signature) == signature:
+            return blob
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    return None
+
+def _write_disk_cache(path: str, signature: Signature, blob: bytes) -> None:
+    """Écrit les données sérialisées d'un fichier dans le cache disque (écriture atomique)."""
+    global _disk_cache_enabled
+    if not _disk_cache_enabled:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump((CACHE_VERSION, path, signature, blob), f)
+            os.replace(tmp_path, _get_cache_file(path))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        # Dossier non accessible en écriture: se contenter du cache mémoire
+        logger.debug(f"Cache YAML sur disque désactivé: {e}")
+        _disk_cache_enabled = False
+
+def _parse_file(path: str) -> Any:
+    """Parse un fichier YAML avec le chargeur 'safe' (données Python simples)."""
+    yaml = YAML(typ='safe')
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f)
+
+def load_yaml(path: Union[str, os.PathLike]) -> Any:
+    """
+    Charge un fichier YAML en lecture seule, en passant par le cache.
+
+    Chaque appel retourne une copie indépendante des données: l'appelant
+    peut les modifier sans affecter le cache.
+
+    Args:
+        path: Chemin du fichier YAML
+
+    Returns:
+        Any: Données du fichier (dict, list, valeurs simples)
+
+    Raises:
+        OSError: Si le fichier est introuvable ou illisible
+        YAMLError: Si le contenu n'est pas du YAML valide
+    """
+    path = os.path.abspath(os.fspath(path))
+    signature = _get_signature(path)
+
+    with _lock:
+        entry = _memory_cache.get(path)
+    if entry and entry[0] == signature:
+        blob, data = entry[1], entry[2]
+        return marshal.loads(blob) if blob is not None else copy.deepcopy(data)
+
+    blob = _read_disk_cache(path, signature)
+    if blob is not None:
+        logger.debug(f"YAML chargé depuis le cache disque: {path}")
+        data = None
+    else:
+        data = _parse_file(path)
+        blob = _serialize(data)
+        if blob is not None:
+            _write_disk_cache(path, signature, blob)
+        logger.debug(f"YAML parsé et mis en cache: {path}")
+
+    with _lock:
+        _memory_cache[path] = (signature, blob, data if blob is None else None)
+
+    return marshal.loads(blob) if blob is not None else copy.deepcopy(data)
+
+def invalidate_yaml(path: Optional[Union[str, os.PathLike]] = None) -> None:
+    """
+    Oublie les données mises en cache.
+
+    Args:
+        path: Fichier à oublier (tous si None)
+    """
+    with _lock:
+        if path is None:
+            _memory_cache.clear()
+            return
+
+        path = os.path.abspath(os.fspath(path))
+        _memory_cache.pop(path, None)
+    try:
+        os.unlink(_get_cache_file(path))
+    except OSError:
+        pass